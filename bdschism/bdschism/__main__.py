@@ -5,6 +5,7 @@ from bdschism.hotstart_date import set_hotstart_date_cli
 from bdschism.hotstart_nudging_data import hotstart_nudge_data_cli
 from bdschism.uv3d import interpolate_uv3d_cli
 from bdschism.uv3d import single_uv3d_cli
+from bdschism.uv3d import batch_uv3d_cli
 from bdschism.port_boundary import port_boundary_cli
 from bdschism.ccf_gate_height import ccf_gate_cli
 from bdschism.calc_ndoi import calc_indoi_cli
@@ -21,6 +22,11 @@ from bdschism.potw import potw_prep_cli
 from bdschism.convert_csv_th import csv_to_th_cli
 from bdschism.slice_th_nc import slice_th_nc_cli
 from bdschism.cruise import cruise_plot_cli
+from bdschism.lsz_zone_ts import lsz_zone_ts_cli
+from bdschism.depth_average import depth_average_cli
+from bdschism.grid_mapping import map_grids_cli
+from bdschism.hsi import hsi_cli
+from bdschism.x2_time_series import x2_time_series_cli
 from bdschism.source_sink_postprocess import postprocess_source_sink_cli
 from bdschism.source_sink_workflow import source_sink_workflow_cli
 from bdschism.create_sflux_links import create_sflux_links
@@ -77,6 +83,7 @@ cli.add_command(set_hotstart_date_cli, "hot_date")
 cli.add_command(hotstart_nudge_data_cli, "hot_nudge_data")
 cli.add_command(interpolate_uv3d_cli, "uv3d")
 cli.add_command(single_uv3d_cli, "uv3d_single")
+cli.add_command(batch_uv3d_cli, "uv3d_batch")
 cli.add_command(port_boundary_cli, "port_bc")
 cli.add_command(ccf_gate_cli, "ccf_gate")
 # create_nudging = "schimpy.nudging:main"
@@ -98,6 +105,11 @@ cli.add_command(postprocess_source_sink_cli, "postprocess_source_sink")
 cli.add_command(source_sink_workflow_cli, "source_sink_workflow")
 cli.add_command(create_sflux_links, "create_sflux_links")
 cli.add_command(cruise_plot_cli, "usgs_cruise_profile")
+cli.add_command(lsz_zone_ts_cli, "lsz_zone_ts")
+cli.add_command(x2_time_series_cli, "x2_time_series")
+cli.add_command(depth_average_cli, "depth_average")
+cli.add_command(map_grids_cli, "map_grids")
+cli.add_command(hsi_cli, "hsi")
 cli.add_command(convert_struct_data_schism_cli, "convert_struct_data_schism")
 
 
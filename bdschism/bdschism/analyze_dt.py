@@ -96,48 +96,131 @@ def plot(filename, file_step, n):
     plt.show()
 
 
-def summarize_elements(ncfile, top_n, min_count, ref_nth=25):
+def _smallest_per_row(block, top_n, ref_nth):
+    """Select the ``top_n`` smallest finite entries of each row of ``block``.
+
+    Ties at the cutoff are broken in favour of the lowest column index.
+    Returns the selection mask and the ``ref_nth`` smallest value of each row
+    (NaN where a row has no finite entries).
+    """
+    nrow, ncol = block.shape
+    nvalid = np.isfinite(block).sum(axis=1)
+    filled = np.where(np.isfinite(block), block, np.inf)
+    k_top = min(top_n, ncol) - 1
+    k_ref = min(ref_nth, ncol - 1)
+    part = np.partition(filled, sorted({k_top, k_ref}), axis=1)
+    cutoff = part[:, k_top]
+    nth_val = np.where(nvalid > ref_nth, part[:, k_ref], np.nan)
+
+    less = filled < cutoff[:, None]
+    need = min(top_n, ncol) - less.sum(axis=1)
+    at_cutoff = filled == cutoff[:, None]
+    selected = less | (at_cutoff & (np.cumsum(at_cutoff, axis=1) <= need[:, None]))
+    selected &= np.isfinite(block)
+    return selected, nth_val
+
+
+def summarize_elements(ncfile, top_n, min_count, ref_nth=25, chunk_steps=None):
+    """Find elements that repeatedly have among the smallest transport time steps.
+
+    At every output time the ``top_n`` elements with the smallest
+    ``minTransportTimeStep`` (excluding NaN and the unconstrained value 90)
+    are recorded together with the ratio of their time step to the
+    ``ref_nth`` smallest one. Time steps are read in blocks and processed
+    with array operations, so memory is bounded by ``chunk_steps`` times the
+    number of elements.
+
+    Parameters
+    ----------
+    ncfile : str
+        Path to the out2d NetCDF file.
+    top_n : int
+        Number of smallest time steps considered at each output time.
+    min_count : int
+        Minimum number of appearances for an element to be reported.
+    ref_nth : int, optional
+        Zero-based rank of the reference time step used for the ratios.
+    chunk_steps : int, optional
+        Number of output times read at once. By default about 50 million
+        values are read per block.
+
+    Returns
+    -------
+    summary : list of dict
+        One entry per reported element with ``index``, ``count``,
+        ``max_count``, ``x``, ``y`` and the ``timesteps`` and ``nth_ratios``
+        of its appearances, sorted by ratio. Entries are ordered by
+        decreasing count, then index.
+    face_x, face_y : numpy.ndarray
+        Element center coordinates.
+    """
     ds = xr.open_dataset(ncfile)
     dt_all = ds["minTransportTimeStep"]
     face_x = ds["SCHISM_hgrid_face_x"].values
     face_y = ds["SCHISM_hgrid_face_y"].values
 
-    cell_stats = {}
     max_count = dt_all.sizes["time"]
-    for t_idx in range(max_count):
-        dts = dt_all.isel(time=t_idx).values
+    nface = dt_all.shape[1]
+    if chunk_steps is None:
+        chunk_steps = max(1, 50_000_000 // max(nface, 1))
+
+    elems = []
+    tsteps = []
+    values = []
+    ratios = []
+    for t0 in range(0, max_count, chunk_steps):
+        t1 = min(t0 + chunk_steps, max_count)
+        block = dt_all.isel(time=slice(t0, t1)).values
         # Exclude dt==90 and NaN (not limiting)
-        valid = np.where((dts != 90) & (~np.isnan(dts)))[0]
-        if valid.size == 0:
+        block = np.where(block != 90, block, np.nan)
+        has_valid = np.isfinite(block).any(axis=1)
+        if not has_valid.any():
             continue
-        # Get top_n indices with smallest dt
-        top_indices = valid[np.argsort(dts[valid])[:top_n]]
-        nth_index = valid[np.argsort(dts[valid])[ref_nth]]
-        for idx in top_indices:
-            if idx not in cell_stats:
-                cell_stats[idx] = {"count": 0, "timesteps": [], "nth_ratios": []}
-            cell_stats[idx]["count"] += 1
-            cell_stats[idx]["nth_ratios"].append(dts[idx]/dts[nth_index])
-            cell_stats[idx]["timesteps"].append(float(dts[idx]))
+        selected, nth_val = _smallest_per_row(block, top_n, ref_nth)
+        short = has_valid & np.isnan(nth_val)
+        if short.any():
+            raise ValueError(
+                f"Time index {t0 + np.flatnonzero(short)[0]} has no more than "
+                f"{ref_nth} limiting elements; lower ref_nth"
+            )
+        rows, cols = np.nonzero(selected)
+        dts = block[rows, cols]
+        elems.append(cols)
+        tsteps.append(rows + t0)
+        values.append(dts)
+        ratios.append(dts / nth_val[rows].astype(dts.dtype))
+    ds.close()
+
+    if not elems:
+        return [], face_x, face_y
+    elems = np.concatenate(elems)
+    tsteps = np.concatenate(tsteps)
+    values = np.concatenate(values)
+    ratios = np.concatenate(ratios)
+
+    counts = np.bincount(elems, minlength=nface)
+    keep = counts[elems] >= min_count
+    elems, tsteps, values, ratios = elems[keep], tsteps[keep], values[keep], ratios[keep]
+    # Group by element, ordered by ratio and then time within each element
+    order = np.lexsort((tsteps, ratios, elems))
+    elems, values, ratios = elems[order], values[order], ratios[order]
+    uniq, starts = np.unique(elems, return_index=True)
+    bounds = np.append(starts, len(elems))
 
     summary = []
-    for idx, info in cell_stats.items():
-        if info["count"] >= min_count:
-            # Sort both sort_dts and sort_nths according to sort_nths
-            paired = sorted(zip(info["timesteps"], info["nth_ratios"]), key=lambda x: x[1])
-            sort_dts = [p[0] for p in paired]
-            sort_nths = [p[1] for p in paired]
-            summary.append(
-                {
-                    "index": idx,
-                    "count": info["count"],
-                    "max_count": max_count,
-                    "x": float(face_x[idx]),
-                    "y": float(face_y[idx]),
-                    "nth_ratios": sort_nths, 
-                    "timesteps": sort_dts,
-                }
-            )
+    for k, idx in enumerate(uniq):
+        sl = slice(bounds[k], bounds[k + 1])
+        summary.append(
+            {
+                "index": int(idx),
+                "count": int(counts[idx]),
+                "max_count": max_count,
+                "x": float(face_x[idx]),
+                "y": float(face_y[idx]),
+                "nth_ratios": [r for r in ratios[sl]],
+                "timesteps": values[sl].tolist(),
+            }
+        )
     # Sort by count descending, then index
     summary.sort(key=lambda x: (-x["count"], x["index"]))
     return summary, face_x, face_y
@@ -249,9 +332,19 @@ def write_bad_csv(csv_out, points):
 )
 @click.option("--csv_out", type=str, default=None, help="Optional CSV output file.")
 @click.option("--shp_out", type=str, default=None, help="Optional CSV output file.")
-def summarize(filename, num_elements, num_active, plot, label_top, csv_out, shp_out):
+@click.option(
+    "--chunk_steps",
+    type=int,
+    default=None,
+    help="Number of time steps read at once. Default sizes blocks automatically.",
+)
+def summarize(
+    filename, num_elements, num_active, plot, label_top, csv_out, shp_out, chunk_steps
+):
     """Summarize elements frequently appearing in the worst time steps."""
-    points, all_x, all_y = summarize_elements(filename, num_elements, num_active)
+    points, all_x, all_y = summarize_elements(
+        filename, num_elements, num_active, chunk_steps=chunk_steps
+    )
     if csv_out:
         write_bad_csv(csv_out, points)
     if shp_out:
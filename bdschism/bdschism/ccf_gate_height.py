@@ -26,7 +26,7 @@ from vtools.functions.filter import cosine_lanczos
 from vtools.functions.coarsen import ts_coarsen
 
 import schimpy.param as parms
-from schimpy.th_io import read_th
+from bdschism.th_sidecar import read_th
 from vtools.functions import tidalhl
 
 logger = logging.getLogger(__name__)
@@ -501,232 +501,141 @@ def _simple_mass_balance_scalar(export, zup, zin0, height, dt_sec, vt, ccf_A_val
     return zin, vt, qint
 
 
-def gen_gate_height(
-    export_ts, priority, max_height, oh4_level, cvp_ts, inside_level0, s1, s2, dt
-):
-    """
-    Estimate Clifton Court Forebay Gate opening height.
-
-    This function estimates the opening height of the Clifton Court Forebay (CCFB) radial gates
-    based on SWP export, eligible intervals for opening and priority level, maximum gate height allowed,
-    OH4 stage level, CVP pump rate, and other operational rules for a given period.
-
-    Gate Opening Conditions
-    -----------------------
-    - **Priority Eligibility**: The gate opens only if priority eligibility criteria are met.
-    - **Water Level Difference**: The gate opens if the water level outside the forebay is higher than the water level inside.
-
-    Early Gate Closure
-    ------------------
-
-    The gate will close early if the volume of water above the 2 ft contour is sufficient to cover
-    the remaining water allocation for the day. This simulates field operations where operators aim to
-    maintain water elevation as close to 2 ft as possible.
-
-    Gate Remains Open
-    -----------------
-
-    The gate will remain open if the volume of water above the 2 ft contour is insufficient to cover
-    the daily allocation, preventing the water level inside the forebay from dropping too low.
+@numba.jit(nopython=True)
+def _draw_down_regression_scalar(cvp, qin):
+    """Scalar :func:`draw_down_regression` for numba nopython JIT."""
+    qnormal = 5000.0
+    return -0.0547 + cvp * 0.1815 / qnormal + qin * 0.1413 / qnormal
 
-    Gate Height Calculation
-    -----------------------
-    - The default gate height is 16 ft, but a maximum height based on export level is applied.
-    - The height is adjusted to prevent flow from exceeding 12,000 cfs, reflecting operational constraints.
-    - The gate height is calculated using a simplified version of the flow rating equation:
 
-        Gate Height = 11 × (Head)^-0.3 - 0.5
+@numba.jit(nopython=True)
+def _relax_ramp(height, nstep, stop):
+    """Return ``np.arange(1.0, stop, -1.0 / nstep) * height`` element for element.
 
-      where Head = Water level upstream - Water level in the reservoir.
+    Written out so the length and values match numpy's arange exactly,
+    which keeps the compiled loop bit-for-bit with the original pandas one.
+    """
+    step = -1.0 / nstep
+    n = int(math.ceil((stop - 1.0) / step))
+    delta = (1.0 + step) - 1.0
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = (1.0 + i * delta) * height
+    return out
 
-    Parameters
-    ----------
-    export_ts : pandas.Series
-        Series of SWP pumping rate.
-    priority : pandas.DataFrame
-        CCFB gate operation priority series, must have 'priority' and 'op' columns.
-    max_height : pandas.DataFrame
-        CCFB gate maximum allowed open height.
-    oh4_level : pandas.DataFrame
-        OH4 surface stage, predicted or historical.
-    cvp_ts : pandas.DataFrame
-        CVP pumping rate.
-    inside_level0 : float
-        Initial CCFB surface stage.
-    s1 : pd.Timestamp
-        Start time.
-    s2 : pd.Timestamp
-        End time.
-    dt : pd.Timedelta
-        Output time step.
 
-    Returns
-    -------
-    gate_height : pandas.DataFrame
-        Radial gate height time series.
-    zin : pandas.DataFrame
-        Predicted forebay inside water level time series.
+@numba.jit(nopython=True)
+def _gate_height_kernel(
+    export_g,
+    daily_g,
+    prio_g,
+    op_g,
+    oh4_g,
+    maxh_g,
+    cvp_next_g,
+    cvp_prev_g,
+    inside_level0,
+    n_end,
+    day_offset,
+    steps_per_day,
+    smooth_steps,
+    dt_sec,
+    ccf_A_val,
+    ref_level,
+    width,
+    zsill,
+    height_out,
+    tt_out,
+    oh4_out,
+    orccf_out,
+    qint_out,
+    op_out,
+    ccf_out,
+    zin2_out,
+    zt2_out,
+):
+    """Gate operation stepping loop on a regular grid of step indices.
+
+    All ``*_g`` inputs are the forcing values already sampled at every grid
+    step, so the loop does no searching. Step ``k`` corresponds to
+    ``s1 + k * dt`` and ``day_offset`` is the number of steps between
+    midnight and ``s1``. Outputs are written to the preallocated ``*_out``
+    arrays with times as step indices. Returns the number of rows written
+    to the gate height/diagnostic arrays and to the interior level arrays.
     """
-    t = s1
-    relax_period = minutes(6)
-    smooth_steps = int(relax_period / dt)
     height = 0.0
-    v0 = (inside_level0 - ccf_reference_level) * ccf_A
-    vt = v0
+    vt = (inside_level0 - ref_level) * ccf_A_val
     accumulate_export = 0.0
     zin = inside_level0
-    export_ts_freq = export_ts.index[1] - export_ts.index[0]
-    export_ts_daily = (export_ts.resample("D").sum()) * export_ts_freq.total_seconds()
-    prio = 0
-    op = 0
     draw_down = 0.0
+    n_out = 0
+    n_zin2 = 0
+    k = 0
 
-    # Pre-extract numpy arrays for fast lookup inside the tight loop.
-    # pandas .iloc inside a 2-min loop over 16+ years is ~100x slower than
-    # direct numpy array indexing with np.searchsorted on int64 timestamps.
-    #
-    # IMPORTANT: pandas 2.x uses datetime64[us] by default, so .asi8 returns
-    # microseconds.  pd.Timestamp.value always returns nanoseconds.  We
-    # normalize all .asi8 arrays to nanoseconds here to match t_ns.
-    _asi8_to_ns = pd.Timestamp(export_ts.index[0]).value // export_ts.index.asi8[0]
-    export_idx = export_ts.index.asi8 * _asi8_to_ns
-    export_val = export_ts.to_numpy(dtype=float)
-    oh4_idx = oh4_level.index.asi8 * _asi8_to_ns
-    oh4_val = oh4_level.to_numpy(dtype=float)
-    priority_idx = priority.index.asi8 * _asi8_to_ns
-    priority_val = priority["priority"].to_numpy(dtype=float)
-    op_val = priority["op"].to_numpy(dtype=float)
-    maxh_idx = max_height.index.asi8 * _asi8_to_ns
-    maxh_val = max_height.to_numpy(dtype=float)
-    cvp_idx = cvp_ts.index.asi8 * _asi8_to_ns
-    cvp_val = cvp_ts.to_numpy(dtype=float)
-    daily_idx = export_ts_daily.index.asi8 * _asi8_to_ns
-    daily_val = export_ts_daily.to_numpy(dtype=float)
-    dt_sec = dt.total_seconds()
-    _width = 6.096 * M2FT
-    _zsill = -4.044 * M2FT
-
-    # Integer-nanosecond time loop: eliminates pd.Timestamp(t).value and
-    # datetime arithmetic from the hot path (~4M iterations for 16 years).
-    dt_ns = int(dt_sec * 1_000_000_000)
-    day_ns = 86400 * 1_000_000_000
-    t_ns = np.int64(pd.Timestamp(s1).value)
-    s2_ns = np.int64(pd.Timestamp(s2).value)
-
-    # Pre-allocate output arrays.  Upper bound: one row per dt step plus
-    # some headroom for relax ramps.
-    _max_steps = int((s2 - s1) / dt) + 2 * smooth_steps + 1
-    height_arr = np.empty(_max_steps, dtype=float)
-    tt_arr = np.empty(_max_steps, dtype='int64')
-    zin2_arr = np.empty(_max_steps, dtype=float)
-    zt2_arr = np.empty(_max_steps, dtype='int64')
-    zin_arr = np.empty(_max_steps, dtype=float)
-    zt_arr = np.empty(_max_steps, dtype='int64')
-    # Diagnostic arrays: oh4, orccf (oh4 - drawdown), gate flow, op flag, ccf interior
-    diag_oh4_arr = np.empty(_max_steps, dtype=float)
-    diag_orccf_arr = np.empty(_max_steps, dtype=float)
-    diag_qint_arr = np.empty(_max_steps, dtype=float)
-    diag_op_arr = np.empty(_max_steps, dtype=float)
-    diag_ccf_arr = np.empty(_max_steps, dtype=float)
-    n_out = 0       # index into height_arr / tt_arr
-    n_zin2 = 0      # index into zin2_arr / zt2_arr
-    n_zin = 0       # index into zin_arr / zt_arr
-
-    while t_ns < s2_ns:
-        zin2 = 2.0 + vt / ccf_A
-        zin2_arr[n_zin2] = zin2
-        zt2_arr[n_zin2] = t_ns
+    while k < n_end:
+        zin2_out[n_zin2] = ref_level + vt / ccf_A_val
+        zt2_out[n_zin2] = k
         n_zin2 += 1
 
-        tday_ns = t_ns - (t_ns % day_ns)
-        tday1_ns = tday_ns + day_ns
-        tleft_ns = tday1_ns - t_ns
-        nleft = int(tleft_ns // dt_ns)
+        kday = k - (k + day_offset) % steps_per_day
+        kday1 = kday + steps_per_day
+        nleft = kday1 - k
 
-        if t_ns == tday_ns:
+        if k == kday:
             accumulate_export = 0.0
 
-        loc = np.searchsorted(export_idx, t_ns) - 1
-        export = export_val[loc]
-        loc_day = np.searchsorted(daily_idx, tday_ns)
-        if loc_day >= len(daily_val):
-            loc_day = len(daily_val) - 1
-        export_daily = daily_val[loc_day]
-        loc = np.searchsorted(priority_idx, t_ns) - 1
-        prio = priority_val[loc]
-        op = op_val[loc]
-        loc = np.searchsorted(oh4_idx, t_ns) - 1
-        zup = oh4_val[loc] - draw_down
-        loc = np.searchsorted(maxh_idx, t_ns) - 1
-        max_h = maxh_val[loc]
-
-        # if (prio < 1) or (op == 0) or ((zup - zin) < 0.0):
+        export = export_g[k]
+        export_daily = daily_g[k]
+        prio = prio_g[k]
+        op = op_g[k]
+        zup = oh4_g[k] - draw_down
+        max_h = maxh_g[k]
+
         if (prio < 1) or (op == 0):
             height_target = 0.0
             if height == height_target:
                 # Single closed step
-                height_arr[n_out] = height
-                tt_arr[n_out] = t_ns
-                # mass balance for this single step
-                loc = np.searchsorted(oh4_idx, t_ns) - 1
-                oh4_raw = oh4_val[loc]
+                height_out[n_out] = height
+                tt_out[n_out] = k
+                oh4_raw = oh4_g[k]
                 zup = oh4_raw - draw_down
                 zin, vt, qint = _simple_mass_balance_scalar(
-                    export, zup, zin, height, dt_sec, vt, ccf_A, _width, _zsill)
-                diag_oh4_arr[n_out] = oh4_raw
-                diag_orccf_arr[n_out] = zup
-                diag_qint_arr[n_out] = qint
-                diag_op_arr[n_out] = op
-                diag_ccf_arr[n_out] = zin
+                    export, zup, zin, height, dt_sec, vt, ccf_A_val, width, zsill
+                )
+                oh4_out[n_out] = oh4_raw
+                orccf_out[n_out] = zup
+                qint_out[n_out] = qint
+                op_out[n_out] = op
+                ccf_out[n_out] = zin
                 n_out += 1
                 accumulate_export += export * dt_sec
-                zin_arr[n_zin] = zin
-                zt_arr[n_zin] = t_ns
-                n_zin += 1
-                loc = np.searchsorted(cvp_idx, t_ns)
-                if loc >= len(cvp_val):
-                    loc = len(cvp_val) - 1
-                cvp = cvp_val[loc]
-                draw_down = draw_down_regression(cvp, qint)
-                t_ns += dt_ns
+                draw_down = _draw_down_regression_scalar(cvp_next_g[k], qint)
+                k += 1
             else:  # closing smoothly
-                relax_n = smooth_steps
-                relax_step = -1.0 / relax_n
-                relax_height_t = np.arange(1.0, relax_step, relax_step) * height
+                relax_height_t = _relax_ramp(height, smooth_steps, -1.0 / smooth_steps)
                 relax_height_t[-1] = height_target
                 relax_n = len(relax_height_t) - 1
-                relax_height = relax_height_t[1:]
-                # Write height ramp and mass balance together
-                ramp_t_ns = t_ns
                 for ri in range(relax_n):
-                    if ramp_t_ns == tday1_ns:
+                    if k == kday1:
                         accumulate_export = 0.0
-                    tt_arr[n_out] = ramp_t_ns
-                    height_arr[n_out] = relax_height[ri]
-                    loc = np.searchsorted(export_idx, ramp_t_ns) - 1
-                    export = export_val[loc]
-                    loc = np.searchsorted(oh4_idx, ramp_t_ns) - 1
-                    oh4_raw = oh4_val[loc]
+                    h = relax_height_t[ri + 1]
+                    tt_out[n_out] = k
+                    height_out[n_out] = h
+                    export = export_g[k]
+                    oh4_raw = oh4_g[k]
                     zup = oh4_raw - draw_down
                     zin, vt, qint = _simple_mass_balance_scalar(
-                        export, zup, zin, relax_height[ri], dt_sec, vt, ccf_A, _width, _zsill)
-                    diag_oh4_arr[n_out] = oh4_raw
-                    diag_orccf_arr[n_out] = zup
-                    diag_qint_arr[n_out] = qint
-                    diag_op_arr[n_out] = op
-                    diag_ccf_arr[n_out] = zin
+                        export, zup, zin, h, dt_sec, vt, ccf_A_val, width, zsill
+                    )
+                    oh4_out[n_out] = oh4_raw
+                    orccf_out[n_out] = zup
+                    qint_out[n_out] = qint
+                    op_out[n_out] = op
+                    ccf_out[n_out] = zin
                     n_out += 1
                     accumulate_export += export * dt_sec
-                    zin_arr[n_zin] = zin
-                    zt_arr[n_zin] = ramp_t_ns
-                    n_zin += 1
-                    loc = np.searchsorted(cvp_idx, ramp_t_ns)
-                    if loc >= len(cvp_val):
-                        loc = len(cvp_val) - 1
-                    cvp = cvp_val[loc]
-                    draw_down = draw_down_regression(cvp, qint)
-                    ramp_t_ns += dt_ns
-                t_ns = ramp_t_ns
+                    draw_down = _draw_down_regression_scalar(cvp_next_g[k], qint)
+                    k += 1
 
             height = height_target
             continue
@@ -734,42 +643,32 @@ def gen_gate_height(
         export_remain = export_daily - accumulate_export
 
         if vt > export_remain:
-            height_target = 0.0
-            ## smoothing closing gate in relax period
-            relax_n = smooth_steps
-            relax_step = -1.0 / relax_n
-            relax_height = np.arange(1.0, 0, relax_step) * height
-            left_height_arr = np.zeros(nleft)
+            # Enough water above the reference level for the rest of the
+            # day: close (smoothly) and hold closed until midnight.
+            relax_height = _relax_ramp(height, smooth_steps, 0.0)
             relax_n = len(relax_height) - 1
-            if nleft >= relax_n:
-                left_height_arr[:relax_n] = relax_height[1:]
-
-            loc = np.searchsorted(oh4_idx, t_ns) - 1
-            oh4_raw = oh4_val[loc]
+            oh4_raw = oh4_g[k]
+            ccf_level = ref_level + vt / ccf_A_val
             for li in range(nleft):
-                height_arr[n_out] = left_height_arr[li]
-                tt_arr[n_out] = t_ns + li * dt_ns
-                diag_oh4_arr[n_out] = oh4_raw
-                diag_orccf_arr[n_out] = oh4_raw - draw_down
-                diag_qint_arr[n_out] = 0.0
-                diag_op_arr[n_out] = op
-                diag_ccf_arr[n_out] = ccf_reference_level + vt / ccf_A
+                if nleft >= relax_n and li < relax_n:
+                    height_out[n_out] = relax_height[li + 1]
+                else:
+                    height_out[n_out] = 0.0
+                tt_out[n_out] = k + li
+                oh4_out[n_out] = oh4_raw
+                orccf_out[n_out] = oh4_raw - draw_down
+                qint_out[n_out] = 0.0
+                op_out[n_out] = op
+                ccf_out[n_out] = ccf_level
                 n_out += 1
 
             vt = vt - export_remain
             accumulate_export = accumulate_export + export_remain
-            zin = ccf_reference_level + vt / ccf_A
+            zin = ref_level + vt / ccf_A_val
 
-            t_ns = tday1_ns
-            height = height_target
-            zin_arr[n_zin] = zin
-            zt_arr[n_zin] = t_ns
-            n_zin += 1
-            loc = np.searchsorted(cvp_idx, t_ns)
-            if loc >= len(cvp_val):
-                loc = len(cvp_val) - 1
-            cvp = cvp_val[loc]
-            draw_down = draw_down_regression(cvp, 0)
+            k = kday1
+            height = 0.0
+            draw_down = _draw_down_regression_scalar(cvp_next_g[k], 0.0)
             continue
 
         if zup - zin <= 0.0:
@@ -786,52 +685,429 @@ def gen_gate_height(
 
         for i in range(relax_n):
             height_temp = height + height_step * (i + 1)
-            loc = np.searchsorted(oh4_idx, t_ns) - 1
-            oh4_raw = oh4_val[loc]
+            oh4_raw = oh4_g[k]
             zup = oh4_raw - draw_down
-            loc = np.searchsorted(export_idx, t_ns) - 1
-            export = export_val[loc]
-            zin, vt, qint = _simple_mass_balance_scalar(export, zup, zin, height_temp, dt_sec, vt, ccf_A, _width, _zsill)
+            export = export_g[k]
+            zin, vt, qint = _simple_mass_balance_scalar(
+                export, zup, zin, height_temp, dt_sec, vt, ccf_A_val, width, zsill
+            )
             accumulate_export = accumulate_export + export * dt_sec
-            height_arr[n_out] = height_temp
-            tt_arr[n_out] = t_ns
-            diag_oh4_arr[n_out] = oh4_raw
-            diag_orccf_arr[n_out] = zup
-            diag_qint_arr[n_out] = qint
-            diag_op_arr[n_out] = op
-            diag_ccf_arr[n_out] = zin
+            height_out[n_out] = height_temp
+            tt_out[n_out] = k
+            oh4_out[n_out] = oh4_raw
+            orccf_out[n_out] = zup
+            qint_out[n_out] = qint
+            op_out[n_out] = op
+            ccf_out[n_out] = zin
             n_out += 1
-            zin_arr[n_zin] = zin
-            zt_arr[n_zin] = t_ns
-            n_zin += 1
-            loc = np.searchsorted(cvp_idx, t_ns) - 1
-            cvp = cvp_val[loc]
-            draw_down = draw_down_regression(cvp, qint)
-            t_ns += dt_ns
+            draw_down = _draw_down_regression_scalar(cvp_prev_g[k], qint)
+            k += 1
             ## if time passes the next day, reset the accumulate export
-            if t_ns == tday1_ns:
+            if k == kday1:
                 accumulate_export = 0.0
         height = height_target
 
-    # Build DataFrames from pre-allocated arrays
-    tt_index = pd.DatetimeIndex(tt_arr[:n_out], dtype='datetime64[ns]')
-    df = pd.DataFrame(height_arr[:n_out], index=tt_index, columns=["ccfb_height"])
-    zt2_index = pd.DatetimeIndex(zt2_arr[:n_zin2], dtype='datetime64[ns]')
-    zin_df2 = pd.DataFrame(zin2_arr[:n_zin2], index=zt2_index, columns=["ccfb_interior_surface"])
-
-    # Diagnostic DataFrame on the same irregular grid as gate height
-    diag_df = pd.DataFrame(
-        {
-            "gate_op": diag_op_arr[:n_out],
-            "gate_height": height_arr[:n_out],
-            "gate_flow": diag_qint_arr[:n_out],
-            "oh4_elev": diag_oh4_arr[:n_out],
-            "orccf_elev": diag_orccf_arr[:n_out],
-            "ccf_elev": diag_ccf_arr[:n_out],
-        },
-        index=tt_index,
+    return n_out, n_zin2
+
+
+@numba.jit(nopython=True, parallel=True)
+def _gate_height_batch_kernel(
+    export_g,
+    daily_g,
+    prio_g,
+    op_g,
+    oh4_g,
+    maxh_g,
+    cvp_next_g,
+    cvp_prev_g,
+    inside_level0,
+    n_end,
+    day_offset,
+    steps_per_day,
+    smooth_steps,
+    dt_sec,
+    ccf_A_val,
+    ref_level,
+    width,
+    zsill,
+    height_out,
+    tt_out,
+    oh4_out,
+    orccf_out,
+    qint_out,
+    op_out,
+    ccf_out,
+    zin2_out,
+    zt2_out,
+    counts,
+):
+    """Run :func:`_gate_height_kernel` for each row (scenario) in parallel."""
+    for j in numba.prange(export_g.shape[0]):
+        n_out, n_zin2 = _gate_height_kernel(
+            export_g[j],
+            daily_g[j],
+            prio_g[j],
+            op_g[j],
+            oh4_g[j],
+            maxh_g[j],
+            cvp_next_g[j],
+            cvp_prev_g[j],
+            inside_level0,
+            n_end,
+            day_offset,
+            steps_per_day,
+            smooth_steps,
+            dt_sec,
+            ccf_A_val,
+            ref_level,
+            width,
+            zsill,
+            height_out[j],
+            tt_out[j],
+            oh4_out[j],
+            orccf_out[j],
+            qint_out[j],
+            op_out[j],
+            ccf_out[j],
+            zin2_out[j],
+            zt2_out[j],
+        )
+        counts[j, 0] = n_out
+        counts[j, 1] = n_zin2
+
+
+def _index_ns(index):
+    """Integer nanoseconds of a DatetimeIndex regardless of its resolution."""
+    return np.asarray(index, dtype="datetime64[ns]").astype(np.int64)
+
+
+def _sample_previous(series, grid_ns):
+    """Value in effect at each grid time, i.e. ``values[searchsorted(index, t) - 1]``.
+
+    A grid time before the first index wraps to the last value, which is
+    what the per-step numpy lookup did.
+    """
+    loc = np.searchsorted(_index_ns(series.index), grid_ns) - 1
+    return np.asarray(series, dtype=float).reshape(-1)[loc]
+
+
+def _sample_next(series, grid_ns):
+    """``values[searchsorted(index, t)]`` clipped to the last value."""
+    values = np.asarray(series, dtype=float).reshape(-1)
+    loc = np.searchsorted(_index_ns(series.index), grid_ns)
+    return values[np.minimum(loc, len(values) - 1)]
+
+
+def _as_scenarios(arg, nscen):
+    if isinstance(arg, (list, tuple)):
+        if len(arg) != nscen:
+            raise ValueError(
+                f"Scenario inputs have inconsistent lengths ({len(arg)} vs {nscen})"
+            )
+        return list(arg)
+    return [arg] * nscen
+
+
+def _gate_height_scenarios(
+    export_ts,
+    priority,
+    max_height,
+    oh4_level,
+    cvp_ts,
+    inside_level0,
+    s1_ns,
+    dt,
+    grid_ns,
+    grid_day_ns,
+    n_end,
+    day_offset,
+    steps_per_day,
+    smooth_steps,
+):
+    """Sample one batch of scenarios onto the grid and run the kernel.
+
+    The returned frames own their data, so the batch arrays are freed on
+    return.
+    """
+    nscen = len(export_ts)
+    dt_ns = dt.value
+    shape = (nscen, len(grid_ns))
+    export_g = np.empty(shape)
+    daily_g = np.empty(shape)
+    prio_g = np.empty(shape)
+    op_g = np.empty(shape)
+    oh4_g = np.empty(shape)
+    maxh_g = np.empty(shape)
+    cvp_next_g = np.empty(shape)
+    cvp_prev_g = np.empty(shape)
+    for j in range(nscen):
+        ets = export_ts[j]
+        export_ts_freq = ets.index[1] - ets.index[0]
+        export_ts_daily = ets.resample("D").sum() * export_ts_freq.total_seconds()
+        export_g[j] = _sample_previous(ets, grid_ns)
+        daily_g[j] = _sample_next(export_ts_daily, grid_day_ns)
+        prio_g[j] = _sample_previous(priority[j]["priority"], grid_ns)
+        op_g[j] = _sample_previous(priority[j]["op"], grid_ns)
+        oh4_g[j] = _sample_previous(oh4_level[j], grid_ns)
+        maxh_g[j] = _sample_previous(max_height[j], grid_ns)
+        cvp_next_g[j] = _sample_next(cvp_ts[j], grid_ns)
+        cvp_prev_g[j] = _sample_previous(cvp_ts[j], grid_ns)
+
+    height_out = np.empty(shape)
+    tt_out = np.empty(shape, dtype=np.int64)
+    oh4_out = np.empty(shape)
+    orccf_out = np.empty(shape)
+    qint_out = np.empty(shape)
+    op_out = np.empty(shape)
+    ccf_out = np.empty(shape)
+    zin2_out = np.empty(shape)
+    zt2_out = np.empty(shape, dtype=np.int64)
+    counts = np.zeros((nscen, 2), dtype=np.int64)
+
+    _gate_height_batch_kernel(
+        export_g,
+        daily_g,
+        prio_g,
+        op_g,
+        oh4_g,
+        maxh_g,
+        cvp_next_g,
+        cvp_prev_g,
+        float(inside_level0),
+        n_end,
+        day_offset,
+        steps_per_day,
+        smooth_steps,
+        dt.total_seconds(),
+        float(ccf_A),
+        ccf_reference_level,
+        6.096 * M2FT,
+        -4.044 * M2FT,
+        height_out,
+        tt_out,
+        oh4_out,
+        orccf_out,
+        qint_out,
+        op_out,
+        ccf_out,
+        zin2_out,
+        zt2_out,
+        counts,
+    )
+
+    results = []
+    for j in range(nscen):
+        n_out, n_zin2 = counts[j]
+        tt_index = pd.DatetimeIndex(
+            s1_ns + tt_out[j, :n_out] * dt_ns, dtype="datetime64[ns]"
+        )
+        df = pd.DataFrame(
+            height_out[j, :n_out].copy(), index=tt_index, columns=["ccfb_height"]
+        )
+        zt2_index = pd.DatetimeIndex(
+            s1_ns + zt2_out[j, :n_zin2] * dt_ns, dtype="datetime64[ns]"
+        )
+        zin_df2 = pd.DataFrame(
+            zin2_out[j, :n_zin2].copy(),
+            index=zt2_index,
+            columns=["ccfb_interior_surface"],
+        )
+        # Diagnostic DataFrame on the same irregular grid as gate height
+        diag_df = pd.DataFrame(
+            {
+                "gate_op": op_out[j, :n_out],
+                "gate_height": height_out[j, :n_out],
+                "gate_flow": qint_out[j, :n_out],
+                "oh4_elev": oh4_out[j, :n_out],
+                "orccf_elev": orccf_out[j, :n_out],
+                "ccf_elev": ccf_out[j, :n_out],
+            },
+            index=tt_index,
+        )
+        results.append((df, zin_df2, diag_df))
+    return results
+
+
+def gen_gate_height_batch(
+    export_ts,
+    priority,
+    max_height,
+    oh4_level,
+    cvp_ts,
+    inside_level0,
+    s1,
+    s2,
+    dt,
+    batch_size=None,
+):
+    """Simulate CCFB gate height for several scenarios in one call.
+
+    Each of ``export_ts``, ``priority``, ``max_height``, ``oh4_level`` and
+    ``cvp_ts`` can be a single object shared by all scenarios or a list with
+    one entry per scenario (e.g. a set of export alternatives with their own
+    priority and max height schedules). The inputs are sampled onto the
+    ``dt`` grid and the scenarios run concurrently in the compiled kernel,
+    one thread per scenario, ``batch_size`` scenarios at a time. The sampled
+    inputs and outputs take about 17 arrays of the grid length per
+    scenario, so only one batch of them is held at once.
+
+    Parameters
+    ----------
+    export_ts, priority, max_height, oh4_level, cvp_ts
+        As in :func:`gen_gate_height`, or lists of them.
+    inside_level0 : float
+        Initial CCFB surface stage.
+    s1 : pd.Timestamp
+        Start time.
+    s2 : pd.Timestamp
+        End time.
+    dt : pd.Timedelta
+        Output time step.
+    batch_size : int, optional
+        Number of scenarios run at once. Defaults to the number of numba
+        threads.
+
+    Returns
+    -------
+    list of tuple
+        ``(gate_height, zin, diag)`` per scenario, as returned by
+        :func:`gen_gate_height`.
+    """
+    args = [export_ts, priority, max_height, oh4_level, cvp_ts]
+    nscen = max(
+        [len(a) for a in args if isinstance(a, (list, tuple))], default=1
     )
-    return df, zin_df2, diag_df
+    export_ts, priority, max_height, oh4_level, cvp_ts = [
+        _as_scenarios(a, nscen) for a in args
+    ]
+
+    s1 = pd.Timestamp(s1)
+    s2 = pd.Timestamp(s2)
+    dt = pd.Timedelta(dt)
+    dt_ns = dt.value
+    day_ns = 86400 * 1_000_000_000
+    if day_ns % dt_ns != 0:
+        raise ValueError(f"dt={dt} must divide one day evenly.")
+    s1_ns = s1.value
+    day_offset_ns = s1_ns - s1.normalize().value
+    if day_offset_ns % dt_ns != 0:
+        raise ValueError(f"Start time {s1} is not on the {dt} grid counted from midnight.")
+
+    smooth_steps = int(minutes(6) / dt)
+    steps_per_day = day_ns // dt_ns
+    day_offset = day_offset_ns // dt_ns
+    n_end = int(-(-(s2.value - s1_ns) // dt_ns))
+    # Headroom: a closing ramp or an early closure can run to the next midnight.
+    n_grid = n_end + steps_per_day + 2 * smooth_steps + 2
+    grid_ns = s1_ns + np.arange(n_grid, dtype=np.int64) * dt_ns
+    grid_day_ns = grid_ns - (grid_ns % day_ns)
+
+    if batch_size is None:
+        batch_size = numba.get_num_threads()
+    batch_size = max(1, int(batch_size))
+    results = []
+    for first in range(0, nscen, batch_size):
+        scenarios = range(first, min(first + batch_size, nscen))
+        results.extend(
+            _gate_height_scenarios(
+                [export_ts[j] for j in scenarios],
+                [priority[j] for j in scenarios],
+                [max_height[j] for j in scenarios],
+                [oh4_level[j] for j in scenarios],
+                [cvp_ts[j] for j in scenarios],
+                inside_level0,
+                s1_ns,
+                dt,
+                grid_ns,
+                grid_day_ns,
+                n_end,
+                day_offset,
+                steps_per_day,
+                smooth_steps,
+            )
+        )
+    return results
+
+
+def gen_gate_height(
+    export_ts, priority, max_height, oh4_level, cvp_ts, inside_level0, s1, s2, dt
+):
+    """
+    Estimate Clifton Court Forebay Gate opening height.
+
+    This function estimates the opening height of the Clifton Court Forebay (CCFB) radial gates
+    based on SWP export, eligible intervals for opening and priority level, maximum gate height allowed,
+    OH4 stage level, CVP pump rate, and other operational rules for a given period.
+
+    Gate Opening Conditions
+    -----------------------
+    - **Priority Eligibility**: The gate opens only if priority eligibility criteria are met.
+    - **Water Level Difference**: The gate opens if the water level outside the forebay is higher than the water level inside.
+
+    Early Gate Closure
+    ------------------
+
+    The gate will close early if the volume of water above the 2 ft contour is sufficient to cover
+    the remaining water allocation for the day. This simulates field operations where operators aim to
+    maintain water elevation as close to 2 ft as possible.
+
+    Gate Remains Open
+    -----------------
+
+    The gate will remain open if the volume of water above the 2 ft contour is insufficient to cover
+    the daily allocation, preventing the water level inside the forebay from dropping too low.
+
+    Gate Height Calculation
+    -----------------------
+    - The default gate height is 16 ft, but a maximum height based on export level is applied.
+    - The height is adjusted to prevent flow from exceeding 12,000 cfs, reflecting operational constraints.
+    - The gate height is calculated using a simplified version of the flow rating equation:
+
+        Gate Height = 11 × (Head)^-0.3 - 0.5
+
+      where Head = Water level upstream - Water level in the reservoir.
+
+    Parameters
+    ----------
+    export_ts : pandas.Series
+        Series of SWP pumping rate.
+    priority : pandas.DataFrame
+        CCFB gate operation priority series, must have 'priority' and 'op' columns.
+    max_height : pandas.DataFrame
+        CCFB gate maximum allowed open height.
+    oh4_level : pandas.DataFrame
+        OH4 surface stage, predicted or historical.
+    cvp_ts : pandas.DataFrame
+        CVP pumping rate.
+    inside_level0 : float
+        Initial CCFB surface stage.
+    s1 : pd.Timestamp
+        Start time.
+    s2 : pd.Timestamp
+        End time.
+    dt : pd.Timedelta
+        Output time step.
+
+    Returns
+    -------
+    gate_height : pandas.DataFrame
+        Radial gate height time series.
+    zin : pandas.DataFrame
+        Predicted forebay inside water level time series.
+    diag : pandas.DataFrame
+        Diagnostics (gate op, height, flow, OH4, ORCCF and CCF elevations)
+        on the same time index as ``gate_height``.
+
+    Notes
+    -----
+    All inputs are sampled once onto the ``dt`` grid and the stepping loop
+    runs in the compiled :func:`_gate_height_kernel`. ``s1`` must lie on
+    the ``dt`` grid counted from midnight and ``dt`` must divide one day.
+    See :func:`gen_gate_height_batch` to simulate several scenarios in one call.
+    """
+    return gen_gate_height_batch(
+        export_ts, priority, max_height, oh4_level, cvp_ts, inside_level0, s1, s2, dt
+    )[0]
 
 
 def process_height(s1, s2, swp_ts,cvp_ts, sjr_ts, oh4_astro_ts, sffpx_elev_ts, save_intermediate=False):
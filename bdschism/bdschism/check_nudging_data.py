@@ -1,6 +1,7 @@
 """Command line tools for nudging data validation and splicing"""
 
 import click
+import numba
 import numpy as np
 import pandas as pd
 import xarray as xr
@@ -8,10 +9,17 @@ import yaml
 import os
 import sys
 import glob
+import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import repeat
 from vtools.functions.merge import ts_splice
 
+_NUDGING_VARS = ["temperature", "salinity", "temp", "salt"]
+# Time steps read at once; a day of hourly 3D fields per chunk
+_CHUNK_STEPS = 24
+
 
 def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var, lon_var, issue_type, limit=None):
     """
@@ -25,7 +33,7 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
         Data array.
     bad_mask : ndarray
         Boolean mask of bad data.
-    time_var, depth_var, lat_var, lon_var : xarray.DataArray or None
+    time_var, depth_var, lat_var, lon_var : xarray.DataArray, ndarray or None
         Coordinate variables.
     issue_type : str
         Type of issue (e.g., 'negative', 'nan', 'inf', 'out_of_bounds', 'manual_spec').
@@ -45,6 +53,12 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
     
     # Get all indices if no limit, otherwise limit
     n_bad = len(indices[0])
+
+    # Pull coordinate values once instead of once per bad point
+    time_var, depth_var, lat_var, lon_var = (
+        None if c is None else np.asarray(getattr(c, "values", c))
+        for c in (time_var, depth_var, lat_var, lon_var)
+    )
     
     for i in range(n_bad):
         idx = tuple(ind[i] for ind in indices)
@@ -60,7 +74,7 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
         if time_var is not None:
             try:
                 t_idx = idx[0] if len(idx) > 0 else 0
-                time_val = time_var.values[t_idx]
+                time_val = time_var[t_idx]
                 coords.append(f"time={time_val}")
             except:
                 pass
@@ -68,7 +82,7 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
         if depth_var is not None:
             try:
                 d_idx = idx[1] if len(idx) > 1 else 0
-                depth_val = depth_var.values[d_idx]
+                depth_val = depth_var[d_idx]
                 coords.append(f"depth={depth_val}")
             except:
                 pass
@@ -76,7 +90,7 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
         if lat_var is not None:
             try:
                 la_idx = idx[2] if len(idx) > 2 else 0
-                lat_val = lat_var.values[la_idx]
+                lat_val = lat_var[la_idx]
                 coords.append(f"lat={lat_val:.4f}")
             except:
                 pass
@@ -84,7 +98,7 @@ def _extract_bad_data_details(var, data, bad_mask, time_var, depth_var, lat_var,
         if lon_var is not None:
             try:
                 lo_idx = idx[3] if len(idx) > 3 else (idx[2] if len(idx) > 2 else 0)
-                lon_val = lon_var.values[lo_idx]
+                lon_val = lon_var[lo_idx]
                 coords.append(f"lon={lon_val:.4f}")
             except:
                 pass
@@ -136,8 +150,290 @@ def load_nc_series(nc_file):
     return df, ds
 
 
+@numba.jit(nopython=True)
+def _scan_values(flat, lo, hi, check_bounds):
+    """Count NaN, infinite, nonzero whole and out of bounds values in one pass."""
+    counts = np.zeros(4, dtype=np.int64)
+    for v in flat:
+        if np.isnan(v):
+            counts[0] += 1
+            continue
+        if np.isinf(v):
+            counts[1] += 1
+        elif v != 0.0 and v == np.floor(v):
+            counts[2] += 1
+        if check_bounds and (v < lo or v > hi):
+            counts[3] += 1
+    return counts
+
+
+def _bad_mask(data, issue_type, lo, hi):
+    if issue_type == "nan":
+        return np.isnan(data)
+    if issue_type == "inf":
+        return np.isinf(data)
+    if issue_type == "manual_spec":
+        return np.logical_and(
+            np.logical_and(data == np.floor(data), data != 0), np.isfinite(data)
+        )
+    return np.logical_or(data < lo, data > hi)
+
+
+def _time_chunks(arr, chunk_steps):
+    """Yield ``(offset, values)`` blocks of ``arr`` along its first axis."""
+    if arr.ndim == 0:
+        yield 0, np.asarray(arr.values, dtype=float)
+        return
+    for t0 in range(0, arr.shape[0], chunk_steps):
+        yield t0, np.asarray(arr[t0 : t0 + chunk_steps].values, dtype=float)
+
+
+def _check_variable(var, arr, coords, bounds, quick, chunk_steps):
+    """Check one variable of a nudging file.
+
+    All criteria are evaluated together on each block of time steps, so the
+    variable is read once. In detailed mode, files with problems are read a
+    second time to collect the bad points of the criteria that failed.
+
+    Returns
+    -------
+    issues : list of str
+    bad_data_by_var_type : dict
+        Same layout as in :func:`validate_nudging_files`.
+    """
+    lo, hi = np.nan, np.nan
+    check_bounds = False
+    for key in ("temp", "sal"):
+        if key in var.lower():
+            lo, hi = bounds[key]
+            check_bounds = True
+
+    counts = np.zeros(4, dtype=np.int64)
+    for _, data in _time_chunks(arr, chunk_steps):
+        counts += _scan_values(data.ravel(), lo, hi, check_bounds)
+        if quick and counts[0]:
+            # NaN decides the variable in quick mode; an inf does not, since
+            # a NaN in a later block takes priority over it
+            break
+    n_nan, n_inf, n_whole, n_out = (int(c) for c in counts)
+
+    # Same criteria, order and quick mode short circuit as the serial checker
+    found = []
+    if n_nan:
+        found.append(("nan", f"{var} has NaN values", n_nan))
+    if (not quick or not found) and n_inf:
+        found.append(("inf", f"{var} has infinite values", n_inf))
+    if (not quick or not found) and n_whole:
+        pct_zeros = (n_whole / arr.size) * 100
+        if pct_zeros > 1:  # Flag if > 1% of values end in .0
+            label = (
+                f"{var} has {n_whole} values ({pct_zeros:.1f}%) ending in .0 "
+                "(possible manual specification)"
+            )
+            found.append(("manual_spec", label, n_whole))
+    if check_bounds and (not quick or not found) and n_out:
+        label = f"{var} has values outside bounds [{lo}, {hi}]"
+        found.append(("out_of_bounds", label, n_out))
+
+    details = {issue_type: [] for issue_type, _, _ in found}
+    if found and not quick:
+        time_vals, depth_vals, lat_vals, lon_vals = coords
+        for t0, data in _time_chunks(arr, chunk_steps):
+            block_time = None
+            if time_vals is not None:
+                block_time = time_vals[t0 : t0 + (data.shape[0] if data.ndim else 1)]
+            for issue_type in details:
+                details[issue_type].extend(
+                    _extract_bad_data_details(
+                        var,
+                        data,
+                        _bad_mask(data, issue_type, lo, hi),
+                        block_time,
+                        depth_vals,
+                        lat_vals,
+                        lon_vals,
+                        issue_type,
+                    )
+                )
+
+    bad_data_by_var_type = {
+        (var, issue_type): {
+            "label": label,
+            "count": 1 if quick else count,
+            "details": details[issue_type],
+        }
+        for issue_type, label, count in found
+    }
+    return [label for _, label, _ in found], bad_data_by_var_type
+
+
+def _file_fingerprint(filepath):
+    st = os.stat(filepath)
+    return st.st_size, st.st_mtime_ns
+
+
+def _check_file(filepath, bounds, quick=False, chunk_steps=_CHUNK_STEPS):
+    """Validate the data of one nudging file.
+
+    Runs in a worker process when files are checked in parallel.
+
+    Returns
+    -------
+    dict
+        File record with keys ``file``, ``path``, ``size``, ``mtime_ns``,
+        ``status`` (``"ok"``, ``"invalid"`` or ``"error"``), ``issues`` and
+        ``bad_data_by_var_type``.
+    """
+    size, mtime_ns = _file_fingerprint(filepath)
+    record = {
+        "file": os.path.basename(filepath),
+        "path": os.path.abspath(filepath),
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "status": "ok",
+        "issues": [],
+        "bad_data_by_var_type": {},
+    }
+    try:
+        with xr.open_dataset(filepath) as ds:
+            coords = tuple(
+                None if name not in ds else np.asarray(ds[name].values)
+                for name in ("time", "depth", "lat", "lon")
+            )
+            for var in _NUDGING_VARS:
+                if var in ds.data_vars:
+                    issues, bad = _check_variable(
+                        var, ds[var], coords, bounds, quick, chunk_steps
+                    )
+                    record["issues"].extend(issues)
+                    record["bad_data_by_var_type"].update(bad)
+    except Exception as e:
+        record["status"] = "error"
+        record["issues"] = [f"Error reading file: {str(e)}"]
+        record["bad_data_by_var_type"] = {}
+        return record
+    if record["issues"]:
+        record["status"] = "invalid"
+    return record
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return str(obj) if isinstance(obj, np.datetime64) else obj.item()
+    return str(obj)
+
+
+def _record_to_json(record):
+    out = {k: v for k, v in record.items() if k != "bad_data_by_var_type"}
+    out["bad_data"] = [
+        dict(variable=var, issue_type=issue_type, **issue_data)
+        for (var, issue_type), issue_data in record["bad_data_by_var_type"].items()
+    ]
+    return out
+
+
+def _record_from_json(entry):
+    record = {k: v for k, v in entry.items() if k != "bad_data"}
+    record["bad_data_by_var_type"] = {
+        (item["variable"], item["issue_type"]): {
+            "label": item["label"],
+            "count": item["count"],
+            "details": item["details"],
+        }
+        for item in entry.get("bad_data", [])
+    }
+    return record
+
+
+def _resumable_records(resume, criteria):
+    """Records of a previous summary that can be reused, keyed by path."""
+    if resume is None:
+        return {}
+    if not isinstance(resume, dict):
+        with open(resume, "r", encoding="utf-8") as f:
+            resume = json.load(f)
+    if resume.get("criteria") != criteria:
+        return {}
+    return {
+        entry["path"]: _record_from_json(entry)
+        for entry in resume.get("files", [])
+        if entry.get("status") != "error"
+    }
+
+
+def write_validation_summary(results, summary_file):
+    """Write validation results as JSON.
+
+    The summary lists every checked file with its size, modification time,
+    status and bad cells, and can be passed back to
+    :func:`validate_nudging_files` as ``resume`` to skip unchanged files.
+
+    Parameters
+    ----------
+    results : dict
+        Results returned by :func:`validate_nudging_files`.
+    summary_file : str
+        Output JSON file.
+    """
+    summary = {
+        key: results.get(key)
+        for key in (
+            "input_path",
+            "criteria",
+            "success",
+            "date_range",
+            "missing_files",
+            "files_found",
+            "files_checked",
+            "files_resumed",
+        )
+    }
+    if "error" in results:
+        summary["error"] = results["error"]
+    summary["files"] = [_record_to_json(r) for r in results.get("files", [])]
+    os.makedirs(os.path.dirname(os.path.abspath(summary_file)) or ".", exist_ok=True)
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1, default=_json_default)
+
+
+def bad_cells_table(results):
+    """Bad data points of all files as a DataFrame, one row per cell.
+
+    Columns are ``file``, ``variable``, ``issue_type``, ``time``, ``depth``,
+    ``lat``, ``lon`` and ``value``. Quick mode results have no cell details.
+    """
+    rows = [
+        (
+            record["file"],
+            var,
+            issue_type,
+            None if detail["time"] is None else str(detail["time"]),
+            detail["depth"],
+            detail["lat"],
+            detail["lon"],
+            detail["value"],
+        )
+        for record in results.get("files", [])
+        for (var, issue_type), issue_data in record["bad_data_by_var_type"].items()
+        for detail in issue_data["details"]
+    ]
+    return pd.DataFrame(
+        rows,
+        columns=["file", "variable", "issue_type", "time", "depth", "lat", "lon", "value"],
+    )
+
+
 def validate_nudging_files(
-    input_path, min_salt, max_salt, min_temp, max_temp, yaml_file=None, quick=False
+    input_path,
+    min_salt,
+    max_salt,
+    min_temp,
+    max_temp,
+    yaml_file=None,
+    quick=False,
+    nproc=1,
+    chunk_steps=_CHUNK_STEPS,
+    resume=None,
 ):
     """
     Validate nudging data files for completeness and data quality.
@@ -170,6 +466,15 @@ def validate_nudging_files(
         If True, checks all criteria for each variable, then moves to the next variable.
         Once any criterion fails for a variable, remaining criteria are skipped for that variable (default: False).
         This identifies bad files quickly without detailed reporting.
+    nproc : int, optional
+        Number of worker processes checking files in parallel (default: 1).
+    chunk_steps : int, optional
+        Number of time steps of a variable read and checked at once.
+    resume : str or dict, optional
+        Summary written by :func:`write_validation_summary` for an earlier
+        run. Files whose size and modification time are unchanged reuse
+        their recorded result when the bounds and ``quick`` match; files
+        that could not be read are always checked again.
 
     Returns
     -------
@@ -177,7 +482,16 @@ def validate_nudging_files(
         True if all validations pass, False otherwise.
     dict
         Dictionary with validation results and details about any failures.
+        ``files`` holds one record per checked file, see
+        :func:`write_validation_summary`.
     """
+    criteria = {
+        "min_salt": min_salt,
+        "max_salt": max_salt,
+        "min_temp": min_temp,
+        "max_temp": max_temp,
+        "quick": quick,
+    }
     results = {
         "success": True,
         "missing_files": [],
@@ -188,6 +502,9 @@ def validate_nudging_files(
         "input_path": input_path,
         "is_single_file": False,
         "quick_mode": quick,
+        "criteria": criteria,
+        "files_resumed": 0,
+        "files": [],
     }
 
     # Handle both directory and file inputs
@@ -246,172 +563,46 @@ def validate_nudging_files(
             results["success"] = False
         current_date += expected_interval
 
-    for dt, filepath in dates:
-        try:
-            ds = xr.open_dataset(filepath)
-            results["files_checked"] += 1
-
-            file_issues = []
-            # Organize bad data by variable and issue type
-            bad_data_by_var_type = {}
-
-            # Get coordinate variables
-            time_var = ds.get("time", None)
-            depth_var = ds.get("depth", None)
-            lat_var = ds.get("lat", None)
-            lon_var = ds.get("lon", None)
-
-            for var in ["temperature", "salinity", "temp", "salt"]:
-                if var in ds.data_vars:
-                    data = ds[var].values
-                    data = np.asarray(data, dtype=float)
-                    
-                    # In quick mode, track if this variable has ANY issues
-                    var_has_issue = False
-
-                    # Check for NaN
-                    if np.any(np.isnan(data)):
-                        bad_mask = np.isnan(data)
-                        count = np.sum(bad_mask)
-                        issue_label = f"{var} has NaN values"
-                        file_issues.append(issue_label)
-                        key = (var, "nan")
-                        bad_data_by_var_type[key] = {
-                            "label": issue_label,
-                            "count": 1 if quick else count,
-                            "details": _extract_bad_data_details(
-                                var, data, bad_mask, time_var, depth_var, lat_var, lon_var, "nan"
-                            ) if not quick else []
-                        }
-                        var_has_issue = True
-
-                    # Check for infinity (skip in quick mode if variable already has issue)
-                    if (not quick or not var_has_issue) and np.any(np.isinf(data)):
-                        bad_mask = np.isinf(data)
-                        count = np.sum(bad_mask)
-                        issue_label = f"{var} has infinite values"
-                        file_issues.append(issue_label)
-                        key = (var, "inf")
-                        bad_data_by_var_type[key] = {
-                            "label": issue_label,
-                            "count": 1 if quick else count,
-                            "details": _extract_bad_data_details(
-                                var, data, bad_mask, time_var, depth_var, lat_var, lon_var, "inf"
-                            ) if not quick else []
-                        }
-                        var_has_issue = True
-
-                    # Check for values ending in .0 (manually specified placeholders)
-                    # Skip in quick mode if variable already has issue
-                    if not quick or not var_has_issue:
-                        valid_mask = np.isfinite(data)
-                        valid_data = data[valid_mask]
-                        values_ending_in_zero = np.sum(
-                            np.logical_and(valid_data == valid_data.astype(int), valid_data != 0)
-                        )
-                        if values_ending_in_zero > 0:
-                            pct_zeros = (values_ending_in_zero / data.size) * 100
-                            if pct_zeros > 1:  # Flag if > 1% of values end in .0
-                                # Create mask for all data (not just valid)
-                                bad_mask = np.logical_and(
-                                    np.logical_and(
-                                        data == np.floor(data),  # Use floor instead of cast
-                                        data != 0
-                                    ),
-                                    np.isfinite(data)  # Only for finite values
-                                )
-                                count = np.sum(bad_mask)
-                                issue_label = f"{var} has {values_ending_in_zero} values ({pct_zeros:.1f}%) ending in .0 (possible manual specification)"
-                                file_issues.append(issue_label)
-                                key = (var, "manual_spec")
-                                bad_data_by_var_type[key] = {
-                                    "label": issue_label,
-                                    "count": 1 if quick else count,
-                                    "details": _extract_bad_data_details(
-                                        var,
-                                        data,
-                                        bad_mask,
-                                        time_var,
-                                        depth_var,
-                                        lat_var,
-                                        lon_var,
-                                        "manual_spec",
-                                    ) if not quick else []
-                                }
-                                var_has_issue = True
-
-                    if "temp" in var.lower():
-                        # Skip in quick mode if variable already has issue
-                        if not quick or not var_has_issue:
-                            bad_mask = np.logical_or(
-                                data < min_temp, data > max_temp
-                            )
-                            if np.any(bad_mask):
-                                count = np.sum(bad_mask)
-                                issue_label = f"{var} has values outside bounds [{min_temp}, {max_temp}]"
-                                file_issues.append(issue_label)
-                                key = (var, "out_of_bounds")
-                                bad_data_by_var_type[key] = {
-                                    "label": issue_label,
-                                    "count": 1 if quick else count,
-                                    "details": _extract_bad_data_details(
-                                        var,
-                                        data,
-                                        bad_mask,
-                                        time_var,
-                                        depth_var,
-                                        lat_var,
-                                        lon_var,
-                                        "out_of_bounds",
-                                    ) if not quick else []
-                                }
-                                var_has_issue = True
-
-                    if "sal" in var.lower():
-                        # Skip in quick mode if variable already has issue
-                        if not quick or not var_has_issue:
-                            bad_mask = np.logical_or(
-                                data < min_salt, data > max_salt
-                            )
-                            if np.any(bad_mask):
-                                count = np.sum(bad_mask)
-                                issue_label = f"{var} has values outside bounds [{min_salt}, {max_salt}]"
-                                file_issues.append(issue_label)
-                                key = (var, "out_of_bounds")
-                                bad_data_by_var_type[key] = {
-                                    "label": issue_label,
-                                    "count": 1 if quick else count,
-                                    "details": _extract_bad_data_details(
-                                        var,
-                                        data,
-                                        bad_mask,
-                                        time_var,
-                                        depth_var,
-                                        lat_var,
-                                        lon_var,
-                                        "out_of_bounds",
-                                    ) if not quick else []
-                                }
-                                var_has_issue = True
-
-            if file_issues:
-                results["files_with_invalid_data"].append(
-                    {
-                        "file": os.path.basename(filepath),
-                        "issues": file_issues,
-                        "bad_data_by_var_type": bad_data_by_var_type,
-                    }
-                )
-                results["success"] = False
-
-            ds.close()
+    previous = _resumable_records(resume, criteria)
+    bounds = {"temp": (min_temp, max_temp), "sal": (min_salt, max_salt)}
+    records = {}
+    to_check = []
+    for _, filepath in dates:
+        record = previous.get(os.path.abspath(filepath))
+        if record is not None and (record["size"], record["mtime_ns"]) == tuple(
+            _file_fingerprint(filepath)
+        ):
+            records[filepath] = record
+            results["files_resumed"] += 1
+        else:
+            to_check.append(filepath)
+
+    if nproc > 1 and len(to_check) > 1:
+        with ProcessPoolExecutor(max_workers=nproc) as pool:
+            checked = pool.map(
+                _check_file,
+                to_check,
+                repeat(bounds),
+                repeat(quick),
+                repeat(chunk_steps),
+                chunksize=max(1, len(to_check) // (4 * nproc)),
+            )
+            records.update(zip(to_check, checked))
+    else:
+        for filepath in to_check:
+            records[filepath] = _check_file(filepath, bounds, quick, chunk_steps)
 
-        except Exception as e:
+    for _, filepath in dates:
+        record = records[filepath]
+        results["files"].append(record)
+        if record["status"] != "error":
+            results["files_checked"] += 1
+        if record["status"] != "ok":
             results["files_with_invalid_data"].append(
                 {
-                    "file": os.path.basename(filepath),
-                    "issues": [f"Error reading file: {str(e)}"],
-                    "bad_data_by_var_type": {},
+                    "file": record["file"],
+                    "issues": record["issues"],
+                    "bad_data_by_var_type": record["bad_data_by_var_type"],
                 }
             )
             results["success"] = False
@@ -476,9 +667,48 @@ def validate_nudging_files(
     help="Quick mode: stops checking each criteria once first bad point is found. Identifies bad files quickly without detailed reporting.",
     show_default=True,
 )
+@click.option(
+    "--nproc",
+    default=1,
+    type=int,
+    help="Number of worker processes checking files in parallel.",
+    show_default=True,
+)
+@click.option(
+    "--summary-json",
+    default=None,
+    type=click.Path(),
+    help="Optional JSON file listing every checked file and its bad cells. Can be passed to --resume in a later run.",
+    show_default=True,
+)
+@click.option(
+    "--bad-cells",
+    default=None,
+    type=click.Path(),
+    help="Optional table of bad cells, one row per point. Written as parquet if the name ends in .parquet, CSV otherwise.",
+    show_default=True,
+)
+@click.option(
+    "--resume",
+    default=None,
+    type=click.Path(exists=True),
+    help="Summary JSON of a previous run with the same bounds. Files that have not changed since are not checked again.",
+    show_default=True,
+)
 
 def check_nudging_data_cli(
-    input_path, min_salt, max_salt, min_temp, max_temp, yaml, report_file, quick
+    input_path,
+    min_salt,
+    max_salt,
+    min_temp,
+    max_temp,
+    yaml,
+    report_file,
+    quick,
+    nproc,
+    summary_json,
+    bad_cells,
+    resume,
 ):
     """
     Validate nudging data files for completeness and data quality.
@@ -504,11 +734,33 @@ def check_nudging_data_cli(
     Example (quick mode):
         bds check_nudging_data --input ./nudging_data --quick \\
             --min-salt 0 --max-salt 40 --min-temp 5 --max-temp 30
+
+    Example (parallel, resuming an earlier check of the archive):
+        bds check_nudging_data --input ./nudging_data --nproc 16 \\
+            --summary-json check.json --resume check.json
     """
 
     success, results = validate_nudging_files(
-        input_path, min_salt, max_salt, min_temp, max_temp, yaml, quick=quick
+        input_path,
+        min_salt,
+        max_salt,
+        min_temp,
+        max_temp,
+        yaml,
+        quick=quick,
+        nproc=nproc,
+        resume=resume,
     )
+    if summary_json:
+        write_validation_summary(results, summary_json)
+        click.echo(f"Summary written to: {summary_json}")
+    if bad_cells:
+        table = bad_cells_table(results)
+        if bad_cells.endswith(".parquet"):
+            table.to_parquet(bad_cells, index=False)
+        else:
+            table.to_csv(bad_cells, index=False)
+        click.echo(f"Bad cells written to: {bad_cells}")
 
     # Determine if output is to console or file
     to_file = report_file is not None
@@ -529,6 +781,10 @@ def check_nudging_data_cli(
     else:
         report_lines.append(f"Files Found: {results['files_found']}")
         report_lines.append(f"Files Checked: {results['files_checked']}")
+        if results.get("files_resumed"):
+            report_lines.append(
+                f"Files Unchanged Since Previous Check: {results['files_resumed']}"
+            )
         
         # Only show date range for multiple files
         if not results["is_single_file"] and results["date_range"]:
@@ -1,40 +1,15 @@
-import xarray as xr
+import netCDF4 as nc
 import os
+import time
 import click
 import glob
 import re
 import numpy as np
 
 
-def validate_time_step_consistency(time_values, atol=1e-9, max_report=20):
-    """Validate constant time step and report exact mismatch locations."""
-
-    times = np.asarray(time_values, dtype=float)
-    if times.size < 2:
-        print(
-            "\tTime coordinate has fewer than 2 points; timestep consistency check skipped."
-        )
-        return
-
-    dt = np.diff(times)
-    expected_dt = dt[0]
-    bad_idx = np.where(~np.isclose(dt, expected_dt, atol=atol, rtol=0.0))[0]
-
-    if bad_idx.size == 0:
-        print(f"\tTimestep is consistent: dt={expected_dt}.")
-        return
-
-    report_lines = [
-        f"\tFound {bad_idx.size} inconsistent timestep(s). Expected dt={expected_dt}."
-    ]
-    for i in bad_idx[:max_report]:
-        report_lines.append(
-            f"  idx {i}->{i+1}: t0={times[i]}, t1={times[i+1]}, dt={dt[i]}"
-        )
-    if bad_idx.size > max_report:
-        report_lines.append(f"  ... and {bad_idx.size - max_report} more mismatch(es).")
-
-    raise ValueError("\n".join(report_lines))
+# Attributes of the partial output that record the appended files and steps
+_FILES_ATTR = "combine_nc_files"
+_STEPS_ATTR = "combine_nc_steps"
 
 
 def get_selected_files(template, start_num, end_num):
@@ -78,60 +53,306 @@ def get_selected_files(template, start_num, end_num):
     return input_files
 
 
-def combine_nc(input_files, outfile, reset_time=False):
-    """Combines multiple NetCDF files (e.g., out2d_1.nc, out2d_2.nc, etc.) into a single NetCDF file along the time dimension."""
+class NCTimeCombiner:
+    """Append NetCDF files to a single output along the time dimension.
+
+    The output is created from the first input with an unlimited ``time``
+    dimension. Variables without a time dimension are copied once; variables
+    on the time dimension are appended file by file, dropping the first
+    time slice of every file after the first to avoid duplicate boundaries.
+    Only one input file is open at a time, so memory use is bounded by the
+    largest input rather than by the combined dataset.
+
+    The time steps are checked for a constant step as the data arrive. The
+    output is written to ``<outfile>.part`` and only renamed to ``outfile``
+    when :meth:`close` succeeds, so a failed combine never leaves a truncated
+    file under the final name. The number of files and time steps appended
+    so far are kept in the attributes of the partial output, so a combine
+    that was killed can continue with ``resume=True``, appending from input
+    :attr:`nfiles` on.
+
+    Parameters
+    ----------
+    outfile : str
+        Path of the combined NetCDF file.
+    reset_time : bool
+        If True, rewrite the time coordinate to start from zero with the time
+        step of the first input instead of checking the original values.
+    atol : float
+        Absolute tolerance for the time step consistency check.
+    max_report : int
+        Maximum number of time step mismatches listed in the error message.
+    resume : bool
+        If True and ``<outfile>.part`` was left by an interrupted combine,
+        continue it instead of starting over.
+
+    Examples
+    --------
+    >>> with NCTimeCombiner("uv3D.th.nc") as combiner:
+    ...     for f in ["uv3d_1.th.nc", "uv3d_2.th.nc"]:
+    ...         combiner.append(f)
+    """
 
-    # Load and combine the NetCDF files, dropping the first time slice
-    # for every dataset except the first one to avoid duplicate boundaries.
-    datasets = [xr.open_dataset(f, decode_times=False) for f in input_files]
-    concat_datasets = []
-    for idx, dataset in enumerate(datasets):
-        if idx == 0:
-            concat_datasets.append(dataset)
+    def __init__(
+        self, outfile, reset_time=False, atol=1e-9, max_report=20, resume=False
+    ):
+        self.outfile = outfile
+        self.reset_time = reset_time
+        self.atol = atol
+        self.max_report = max_report
+        self.tmpfile = f"{outfile}.part"
+        self.nfiles = 0
+        self.ntime = 0
+        self.nbytes = 0
+        self._dst = None
+        self._dt = None
+        self._first_times = None
+        self._last_time = None
+        self._bad = []
+        self._nbad = 0
+        self._t_start = None
+        if resume and os.path.exists(self.tmpfile):
+            self._reopen()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
         else:
-            concat_datasets.append(dataset.isel(time=slice(1, None)))
-
-    combined_ds = xr.concat(concat_datasets, dim="time")
-
-    # Update the time coordinate with the provided times
-    if reset_time == True:
-        times = np.asarray(combined_ds["time"].values, dtype=float)
-        dt = np.diff(times)[1]
-
-        print("\tResetting time coordinate to start from zero.")
+            self.abort()
+        return False
+
+    def _create(self, src):
+        out_dir = os.path.dirname(self.outfile)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        if "time" not in src.dimensions:
+            raise ValueError(f"Input file {src.filepath()} has no 'time' dimension")
+        dst = nc.Dataset(self.tmpfile, "w", format=src.data_model)
+        dst.set_auto_maskandscale(False)
+        dst.setncatts({a: src.getncattr(a) for a in src.ncattrs()})
+        # Set before any data so a classic format header does not grow later
+        dst.setncattr(_FILES_ATTR, 0)
+        dst.setncattr(_STEPS_ATTR, 0)
+        for name, dim in src.dimensions.items():
+            dst.createDimension(name, None if name == "time" else len(dim))
+        netcdf4 = src.data_model.startswith("NETCDF4")
+        for name, var in src.variables.items():
+            kwargs = {}
+            if "_FillValue" in var.ncattrs():
+                kwargs["fill_value"] = var.getncattr("_FillValue")
+            if netcdf4:
+                filters = var.filters() or {}
+                if filters.get("zlib"):
+                    kwargs.update(
+                        zlib=True,
+                        complevel=filters.get("complevel", 4),
+                        shuffle=filters.get("shuffle", False),
+                    )
+                chunking = var.chunking()
+                if chunking != "contiguous" and chunking is not None:
+                    kwargs["chunksizes"] = chunking
+            out = dst.createVariable(name, var.datatype, var.dimensions, **kwargs)
+            out.setncatts(
+                {a: var.getncattr(a) for a in var.ncattrs() if a != "_FillValue"}
+            )
+            if "time" not in var.dimensions:
+                out[...] = var[...]
+        self._dst = dst
+
+    def _reopen(self):
+        """Continue the partial output after its last complete input file."""
+        dst = nc.Dataset(self.tmpfile, "a")
+        attrs = dst.ncattrs()
+        if _FILES_ATTR not in attrs or dst.getncattr(_STEPS_ATTR) < 2:
+            # Nothing to keep: start over
+            dst.close()
+            return
+        dst.set_auto_maskandscale(False)
+        self.nfiles = int(dst.getncattr(_FILES_ATTR))
+        self.ntime = int(dst.getncattr(_STEPS_ATTR))
+        times = np.asarray(dst.variables["time"][: self.ntime], dtype=float)
+        self._first_times = times
+        if self.reset_time:
+            self._dt = times[1] - times[0]
+        else:
+            self._check_times(times)
+        self._last_time = times[-1]
+        self._dst = dst
         print(
-            "\tOriginal time values:",
-            "[",
-            " ".join(map(str, combined_ds["time"].values[:3])),
-            "...",
-            " ".join(map(str, combined_ds["time"].values[-3:])),
-            "]"
+            f"\tResuming {self.tmpfile}: {self.nfiles} file(s), {self.ntime} steps"
         )
 
-        # create array of new time values starting from 0 with the same length as the combined dataset
-        combined_ds["time"] = np.arange(0, len(times) * dt, dt)
-
+    def _check_times(self, times):
+        """Run the running time step check on newly appended time values."""
+        if self._last_time is not None:
+            times_ext = np.concatenate(([self._last_time], times))
+            offset = self.ntime - 1
+        else:
+            times_ext = times
+            offset = 0
+        if times_ext.size < 2:
+            return
+        dt = np.diff(times_ext)
+        if self._dt is None:
+            self._dt = dt[0]
+        bad_idx = np.where(~np.isclose(dt, self._dt, atol=self.atol, rtol=0.0))[0]
+        self._nbad += bad_idx.size
+        for i in bad_idx[: max(self.max_report - len(self._bad), 0)]:
+            self._bad.append(
+                (offset + i, times_ext[i], times_ext[i + 1], dt[i])
+            )
+
+    def append(self, infile):
+        """Append the time slices of ``infile`` to the output.
+
+        Parameters
+        ----------
+        infile : str
+            NetCDF file to append.
+        """
+        t0 = time.perf_counter()
+        if self._t_start is None:
+            self._t_start = t0
+        with nc.Dataset(infile, "r") as src:
+            src.set_auto_maskandscale(False)
+            if self._dst is None:
+                self._create(src)
+            dst = self._dst
+
+            for name, dim in src.dimensions.items():
+                if name != "time" and len(dim) != len(dst.dimensions[name]):
+                    raise ValueError(
+                        f"Dimension '{name}' of {infile} has size {len(dim)}, "
+                        f"expected {len(dst.dimensions[name])}"
+                    )
+
+            # Drop the first time slice of every file after the first
+            first = 0 if self.nfiles == 0 else 1
+            nt_src = len(src.dimensions["time"])
+            nt_new = max(nt_src - first, 0)
+            i0 = self.ntime
+
+            if "time" in src.variables:
+                times = np.asarray(src.variables["time"][first:], dtype=float)
+                if self._first_times is None:
+                    self._first_times = times
+                if self.reset_time:
+                    if self._dt is None:
+                        ft = self._first_times
+                        self._dt = np.diff(ft)[1] if ft.size > 2 else np.diff(ft)[0]
+                    dst.variables["time"][i0 : i0 + nt_new] = (
+                        np.arange(i0, i0 + nt_new) * self._dt
+                    )
+                else:
+                    self._check_times(times)
+                    dst.variables["time"][i0 : i0 + nt_new] = times
+                if nt_new:
+                    self._last_time = times[-1]
+
+            for name, var in src.variables.items():
+                if name == "time" or "time" not in var.dimensions:
+                    continue
+                if name not in dst.variables:
+                    raise ValueError(
+                        f"Variable '{name}' of {infile} is not in the first input file"
+                    )
+                axis = var.dimensions.index("time")
+                src_idx = [slice(None)] * var.ndim
+                src_idx[axis] = slice(first, nt_src)
+                dst_idx = [slice(None)] * var.ndim
+                dst_idx[axis] = slice(i0, i0 + nt_new)
+                dst.variables[name][tuple(dst_idx)] = var[tuple(src_idx)]
+
+        self.ntime += nt_new
+        self.nfiles += 1
+        dst.setncattr(_FILES_ATTR, self.nfiles)
+        dst.setncattr(_STEPS_ATTR, self.ntime)
+        dst.sync()
+        size = os.path.getsize(infile)
+        self.nbytes += size
+        elapsed = time.perf_counter() - t0
+        total = time.perf_counter() - self._t_start
         print(
-            "\tUpdated time values:",
-            "[",
-            " ".join(map(str, combined_ds["time"].values[:3])),
-            "...",
-            " ".join(map(str, combined_ds["time"].values[-3:])),
-            "]"
+            f"\t[{self.nfiles}] {infile}: {nt_new} step(s) in {elapsed:.2f}s "
+            f"({size / 1e6 / max(elapsed, 1e-9):.1f} MB/s; "
+            f"total {self.ntime} steps, {self.nbytes / 1e6 / max(total, 1e-9):.1f} MB/s)"
         )
 
-    elif reset_time == False:
-        validate_time_step_consistency(combined_ds["time"].values)
-
-    # Save the combined dataset to a new NetCDF file
-    out_dir = os.path.dirname(outfile)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
-    combined_ds.to_netcdf(outfile)
+    def close(self):
+        """Finish the check, close the output and move it to ``outfile``."""
+        if self._dst is None:
+            raise ValueError("No input files were appended.")
+        dst = self._dst
+        for name in (_FILES_ATTR, _STEPS_ATTR):
+            dst.delncattr(name)
+        ntime = len(dst.dimensions["time"])
+        dst.close()
+        if ntime != self.ntime:
+            # A resumed output holds more steps than the inputs now give
+            self._dst = None
+            self.abort()
+            raise ValueError(
+                f"{self.tmpfile} has {ntime} time steps, expected {self.ntime}"
+            )
+        self._dst = None
+        try:
+            self._report()
+        except Exception:
+            self.abort()
+            raise
+        os.replace(self.tmpfile, self.outfile)
+
+    def abort(self):
+        """Close and remove the partially written output."""
+        if self._dst is not None:
+            self._dst.close()
+            self._dst = None
+        if os.path.exists(self.tmpfile):
+            os.remove(self.tmpfile)
+
+    def _report(self):
+        if self.reset_time:
+            print(
+                f"\tReset time coordinate to start from zero with dt={self._dt} "
+                f"({self.ntime} steps)."
+            )
+            return
+        if self.ntime < 2:
+            print(
+                "\tTime coordinate has fewer than 2 points; timestep consistency check skipped."
+            )
+            return
+        if self._nbad == 0:
+            print(f"\tTimestep is consistent: dt={self._dt}.")
+            return
+        report_lines = [
+            f"\tFound {self._nbad} inconsistent timestep(s). Expected dt={self._dt}."
+        ]
+        for i, t0, t1, dt in self._bad:
+            report_lines.append(f"  idx {i}->{i+1}: t0={t0}, t1={t1}, dt={dt}")
+        if self._nbad > self.max_report:
+            report_lines.append(
+                f"  ... and {self._nbad - self.max_report} more mismatch(es)."
+            )
+        raise ValueError("\n".join(report_lines))
+
+
+def combine_nc(input_files, outfile, reset_time=False, resume=False):
+    """Combines multiple NetCDF files (e.g., out2d_1.nc, out2d_2.nc, etc.) into a single NetCDF file along the time dimension.
+
+    The files are streamed into the output one at a time with
+    :class:`NCTimeCombiner`, so peak memory is bounded by a single input.
+    With ``resume``, the partial output of an interrupted combine of the
+    same inputs is continued.
+    """
 
-    for dataset in datasets:
-        dataset.close()
-    combined_ds.close()
+    print(f"\tCombining {len(input_files)} file(s) into {outfile}")
+    with NCTimeCombiner(outfile, reset_time=reset_time, resume=resume) as combiner:
+        for f in input_files[combiner.nfiles :]:
+            combiner.append(f)
 
 
 def combine_uv3d(
@@ -140,13 +361,14 @@ def combine_uv3d(
     outfile,
     tmp_out_dir="./outputs.tropic/uv3d",
     reset_time=False,
+    resume=False,
 ):
 
     template = f"{tmp_out_dir}/uv3d_*.th.nc"
 
     input_files = get_selected_files(template, start_num, end_num)
 
-    combine_nc(input_files, outfile, reset_time=reset_time)
+    combine_nc(input_files, outfile, reset_time=reset_time, resume=resume)
     
     print(f"\nOutfile written to : {outfile}")
 
@@ -236,8 +458,15 @@ def compare_dataarray_all_axes(validate_da, check_da, atol=1e-6, rtol=1e-6):
     is_flag=True,
     help="Reset the time coordinate to start from zero.",
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue the partial <output>.part of an interrupted combine.",
+)
 @click.help_option("-h", "--help")
-def combine_nc_cli(template, start, end, output, tmp_out_dir, reset_time=False):
+def combine_nc_cli(
+    template, start, end, output, tmp_out_dir, reset_time=False, resume=False
+):
     """Command line utility for combining NetCDF files.
 
     Example usage:
@@ -247,15 +476,22 @@ def combine_nc_cli(template, start, end, output, tmp_out_dir, reset_time=False):
     if "uv3d" in template.lower():
         print("Combining uv3d files using combine_uv3d...")
         if tmp_out_dir is None:
-            combine_uv3d(start, end, output, reset_time=reset_time)
+            combine_uv3d(start, end, output, reset_time=reset_time, resume=resume)
         else:
-            combine_uv3d(start, end, output, tmp_out_dir=tmp_out_dir, reset_time=reset_time)
+            combine_uv3d(
+                start,
+                end,
+                output,
+                tmp_out_dir=tmp_out_dir,
+                reset_time=reset_time,
+                resume=resume,
+            )
     else:
         print(
             f"Combining generic NetCDF files using combine_nc and template: {template}..."
         )
         input_files = get_selected_files(template, start, end)
-        combine_nc(input_files, output, reset_time=reset_time)
+        combine_nc(input_files, output, reset_time=reset_time, resume=resume)
 
 
 if __name__ == "__main__":
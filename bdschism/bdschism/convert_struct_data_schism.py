@@ -25,6 +25,8 @@ import vtools.functions.unit_conversions as units
 
 from dms_datastore import read_ts_repo
 
+from bdschism.th_writer import write_th
+
 logger = logging.getLogger(__name__)
 
 
@@ -97,7 +99,8 @@ def _write_th(df, fname, columns, float_format="%.2f", inline_comments=None):
     inline_comments = inline_comments or {}
 
     buf = StringIO()
-    out[columns].to_csv(
+    write_th(
+        out[columns],
         buf,
         sep=" ",
         float_format=float_format,
@@ -1,5 +1,7 @@
 import datetime as dtm
 from .profile_plot import profile_plot
+from .read_fort18 import read_xyt
+from .extract_xyt import extract_profiles, output_period, profiles_to_xyt
 import matplotlib.pyplot as plt
 from matplotlib.font_manager import fontManager, FontProperties
 import sys
@@ -7,6 +9,8 @@ import pandas as pd
 import numpy as np
 import os
 import re
+import json
+import tempfile
 from dateutil import parser
 import errno
 from shutil import copyfile, which
@@ -234,7 +238,111 @@ def process_cruise(path):
     return cruise_data
 
 
-def process_cruise_yearly_csv(path, target_stations=None, depth_threshold_stations=None, model_start_time=None):
+# Columns of the yearly USGS cruise CSV used by process_cruise_yearly_csv
+_YEARLY_COLUMNS = ("Date", "Time", "Station", "Depth (m)", "Salinity")
+_CRUISE_CACHE_EXT = ".npz"
+_CRUISE_CACHE_VERSION = 1
+
+
+def _as_float(column):
+    """Values of ``column`` as floats and a mask of entries ``float`` rejects."""
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        return column.astype(float), np.zeros(len(column), dtype=bool)
+    values = pd.to_numeric(column, errors="coerce").astype(float)
+    return values, (values.isna() & column.notna()).to_numpy()
+
+
+def _parse_cruise_yearly_table(path):
+    """Parse a yearly cruise CSV into valid observations, in file order."""
+    df = pd.read_csv(path)
+    missing = [c for c in _YEARLY_COLUMNS if c not in df.columns]
+    if missing:
+        print(f"Error reading CSV file {path}: missing column(s) {missing}")
+        return None
+    time = pd.to_datetime(
+        df["Date"].astype(str) + " " + df["Time"].astype(str),
+        format="%Y-%m-%d %H:%M",
+        errors="coerce",
+    )
+    station = df["Station"].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    depth, bad_depth = _as_float(df["Depth (m)"])
+    salinity, bad_salinity = _as_float(df["Salinity"])
+    valid = time.notna().to_numpy() & ~bad_depth & ~bad_salinity
+    return pd.DataFrame(
+        {
+            "time": time[valid].to_numpy(dtype="datetime64[ns]"),
+            "station": station[valid].to_numpy(dtype=str),
+            "depth": depth[valid].to_numpy(),
+            "salinity": salinity[valid].to_numpy(),
+        }
+    )
+
+
+def read_cruise_yearly_table(path, cache=True):
+    """Observations of a yearly USGS cruise CSV as a columnar table.
+
+    Rows whose date and time, depth or salinity cannot be parsed are dropped
+    and station IDs are normalized by removing a trailing ``.0``. No
+    station, depth or time filtering is applied.
+
+    Parameters
+    ----------
+    path : str
+        Path to yearly CSV file (e.g., usgs_cruise_2011.csv)
+    cache : bool, optional
+        Store the table next to the CSV as ``<path>.npz`` and reuse it while
+        the size and modification time of the CSV are unchanged. The cache
+        is skipped silently if it cannot be written.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        Columns ``time``, ``station``, ``depth`` and ``salinity`` in file
+        order, or None if the file lacks the expected columns.
+    """
+    if not cache:
+        return _parse_cruise_yearly_table(path)
+    st = os.stat(path)
+    source = [st.st_size, st.st_mtime_ns]
+    cache_file = str(path) + _CRUISE_CACHE_EXT
+    try:
+        with np.load(cache_file, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta == {"version": _CRUISE_CACHE_VERSION, "source": source}:
+                return pd.DataFrame({c: npz[c] for c in ("time", "station", "depth", "salinity")})
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Ignoring unreadable cruise cache {cache_file}: {e}")
+
+    table = _parse_cruise_yearly_table(path)
+    if table is None:
+        return None
+    meta = json.dumps({"version": _CRUISE_CACHE_VERSION, "source": source})
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_file)), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(meta),
+                time=table.time.to_numpy(dtype="datetime64[ns]"),
+                station=table.station.to_numpy(dtype=str),
+                depth=table.depth.to_numpy(),
+                salinity=table.salinity.to_numpy(),
+            )
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+    return table
+
+
+def process_cruise_yearly_csv(
+    path,
+    target_stations=None,
+    depth_threshold_stations=None,
+    model_start_time=None,
+    cache=True,
+):
     """Process yearly USGS cruise data from CSV file.
     
     Parameters
@@ -252,6 +360,9 @@ def process_cruise_yearly_csv(path, target_stations=None, depth_threshold_statio
     model_start_time : datetime, optional
         Filter out observations made before this time and within 1 month after start.
         If None, no time filtering applied.
+    cache : bool, optional
+        Reuse the parsed table cached next to the CSV, see
+        :func:`read_cruise_yearly_table`.
     
     Returns
     -------
@@ -271,133 +382,61 @@ def process_cruise_yearly_csv(path, target_stations=None, depth_threshold_statio
         depth_threshold_stations = {'7': 9, '8': 9, '9': 9}
     
     try:
-        df = pd.read_csv(path)
+        obs = read_cruise_yearly_table(path, cache=cache)
     except Exception as e:
         print(f"Error reading CSV file {path}: {e}")
         return {}
-    
-    # First pass: collect all raw data and identify (date, station) pairs 
-    # that have maximum depth below threshold
-    invalid_date_station_pairs = set()
-    raw_data_by_key = {}  # {(date_key, station): [depths, salinities, times]}
-    
-    # Calculate 1 month after model start for filtering
-    one_month_after_start = None
+    if obs is None:
+        return {}
+
+    # Filter out observations before model start time and within 1 month after start
+    keep = obs.station.isin(target_stations).to_numpy().copy()
     if model_start_time is not None:
         if model_start_time.month == 12:
             one_month_after_start = model_start_time.replace(year=model_start_time.year + 1, month=1)
         else:
             one_month_after_start = model_start_time.replace(month=model_start_time.month + 1)
-    
-    for idx, row in df.iterrows():
-        try:
-            date_str = row['Date']
-            time_str = row['Time']
-            
-            # Parse datetime
-            time = dtm.datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            
-            # Filter out observations before model start time and within 1 month after start
-            if one_month_after_start is not None and time < one_month_after_start:
-                continue
-            
-            date_key = time.strftime("%Y-%m-%d")
-            
-            # Parse station
-            station = str(row['Station']).strip()
-            if station.endswith('.0'):
-                station = station[:-2]
-            
-            # Check if station is in target set
-            if station not in target_stations:
-                continue
-            
-            # Parse depth and salinity
-            try:
-                depth = float(row['Depth (m)'])
-            except (ValueError, TypeError):
-                continue
-            
-            try:
-                salinity = float(row['Salinity'])
-            except (ValueError, TypeError):
-                continue
-            
-            # Store raw data
-            key = (date_key, station)
-            if key not in raw_data_by_key:
-                raw_data_by_key[key] = ([], [], [])
-            raw_data_by_key[key][0].append(depth)
-            raw_data_by_key[key][1].append(salinity)
-            raw_data_by_key[key][2].append(time)
-                    
-        except Exception as e:
-            continue
-    
-    # Check depth threshold for each (date, station) pair based on maximum depth
-    for key, (depths, salinities, times) in raw_data_by_key.items():
-        date_key, station = key
-        if station in depth_threshold_stations:
-            min_depth = depth_threshold_stations[station]
-            max_depth = max(depths)
-            if max_depth <= min_depth:
-                # Mark this (date, station) pair as invalid
-                invalid_date_station_pairs.add(key)
-    
-    # Second pass: build cruise_records from raw data, skipping invalid (date, station) pairs
+        keep &= (obs.time >= pd.Timestamp(one_month_after_start)).to_numpy()
+    obs = obs[keep].reset_index(drop=True)
+    obs["date"] = obs.time.dt.strftime("%Y-%m-%d")
+
+    # Exclude (date, station) pairs whose maximum depth is not above the
+    # station's threshold
+    groups = obs.groupby(["date", "station"], sort=False)
+    max_depth = groups["depth"].transform("max")
+    threshold = obs.station.map(depth_threshold_stations).astype(float)
+    obs = obs[~(max_depth <= threshold)]
+
+    # Filter: remove days that don't have all required stations
+    stations_on_day = obs.groupby("date", sort=False)["station"].unique()
+    complete = stations_on_day.map(lambda s: target_stations.issubset(s))
+    for date_key, stations in stations_on_day[~complete].items():
+        missing_stations = target_stations - set(stations)
+        print(f"Removing {date_key}: missing stations {sorted(missing_stations)}")
+    obs = obs[obs.date.isin(stations_on_day.index[complete])]
+
+    # One record per (date, station) in order of first appearance; the first
+    # time is representative for the station/day and profiles are sorted by depth
     cruise_records = {}
-    
-    # Build cruise_records from raw data, skipping invalid (date, station) pairs
-    for key, (depths, salinities, times) in raw_data_by_key.items():
-        date_key, station = key
-        
-        # Skip if this (date, station) pair is invalid due to depth threshold
-        if key in invalid_date_station_pairs:
+    group_id = obs.groupby(["date", "station"], sort=False).ngroup().to_numpy()
+    order = np.argsort(group_id, kind="stable")
+    bounds = np.flatnonzero(np.diff(group_id[order])) + 1
+    dates = obs.date.to_numpy()[order]
+    stations = obs.station.to_numpy()[order]
+    times = obs.time.to_numpy()[order]
+    depths = obs.depth.to_numpy()[order]
+    salinities = obs.salinity.to_numpy()[order]
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(order)]):
+        if start == end:
             continue
-        
-        # Initialize cruise record for this date if not exists
-        if date_key not in cruise_records:
-            cruise_records[date_key] = {}
-        
-        # Use the first time as representative time for this station/day
-        time = times[0]
-        
-        # Store depths and salinities
-        cruise_records[date_key][station] = (depths, salinities, time)
-    
-    # Sort depth profiles for each station on each date
-    for date_key in cruise_records:
-        for station in list(cruise_records[date_key].keys()):
-            time = cruise_records[date_key][station][2]
-            depth = np.array(cruise_records[date_key][station][0])
-            salinity = np.array(cruise_records[date_key][station][1])
-            
-            # Skip if no valid data
-            if len(depth) == 0:
-                del cruise_records[date_key][station]
-                continue
-            
-            depthorder = np.argsort(depth)
-            depth = depth[depthorder]
-            salinity = salinity[depthorder]
-            cruise_records[date_key][station] = (depth, salinity, time)
-    
-    # Filter: remove days that don't have all required stations
-    required_stations = target_stations.copy()
-    dates_to_remove = []
-    
-    for date_key in cruise_records:
-        stations_on_day = set(cruise_records[date_key].keys())
-        
-        # Check if all required stations are present
-        if not required_stations.issubset(stations_on_day):
-            missing_stations = required_stations - stations_on_day
-            print(f"Removing {date_key}: missing stations {sorted(missing_stations)}")
-            dates_to_remove.append(date_key)
-    
-    for date_key in dates_to_remove:
-        del cruise_records[date_key]
-    
+        depth = depths[start:end]
+        depthorder = np.argsort(depth)
+        time = pd.Timestamp(times[start]).to_pydatetime()
+        cruise_records.setdefault(dates[start], {})[stations[start]] = (
+            depth[depthorder],
+            salinities[start:end][depthorder],
+            time,
+        )
     return cruise_records
 
 
@@ -410,8 +449,11 @@ def process_xyt(path, casts, base_time):
     
     Parameters
     ----------
-    path : str
-        Path to fort.18 model output file containing extracted salinity profiles.
+    path : str or tuple
+        Path to fort.18 model output file containing extracted salinity profiles,
+        or a ``(data, index)`` pair already in memory, as returned by
+        :func:`bdschism.read_fort18.read_xyt` or
+        :func:`bdschism.extract_xyt.profiles_to_xyt`.
     casts : dict
         Dictionary mapping cast number (int) to tuple:
         (x_coord, y_coord, elapsed_time, name, station_id).
@@ -432,39 +474,31 @@ def process_xyt(path, casts, base_time):
         If cast number in fort.18 is not found in casts mapping.
     """
     print("process_xyt")
-    cruisefile = open(path, "r")
-    cruisetxt = cruisefile.readlines()
-    cruisefile.close()
-    cruiselines = [line.strip().split() for line in cruisetxt if (line != "\n")]
-    cruise_data = {}
-    
-    for entry in cruiselines:
-        if "&" in entry:
-            continue
-        castno = int(entry[0])
-        if "**" in entry[1]:
-            continue
-        salt = float(entry[1])
-        depth = -float(entry[2])
-        elapsed = 24.0 * 3600.0 * float(entry[4])
-        time = base_time + dtm.timedelta(seconds=elapsed)
-        if castno not in casts.keys():
+    if isinstance(path, tuple):
+        data, index = path
+    else:
+        data, index = read_xyt(path)
+    for castno in index:
+        if castno not in casts:
             raise ValueError("Cast %s not in casts" % castno)
 
-        station = casts[castno][4]
-
-        if not station in cruise_data.keys():
-            cruise_data[station] = ([], [], time)
-        cruise_data[station][0].append(depth)
-        cruise_data[station][1].append(salt)
-    for station in cruise_data.keys():
-        time = cruise_data[station][2]
-        depth = np.array(cruise_data[station][0])
-        salinity = np.array(cruise_data[station][1])
+    # Rows of each station in file order (several casts may map to a station)
+    station_rows = {}
+    for castno, rows in index.items():
+        station_rows.setdefault(casts[castno][4], []).append(rows)
+    station_rows = {
+        station: np.sort(np.concatenate(rows)) for station, rows in station_rows.items()
+    }
+    cruise_data = {}
+    # Stations in order of first appearance in the file
+    for station in sorted(station_rows, key=lambda st: station_rows[st][0]):
+        rows = station_rows[station]
+        elapsed = 24.0 * 3600.0 * float(data["time"][rows[0]])
+        time = base_time + dtm.timedelta(seconds=elapsed)
+        depth = -data["z"][rows]
+        salinity = data["value"][rows]
         depthorder = np.argsort(depth)
-        depth = depth[depthorder]
-        salinity = salinity[depthorder]
-        cruise_data[station] = (depth, salinity, time)
+        cruise_data[station] = (depth[depthorder], salinity[depthorder], time)
     return cruise_data
 
 
@@ -754,8 +788,9 @@ def gen_profile_plot(
         Date/time of cruise observations.
     survey_file : str
         Path to temporary cruise observation file (single date format).
-    model_file : str
-        Path to model output fort.18 file (date-specific).
+    model_file : str or tuple
+        Path to model output fort.18 file (date-specific), or extracted
+        ``(data, index)`` as accepted by process_xyt().
     station_file : str
         Path to station metadata CSV file.
     xytfile : str
@@ -1033,14 +1068,78 @@ def gen_station_xyt(base_date, cruise_time, survey_file, station_file, xytfile):
     
     Returns
     -------
-    None
-        Generates xytfile as side effect. xytfile contains station locations
-        and times formatted for SCHISM's read_output10_xyt utility.
+    dict
+        Cast mapping returned by cruise_xyt(). Also generates xytfile as side
+        effect. xytfile contains station locations and times formatted for
+        SCHISM's read_output10_xyt utility.
     """
     filename = survey_file
     station_data = process_stations(station_file)
     cruise_data = process_cruise(filename)
     casts = cruise_xyt(filename, station_data, base_date, xytfile)
+    return casts
+
+
+def _run_read_output10_xyt(schism_output_folder, xytfile, model_name):
+    """Run read_output10_xyt for one request file and keep a copy of fort.18.
+
+    Returns the path of the copy, ``<schism_output_folder>/<model_name>``.
+    """
+    copyfile(xytfile, os.path.join(schism_output_folder, "station.xyt"))
+    cmd = ["read_output10_xyt"]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, cwd=schism_output_folder)
+    for line in p.stdout:
+        print(line.decode(errors="replace").rstrip())
+    p.wait()
+    if p.returncode:
+        raise ChildProcessError("Fail to extract SCHISM outputs")
+    model_file = os.path.join(schism_output_folder, model_name)
+    copyfile(os.path.join(schism_output_folder, "fort.18"), model_file)
+    return model_file
+
+
+def _extract_native(schism_output_folder, pending, variable="salinity"):
+    """Extract model profiles for all cruise dates in one pass over the outputs.
+
+    ``pending`` is a list of ``(record, casts)``; each record gets a
+    ``model_file`` entry holding the extracted ``(data, index)``. Dates with
+    a cast outside the model output period are reported and left without
+    ``model_file``, as a failed date is with the fortran extractor.
+    """
+    first, last = output_period(schism_output_folder, variable)
+    in_range = []
+    for record, casts in pending:
+        times = [float(cast[2]) for cast in casts.values()]
+        if times and (min(times) < first or max(times) > last):
+            print(
+                f"Error processing date {record['time']:%Y-%m-%d}: "
+                "cast times outside the model output period"
+            )
+            continue
+        in_range.append((record, casts))
+    pending = in_range
+    if not pending:
+        return
+
+    x = []
+    y = []
+    elapsed = []
+    counts = []
+    for _, casts in pending:
+        for castno in sorted(casts):
+            cx, cy, t = casts[castno][:3]
+            x.append(float(cx))
+            y.append(float(cy))
+            elapsed.append(float(t))
+        counts.append(len(casts))
+    print(f"extracting {len(x)} model profiles for {len(pending)} cruise date(s)")
+    profiles = extract_profiles(schism_output_folder, x, y, elapsed, variable=variable)
+    start = 0
+    for (record, _), n in zip(pending, counts):
+        record["model_file"] = profiles_to_xyt(
+            profiles[start : start + n], elapsed[start : start + n]
+        )
+        start += n
 
 
 def cruise_plot(
@@ -1054,6 +1153,7 @@ def cruise_plot(
     use_yearly_format=True,
     target_stations=None,
     depth_thresholds=None,
+    extractor="native",
 ):
     """Main work function: Process USGS cruise data and generate comparison plots.
 
@@ -1063,7 +1163,8 @@ def cruise_plot(
     1. Load and filter USGS cruise observations (yearly or daily format)
     2. For yearly format: apply multi-pass filtering (stations, depth, time)
     3. For each valid date: generate date-specific xyt model extraction request
-    4. Extract model salinity profiles from SCHISM output
+    4. Extract model salinity profiles from SCHISM output (all dates at once
+       with the native extractor)
     5. Generate publication-quality comparison figures (observed vs. model)
 
     Parameters
@@ -1091,6 +1192,11 @@ def cruise_plot(
         Depth thresholds for specific stations (yearly format only).
         E.g., {'7': 9, '8': 9, '9': 9} requires depth > 9 meters.
         Defaults to {'7': 9, '8': 9, '9': 9}.
+    extractor : {'native', 'fortran'}, optional
+        How model profiles are extracted. 'native' (default) reads
+        salinity_N.nc and zCoordinates_N.nc directly with
+        :mod:`bdschism.extract_xyt`, visiting each output stack once for all
+        cruise dates. 'fortran' runs SCHISM's read_output10_xyt once per date.
 
     Returns
     -------
@@ -1100,9 +1206,9 @@ def cruise_plot(
     Raises
     ------
     FileNotFoundError
-        If required files are missing: vgrid.in, read_output_xyt.in,
-        usgs_cruise_stations.csv, cruise data files, or if read_output10_xyt
-        executable is not found in PATH.
+        If required files are missing: out2d_1.nc, usgs_cruise_stations.csv,
+        cruise data files, or for the 'fortran' extractor vgrid.in,
+        read_output_xyt.in or the read_output10_xyt executable.
     ChildProcessError
         If read_output10_xyt command fails during model extraction.
 
@@ -1119,9 +1225,12 @@ def cruise_plot(
     For yearly format, a date is included only if ALL target stations have
     valid observations. Temporary files are cleaned up after plotting.
     """
-    # Check if read_output10_xyt is available in PATH
-    check_read_output10_xyt_available()
-    
+    if extractor not in ("native", "fortran"):
+        raise ValueError(f"Unknown extractor {extractor}, use 'native' or 'fortran'")
+    if extractor == "fortran":
+        # Check if read_output10_xyt is available in PATH
+        check_read_output10_xyt_available()
+
     data_folder = data_path
     base_date = parser.parse(start)
     if schism_output_path is None:
@@ -1129,16 +1238,18 @@ def cruise_plot(
     else:
         schism_output_folder = schism_output_path
 
-    schism_vgrid_in = os.path.join(schism_output_folder, "vgrid.in")
-    if not os.path.exists(schism_vgrid_in):
-        raise FileNotFoundError(
-            errno.ENOENT, os.strerror(errno.ENOENT), schism_vgrid_in
-        )
-    schism_output_in = os.path.join(schism_output_folder, "read_output_xyt.in")
-    if not os.path.exists(schism_output_in):
-        raise FileNotFoundError(
-            errno.ENOENT, os.strerror(errno.ENOENT), schism_output_in
-        )
+    if extractor == "fortran":
+        schism_vgrid_in = os.path.join(schism_output_folder, "vgrid.in")
+        if not os.path.exists(schism_vgrid_in):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), schism_vgrid_in
+            )
+        schism_output_in = os.path.join(schism_output_folder, "read_output_xyt.in")
+        if not os.path.exists(schism_output_in):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), schism_output_in
+            )
+    validate_out2d_time_variable(os.path.join(schism_output_folder, "out2d_1.nc"))
 
     station_file = os.path.join(data_folder, "usgs_cruise_stations.csv")
     if not os.path.exists(station_file):
@@ -1146,9 +1257,10 @@ def cruise_plot(
 
     cruise_records = []
     temp_cruise_files = []
+    # (record, casts) awaiting the single native extraction pass
+    pending = []
     if use_yearly_format:
         # Process yearly CSV files like usgs_cruise_2011.csv
-        # Strategy: Create ONE comprehensive xyt file for all dates and run read_output10_xyt ONCE
         usgs_cruise_match = re.compile(r"usgs_cruise_(?P<year>[0-9]{4})\.csv$")
         
         # First pass: collect all cruise data
@@ -1178,15 +1290,11 @@ def cruise_plot(
                 data_folder,
             )
         
-        # For yearly format: In the fourth pass, we generate date-specific xyt and model files
-        # This ensures model data extraction matches exactly with observation data for each date
-        
-        # Fourth pass: process each date for plotting (generate date-specific xyt and model files)
+        # Generate date-specific xyt requests so model data extraction matches
+        # exactly with observation data for each date
         temp_cruise_files = []
         min_stations_for_plot = 2  # Need at least 2 stations to create contour plot
         
-        station_data = process_stations(station_file)
-        
         for date_str in sorted(all_yearly_records.keys()):
             cruise_data_dict = all_yearly_records[date_str]
             # Skip dates with insufficient stations for contour plotting
@@ -1203,7 +1311,6 @@ def cruise_plot(
             date_yyyymmdd = cruise_time.strftime("%Y%m%d")
             temp_cruise_file = os.path.join(data_folder, f"temp_cruise_{date_yyyymmdd}.txt")
             local_xyt = os.path.join(data_folder, f"station_{date_yyyymmdd}.xyt")
-            output_xyt_date = os.path.join(schism_output_folder, "station.xyt")
             
             try:
                 # Write temporary cruise file with only this date's observations
@@ -1214,34 +1321,22 @@ def cruise_plot(
                             f.write(f"{time.strftime('%Y-%m-%d')},{time.strftime('%H:%M')},{station},{depth},{salinity}\n")
                 
                 # Generate date-specific xyt file and extract model data for this date
-                gen_station_xyt(base_date, cruise_time, temp_cruise_file, station_file, local_xyt)
-                copyfile(local_xyt, output_xyt_date)
-                
-                out2d_file = os.path.join(schism_output_folder, "out2d_1.nc")
-                validate_out2d_time_variable(out2d_file)
-
-                print(f"running read_output10_xyt for {date_str}")
-                cmd = ["read_output10_xyt"]
-                p = subprocess.Popen(cmd, stdout=subprocess.PIPE, cwd=schism_output_folder)
-                for line in p.stdout:
-                    print(line.decode(errors="replace").rstrip())
-                p.wait()
-                if p.returncode:
-                    raise ChildProcessError("Fail to extract SCHISM outputs")
-
-                model_salt = f"salt_{date_yyyymmdd}"
-                model_file_date = os.path.join(schism_output_folder, model_salt)
-                copyfile(os.path.join(schism_output_folder, "fort.18"), model_file_date)
+                casts = gen_station_xyt(base_date, cruise_time, temp_cruise_file, station_file, local_xyt)
+                record = {
+                    "time": cruise_time,
+                    "obs_file": temp_cruise_file,
+                    "xyt_file": local_xyt,
+                }
+                if extractor == "fortran":
+                    print(f"running read_output10_xyt for {date_str}")
+                    record["model_file"] = _run_read_output10_xyt(
+                        schism_output_folder, local_xyt, f"salt_{date_yyyymmdd}"
+                    )
+                else:
+                    pending.append((record, casts))
                 
                 temp_cruise_files.append(temp_cruise_file)
-                cruise_records.append(
-                    {
-                        "time": cruise_time,
-                        "obs_file": temp_cruise_file,
-                        "model_file": model_file_date,
-                        "xyt_file": output_xyt_date,
-                    }
-                )
+                cruise_records.append(record)
             except Exception as e:
                 print(f"Error processing date {date_str}: {e}")
                 continue
@@ -1257,35 +1352,25 @@ def cruise_plot(
             cruise_time = parser.parse(match_re.group("date"))
             xyt_file = "station_" + match_re.group("date") + ".xyt"
             local_xyt = os.path.join(data_folder, xyt_file)
-            output_xyt = os.path.join(schism_output_folder, "station.xyt")
             obs_file = os.path.join(data_folder, file_name)
 
-            gen_station_xyt(base_date, cruise_time, obs_file, station_file, local_xyt)
-            copyfile(local_xyt, output_xyt)
-
-            out2d_file = os.path.join(schism_output_folder, "out2d_1.nc")
-            validate_out2d_time_variable(out2d_file)
-
-            cmd = ["read_output10_xyt"]
-            p = subprocess.Popen(cmd, stdout=subprocess.PIPE, cwd=schism_output_folder)
-            for line in p.stdout:
-                print(line.decode(errors="replace").rstrip())
-            p.wait()
-            if p.returncode:
-                raise ChildProcessError("Fail to extract SCHISM outputs")
-
-            model_salt = "salt_" + match_re.group("date")
-            model_file = os.path.join(schism_output_folder, model_salt)
-            copyfile(os.path.join(schism_output_folder, "fort.18"), model_file)
+            casts = gen_station_xyt(base_date, cruise_time, obs_file, station_file, local_xyt)
+            record = {
+                "time": cruise_time,
+                "obs_file": obs_file,
+                "xyt_file": local_xyt,
+            }
+            if extractor == "fortran":
+                record["model_file"] = _run_read_output10_xyt(
+                    schism_output_folder, local_xyt, "salt_" + match_re.group("date")
+                )
+            else:
+                pending.append((record, casts))
+            cruise_records.append(record)
 
-            cruise_records.append(
-                {
-                    "time": cruise_time,
-                    "obs_file": obs_file,
-                    "model_file": model_file,
-                    "xyt_file": output_xyt,
-                }
-            )
+    if pending:
+        _extract_native(schism_output_folder, pending)
+        cruise_records = [r for r in cruise_records if "model_file" in r]
     
     if not cruise_records:
         raise FileNotFoundError(
@@ -1353,7 +1438,14 @@ def cruise_plot(
     default=False,
     help="Use legacy daily file format (usgs_cruise_yyyymmdd.txt) instead of yearly.",
 )
-def cruise_plot_cli(data_path, start, schism_output_path, output_stem, xmin, xmax, max_depth, use_yearly_format, legacy_daily_format):
+@click.option(
+    "--extractor",
+    type=click.Choice(["native", "fortran"]),
+    default="native",
+    show_default=True,
+    help="Extract model profiles in-process (native) or with SCHISM's read_output10_xyt (fortran).",
+)
+def cruise_plot_cli(data_path, start, schism_output_path, output_stem, xmin, xmax, max_depth, use_yearly_format, legacy_daily_format, extractor):
     """ This tool generates comparison plots of observed USGS cruise salinity profile against SCHISM model output.
 
     This is the click-decorated CLI function that serves as the entry point
@@ -1385,7 +1477,8 @@ def cruise_plot_cli(data_path, start, schism_output_path, output_stem, xmin, xma
         xmin, 
         xmax, 
         max_depth,
-        use_yearly_format=use_yearly_format
+        use_yearly_format=use_yearly_format,
+        extractor=extractor,
     )
 
 
@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+"""
+Depth averages of 3-D SCHISM outputs.
+
+A 3-D variable such as ``salinity``, ``temperature`` or ``horizontalVelX``
+is averaged over the water column with the trapezoid rule on the layer
+interfaces of ``zCoordinates_N.nc``: every layer contributes the mean of the
+values at its top and bottom interfaces weighted by its thickness. Levels
+below ``bottom_index_node`` and missing values are skipped, and nodes flagged
+in ``dryFlagNode`` are reported as NaN. For wet nodes the result is the same
+as the ``depth_average`` of suxarray, which made the scripts in
+``scripts/suxarray_dep_scripts`` depend on that package.
+
+Each stack is streamed in blocks of time steps and nodes, so memory use does
+not grow with the mesh or the stack length, and stacks are processed
+concurrently. The result is written as a compressed NetCDF file of daily
+averages for the whole period and, optionally, one file of instantaneous
+depth averages per stack. A daily average labeled with day ``D`` covers the
+outputs after ``D 00:00`` up to and including ``D+1 00:00``, so a daily
+stack that ends at midnight forms one day.
+"""
+
+import glob
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import numpy as np
+import pandas as pd
+from netCDF4 import Dataset
+
+logger = logging.getLogger(__name__)
+
+NODE_DIM = "nSCHISM_hgrid_node"
+
+# Blocks of nodes read at once are capped at about this many bytes per variable
+_BLOCK_BYTES = 64 * 1024**2
+
+
+def depth_average(values, z, bottom):
+    """Thickness-weighted depth average over the wet layers of each node.
+
+    Parameters
+    ----------
+    values, z : numpy.ndarray
+        Variable and interface elevations, shape ``(nstep, node, level)``,
+        with NaN for missing values.
+    bottom : numpy.ndarray
+        Zero-based bottom level of each node.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shape ``(nstep, node)``, NaN where no layer has positive weight.
+    """
+    nlayer = values.shape[-1] - 1
+    valid = np.arange(nlayer)[None, None, :] >= bottom[None, :, None]
+    dz = np.diff(z, axis=-1)
+    mid = 0.5 * (values[..., 1:] + values[..., :-1])
+    use = valid & np.isfinite(dz) & np.isfinite(mid)
+    w = np.where(use, dz, 0.0)
+    num = (w * np.where(use, mid, 0.0)).sum(axis=-1)
+    den = w.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den != 0.0, num / den, np.nan)
+
+
+def _available_stacks(output_dir, varname):
+    pattern = re.compile(rf"{re.escape(varname)}_(\d+)\.nc$")
+    stacks = []
+    for fname in glob.glob(os.path.join(output_dir, f"{varname}_*.nc")):
+        m = pattern.search(os.path.basename(fname))
+        if m:
+            stacks.append(int(m.group(1)))
+    return sorted(stacks)
+
+
+def _day_labels(times, start):
+    """Day of each output time, with bins closed on the right: (D 00:00, D+1 00:00]."""
+    stamps = start + pd.to_timedelta(times, unit="s")
+    return (stamps - pd.Timedelta(1, "ns")).floor("D").to_numpy()
+
+
+def _node_block(chunk_nodes, chunk_steps, nlevel, nnode):
+    """Nodes read at once: ``chunk_nodes`` or as many as fit in the byte budget."""
+    if chunk_nodes:
+        return chunk_nodes
+    record_bytes = 8 * chunk_steps * max(nlevel, 1)
+    return int(min(nnode, max(1, _BLOCK_BYTES // record_bytes)))
+
+
+def _create_output(fname, varname, nnode, time_attrs, complevel, title):
+    """Create a compressed ``(time, node)`` NetCDF file for a depth average."""
+    nc = Dataset(fname, "w")
+    nc.createDimension("time", None)
+    nc.createDimension(NODE_DIM, nnode)
+    time = nc.createVariable("time", "f8", ("time",))
+    time.setncatts(time_attrs)
+    var = nc.createVariable(
+        f"depth_averaged_{varname}",
+        "f4",
+        ("time", NODE_DIM),
+        zlib=complevel > 0,
+        complevel=max(complevel, 1),
+        fill_value=np.float32(np.nan),
+        chunksizes=(1, nnode),
+    )
+    var.long_name = title
+    return nc
+
+
+def stack_depth_average(
+    output_dir,
+    stack,
+    start,
+    varname="salinity",
+    chunk_steps=8,
+    chunk_nodes=None,
+    mask_dry=True,
+    out_file=None,
+    complevel=4,
+):
+    """Depth average one stack and accumulate it into daily sums.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory with out2d_N.nc, zCoordinates_N.nc and
+        ``<varname>_N.nc``.
+    stack : int
+        Output stack number.
+    start : str or datetime-like
+        Model start date; output times are seconds after it.
+    varname : str, optional
+        3-D variable, also the prefix of its files.
+    chunk_steps : int, optional
+        Number of time steps read at once.
+    chunk_nodes : int, optional
+        Number of nodes read at once. Defaults to as many as fit in about
+        64 MB per variable.
+    mask_dry : bool, optional
+        Report nodes flagged dry as NaN.
+    out_file : str, optional
+        If given, write the instantaneous depth averages of the stack here.
+    complevel : int, optional
+        zlib compression level of ``out_file``, 0 for none.
+
+    Returns
+    -------
+    dict
+        Maps each day (numpy.datetime64) to ``(sum, count)`` arrays over
+        the nodes, the sum and number of finite depth averages in that day.
+    """
+    start = pd.Timestamp(start)
+
+    def fname(prefix):
+        return os.path.join(output_dir, f"{prefix}_{stack}.nc")
+
+    daily = {}
+    with Dataset(fname("out2d"), "r") as out2d, Dataset(
+        fname(varname), "r"
+    ) as var_src, Dataset(fname("zCoordinates"), "r") as z_src:
+        bottom_all = np.asarray(out2d.variables["bottom_index_node"][:], dtype=np.int64) - 1
+        dry_var = out2d.variables["dryFlagNode"] if mask_dry else None
+        var = var_src.variables[varname]
+        z_var = z_src.variables["zCoordinates"]
+        time_var = var_src.variables["time"]
+        times = np.asarray(time_var[:], dtype=float)
+        nstep, nnode = len(times), len(bottom_all)
+        chunk_nodes = _node_block(chunk_nodes, chunk_steps, var.shape[-1], nnode)
+
+        days = _day_labels(times, start)
+
+        out = None
+        if out_file is not None:
+            title = f"depth-averaged {varname}"
+            time_attrs = {
+                k: time_var.getncattr(k) for k in time_var.ncattrs() if k != "_FillValue"
+            }
+            out = _create_output(out_file, varname, nnode, time_attrs, complevel, title)
+            if "units" in var.ncattrs():
+                out.variables[f"depth_averaged_{varname}"].units = var.units
+            out.variables["time"][:] = times
+        try:
+            for t0 in range(0, nstep, chunk_steps):
+                t1 = min(t0 + chunk_steps, nstep)
+                da = np.empty((t1 - t0, nnode))
+                for n0 in range(0, nnode, chunk_nodes):
+                    n1 = min(n0 + chunk_nodes, nnode)
+                    values = np.ma.filled(var[t0:t1, n0:n1, :].astype(float), np.nan)
+                    z = np.ma.filled(z_var[t0:t1, n0:n1, :].astype(float), np.nan)
+                    da[:, n0:n1] = depth_average(values, z, bottom_all[n0:n1])
+                if dry_var is not None:
+                    da[np.ma.filled(dry_var[t0:t1], 1) != 0] = np.nan
+                if out is not None:
+                    out.variables[f"depth_averaged_{varname}"][t0:t1, :] = da
+                ok = np.isfinite(da)
+                for day in np.unique(days[t0:t1]):
+                    rows = days[t0:t1] == day
+                    total, count = daily.setdefault(
+                        day, (np.zeros(nnode), np.zeros(nnode, dtype=np.int64))
+                    )
+                    total += np.where(ok[rows], da[rows], 0.0).sum(axis=0)
+                    count += ok[rows].sum(axis=0)
+        finally:
+            if out is not None:
+                out.close()
+    return daily
+
+
+def _stack_job(
+    output_dir, stack, start, varname, chunk_steps, chunk_nodes, mask_dry, out_file, complevel
+):
+    daily = stack_depth_average(
+        output_dir,
+        stack,
+        start,
+        varname=varname,
+        chunk_steps=chunk_steps,
+        chunk_nodes=chunk_nodes,
+        mask_dry=mask_dry,
+        out_file=out_file,
+        complevel=complevel,
+    )
+    return stack, daily
+
+
+def depth_average_stacks(
+    output_dir,
+    start,
+    varname="salinity",
+    first_stack=None,
+    last_stack=None,
+    out_dir=None,
+    daily_file=None,
+    instantaneous=False,
+    nproc=None,
+    chunk_steps=8,
+    chunk_nodes=None,
+    mask_dry=True,
+    complevel=4,
+):
+    """Daily (and optionally instantaneous) depth averages for a range of stacks.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory.
+    start : str or datetime-like
+        Model start date.
+    varname : str, optional
+        3-D variable to average, e.g. ``salinity`` or ``horizontalVelX``.
+    first_stack, last_stack : int, optional
+        Inclusive stack range. Defaults to all stacks of ``varname`` found.
+    out_dir : str, optional
+        Directory for the output files. Defaults to ``output_dir``.
+    daily_file : str, optional
+        Name of the daily file. Defaults to
+        ``depth_averaged_<varname>_daily.nc``; empty to skip it. Each day is
+        written as soon as the stacks covering it are done, so only the sums
+        of days in progress are held in memory.
+    instantaneous : bool, optional
+        Also write ``depth_averaged_<varname>_N.nc`` for every stack.
+    nproc : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_steps, chunk_nodes : int, optional
+        Block of time steps and nodes each worker reads at once. The nodes
+        default to as many as fit in about 64 MB per variable.
+    mask_dry : bool, optional
+        Report nodes flagged dry as NaN.
+    complevel : int, optional
+        zlib compression level of the outputs, 0 for none.
+
+    Returns
+    -------
+    list of str
+        Files written.
+    """
+    start = pd.Timestamp(start)
+    out_dir = output_dir if out_dir is None else out_dir
+    stacks = _available_stacks(output_dir, varname)
+    if first_stack is not None:
+        stacks = [s for s in stacks if s >= first_stack]
+    if last_stack is not None:
+        stacks = [s for s in stacks if s <= last_stack]
+    if not stacks:
+        raise ValueError(f"No {varname}_*.nc stacks in range found in {output_dir}")
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    nproc = max(1, min(nproc, len(stacks)))
+
+    def inst_file(stack):
+        if not instantaneous:
+            return None
+        return os.path.join(out_dir, f"depth_averaged_{varname}_{stack}.nc")
+
+    args = (start, varname, chunk_steps, chunk_nodes, mask_dry)
+    if daily_file is None:
+        daily_file = f"depth_averaged_{varname}_daily.nc"
+
+    # The daily file is created up front and each day is written, and its
+    # sums dropped, as soon as every stack covering it has been merged
+    nc = None
+    sums = {}
+    pending = {}
+    if daily_file:
+        daily_path = os.path.join(out_dir, daily_file)
+        for s in stacks:
+            with Dataset(os.path.join(output_dir, f"{varname}_{s}.nc"), "r") as ds:
+                times = np.asarray(ds.variables["time"][:], dtype=float)
+                nnode = ds.dimensions[NODE_DIM].size
+            for day in np.unique(_day_labels(times, start)):
+                pending.setdefault(day, set()).add(s)
+        days = sorted(pending)
+        row = {day: i for i, day in enumerate(days)}
+        time_attrs = {
+            "long_name": "Time",
+            "units": f"days since {start:%Y-%m-%d %H:%M:%S}",
+            "base_date": f"{start:%Y %m %d %H %M %S}",
+        }
+        part_path = daily_path + ".part"
+        nc = _create_output(
+            part_path, varname, nnode, time_attrs, complevel,
+            f"depth-averaged daily {varname}",
+        )
+        nc.variables["time"][:] = [
+            (pd.Timestamp(day) - start) / pd.Timedelta("1D") for day in days
+        ]
+
+    def merge(stack, daily):
+        if nc is not None:
+            var = nc.variables[f"depth_averaged_{varname}"]
+            for day, (total, count) in daily.items():
+                if day in sums:
+                    acc_total, acc_count = sums[day]
+                    acc_total += total
+                    acc_count += count
+                else:
+                    sums[day] = (total, count)
+                pending[day].discard(stack)
+                if not pending[day]:
+                    total, count = sums.pop(day)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        var[row[day], :] = np.where(
+                            count > 0, total / np.maximum(count, 1), np.nan
+                        )
+        logger.info(f"Done with stack {stack}")
+
+    try:
+        if nproc == 1:
+            for s in stacks:
+                merge(*_stack_job(output_dir, s, *args, inst_file(s), complevel))
+        else:
+            with ProcessPoolExecutor(max_workers=nproc) as pool:
+                futures = [
+                    pool.submit(_stack_job, output_dir, s, *args, inst_file(s), complevel)
+                    for s in stacks
+                ]
+                for fut in as_completed(futures):
+                    merge(*fut.result())
+    except BaseException:
+        if nc is not None:
+            nc.close()
+            os.remove(part_path)
+        raise
+
+    written = [inst_file(s) for s in stacks] if instantaneous else []
+    if nc is not None:
+        nc.close()
+        os.replace(part_path, daily_path)
+        written.append(daily_path)
+    return written
+
+
+@click.command()
+@click.option(
+    "--output-dir",
+    default="outputs",
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="SCHISM outputs directory.",
+)
+@click.option("--start", required=True, help="Model start date, e.g. 2021-04-20.")
+@click.option(
+    "--var", "varname", default="salinity", show_default=True, help="3-D variable to average."
+)
+@click.option("--first-stack", type=int, default=None, help="First stack (inclusive).")
+@click.option("--last-stack", type=int, default=None, help="Last stack (inclusive).")
+@click.option(
+    "--out-dir",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory for the outputs. Default: --output-dir.",
+)
+@click.option(
+    "--daily-file",
+    default=None,
+    help="Name of the daily output. Default: depth_averaged_<var>_daily.nc.",
+)
+@click.option(
+    "--instantaneous/--no-instantaneous",
+    default=False,
+    show_default=True,
+    help="Also write depth_averaged_<var>_N.nc for every stack.",
+)
+@click.option("-n", "--nproc", type=int, default=None, help="Number of worker processes.")
+@click.option(
+    "--chunk-steps",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Time steps read at once per worker.",
+)
+@click.option(
+    "--chunk-nodes",
+    type=int,
+    default=None,
+    help="Nodes read at once per worker. Default: about 64 MB per variable.",
+)
+@click.option(
+    "--keep-dry", is_flag=True, default=False, help="Do not mask nodes flagged dry."
+)
+@click.option(
+    "--complevel", type=int, default=4, show_default=True, help="zlib compression level (0-9)."
+)
+@click.help_option("-h", "--help")
+def depth_average_cli(
+    output_dir,
+    start,
+    varname,
+    first_stack,
+    last_stack,
+    out_dir,
+    daily_file,
+    instantaneous,
+    nproc,
+    chunk_steps,
+    chunk_nodes,
+    keep_dry,
+    complevel,
+):
+    """Daily depth averages of a 3-D variable from SCHISM output stacks.
+
+    Example:
+
+        bds depth_average --start 2021-04-20 --var salinity --instantaneous -n 8
+    """
+    files = depth_average_stacks(
+        output_dir,
+        start,
+        varname=varname,
+        first_stack=first_stack,
+        last_stack=last_stack,
+        out_dir=out_dir,
+        daily_file=daily_file,
+        instantaneous=instantaneous,
+        nproc=nproc,
+        chunk_steps=chunk_steps,
+        chunk_nodes=chunk_nodes,
+        mask_dry=not keep_dry,
+        complevel=complevel,
+    )
+    for f in files:
+        click.echo(f)
+
+
+if __name__ == "__main__":
+    depth_average_cli()
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+In-process extraction of SCHISM profiles at (x, y, time) points.
+
+This is a native replacement for the ``read_output10_xyt`` utility used to
+compare model salinity with cruise casts. Points are located once on the
+horizontal grid (a KD-tree over element centroids followed by a barycentric
+containment test), then every output stack that brackets any requested time
+is opened once and only the required time records are read. Values and
+z-coordinates are interpolated linearly in time and with barycentric weights
+in the horizontal, level by level.
+
+The result can be converted to the same structured array produced by
+:func:`bdschism.read_fort18.read_xyt`, so it is a drop-in source for code
+that reads ``fort.18``.
+"""
+
+import glob
+import os
+import re
+
+import numpy as np
+from netCDF4 import Dataset
+from scipy.spatial import cKDTree
+
+from bdschism.read_fort18 import XYT_DTYPE
+
+
+class PointLocator:
+    """Locate points on a SCHISM horizontal grid.
+
+    Quadrilaterals are split into two triangles so every point gets three
+    nodes and barycentric weights.
+
+    Parameters
+    ----------
+    node_x, node_y : array_like
+        Node coordinates.
+    face_nodes : array_like
+        Zero-based node indices of each element, shape ``(nface, 3|4)``, with
+        a negative value for the unused fourth node of triangles.
+    """
+
+    def __init__(self, node_x, node_y, face_nodes):
+        self.node_x = np.asarray(node_x, dtype=float)
+        self.node_y = np.asarray(node_y, dtype=float)
+        face_nodes = np.asarray(face_nodes, dtype=np.int64)
+        tri = face_nodes[:, :3]
+        if face_nodes.shape[1] > 3:
+            quad = face_nodes[:, 3] >= 0
+            tri = np.vstack([tri, face_nodes[quad][:, [0, 2, 3]]])
+        self.tri = tri
+        cx = self.node_x[tri].mean(axis=1)
+        cy = self.node_y[tri].mean(axis=1)
+        self._tree = cKDTree(np.column_stack([cx, cy]))
+        self._node_tree = None
+
+    @classmethod
+    def from_out2d(cls, path):
+        """Build a locator from the grid stored in an ``out2d_*.nc`` file."""
+        with Dataset(path, "r") as ds:
+            x = ds.variables["SCHISM_hgrid_node_x"][:]
+            y = ds.variables["SCHISM_hgrid_node_y"][:]
+            faces = ds.variables["SCHISM_hgrid_face_nodes"]
+            start = int(getattr(faces, "start_index", 1))
+            faces = np.ma.filled(faces[:], -1).astype(np.int64)
+        faces = np.where(faces >= start, faces - start, -1)
+        return cls(np.ma.filled(x, np.nan), np.ma.filled(y, np.nan), faces)
+
+    def locate(self, x, y, k=16, tol=1e-9):
+        """Find the enclosing triangle and weights for each point.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Point coordinates.
+        k : int, optional
+            Number of nearest element centroids tested for containment.
+        tol : float, optional
+            Tolerance on the barycentric weights for points on an edge.
+
+        Returns
+        -------
+        nodes : numpy.ndarray
+            Node indices, shape ``(npoint, 3)``.
+        weights : numpy.ndarray
+            Barycentric weights, shape ``(npoint, 3)``. Points outside the
+            grid are assigned to their nearest node with weight one.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        k = min(k, len(self.tri))
+        _, cand = self._tree.query(np.column_stack([x, y]), k=k)
+        cand = cand.reshape(len(x), k)
+
+        tri = self.tri[cand]  # (npoint, k, 3)
+        x1, x2, x3 = (self.node_x[tri[..., i]] for i in range(3))
+        y1, y2, y3 = (self.node_y[tri[..., i]] for i in range(3))
+        px = x[:, None]
+        py = y[:, None]
+        det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        w1 = ((y2 - y3) * (px - x3) + (x3 - x2) * (py - y3)) / det
+        w2 = ((y3 - y1) * (px - x3) + (x1 - x3) * (py - y3)) / det
+        w3 = 1.0 - w1 - w2
+        inside = (w1 >= -tol) & (w2 >= -tol) & (w3 >= -tol)
+
+        found = inside.any(axis=1)
+        first = np.argmax(inside, axis=1)
+        rows = np.arange(len(x))
+        nodes = tri[rows, first]
+        weights = np.column_stack(
+            [w1[rows, first], w2[rows, first], w3[rows, first]]
+        )
+
+        if not found.all():
+            if self._node_tree is None:
+                self._node_tree = cKDTree(np.column_stack([self.node_x, self.node_y]))
+            missing = ~found
+            _, nearest = self._node_tree.query(
+                np.column_stack([x[missing], y[missing]])
+            )
+            nodes[missing] = nearest[:, None]
+            weights[missing] = [1.0, 0.0, 0.0]
+            print(
+                f"Warning: {missing.sum()} point(s) outside the grid, using nearest node"
+            )
+        return nodes, weights
+
+
+def _stack_files(output_dir, variable):
+    pattern = re.compile(rf"{re.escape(variable)}_(\d+)\.nc$")
+    stacks = []
+    for fname in glob.glob(os.path.join(output_dir, f"{variable}_*.nc")):
+        m = pattern.search(os.path.basename(fname))
+        if m:
+            stacks.append(int(m.group(1)))
+    if not stacks:
+        raise FileNotFoundError(f"No {variable}_*.nc files found in {output_dir}")
+    return sorted(stacks)
+
+
+def output_period(output_dir, variable="salinity"):
+    """First and last output time of a run, in seconds since its start.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM ``outputs`` directory with ``<variable>_*.nc``.
+    variable : str, optional
+        Output variable whose stacks are used (default ``"salinity"``).
+
+    Returns
+    -------
+    tuple of float
+        Times accepted by :func:`extract_profiles`.
+    """
+    stacks = _stack_files(output_dir, variable)
+
+    def stack_time(stack, index):
+        with Dataset(os.path.join(output_dir, f"{variable}_{stack}.nc"), "r") as ds:
+            return float(ds.variables["time"][index])
+
+    return stack_time(stacks[0], 0), stack_time(stacks[-1], -1)
+
+
+def _read_records(fname, varname, steps, nodes, bottom):
+    """Read ``varname`` at the given time steps and sorted unique nodes.
+
+    Missing values and levels below the zero-based ``bottom`` level of each
+    node are NaN.
+    """
+    with Dataset(fname, "r") as ds:
+        var = ds.variables[varname]
+        out = np.empty((len(steps), len(nodes), var.shape[2]))
+        for i, step in enumerate(steps):
+            out[i] = np.ma.filled(var[step, nodes, :].astype(float), np.nan)
+    below = np.arange(out.shape[2])[None, :] < bottom[:, None]
+    out[:, below] = np.nan
+    return out
+
+
+def extract_profiles(output_dir, x, y, elapsed, variable="salinity", locator=None):
+    """Extract vertical profiles of a 3D nodal variable at (x, y, time) points.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM ``outputs`` directory with ``out2d_*.nc``, ``<variable>_*.nc``
+        and ``zCoordinates_*.nc``.
+    x, y : array_like
+        Point coordinates.
+    elapsed : array_like
+        Time of each point in seconds since the start of the run.
+    variable : str, optional
+        Name of the output variable and file prefix (default ``"salinity"``).
+    locator : PointLocator, optional
+        Reuse a locator built earlier for the same grid.
+
+    Returns
+    -------
+    list of tuple
+        One ``(values, z)`` pair per point with the valid levels ordered from
+        the bottom up. Levels that are dry or below the bed at any of the
+        contributing nodes are omitted.
+
+    Raises
+    ------
+    ValueError
+        If a requested time lies outside the times in the output files.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    elapsed = np.atleast_1d(np.asarray(elapsed, dtype=float))
+    if locator is None:
+        locator = PointLocator.from_out2d(os.path.join(output_dir, "out2d_1.nc"))
+    nodes, hweights = locator.locate(x, y)
+
+    # Global time table across stacks
+    stacks = _stack_files(output_dir, variable)
+    rec_stack = []
+    rec_step = []
+    times = []
+    for stack in stacks:
+        with Dataset(os.path.join(output_dir, f"{variable}_{stack}.nc"), "r") as ds:
+            t = np.asarray(ds.variables["time"][:], dtype=float)
+        times.append(t)
+        rec_stack.append(np.full(len(t), stack))
+        rec_step.append(np.arange(len(t)))
+    times = np.concatenate(times)
+    rec_stack = np.concatenate(rec_stack)
+    rec_step = np.concatenate(rec_step)
+
+    bad = (elapsed < times[0]) | (elapsed > times[-1])
+    if bad.any():
+        raise ValueError(
+            f"Requested time(s) {elapsed[bad]} s outside the output period "
+            f"{times[0]} to {times[-1]} s in {output_dir}"
+        )
+    hi = np.clip(np.searchsorted(times, elapsed), 1, len(times) - 1)
+    lo = hi - 1
+    tweight = (elapsed - times[lo]) / (times[hi] - times[lo])
+
+    # Read each needed record once, grouped by stack
+    needed = np.unique(np.concatenate([lo, hi]))
+    node_ids, node_local = np.unique(nodes, return_inverse=True)
+    node_local = node_local.reshape(nodes.shape)
+    values = {}
+    zcoords = {}
+    for stack in np.unique(rec_stack[needed]):
+        recs = needed[rec_stack[needed] == stack]
+        steps = rec_step[recs]
+        with Dataset(os.path.join(output_dir, f"out2d_{stack}.nc"), "r") as out2d:
+            bottom = np.asarray(out2d.variables["bottom_index_node"][:], dtype=np.int64)
+            bottom = bottom[node_ids] - 1
+        v = _read_records(
+            os.path.join(output_dir, f"{variable}_{stack}.nc"),
+            variable,
+            steps,
+            node_ids,
+            bottom,
+        )
+        z = _read_records(
+            os.path.join(output_dir, f"zCoordinates_{stack}.nc"),
+            "zCoordinates",
+            steps,
+            node_ids,
+            bottom,
+        )
+        for i, rec in enumerate(recs):
+            values[rec] = v[i]
+            zcoords[rec] = z[i]
+    rec_local = {rec: i for i, rec in enumerate(needed)}
+    vals = np.stack([values[rec] for rec in needed])  # (nrec, nnode, nvrt)
+    zs = np.stack([zcoords[rec] for rec in needed])
+
+    lo_local = np.array([rec_local[r] for r in lo], dtype=int)
+    hi_local = np.array([rec_local[r] for r in hi], dtype=int)
+
+    def _interp(arr):
+        w = hweights[:, :, None]
+        a_lo = (arr[lo_local[:, None], node_local] * w).sum(axis=1)
+        a_hi = (arr[hi_local[:, None], node_local] * w).sum(axis=1)
+        tw = tweight[:, None]
+        return (1.0 - tw) * a_lo + tw * a_hi
+
+    vint = _interp(vals)
+    zint = _interp(zs)
+    profiles = []
+    for i in range(len(x)):
+        valid = np.isfinite(vint[i]) & np.isfinite(zint[i])
+        profiles.append((vint[i][valid], zint[i][valid]))
+    return profiles
+
+
+def profiles_to_xyt(profiles, elapsed):
+    """Arrange extracted profiles like the output of :func:`~bdschism.read_fort18.read_xyt`.
+
+    Parameters
+    ----------
+    profiles : list of tuple
+        ``(values, z)`` pairs from :func:`extract_profiles`.
+    elapsed : array_like
+        Time of each profile in seconds since the start of the run.
+
+    Returns
+    -------
+    data : numpy.ndarray
+        Structured array with dtype :data:`~bdschism.read_fort18.XYT_DTYPE`;
+        casts are numbered from one in the order of ``profiles``.
+    index : dict
+        Maps each cast number to its row indices in ``data``.
+    """
+    sizes = [len(v) for v, _ in profiles]
+    data = np.zeros(sum(sizes), dtype=XYT_DTYPE)
+    index = {}
+    start = 0
+    for i, ((v, z), t) in enumerate(zip(profiles, elapsed)):
+        rows = np.arange(start, start + len(v))
+        data["cast"][rows] = i + 1
+        data["value"][rows] = v
+        data["z"][rows] = z
+        data["time"][rows] = t / 86400.0
+        index[i + 1] = rows
+        start += len(v)
+    return data, index
@@ -16,6 +16,7 @@ from vtools import days, seconds
 from vtools.data.gap import describe_null
 from dms_datastore.read_ts import read_noaa, read_ts
 from dms_datastore.read_multi import read_ts_repo
+from bdschism.ts_cache import cached_call, repo_max_age
 import numpy as np
 from datetime import datetime
 import struct, argparse
@@ -24,8 +25,21 @@ import warnings
 import glob
 import os
 
+# Semi-diurnal variance at Point Reyes, Monterey and San Francisco
+VAR_SEMI = np.array([0.554, 0.493, 0.580])
+
+
+# Rows formatted and written per block by THWriter.write_all
+_BLOCK_ROWS = 8760
+
 
 class THWriter(object):
+    """Writer of boundary time histories, one row of values per time step.
+
+    Subclasses implement :meth:`write_step` for a single time step and may
+    override :meth:`write_block` to write many time steps at once.
+    """
+
     def __init__(self, path, size, starttime):
         pass
         # self.myfilehnandle =
@@ -33,22 +47,44 @@ class THWriter(object):
     def write_step(self, iter, time, vals):
         pass
 
-    def write_all(self, times, vals):
-        # if you get to this point
+    def write_block(self, start, times, vals):
+        """Write rows ``start, start + 1, ...`` from a ``(ntime, nloc)`` block."""
+        for i, (time, row) in enumerate(zip(times, vals)):
+            self.write_step(start + i, time, row)
+
+    def write_all(self, times, vals, block_rows=_BLOCK_ROWS):
+        """Write a ``(ntime, nloc)`` array of values at ``times``.
+
+        The array is written in blocks of ``block_rows`` time steps, which
+        bounds the memory of the type conversion for long histories.
+        """
+        vals = np.asarray(vals)
+        for start in range(0, len(times), block_rows):
+            stop = start + block_rows
+            self.write_block(start, times[start:stop], vals[start:stop])
+
+    def close(self):
         pass
 
     def __del__(self):
-        pass
+        self.close()
         # tear down/close things
 
 
 class BinaryTHWriter(THWriter):
+    """Binary ``elev2D.th``: per time step a float32 time then float32 values."""
+
     # super(THWriter, self).__init__(path)
-    def __init__(self, fpath_out, nloc, starttime):
+    def __init__(self, fpath_out, nloc, starttime, ntime=None):
         self.outfile = open(fpath_out, "wb")
         # self.myfilehnandle =
         self.tformat = "f"
         self.valformat = "f" * nloc
+        self.nloc = nloc
+        self.record_bytes = struct.calcsize(self.tformat + self.valformat)
+        if ntime:
+            # Reserve the final size up front
+            self.outfile.truncate(ntime * self.record_bytes)
 
     def write_step(self, iter, time, vals):
         print("Writing Output")
@@ -57,28 +93,50 @@ class BinaryTHWriter(THWriter):
         buf = struct.pack(self.valformat, *vals)
         self.outfile.write(buf)
 
-    def write_all(self, times, vals):
-        # if you get to this point
-        pass
+    def write_block(self, start, times, vals):
+        # One contiguous native float32 buffer, the same bytes as struct "f"
+        buf = np.empty((len(times), self.nloc + 1), dtype=np.float32)
+        buf[:, 0] = times
+        buf[:, 1:] = vals
+        self.outfile.seek(start * self.record_bytes)
+        self.outfile.write(buf.tobytes())
 
-    def __del__(self):
-        self.outfile.close()
-        # tear down/close things
+    def close(self):
+        if not self.outfile.closed:
+            self.outfile.close()
 
 
 class NetCDFTHWriter(THWriter):
-    def __init__(self, fpath_out, nloc, starttime, dt, slr, hgrid_fpath):
+    """``elev2D.th.nc`` writer.
+
+    If ``ntime`` is known the time dimension is created with that length,
+    otherwise it is unlimited. ``time_series`` is stored in chunks of about
+    1 MB of whole time records, which suits both block writes and SCHISM
+    reading one record at a time.
+    """
+
+    def __init__(
+        self, fpath_out, nloc, starttime, dt, slr, hgrid_fpath, ntime=None
+    ):
         self.outfile = Dataset(fpath_out, "w", format="NETCDF4_CLASSIC")
         fout = self.outfile
 
-        time = fout.createDimension("time", None)
+        time = fout.createDimension("time", ntime or None)
         nOpenBndNodes = fout.createDimension("nOpenBndNodes", nloc)
         nLevels = fout.createDimension("nLevels", 1)
         nComponents = fout.createDimension("nComponents", 1)
         one = fout.createDimension("one", 1)
 
+        records_per_chunk = max(1, 2**20 // (4 * nloc))
+        time_chunk = max(records_per_chunk, 512)
+        if ntime:
+            records_per_chunk = min(records_per_chunk, ntime)
+            time_chunk = min(time_chunk, ntime)
+
         # create netCDF dimension variables and
-        self.times = fout.createVariable("time", "f8", ("time",))
+        self.times = fout.createVariable(
+            "time", "f8", ("time",), chunksizes=(time_chunk,)
+        )
         # todo: what is timestep all about? Did we invent this? Why variable rather than attribute?
         # todo: what is timestep all about? Did we invent this? Why variable rather than attribute?
         self.timestep = fout.createVariable("time_step", "f4", ("one",))
@@ -86,7 +144,10 @@ class NetCDFTHWriter(THWriter):
 
         # create elevation time series data to be writen to netCDF file
         self.timeseries = fout.createVariable(
-            "time_series", "f4", ("time", "nOpenBndNodes", "nLevels", "nComponents")
+            "time_series",
+            "f4",
+            ("time", "nOpenBndNodes", "nLevels", "nComponents"),
+            chunksizes=(records_per_chunk, nloc, 1, 1),
         )
 
         # variable attributes
@@ -109,12 +170,14 @@ class NetCDFTHWriter(THWriter):
         self.timeseries[iter, :, 0, 0] = vals
         self.times[iter] = time
 
-    def write_all(self, times, vals):
-        # if you get to this point
-        pass
+    def write_block(self, start, times, vals):
+        stop = start + len(times)
+        self.timeseries[start:stop, :, 0, 0] = np.asarray(vals, dtype=np.float32)
+        self.times[start:stop] = times
 
-    def __del__(self):
-        self.outfile.close()
+    def close(self):
+        if self.outfile.isopen():
+            self.outfile.close()
 
 
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
@@ -143,8 +206,18 @@ class NetCDFTHWriter(THWriter):
     required=False,
     help="Scalar sea level rise increment",
 )
+@click.option(
+    "--scenario",
+    "scenarios",
+    multiple=True,
+    metavar="OUTFILE,STIME,ETIME,SLR",
+    help="Write an additional output for this sea level rise and window. "
+    "May be repeated; ETIME may be left empty. When given, --outfile, --stime, "
+    "--etime and --slr are ignored and the data are read and filtered once "
+    "for each group of overlapping windows.",
+)
 @click.argument("files", nargs=-1, type=str, required=False)
-def gen_elev2d_cli(stime, etime, hgrid, outfile, slr, files):
+def gen_elev2d_cli(stime, etime, hgrid, outfile, slr, scenarios, files):
     """
     Script to create elev2D.th.nc boundary condition from Point Reyes and Monterey NOAA file
 
@@ -153,6 +226,8 @@ def gen_elev2d_cli(stime, etime, hgrid, outfile, slr, files):
     > gen_elev2D.py --outfile elev2D.th.nc --stime=2009-03-12 --etime=2010-01-01 9415020_gageheight.csv 9413450_gageheight.csv
 
     > bds gen_elev2d --outfile elev2D.th.nc --hgrid=hgrid.gr3 --stime=2025-8-27 --etime=2026-01-04 --slr 0.0 "/path/to/noaa_pryc1_9415020_elev_*.csv" "path/to/noaa_mtyc1_9413450_elev_*.csv"
+
+    > bds gen_elev2d --hgrid=hgrid.gr3 --scenario elev2D_slr0.th.nc,2021-1-1,2022-1-1,0.0 --scenario elev2D_slr1.th.nc,2021-1-1,2022-1-1,1.0 pryc1 mtyc1
     """
     # Default values
     pt_reyes = "pryc1"
@@ -183,19 +258,47 @@ def gen_elev2d_cli(stime, etime, hgrid, outfile, slr, files):
             pt_reyes = pt_reyes_files if pt_reyes_files else "pryc1"
             monterey = monterey_files if monterey_files else "mtyc1"
 
+    if scenarios:
+        parsed = []
+        for scenario in scenarios:
+            fields = [f.strip() for f in scenario.split(",")]
+            if len(fields) != 4:
+                raise click.BadParameter(
+                    f"expected OUTFILE,STIME,ETIME,SLR, got {scenario!r}",
+                    param_hint="--scenario",
+                )
+            out, start, end, rise = fields
+            parsed.append((out, start, end or None, float(rise)))
+        return gen_elev2D_scenarios(hgrid, pt_reyes, monterey, parsed)
+
     return gen_elev2D(hgrid, outfile, pt_reyes, monterey, stime, etime, slr)
 
 
 def _get_data(src, start, end=None):
     """Get data from file(s) or repository.
 
+    Results are cached on disk (see :mod:`bdschism.ts_cache`). File reads are
+    invalidated when a file changes, repository reads expire after
+    ``repo_max_age_hours``.
+
     Args:
         src: Either a single file path, list of file paths, or station code string
         start: Start time
         end: End time
-        tbuf: Time buffer
-        bufend: Buffered end time
     """
+    if isinstance(src, list):
+        sources = sorted(src)
+    elif isinstance(src, str) and src.endswith(".csv"):
+        sources = [src]
+    else:
+        return cached_call(
+            "gen_elev2d.repo", _read_data, src, start, end, max_age=repo_max_age()
+        )
+    return cached_call("gen_elev2d.files", _read_data, src, start, end, sources=sources)
+
+
+def _read_data(src, start, end=None):
+    """Uncached implementation of :func:`_get_data`."""
     # Handle list of files
     if isinstance(src, list):
         if not src:
@@ -235,47 +338,25 @@ def _get_data(src, start, end=None):
     return out
 
 
-def gen_elev2D(hgrid_fpath, outfile, pt_reyes_fpath, monterey_fpath, start, end, slr):
-    """Generate elev2D.th or elev2D.th.nc file for Bay-Delta SCHISM model using Point Reyes and Monterey tide data.
+def _ocean_boundary_weights(mesh, hgrid_fpath):
+    """Interpolation weights of the ocean boundary nodes.
 
-    Arguments:
-    hgrid_fpath: Path to hgrid file (e.g. hgrid.gr3)
-    outfile: Path to output file (e.g. elev2D.th or elev2D.th.nc)
-    pt_reyes_fpath: Path to Point Reyes data file(s) or station code (e.g. "/path/to/noaa_pryc1_9415020_elev_*.csv")
-    monterey_fpath: Path to Monterey data file(s) or station code (e.g. "path/to/noaa_mtyc1_9413450_elev_*.csv")
-    start: Start time (e.g. "2025-8-27")
-    end: End time (e.g. "2026-01-04")
-    slr: Sea level rise increment in meters (e.g. 0.0)
+    Point Reyes and Monterey define a local frame, x along the coast
+    (assumed 45 degrees from north-west to south-east) and y normal to it.
+    Each boundary node gets its relative position in that frame.
 
-    Example usage:
-    > gen_elev2D.py --outfile elev2D.th.nc --hgrid=hgrid.gr3 --stime=2025-8-27 --etime=2026-01-04 --slr 0.0 "/path/to/noaa_pryc1_9415020_elev_*.csv" "path/to/noaa_mtyc1_9413450_elev_*.csv"
+    Returns
+    -------
+    dict
+        ``theta_x``, ``theta_x_comp``, ``theta_y``, ``theta_y_comp`` and
+        ``var_y``, each an array with one value per ocean boundary node.
     """
-    max_gap = 5
-    stime = start
-    etime = end
-    fpath_out = outfile
-
-
-    tbuf = days(16)
-    # convert start time string input to datetime
-    sdate = pd.Timestamp(stime)
-    bufstart = sdate - tbuf
-
-    if not etime is None:
-        # convert start time string input to datetime
-        edate = pd.Timestamp(etime)
-        bufend = edate + tbuf
-    else:
-        edate = None
-        bufend = None
-
     # UTM positions of Point Reyes, Monterey, SF
     pos_pr = np.array([502195.03, 4205445.47])
     pos_mt = np.array([599422.84, 4051630.37])
     pos_sf = np.array([547094.79, 4184499.42])
 
     var_subtidal = np.array([0.938, 0.905, 0.969])  # pr, mt, sf
-    var_semi = np.array([0.554, 0.493, 0.580])
 
     # Assume 45 degree from north-west to south-east
     tangent = np.array([1, -1])
@@ -289,17 +370,39 @@ def gen_elev2D(hgrid_fpath, outfile, pt_reyes_fpath, monterey_fpath, start, end,
     x_mt = np.dot(tangent, mt_rel)  # In pr-mt direction
     y_mt = np.dot(normal, mt_rel)  # Normal to x-direction to the
 
-    # Grid
-    mesh = read_mesh(hgrid_fpath)
     if not mesh.boundaries:
         raise ValueError(f"No boundary information found in {hgrid_fpath}")
-
     ocean_boundary = mesh.boundaries[0]  # First one is ocean
-    nnode = ocean_boundary.n_nodes()
-    print(f"Ocean boundary has {nnode} nodes")
+    print(f"Ocean boundary has {ocean_boundary.n_nodes()} nodes")
 
+    boundaries = mesh.nodes[ocean_boundary.nodes]
+    pos_rel = boundaries[:, :2] - pos_pr
 
-    # Data
+    # x, y in a new principal axes
+    x = np.dot(pos_rel, tangent.reshape((2, -1)))[:, 0]
+    y = np.dot(pos_rel, normal.reshape((2, -1)))[:, 0]
+    theta_x = x / x_mt
+    theta_y = y / y_mt
+    theta_y_comp = 1.0 - theta_y
+    return {
+        "theta_x": theta_x,
+        "theta_x_comp": 1.0 - theta_x,
+        "theta_y": theta_y,
+        "theta_y_comp": theta_y_comp,
+        "var_y": theta_y_comp * VAR_SEMI[0] + theta_y * VAR_SEMI[1],
+    }
+
+
+def _read_species(pt_reyes_fpath, monterey_fpath, bufstart, bufend, max_gap=5):
+    """Read Point Reyes and Monterey and separate their tidal species.
+
+    Returns
+    -------
+    species_pr, species_mt : tuple of pandas.DataFrame
+        ``(subtidal, diurnal, semidiurnal)`` at each station.
+    dt : float
+        Time step of the data in seconds.
+    """
     print("Reading Point Reyes...")
     pt_reyes = _get_data(pt_reyes_fpath, bufstart, bufend)
 
@@ -362,45 +465,40 @@ def gen_elev2D(hgrid_fpath, outfile, pt_reyes_fpath, monterey_fpath, start, end,
     dt = monterey.index.freq / seconds(1)
 
     print("Done Reading")
+    return (
+        (ts_pr_subtidal, ts_pr_diurnal, ts_pr_semi),
+        (ts_mt_subtidal, ts_mt_diurnal, ts_mt_semi),
+        dt,
+    )
 
-    print("Interpolating and subsetting Point Reyes")
-    # interpolate_ts(ts_pr_subtidal.window(sdate,edate),step)
-    ts_pr_subtidal = ts_pr_subtidal.loc[sdate:edate]
-    ts_pr_diurnal = ts_pr_diurnal.loc[sdate:edate]
-    # interpolate_ts(ts_pr_semi.window(sdate,edate),step)
-    ts_pr_semi = ts_pr_semi.loc[sdate:edate]
 
+def _boundary_elevation(species_pr, species_mt, weights, sdate, edate, slr):
+    """Elevation at every ocean boundary node and time step of a window.
+
+    Parameters
+    ----------
+    species_pr, species_mt : tuple of pandas.DataFrame
+        Tidal species from :func:`_read_species`.
+    weights : dict
+        Node weights from :func:`_ocean_boundary_weights`.
+    sdate, edate : pandas.Timestamp or None
+        Window, inclusive. ``edate`` None means to the end of the data.
+    slr : float
+        Sea level rise added to every value.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape ``(ntime, nnode)``.
+    """
+    print("Interpolating and subsetting Point Reyes")
+    ts_pr_subtidal, ts_pr_diurnal, ts_pr_semi = (
+        ts.loc[sdate:edate] for ts in species_pr
+    )
     print("Interpolating and subsetting Monterey")
-    # interpolate_ts(ts_mt_subtidal.window(sdate,edate),step)
-    ts_mt_subtidal = ts_mt_subtidal.loc[sdate:edate]
-    # interpolate_ts(ts_mt_diurnal.window(sdate,edate),step)
-    ts_mt_diurnal = ts_mt_diurnal.loc[sdate:edate]
-    # interpolate_ts(ts_mt_semi.window(sdate,edate),step)
-    ts_mt_semi = ts_mt_semi.loc[sdate:edate]
-
-    print("Creating writer")  # requires dt be known for netcdf
-    if fpath_out.endswith("th"):
-        thwriter = BinaryTHWriter(fpath_out, nnode, None)
-    elif fpath_out.endswith("nc"):
-        thwriter = NetCDFTHWriter(fpath_out, nnode, sdate, dt, slr, hgrid_fpath)
-    else:
-        raise ValueError(
-            "File extension for output not recognized in file: {}".format(fpath_out)
-        )
-
-    # Grid
-    boundaries = mesh.nodes[ocean_boundary.nodes]
-    pos_rel = boundaries[:, :2] - pos_pr
-
-    # x, y in a new principal axes
-    x = np.dot(pos_rel, tangent.reshape((2, -1)))
-    y = np.dot(pos_rel, normal.reshape((2, -1)))
-    theta_x = x / x_mt
-    theta_x_comp = 1.0 - theta_x
-    theta_y = y / y_mt
-    theta_y_comp = 1.0 - theta_y
-
-    var_y = theta_y_comp * var_semi[0] + theta_y * var_semi[1]
+    ts_mt_subtidal, ts_mt_diurnal, ts_mt_semi = (
+        ts.loc[sdate:edate] for ts in species_mt
+    )
 
     # adj_subtidal_mt = 0.08  # Adjustment in Monterey subtidal signal
     # scaling_diurnal_mt = 0.95 # Scaling of Monterey diurnal signal (for K1/Q1)
@@ -436,49 +534,184 @@ def gen_elev2D(hgrid_fpath, outfile, pt_reyes_fpath, monterey_fpath, start, end,
         print(ts_pr_semi[ts_pr_semi.isna()])
         raise ValueError("Above times are missing in Point Reyes data")
 
-    for i in range(len(ts_pr_semi)):
-        t = float(dt * i)
-        # semi-diurnal
-        # Scaling
-        pr = ts_pr_semi.iloc[i, 0]
-        mt = ts_mt_semi.iloc[i, 0] * scaling_semidiurnal_mt
-
-        if np.isnan(pr) or np.isnan(mt):
-            raise ValueError("One of values is numpy.nan.")
-
-        eta_pr_side = var_y / var_semi[0] * pr
-        eta_mt_side = var_y / var_semi[1] * mt
-        eta = eta_pr_side * theta_x_comp + eta_mt_side * theta_x
-
-        # diurnal
-        # Interpolate in x-direction only to get a better phase
-        pr = ts_pr_diurnal.iloc[i, 0] * scaling_diurnal_pr
-        mt = ts_mt_diurnal.iloc[i, 0] * scaling_diurnal_mt
-        # if i < 5:
-        #    print("yu")
-        #    print(pr)
-        #    print(mt)
-
-        if np.isnan(pr) or np.isnan(mt):
-            raise ValueError("One of values is numpy.nan.")
-
-        eta += pr * theta_x_comp + mt * theta_x
-
-        # Subtidal
-        # No phase change in x-direction. Simply interpolate in
-        # y-direction.
-        pr = ts_pr_subtidal.iloc[i, 0]
-        mt = ts_mt_subtidal.iloc[i, 0] + adj_subtidal_mt
-
-        if np.isnan(pr) or np.isnan(mt):
-            raise ValueError("One of values is numpy.nan.")
-        eta += pr * theta_y_comp + mt * theta_y + slr
-
-        # write data to netCDF file
-        thwriter.write_step(i, t, eta)
-
-    # Delete class
-    del thwriter
+    # Station signals as (ntime, 1) columns broadcast against (nnode,) weights
+    ntime = len(ts_pr_semi)
+    signals = [
+        ts.iloc[:, 0].to_numpy(dtype=float)[:ntime, np.newaxis]
+        for ts in (
+            ts_pr_semi,
+            ts_mt_semi,
+            ts_pr_diurnal,
+            ts_mt_diurnal,
+            ts_pr_subtidal,
+            ts_mt_subtidal,
+        )
+    ]
+    if any(len(s) < ntime for s in signals):
+        raise ValueError("Point Reyes and Monterey species do not cover the same times")
+    if any(np.isnan(s).any() for s in signals):
+        raise ValueError("One of values is numpy.nan.")
+    pr_semi, mt_semi, pr_diurnal, mt_diurnal, pr_subtidal, mt_subtidal = signals
+
+    var_y = weights["var_y"]
+    theta_x = weights["theta_x"]
+    theta_x_comp = weights["theta_x_comp"]
+    theta_y = weights["theta_y"]
+    theta_y_comp = weights["theta_y_comp"]
+
+    # semi-diurnal
+    eta_pr_side = var_y / VAR_SEMI[0] * pr_semi
+    eta_mt_side = var_y / VAR_SEMI[1] * (mt_semi * scaling_semidiurnal_mt)
+    eta = eta_pr_side * theta_x_comp + eta_mt_side * theta_x
+
+    # diurnal
+    # Interpolate in x-direction only to get a better phase
+    eta += (pr_diurnal * scaling_diurnal_pr) * theta_x_comp + (
+        mt_diurnal * scaling_diurnal_mt
+    ) * theta_x
+
+    # Subtidal
+    # No phase change in x-direction. Simply interpolate in
+    # y-direction.
+    eta += pr_subtidal * theta_y_comp + (mt_subtidal + adj_subtidal_mt) * theta_y + slr
+    return eta
+
+
+def _window_groups(sdates, edates, tbuf):
+    """Group scenario windows whose buffered spans overlap.
+
+    Parameters
+    ----------
+    sdates, edates : list of pandas.Timestamp
+        Start and end of each window; an end of None is open.
+    tbuf : pandas.Timedelta
+        Buffer added on both sides of each window.
+
+    Returns
+    -------
+    list of tuple
+        ``(bufstart, bufend, indices)`` in time order, where ``indices`` are
+        the positions of the scenarios covered by the span ``bufstart`` to
+        ``bufend`` (None if open).
+    """
+    groups = []
+    for i in sorted(range(len(sdates)), key=lambda i: sdates[i]):
+        bufstart = sdates[i] - tbuf
+        bufend = None if edates[i] is None else edates[i] + tbuf
+        if groups and (groups[-1][1] is None or bufstart <= groups[-1][1]):
+            group = groups[-1]
+            if group[1] is not None:
+                group[1] = None if bufend is None else max(group[1], bufend)
+            group[2].append(i)
+        else:
+            groups.append([bufstart, bufend, [i]])
+    return [tuple(g) for g in groups]
+
+
+def gen_elev2D_scenarios(hgrid_fpath, pt_reyes_fpath, monterey_fpath, scenarios):
+    """Generate elev2D files for several sea level rise and time window scenarios.
+
+    The mesh is read and the boundary weights are computed once for all
+    scenarios. Scenarios whose buffered windows overlap form a group, and
+    the tide data are read and separated into species once per group, over
+    the union of its buffered windows. Disjoint windows, e.g. years apart,
+    are read separately, so a data gap between them does not matter. Each
+    scenario is then a vectorized node by time evaluation written to its
+    own file.
+
+    A scenario alone in its group, or sharing its window with the rest of
+    the group (e.g. several sea level rise values), gives the same file as
+    :func:`gen_elev2D` over that window. Otherwise the species are separated
+    over a longer span, which can change the filtered values slightly.
+
+    Parameters
+    ----------
+    hgrid_fpath : str
+        Path to hgrid file (e.g. hgrid.gr3).
+    pt_reyes_fpath, monterey_fpath : str or list of str
+        Data file(s) or station code, see :func:`gen_elev2D`.
+    scenarios : iterable of tuple
+        ``(outfile, start, end, slr)`` for every output. ``outfile`` ends in
+        ``.th`` or ``.nc``; ``end`` may be None.
+
+    Examples
+    --------
+    >>> gen_elev2D_scenarios(
+    ...     "hgrid.gr3", "pryc1", "mtyc1",
+    ...     [(f"elev2D_slr{slr}.th.nc", "2021-01-01", "2022-01-01", slr)
+    ...      for slr in (0.0, 0.5, 1.0)],
+    ... )
+    """
+    max_gap = 5
+    scenarios = [tuple(s) for s in scenarios]
+    if not scenarios:
+        raise ValueError("No scenarios given")
+    for outfile, _, _, _ in scenarios:
+        if not (outfile.endswith("th") or outfile.endswith("nc")):
+            raise ValueError(
+                "File extension for output not recognized in file: {}".format(outfile)
+            )
+
+    tbuf = days(16)
+    # convert start time string input to datetime
+    sdates = [pd.Timestamp(start) for _, start, _, _ in scenarios]
+    edates = [None if end is None else pd.Timestamp(end) for _, _, end, _ in scenarios]
+
+    # Grid
+    mesh = read_mesh(hgrid_fpath)
+    weights = _ocean_boundary_weights(mesh, hgrid_fpath)
+    nnode = len(weights["theta_x"])
+
+    for bufstart, bufend, members in _window_groups(sdates, edates, tbuf):
+        # Data
+        species_pr, species_mt, dt = _read_species(
+            pt_reyes_fpath, monterey_fpath, bufstart, bufend, max_gap
+        )
+
+        for i in members:
+            fpath_out, _, _, slr = scenarios[i]
+            sdate, edate = sdates[i], edates[i]
+            eta = _boundary_elevation(
+                species_pr, species_mt, weights, sdate, edate, slr
+            )
+            times = dt * np.arange(len(eta), dtype=float)
+
+            print("Creating writer")  # requires dt be known for netcdf
+            if fpath_out.endswith("th"):
+                thwriter = BinaryTHWriter(fpath_out, nnode, None, ntime=len(eta))
+            else:
+                thwriter = NetCDFTHWriter(
+                    fpath_out, nnode, sdate, dt, slr, hgrid_fpath, ntime=len(eta)
+                )
+            thwriter.write_all(times, eta)
+            thwriter.close()
+        del species_pr, species_mt
+
+
+def gen_elev2D(hgrid_fpath, outfile, pt_reyes_fpath, monterey_fpath, start, end, slr):
+    """Generate elev2D.th or elev2D.th.nc file for Bay-Delta SCHISM model using Point Reyes and Monterey tide data.
+
+    Arguments:
+    hgrid_fpath: Path to hgrid file (e.g. hgrid.gr3)
+    outfile: Path to output file (e.g. elev2D.th or elev2D.th.nc)
+    pt_reyes_fpath: Path to Point Reyes data file(s) or station code (e.g. "/path/to/noaa_pryc1_9415020_elev_*.csv")
+    monterey_fpath: Path to Monterey data file(s) or station code (e.g. "path/to/noaa_mtyc1_9413450_elev_*.csv")
+    start: Start time (e.g. "2025-8-27")
+    end: End time (e.g. "2026-01-04")
+    slr: Sea level rise increment in meters (e.g. 0.0)
+
+    To write several sea level rise values or windows from the same data,
+    use :func:`gen_elev2D_scenarios`, which reads and filters the data once.
+
+    Example usage:
+    > gen_elev2D.py --outfile elev2D.th.nc --hgrid=hgrid.gr3 --stime=2025-8-27 --etime=2026-01-04 --slr 0.0 "/path/to/noaa_pryc1_9415020_elev_*.csv" "path/to/noaa_mtyc1_9413450_elev_*.csv"
+    """
+    gen_elev2D_scenarios(
+        hgrid_fpath,
+        pt_reyes_fpath,
+        monterey_fpath,
+        [(outfile, start, end, slr)],
+    )
 
 
 if __name__ == "__main__":
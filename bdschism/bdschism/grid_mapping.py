@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Interpolation of node values from one SCHISM grid to the nodes of another.
+
+Habitat suitability and similar analyses evaluate fields computed on a
+coarse grid (e.g. turbidity quantiles on ``bay_delta_coarse_v4.gr3``) at the
+nodes of the model grid. Every target node is located in a triangle of the
+source grid (quadrilaterals are split in two) with
+:class:`bdschism.extract_xyt.PointLocator`, and gets either the barycentric
+weights of the three triangle nodes or, as in the original
+``map_grids`` script, their normalized inverse-distance weights. Target
+nodes outside the source grid take the value of the nearest source node.
+
+The mapping is a sparse ``(ntarget, nsource)`` matrix with at most three
+entries per row, so a field is remapped with one sparse product per time
+step (or one product for all time steps). Mappings are cached as
+``grid_mapping_<key>.npz``, where the key is a hash of the coordinates and
+element tables of both grids and the weighting method, so they are computed
+once per pair of grids no matter where the grid files live or what they are
+called.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+import click
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from netCDF4 import Dataset
+
+from bdschism.extract_xyt import PointLocator
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("barycentric", "idw")
+_FORMAT_VERSION = 1
+
+
+def read_grid(path):
+    """Node coordinates and element table of a horizontal grid.
+
+    Parameters
+    ----------
+    path : str
+        ``hgrid.gr3`` style file, or a SCHISM ``out2d_*.nc`` output file.
+
+    Returns
+    -------
+    x, y : numpy.ndarray
+        Node coordinates.
+    faces : numpy.ndarray
+        Zero-based node indices of each element, shape ``(nface, 4)``, with
+        -1 for the unused fourth node of triangles.
+    """
+    if str(path).endswith(".nc"):
+        with Dataset(path, "r") as ds:
+            x = np.ma.filled(ds.variables["SCHISM_hgrid_node_x"][:], np.nan)
+            y = np.ma.filled(ds.variables["SCHISM_hgrid_node_y"][:], np.nan)
+            fn = ds.variables["SCHISM_hgrid_face_nodes"]
+            start = int(getattr(fn, "start_index", 1))
+            raw = np.ma.filled(fn[:], -1).astype(np.int64)
+        faces = np.full((len(raw), 4), -1, dtype=np.int64)
+        faces[:, : raw.shape[1]] = np.where(raw >= start, raw - start, -1)
+        return np.asarray(x, dtype=float), np.asarray(y, dtype=float), faces
+
+    with open(path, "r") as f:
+        f.readline()
+        ne, nn = (int(v) for v in f.readline().split()[:2])
+    nodes = pd.read_csv(
+        path, sep=r"\s+", skiprows=2, nrows=nn, header=None, usecols=[1, 2],
+        engine="c",
+    ).to_numpy(dtype=float)
+    # Triangle rows have one field less; the missing fourth node reads as NaN
+    elems = pd.read_csv(
+        path, sep=r"\s+", skiprows=2 + nn, nrows=ne, header=None,
+        names=range(6), engine="c",
+    ).to_numpy(dtype=float)[:, 1:]
+    nv = elems[:, 0].astype(np.int64)
+    faces = np.where(np.isnan(elems[:, 1:]), 0, elems[:, 1:]).astype(np.int64) - 1
+    faces[nv == 3, 3] = -1
+    return nodes[:, 0], nodes[:, 1], faces
+
+
+def grid_key(x, y, faces):
+    """Hash of the coordinates and element table of a grid."""
+    h = hashlib.sha256()
+    for arr in (
+        np.ascontiguousarray(x, dtype=np.float64),
+        np.ascontiguousarray(y, dtype=np.float64),
+        np.ascontiguousarray(faces, dtype=np.int64),
+    ):
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class GridMapping:
+    """Weights mapping node values of a source grid to target points.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        Source node of each weight, shape ``(ntarget, k)`` (``k`` is three
+        for mappings built here), -1 where unused.
+    weights : numpy.ndarray
+        Weights summing to one on each row, same shape as ``nodes``.
+    nsource : int
+        Number of source nodes.
+    """
+
+    def __init__(self, nodes, weights, nsource):
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=float)
+        self.nsource = int(nsource)
+        self._matrix = None
+
+    @property
+    def matrix(self):
+        """The mapping as a ``scipy.sparse.csr_matrix`` of ``(ntarget, nsource)``."""
+        if self._matrix is None:
+            used = self.nodes >= 0
+            rows = np.broadcast_to(np.arange(len(self.nodes))[:, None], self.nodes.shape)
+            self._matrix = scipy.sparse.csr_matrix(
+                (self.weights[used], (rows[used], self.nodes[used])),
+                shape=(len(self.nodes), self.nsource),
+            )
+        return self._matrix
+
+    def remap(self, values):
+        """Evaluate source node values at the target points.
+
+        Parameters
+        ----------
+        values : array_like
+            Shape ``(nsource,)`` or ``(..., nsource)``, e.g. ``(ntime, nsource)``.
+
+        Returns
+        -------
+        numpy.ndarray
+            Shape ``(ntarget,)`` or ``(..., ntarget)``. NaN at a source node
+            propagates to every target point that uses it.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            return self.matrix @ values
+        flat = values.reshape(-1, values.shape[-1])
+        return (self.matrix @ flat.T).T.reshape(values.shape[:-1] + (len(self.nodes),))
+
+    def save(self, path):
+        """Store the mapping in a ``.npz`` file, atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=_FORMAT_VERSION,
+                    nodes=self.nodes,
+                    weights=self.weights,
+                    nsource=self.nsource,
+                )
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a mapping written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as npz:
+            if int(npz["version"]) != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported grid mapping version in {path}")
+            return cls(npz["nodes"], npz["weights"], int(npz["nsource"]))
+
+    def write_map_file(self, path):
+        """Write the NetCDF map file used by ``scripts/suxarray_dep_scripts``.
+
+        The file has ``map_to_coarse_nodes`` (zero-based, -1 fill) and
+        ``weight`` on ``(nMesh2_node, three)``.
+        """
+        with Dataset(path, "w") as nc:
+            nc.createDimension("nMesh2_node", len(self.nodes))
+            nc.createDimension("three", 3)
+            nodes = nc.createVariable(
+                "map_to_coarse_nodes", "i8", ("nMesh2_node", "three"), fill_value=-1
+            )
+            nodes.start_index = 0
+            nodes[:] = self.nodes
+            nc.createVariable("weight", "f8", ("nMesh2_node", "three"))[:] = self.weights
+
+
+def read_map_text(path, nsource=None, max_nodes=4):
+    """Read a grid map text file such as ``mapped_dwr.txt``.
+
+    Every line maps one target node, in order: its id, the number ``n`` of
+    source nodes, their one-based ids and then their ``n`` weights. The
+    weights are normalized on each line, as :func:`numpy.average` does.
+
+    Parameters
+    ----------
+    path : str
+        Map file.
+    nsource : int, optional
+        Number of source nodes. Defaults to the largest node id in the file.
+    max_nodes : int, optional
+        Largest number of source nodes on a line.
+
+    Returns
+    -------
+    GridMapping
+    """
+    table = pd.read_csv(
+        path, sep=r"\s+", header=None, names=range(2 + 2 * max_nodes), engine="c"
+    ).to_numpy(dtype=float)
+    n = table[:, 1].astype(np.int64)
+    if (n < 1).any() or (n > max_nodes).any():
+        raise ValueError(f"Lines of {path} must map 1 to {max_nodes} nodes")
+    slot = np.arange(max_nodes)
+    used = slot[None, :] < n[:, None]
+    ids = np.where(used, table[:, 2 : 2 + max_nodes], 0.0)
+    weight_col = np.minimum(2 + n[:, None] + slot[None, :], table.shape[1] - 1)
+    weights = np.where(used, np.take_along_axis(table, weight_col, axis=1), 0.0)
+    nodes = np.where(used, ids.astype(np.int64) - 1, -1)
+    weights /= weights.sum(axis=1, keepdims=True)
+    if nsource is None:
+        nsource = int(nodes.max()) + 1
+    return GridMapping(nodes, weights, nsource)
+
+
+def build_grid_mapping(source, x, y, method="barycentric"):
+    """Compute the mapping from a source grid to points.
+
+    Parameters
+    ----------
+    source : tuple
+        ``(x, y, faces)`` of the source grid as returned by :func:`read_grid`.
+    x, y : array_like
+        Target points, e.g. the nodes of a finer grid.
+    method : {"barycentric", "idw"}, optional
+        Barycentric weights of the enclosing triangle, or inverse-distance
+        weights of its nodes. A target point on a source node takes that
+        node's value with either method.
+
+    Returns
+    -------
+    GridMapping
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+    sx, sy, faces = source
+    locator = PointLocator(sx, sy, faces)
+    nodes, weights = locator.locate(x, y)
+    outside = (weights[:, 0] == 1.0) & (weights[:, 1] == 0.0) & (weights[:, 2] == 0.0)
+    if method == "idw":
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        dist = np.hypot(locator.node_x[nodes] - x[:, None], locator.node_y[nodes] - y[:, None])
+        with np.errstate(divide="ignore"):
+            inv = 1.0 / dist
+        on_node = np.isinf(inv)
+        inv = np.where(on_node.any(axis=1, keepdims=True), on_node.astype(float), inv)
+        weights = inv / inv.sum(axis=1, keepdims=True)
+    else:
+        weights = np.clip(weights, 0.0, None)
+        weights /= weights.sum(axis=1, keepdims=True)
+    # Points assigned to their nearest node use a single weight
+    nodes[outside, 1:] = -1
+    weights[outside] = [1.0, 0.0, 0.0]
+    return GridMapping(nodes, weights, len(sx))
+
+
+def grid_mapping(source_grid, target_grid, method="barycentric", cache_dir=None):
+    """Mapping from the nodes of one grid to the nodes of another, cached.
+
+    Parameters
+    ----------
+    source_grid, target_grid : str
+        Grid files (see :func:`read_grid`), e.g. the coarse and the model
+        grid.
+    method : {"barycentric", "idw"}, optional
+        Weighting, see :func:`build_grid_mapping`.
+    cache_dir : str, optional
+        Directory of the cache files. Defaults to the directory of
+        ``target_grid``; an empty string disables caching.
+
+    Returns
+    -------
+    GridMapping
+    """
+    source = read_grid(source_grid)
+    tx, ty, tfaces = read_grid(target_grid)
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(target_grid))
+    cache_file = None
+    if cache_dir:
+        key = hashlib.sha256(
+            f"{grid_key(*source)}:{grid_key(tx, ty, tfaces)}:{method}".encode()
+        ).hexdigest()[:20]
+        cache_file = os.path.join(cache_dir, f"grid_mapping_{key}.npz")
+        try:
+            mapping = GridMapping.load(cache_file)
+            logger.info(f"Read grid mapping from {cache_file}")
+            return mapping
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable grid mapping {cache_file}: {e}")
+
+    mapping = build_grid_mapping(source, tx, ty, method=method)
+    if cache_file is not None:
+        try:
+            mapping.save(cache_file)
+        except OSError as e:
+            logger.debug(f"Could not write grid mapping {cache_file}: {e}")
+    return mapping
+
+
+@click.command()
+@click.option(
+    "--coarse",
+    "coarse_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Source (coarse) grid, .gr3 or out2d_*.nc.",
+)
+@click.option(
+    "--fine",
+    "fine_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Target (fine) grid, .gr3 or out2d_*.nc.",
+)
+@click.option(
+    "--map",
+    "map_path",
+    default="grid_mapping_and_weight.nc",
+    show_default=True,
+    help="NetCDF map file to write.",
+)
+@click.option(
+    "--method",
+    type=click.Choice(METHODS),
+    default="barycentric",
+    show_default=True,
+    help="Weighting of the nodes of the enclosing coarse element.",
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    help="Directory for cached mappings. Default: directory of --fine.",
+)
+@click.help_option("-h", "--help")
+def map_grids_cli(coarse_path, fine_path, map_path, method, cache_dir):
+    """Map nodes of a fine grid to a coarse grid and write the map file."""
+    mapping = grid_mapping(coarse_path, fine_path, method=method, cache_dir=cache_dir)
+    mapping.write_map_file(map_path)
+
+
+if __name__ == "__main__":
+    map_grids_cli()
@@ -18,9 +18,11 @@ import pandas as pd
 import os
 import logging
 import click
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 from bdschism.logging_config import configure_logging, resolve_loglevel
+from bdschism.ts_cache import cached_call, repo_max_age
 
 
 stations = [
@@ -135,7 +137,28 @@ stations = [
 add_upper = ["anh", "cse", "mrz", "emm", "mal", "pts"]
 
 
-def hotstart_nudge_data(sdate, ndays, dest, repo = "screened"):
+def _read_station(ndx, var, subloc, repo, start, end):
+    """Read one station variable from the repository, limited to ``start``-``end``."""
+    logger.info(f"Reading {var} data for {ndx} with subloc={subloc}")
+    return cached_call(
+        "read_ts_repo",
+        read_ts_repo,
+        ndx,
+        var,
+        subloc=subloc,
+        repo=repo,
+        start=start,
+        end=end,
+        max_age=repo_max_age(),
+    )
+
+
+def hotstart_nudge_data(sdate, ndays, dest, repo = "screened", nworkers=8):
+    """Write hotstart and nudging observation files for temperature and salinity.
+
+    Each station variable is read once, limited to the nudging period plus a
+    buffer, with up to ``nworkers`` reads in flight at a time.
+    """
 
     t0 = sdate
     nudgelen = pd.Timedelta(days=ndays)
@@ -153,13 +176,27 @@ def hotstart_nudge_data(sdate, ndays, dest, repo = "screened"):
     no_such_file = []
     tndx = pd.date_range(t0, t0 + nudgelen, freq="h")
     all_vars = ["temperature", "salinity"]
+    var_codes = {"temperature": "temp", "salinity": "ec"}
+
+    # Issue every (station, variable) read up front; duplicate station
+    # entries share a single read.
+    pool = ThreadPoolExecutor(max_workers=nworkers)
+    reads = {}
+    for label_var in all_vars:
+        var = var_codes[label_var]
+        for ndx in station_df.index:
+            if (ndx, var) not in reads:
+                subloc = "upper" if ndx in add_upper else None
+                reads[(ndx, var)] = pool.submit(
+                    _read_station, ndx, var, subloc, repo, sdata, edata
+                )
+    pool.shutdown(wait=False)
+
     used_stations = set()
     nudging_dfs = {}
     accepted_loc = []
     for label_var in all_vars:
-        var = {"temperature": "temp", "salinity": "ec"}[
-            label_var
-        ]  # working variable for data
+        var = var_codes[label_var]  # working variable for data
         logger.info(f"Working on variable: {label_var},{var}")
         vals = []
         accepted = {}
@@ -170,11 +207,7 @@ def hotstart_nudge_data(sdate, ndays, dest, repo = "screened"):
             fndx = ndx + "@upper" if ndx in add_upper else ndx
 
             try:
-                subloc = "upper" if ndx in add_upper else None
-                logger.info(f"Reading {var} data for {ndx} with subloc={subloc}")
-                ts = read_ts_repo(
-                    ndx, var, subloc=subloc, repo=repo
-                )
+                ts = reads[(ndx, var)].result()
                 ts = ts.loc[sdata:edata]
                 ts = ts.interpolate(limit=4)
                 if ts.shape[1] > 1:
@@ -281,12 +314,19 @@ def hotstart_nudge_data(sdate, ndays, dest, repo = "screened"):
     help="repo of observed time series. \
                         Default is screened",
 )
+@click.option(
+    "--nworkers",
+    type=int,
+    default=8,
+    help="maximum number of station reads in flight at once. \
+                        Default is 8",
+)
 @click.option("--logdir", type=click.Path(path_type=pathlib.Path), default="logs")
 @click.option("--debug", is_flag=True)
 @click.option("--quiet", is_flag=True)
 @click.help_option("-h", "--help")
 def hotstart_nudge_data_cli(
-    start_date, nudge_len, dest_dir, repo, logdir, debug, quiet
+    start_date, nudge_len, dest_dir, repo, nworkers, logdir, debug, quiet
 ):
     """
     Command-line interface for the hotstart_nudge_data function.
@@ -309,7 +349,7 @@ def hotstart_nudge_data_cli(
     except ValueError:
         raise ValueError("Invalid date format. Use YYYY-MM-DD.")
 
-    hotstart_nudge_data(sdate, nudge_len, dest_dir, repo)
+    hotstart_nudge_data(sdate, nudge_len, dest_dir, repo, nworkers=nworkers)
 
 
 if __name__ == "__main__":
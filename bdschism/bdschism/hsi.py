@@ -0,0 +1,818 @@
+# -*- coding: utf-8 -*-
+"""
+Habitat suitability index (HSI) from SCHISM outputs, one day at a time.
+
+This computes the outputs of ``scripts/suxarray_dep_scripts/calculate_hsi.py``
+without suxarray. For each day the depth-averaged salinity and horizontal
+velocity at every node are reduced to the fraction of the day with salinity
+under 6 psu and the daily maximum velocity magnitude, and both are averaged
+to elements. Days are the one-day bins of calculate_hsi.py, which start at
+the first output time (``resample(time="1D", origin="start")``) and are
+labeled 30 minutes before their start. The combined index is
+
+    hsi = (1 - 0.6 p) (0.67 f + 0.33 v) SI_temperature
+
+with the daily fraction ``f`` and maximum velocity ``v`` as they are. The
+suitability indices SI_salinity and SI_hvel of the piecewise linear curves
+are written too. SI_temperature counts the temperature quantiles of the
+coarse grid under 24 degC and ``p`` is the interpolated probability of
+turbidity under 12 NTU; the quantile files start on 2017-07-01 unless
+``quantile_start`` is given. HSI weighted areas are summed over subregions.
+
+``formula="hsi2"`` combines the suitability indices instead, as
+calculate_hsi2.py does, ``(1 - 0.6 p) (0.67 SI_salinity + 0.33 SI_hvel)
+SI_temperature``, and its quantile files start on July 1 of the model year. The node to element averaging still
+follows calculate_hsi.py: daily statistics at the nodes, then averaged.
+
+Every output stack must hold exactly one of these days. Each stack is
+streamed in blocks of time steps and nodes through depth averaging,
+velocity magnitude and the daily reductions, so memory is bounded by one day
+of element values per worker. The result of each day is checkpointed in its
+own file, and a rerun after a crash only processes the days without a
+checkpoint. The NetCDF outputs of the whole period are assembled from the
+checkpoints one day at a time.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import numpy as np
+import pandas as pd
+from netCDF4 import Dataset
+
+from bdschism.depth_average import _available_stacks, _node_block, depth_average
+from bdschism.grid_mapping import grid_mapping
+from bdschism.lsz_zone_ts import load_lsz_mesh
+from bdschism.ts_cache import TimeSeriesCache
+from bdschism.zone_utils import face_aver
+
+logger = logging.getLogger(__name__)
+
+FACE_DIM = "nMesh2_face"
+SALT_THRESHOLD = 6.0
+TEMPERATURE_THRESHOLD = 24.0
+TURBIDITY_THRESHOLD = 12.0
+
+# Piecewise linear SI curves: slope and intercept on each bin
+HVEL_BINS = np.array([0.5, 0.71, 0.82, 0.89, 1.02, 1.1])
+HVEL_COEFS = np.array(
+    [
+        [0.0, 1.0],
+        [-0.4655, 1.233],
+        [-1.8608, 2.228],
+        [-3.0193, 3.179],
+        [-1.5059, 1.836],
+        [-2.4432, 2.792],
+        [-0.0859, 0.194],
+    ]
+)
+SALT_BINS = np.array([0.195, 0.448, 0.723, 0.802, 0.839, 0.949])
+SALT_COEFS = np.array(
+    [
+        [0.1537, 0.069],
+        [0.7937, -0.055],
+        [0.7273, -0.025],
+        [2.5386, -1.334],
+        [5.3637, -3.600],
+        [0.8902, 0.155],
+        [0.0, 1.0],
+    ]
+)
+QUANTILE_SI = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+
+FORMULAS = ("hsi", "hsi2")
+# First day of the quantile files in calculate_hsi.py
+QUANTILE_START = "2017-07-01"
+# calculate_hsi.py labels each day 30 minutes before the start of its bin
+LABEL_SHIFT = pd.Timedelta(30, "min")
+
+_OUTPUTS = {
+    "si_hvel": (
+        "si_hvel.nc",
+        "SI_hvel",
+        "Suitability Index based on depth-averaged horizontal velocity magnitude",
+    ),
+    "si_salinity": (
+        "si_salinity.nc",
+        "SI_salinity",
+        "Suitability Index based on depth-averaged salinity",
+    ),
+    "hsi": ("hsi.nc", "hsi", "Habitat Suitability Index"),
+}
+
+
+def piecewise_si(values, bins, coefs):
+    """Evaluate a piecewise linear suitability curve, clipped to [0, 1].
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Values of the habitat variable.
+    bins : numpy.ndarray
+        Increasing bin edges, as for :func:`numpy.digitize`.
+    coefs : numpy.ndarray
+        Slope and intercept of the curve in each of the ``len(bins) + 1``
+        bins, shape ``(len(bins) + 1, 2)``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Suitability index, NaN where ``values`` is NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    idx = np.digitize(values, bins)
+    si = coefs[idx, 0] * values + coefs[idx, 1]
+    return np.clip(si, 0.0, 1.0)
+
+
+def turbidity_cutoff_probability(turb, levels):
+    """Probability of turbidity under 12 NTU from turbidity quantiles.
+
+    Parameters
+    ----------
+    turb : numpy.ndarray
+        Turbidity (NTU) of the four quantiles, quantiles on the last axis in
+        increasing order.
+    levels : numpy.ndarray
+        Number of quantiles above 12 NTU.
+
+    Returns
+    -------
+    numpy.ndarray
+        Probability in [0, 1], 0 where every quantile exceeds 12 NTU.
+    """
+    t = TURBIDITY_THRESHOLD
+    v = [turb[..., i] for i in range(turb.shape[-1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        choices = [
+            (t - v[0]) / (v[1] - v[0]) * 0.20 + 0.05,
+            (t - v[1]) / (v[2] - v[1]) * 0.25 + 0.25,
+            (t - v[2]) / (v[3] - v[2]) * 0.25 + 0.5,
+            # The last quantile extrapolates from the previous pair
+            (t - v[3]) / (v[3] - v[2]) * 0.25 + 0.75,
+        ]
+    result = np.select(
+        [levels == i for i in range(len(choices))], choices, default=0.0
+    )
+    return np.clip(result, 0.0, 1.0)
+
+
+def read_quantile_files(files):
+    """Read daily quantile CSV files of a coarse grid, in the given order.
+
+    Parameters
+    ----------
+    files : list of str
+        One file per quantile, with one row per day and one column per
+        coarse node.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shape ``(nquantile, nday, nnode)``.
+    """
+    # np.loadtxt is much faster than pandas on files with thousands of columns
+    return np.stack([np.loadtxt(f, delimiter=",", ndmin=2) for f in files])
+
+
+def read_quantiles(pattern):
+    """Read daily quantile CSV files of a coarse grid.
+
+    Parameters
+    ----------
+    pattern : str
+        Glob pattern of the files, one per quantile, named with the quantile
+        number (e.g. ``temperature_25.csv``), with one row per day and one
+        column per coarse node.
+
+    Returns
+    -------
+    quantiles : list of int
+        Quantile numbers in increasing order.
+    values : numpy.ndarray
+        Shape ``(nquantile, nday, nnode)``.
+    files : list of str
+        The files, in quantile order.
+    """
+    found = []
+    for fname in glob.glob(str(pattern)):
+        m = re.search(r"\d+", os.path.basename(fname))
+        if m:
+            found.append((int(m.group(0)), fname))
+    if not found:
+        raise ValueError(f"No quantile files match {pattern}")
+    found.sort()
+    files = [f for _, f in found]
+    return [q for q, _ in found], read_quantile_files(files), files
+
+
+def stack_day_stats(output_dir, stack, chunk_steps=8, chunk_nodes=None):
+    """Salinity and velocity statistics of one stack at the nodes.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory with out2d_N.nc, zCoordinates_N.nc,
+        salinity_N.nc, horizontalVelX_N.nc and horizontalVelY_N.nc.
+    stack : int
+        Output stack number, normally one day.
+    chunk_steps : int, optional
+        Number of time steps read at once.
+    chunk_nodes : int, optional
+        Number of nodes read at once. Defaults to as many as fit in about
+        64 MB per variable.
+
+    Returns
+    -------
+    frac_fresh : numpy.ndarray
+        Fraction of the time steps with depth-averaged salinity under 6 psu.
+    hvel_max : numpy.ndarray
+        Maximum magnitude of the depth-averaged velocity, NaN where it is
+        never defined.
+    times : numpy.ndarray
+        Output times of the stack in seconds after the model start.
+    """
+
+    def fname(prefix):
+        return os.path.join(output_dir, f"{prefix}_{stack}.nc")
+
+    names = ("salinity", "horizontalVelX", "horizontalVelY", "zCoordinates")
+    sources = [Dataset(fname(name), "r") for name in names]
+    try:
+        with Dataset(fname("out2d"), "r") as out2d:
+            bottom_all = (
+                np.asarray(out2d.variables["bottom_index_node"][:], dtype=np.int64) - 1
+            )
+        salt_var, u_var, v_var, z_var = (
+            src.variables[name] for src, name in zip(sources, names)
+        )
+        times = np.asarray(sources[0].variables["time"][:], dtype=float)
+        nstep, nnode = len(times), len(bottom_all)
+        chunk_nodes = _node_block(chunk_nodes, chunk_steps, salt_var.shape[-1], nnode)
+
+        def read(var, t0, t1, n0, n1):
+            return np.ma.filled(var[t0:t1, n0:n1, :].astype(float), np.nan)
+
+        fresh = np.zeros(nnode, dtype=np.int64)
+        hvel_max = np.full(nnode, np.nan)
+        for t0 in range(0, nstep, chunk_steps):
+            t1 = min(t0 + chunk_steps, nstep)
+            for n0 in range(0, nnode, chunk_nodes):
+                n1 = min(n0 + chunk_nodes, nnode)
+                bottom = bottom_all[n0:n1]
+                z = read(z_var, t0, t1, n0, n1)
+                salt = depth_average(read(salt_var, t0, t1, n0, n1), z, bottom)
+                fresh[n0:n1] += (salt < SALT_THRESHOLD).sum(axis=0)
+                mag = np.hypot(
+                    depth_average(read(u_var, t0, t1, n0, n1), z, bottom),
+                    depth_average(read(v_var, t0, t1, n0, n1), z, bottom),
+                )
+                hvel_max[n0:n1] = np.fmax(hvel_max[n0:n1], np.fmax.reduce(mag, axis=0))
+    finally:
+        for src in sources:
+            src.close()
+    return fresh / nstep, hvel_max, times
+
+
+def day_hsi(frac_fresh, hvel_max, temperature, turbidity, mesh, formula="hsi"):
+    """Suitability indices, HSI and HSI areas of one day.
+
+    Parameters
+    ----------
+    frac_fresh, hvel_max : numpy.ndarray
+        Node values from :func:`stack_day_stats`.
+    temperature, turbidity : numpy.ndarray
+        Temperature (degC) and turbidity (NTU) quantiles of the day at the
+        nodes, shape ``(nquantile, nnode)``.
+    mesh : dict
+        Mesh from :func:`bdschism.lsz_zone_ts.load_lsz_mesh`.
+    formula : {"hsi", "hsi2"}, optional
+        Combine the daily fraction and velocity as they are, as
+        calculate_hsi.py does, or their suitability indices, as
+        calculate_hsi2.py does.
+
+    Returns
+    -------
+    dict
+        ``si_hvel``, ``si_salinity`` and ``hsi`` at the elements and
+        ``hsi_area``, the HSI weighted area (m2) of each subregion.
+    """
+    ele_table = mesh["ele_table"]
+    node_num = mesh["node_num"]
+    face_num = len(ele_table)
+
+    def at_face(values):
+        return face_aver(values, node_num, face_num, ele_table)
+
+    if formula not in FORMULAS:
+        raise ValueError(f"Unknown formula {formula}, use one of {FORMULAS}")
+    frac_face = at_face(frac_fresh)
+    hvel_face = at_face(hvel_max)
+    si_salinity = piecewise_si(frac_face, SALT_BINS, SALT_COEFS)
+    si_hvel = piecewise_si(hvel_face, HVEL_BINS, HVEL_COEFS)
+
+    temp_face = np.stack([at_face(q) for q in temperature])
+    si_temperature = QUANTILE_SI[(temp_face < TEMPERATURE_THRESHOLD).sum(axis=0)]
+    turb_face = np.stack([at_face(q) for q in turbidity], axis=-1)
+    levels = (turb_face > TURBIDITY_THRESHOLD).sum(axis=-1)
+    prob = turbidity_cutoff_probability(turb_face, levels)
+
+    if formula == "hsi2":
+        habitat = 0.67 * si_salinity + 0.33 * si_hvel
+    else:
+        habitat = 0.67 * frac_face + 0.33 * hvel_face
+    hsi = (1.0 - 0.6 * prob) * habitat * si_temperature
+    weighted = mesh["ele_area"] * hsi
+    ptr = mesh["zone_ptr"]
+    hsi_area = np.array(
+        [
+            weighted[mesh["zone_ele"][ptr[i] : ptr[i + 1]]].sum()
+            for i in range(len(mesh["zones"]))
+        ]
+    )
+    return {
+        "si_hvel": si_hvel,
+        "si_salinity": si_salinity,
+        "hsi": hsi,
+        "hsi_area": hsi_area,
+    }
+
+
+def _stack_times(output_dir, stack):
+    with Dataset(os.path.join(output_dir, f"out2d_{stack}.nc"), "r") as ds:
+        return np.asarray(ds.variables["time"][:], dtype=float)
+
+
+def stack_days(output_dir, stacks, start):
+    """Label the day of each stack the way calculate_hsi.py bins days.
+
+    Days are one-day bins starting at the first output of the first stack,
+    labeled 30 minutes before their start.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory.
+    stacks : list of int
+        Stacks in increasing order.
+    start : pandas.Timestamp
+        Model start date.
+
+    Returns
+    -------
+    dict
+        Day label (pandas.Timestamp) of each stack.
+
+    Raises
+    ------
+    ValueError
+        If a stack has outputs in more than one bin or shares its bin with
+        another stack.
+    """
+    day = pd.Timedelta(1, "D")
+    origin = None
+    days = {}
+    owner = {}
+    for stack in stacks:
+        times = _stack_times(output_dir, stack)
+        if origin is None:
+            origin = times[0]
+        first, last = ((times[[0, -1]] - origin) // day.total_seconds()).astype(int)
+        if first != last:
+            raise ValueError(
+                f"Stack {stack} spans more than one day of the daily bins "
+                "starting at the first output; every stack must hold one day"
+            )
+        if first in owner:
+            raise ValueError(
+                f"Stacks {owner[first]} and {stack} fall in the same day; "
+                "every stack must hold one day"
+            )
+        owner[first] = stack
+        days[stack] = start + pd.Timedelta(seconds=origin) + first * day - LABEL_SHIFT
+    return days
+
+
+def _stack_fingerprint(output_dir, stack):
+    names = ("out2d", "zCoordinates", "salinity", "horizontalVelX", "horizontalVelY")
+    return [
+        TimeSeriesCache.fingerprint(os.path.join(output_dir, f"{name}_{stack}.nc"))
+        for name in names
+    ]
+
+
+def _checkpoint_path(checkpoint_dir, stack):
+    return os.path.join(checkpoint_dir, f"hsi_day_{stack}.npz")
+
+
+def _read_checkpoint(path, key):
+    """Arrays of a checkpoint written with ``key``, or None."""
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            if str(npz["key"]) != key:
+                return None
+            return {k: npz[k] for k in npz.files}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def _write_checkpoint(path, **arrays):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_STATE = None
+
+
+def _init_worker(state):
+    global _STATE
+    _STATE = state
+
+
+def _day_job(
+    output_dir,
+    stack,
+    temperature,
+    turbidity,
+    key,
+    checkpoint,
+    chunk_steps,
+    chunk_nodes,
+    formula,
+):
+    frac_fresh, hvel_max, _ = stack_day_stats(
+        output_dir, stack, chunk_steps=chunk_steps, chunk_nodes=chunk_nodes
+    )
+    mapping = _STATE["mapping"]
+    result = day_hsi(
+        frac_fresh,
+        hvel_max,
+        mapping.remap(temperature),
+        mapping.remap(turbidity),
+        _STATE["mesh"],
+        formula=formula,
+    )
+    _write_checkpoint(
+        checkpoint,
+        key=key,
+        si_hvel=result["si_hvel"].astype(np.float32),
+        si_salinity=result["si_salinity"].astype(np.float32),
+        hsi=result["hsi"].astype(np.float32),
+        hsi_area=result["hsi_area"],
+    )
+    return stack
+
+
+def _create_face_output(fname, varname, long_name, face_num, time_units):
+    nc = Dataset(fname, "w")
+    nc.createDimension("time", None)
+    nc.createDimension(FACE_DIM, face_num)
+    time = nc.createVariable("time", "f8", ("time",))
+    time.units = time_units
+    var = nc.createVariable(
+        varname,
+        "f4",
+        ("time", FACE_DIM),
+        zlib=True,
+        fill_value=np.float32(np.nan),
+        chunksizes=(1, face_num),
+    )
+    var.units = "dimensionless"
+    var.long_name = long_name
+    return nc
+
+
+def _write_outputs(out_dir, days, checkpoints, mesh, time_units, start):
+    """Assemble the NetCDF outputs from the day checkpoints."""
+    face_num = len(mesh["ele_table"])
+    regions = mesh["zones"]
+    ptr = mesh["zone_ptr"]
+    t = np.asarray((days - start) / pd.Timedelta(1, "D"), dtype=float)
+    files = {
+        k: _create_face_output(os.path.join(out_dir, fname), var, title, face_num, time_units)
+        for k, (fname, var, title) in _OUTPUTS.items()
+    }
+    area_path = os.path.join(out_dir, "hsi_area.nc")
+    area_nc = Dataset(area_path, "w")
+    try:
+        area_nc.createDimension("region", len(regions))
+        area_nc.createDimension("time", len(days))
+        rvar = area_nc.createVariable("region", str, ("region",))
+        for i, region in enumerate(regions):
+            rvar[i] = region
+        tvar = area_nc.createVariable("time", "f8", ("time",))
+        tvar.units = time_units
+        tvar[:] = t
+        area = area_nc.createVariable("hsi_area", "f8", ("region", "time"))
+        area.units = "m2"
+        area.long_name = "HSI area for each region"
+        subarea = area_nc.createVariable("subarea", "f8", ("region",))
+        subarea.units = "m2"
+        subarea[:] = [
+            mesh["ele_area"][mesh["zone_ele"][ptr[i] : ptr[i + 1]]].sum()
+            for i in range(len(regions))
+        ]
+        for i, path in enumerate(checkpoints):
+            with np.load(path, allow_pickle=False) as npz:
+                for k, nc in files.items():
+                    nc.variables["time"][i] = t[i]
+                    nc.variables[_OUTPUTS[k][1]][i, :] = npz[k]
+                area[:, i] = npz["hsi_area"]
+    finally:
+        area_nc.close()
+        for nc in files.values():
+            nc.close()
+    return [os.path.join(out_dir, v[0]) for v in _OUTPUTS.values()] + [area_path]
+
+
+def hsi_stacks(
+    output_dir,
+    start,
+    temperature_csv,
+    turbidity_csv,
+    coarse_grid,
+    subregion_file,
+    regions=None,
+    first_stack=None,
+    last_stack=None,
+    quantile_start=None,
+    out_dir=".",
+    checkpoint_dir=None,
+    nproc=None,
+    chunk_steps=8,
+    chunk_nodes=None,
+    formula="hsi",
+):
+    """Compute daily HSI for a range of output stacks, resuming from checkpoints.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory with daily stacks of out2d_N.nc,
+        zCoordinates_N.nc, salinity_N.nc, horizontalVelX_N.nc and
+        horizontalVelY_N.nc.
+    start : str or datetime-like
+        Model start date. Each stack must hold one day of the bins of
+        :func:`stack_days`.
+    temperature_csv, turbidity_csv : str
+        Glob patterns of the temperature and log turbidity quantile files on
+        the coarse grid, see :func:`read_quantiles`.
+    coarse_grid : str
+        Grid of the quantile files.
+    subregion_file : str
+        NetCDF file of element flags per subregion for the HSI areas.
+    regions : list of str, optional
+        Subregions to report. Defaults to all in ``subregion_file``.
+    first_stack, last_stack : int, optional
+        Inclusive stack range. Defaults to all salinity stacks found.
+    quantile_start : str or datetime-like, optional
+        Day of the first row of the quantile files. Defaults to 2017-07-01,
+        or to July 1 of the year of the first day with ``formula="hsi2"``.
+        Days without a quantile row of the same label are skipped.
+    out_dir : str, optional
+        Directory of the NetCDF outputs.
+    checkpoint_dir : str, optional
+        Directory of the day checkpoints. Defaults to ``hsi_checkpoints`` in
+        ``out_dir``.
+    nproc : int, optional
+        Number of worker processes, each holding one day. Defaults to the
+        number of CPUs.
+    chunk_steps : int, optional
+        Number of time steps read at once.
+    chunk_nodes : int, optional
+        Number of nodes read at once. Defaults to as many as fit in about
+        64 MB per variable.
+    formula : {"hsi", "hsi2"}, optional
+        HSI of calculate_hsi.py or of calculate_hsi2.py, see the module
+        description.
+
+    Returns
+    -------
+    list of str
+        The written si_hvel.nc, si_salinity.nc, hsi.nc and hsi_area.nc.
+    """
+    if formula not in FORMULAS:
+        raise ValueError(f"Unknown formula {formula}, use one of {FORMULAS}")
+    start = pd.Timestamp(start)
+    stacks = _available_stacks(output_dir, "salinity")
+    if first_stack is not None:
+        stacks = [s for s in stacks if s >= first_stack]
+    if last_stack is not None:
+        stacks = [s for s in stacks if s <= last_stack]
+    if not stacks:
+        raise ValueError(f"No salinity_*.nc stacks in range found in {output_dir}")
+
+    days = stack_days(output_dir, stacks, start)
+    if quantile_start is None:
+        if formula == "hsi2":
+            quantile_start = pd.Timestamp(min(days.values()).year, 7, 1)
+        else:
+            quantile_start = QUANTILE_START
+    quantile_start = pd.Timestamp(quantile_start)
+
+    _, temperature, temp_files = read_quantiles(temperature_csv)
+    _, ln_turbidity, turb_files = read_quantiles(turbidity_csv)
+    nrow = min(temperature.shape[1], ln_turbidity.shape[1])
+    # As the time alignment of calculate_hsi.py, a day needs a quantile row
+    # with exactly its label
+    offsets = {s: (days[s] - quantile_start) / pd.Timedelta(1, "D") for s in stacks}
+    rows = {s: int(offsets[s]) for s in stacks}
+    skipped = [
+        s for s in stacks if offsets[s] != rows[s] or not 0 <= rows[s] < nrow
+    ]
+    if skipped:
+        logger.warning(f"No quantile data for the days of stacks {skipped}, skipping")
+    stacks = [s for s in stacks if s not in skipped]
+    if not stacks:
+        raise ValueError("No stack falls within the quantile record")
+
+    os.makedirs(out_dir, exist_ok=True)
+    if checkpoint_dir is None:
+        checkpoint_dir = os.path.join(out_dir, "hsi_checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    config = [
+        [TimeSeriesCache.fingerprint(f) for f in temp_files + turb_files],
+        TimeSeriesCache.fingerprint(coarse_grid),
+        TimeSeriesCache.fingerprint(subregion_file),
+        regions,
+        str(quantile_start),
+        formula,
+    ]
+    keys = {}
+    for stack in stacks:
+        payload = json.dumps(
+            config + [str(days[stack]), _stack_fingerprint(output_dir, stack)]
+        )
+        keys[stack] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    checkpoints = {s: _checkpoint_path(checkpoint_dir, s) for s in stacks}
+    todo = [s for s in stacks if _read_checkpoint(checkpoints[s], keys[s]) is None]
+    if len(todo) < len(stacks):
+        logger.info(f"Resuming: {len(stacks) - len(todo)} of {len(stacks)} days done")
+
+    mesh = load_lsz_mesh(output_dir, subregion_file, zones=regions, stack=stacks[0])
+    if todo:
+        mapping = grid_mapping(
+            coarse_grid, os.path.join(output_dir, f"out2d_{stacks[0]}.nc"), method="idw"
+        )
+        # Workers hold only the mesh and the mapping; each job carries the
+        # coarse quantiles of its own day
+        state = {"mesh": mesh, "mapping": mapping}
+        if nproc is None:
+            nproc = os.cpu_count() or 1
+        nproc = max(1, min(nproc, len(todo)))
+
+        def args(s):
+            return (
+                output_dir,
+                s,
+                temperature[:, rows[s], :],
+                np.exp(ln_turbidity[:, rows[s], :]),
+                keys[s],
+                checkpoints[s],
+                chunk_steps,
+                chunk_nodes,
+                formula,
+            )
+
+        if nproc == 1:
+            _init_worker(state)
+            for stack in todo:
+                _day_job(*args(stack))
+                logger.info(f"Done with stack {stack} ({days[stack].date()})")
+        else:
+            with ProcessPoolExecutor(
+                max_workers=nproc, initializer=_init_worker, initargs=(state,)
+            ) as pool:
+                futures = [pool.submit(_day_job, *args(s)) for s in todo]
+                for fut in as_completed(futures):
+                    stack = fut.result()
+                    logger.info(f"Done with stack {stack} ({days[stack].date()})")
+
+    order = sorted(stacks, key=lambda s: days[s])
+    return _write_outputs(
+        out_dir,
+        pd.DatetimeIndex([days[s] for s in order]),
+        [checkpoints[s] for s in order],
+        mesh,
+        f"days since {start:%Y-%m-%d %H:%M:%S}",
+        start,
+    )
+
+
+@click.command()
+@click.option(
+    "--output-dir",
+    default="outputs",
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="SCHISM outputs directory.",
+)
+@click.option(
+    "--input-dir",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory with bay_delta_coarse_v4.gr3, temperature_*.csv, "
+    "ln_turbidity_*.csv, subregion_hsi.nc and region_pointsUTM.csv.",
+)
+@click.option("--start", required=True, help="Model start date, e.g. 2021-04-20.")
+@click.option("--first-stack", type=int, default=None, help="First stack (inclusive).")
+@click.option("--last-stack", type=int, default=None, help="Last stack (inclusive).")
+@click.option(
+    "--quantile-start",
+    default=None,
+    help="Date of the first row of the quantile files. Default: 2017-07-01, "
+    "or July 1 of the model year with --formula hsi2.",
+)
+@click.option(
+    "--formula",
+    type=click.Choice(FORMULAS),
+    default="hsi",
+    show_default=True,
+    help="HSI of calculate_hsi.py (raw daily fraction and velocity) or "
+    "calculate_hsi2.py (suitability indices).",
+)
+@click.option(
+    "--out-dir", default=".", show_default=True, help="Directory of the NetCDF outputs."
+)
+@click.option(
+    "--checkpoint-dir",
+    default=None,
+    help="Directory of day checkpoints. Default: hsi_checkpoints in --out-dir.",
+)
+@click.option("-n", "--nproc", type=int, default=None, help="Number of worker processes.")
+@click.option(
+    "--chunk-steps",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Time steps read at once per worker.",
+)
+@click.option(
+    "--chunk-nodes",
+    type=int,
+    default=None,
+    help="Nodes read at once. Default: about 64 MB per variable.",
+)
+@click.help_option("-h", "--help")
+def hsi_cli(
+    output_dir,
+    input_dir,
+    start,
+    first_stack,
+    last_stack,
+    quantile_start,
+    formula,
+    out_dir,
+    checkpoint_dir,
+    nproc,
+    chunk_steps,
+    chunk_nodes,
+):
+    """Daily habitat suitability index and HSI areas from SCHISM outputs."""
+    regions = None
+    region_points = os.path.join(input_dir, "region_pointsUTM.csv")
+    if os.path.exists(region_points):
+        regions = list(pd.read_csv(region_points, header=0)["SUBREGION"].unique())
+    hsi_stacks(
+        output_dir,
+        start,
+        os.path.join(input_dir, "temperature_*.csv"),
+        os.path.join(input_dir, "ln_turbidity_*.csv"),
+        os.path.join(input_dir, "bay_delta_coarse_v4.gr3"),
+        os.path.join(input_dir, "subregion_hsi.nc"),
+        regions=regions,
+        first_stack=first_stack,
+        last_stack=last_stack,
+        quantile_start=quantile_start,
+        out_dir=out_dir,
+        checkpoint_dir=checkpoint_dir,
+        nproc=nproc,
+        chunk_steps=chunk_steps,
+        chunk_nodes=chunk_nodes,
+        formula=formula,
+    )
+
+
+if __name__ == "__main__":
+    hsi_cli()
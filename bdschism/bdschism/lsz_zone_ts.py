@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+Low salinity zone (LSZ) area time series by subregion.
+
+For every output stack (normally one day) the depth-averaged salinity at
+each node is averaged over the stack, nodes or elements that were dry at any
+time are excluded, and the node values are averaged to elements. Elements
+below ``salt_low`` (6 psu by default) form the LSZ, and elements between
+``salt_low`` and ``salt_high`` (7 psu) the extended LSZ. Their areas are
+summed for each subregion flagged in a subregion file (see
+``scripts/gen_zone_flags.py``) and for the whole mesh.
+
+This is the engine behind ``scripts/gen_lsz_zone_ts.py``. Element areas
+and subregion membership are computed once and cached next to the outputs,
+each stack is streamed in chunks of time steps and reduced with vectorized
+sums, and stacks are processed concurrently.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import numpy as np
+import pandas as pd
+from netCDF4 import Dataset
+
+from bdschism.depth_average import depth_average
+from bdschism.grid_mapping import grid_key
+from bdschism.ts_cache import TimeSeriesCache
+from bdschism.zone_utils import element_areas, face_aver
+
+logger = logging.getLogger(__name__)
+
+SQUARE_METER_TO_ACRE = 0.000247105
+BIG_SALT = 9999.0
+
+
+def load_lsz_mesh(output_dir, subregion_file, zones=None, cache=True, stack=1):
+    """Element table, element areas and subregion membership for LSZ sums.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory containing ``out2d_<stack>.nc``.
+    subregion_file : str
+        NetCDF file with one 0/1 flag variable per subregion over elements.
+    zones : list of str, optional
+        Subregions to use. Defaults to every element-sized variable in
+        ``subregion_file``.
+    cache : bool, optional
+        Reuse/write ``lsz_mesh_<hash>.npz`` in ``output_dir``. The hash covers
+        the subregion file identity, the zones and the node coordinates and
+        element table of the mesh.
+    stack : int, optional
+        Output stack whose ``out2d`` file holds the mesh, normally the first
+        stack processed.
+
+    Returns
+    -------
+    dict
+        ``ele_table`` (one-based, -1 for the unused node of triangles),
+        ``ele_area``, ``node_num``, ``zones`` and ``zone_ptr``/``zone_ele``,
+        the member elements of each zone in CSR form.
+    """
+    out2d = os.path.join(output_dir, f"out2d_{stack}.nc")
+    with Dataset(out2d, "r") as ds:
+        face_num = ds.dimensions["nSCHISM_hgrid_face"].size
+        node_num = ds.dimensions["nSCHISM_hgrid_node"].size
+        ele_table = np.ma.filled(ds.variables["SCHISM_hgrid_face_nodes"][:], -1)
+        node_x = np.ma.filled(ds.variables["SCHISM_hgrid_node_x"][:], np.nan)
+        node_y = np.ma.filled(ds.variables["SCHISM_hgrid_node_y"][:], np.nan)
+    ele_table = np.asarray(ele_table, dtype=np.int64)
+
+    cache_path = None
+    if cache:
+        key = json.dumps(
+            [
+                TimeSeriesCache.fingerprint(subregion_file),
+                zones,
+                grid_key(node_x, node_y, ele_table),
+            ]
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(output_dir, f"lsz_mesh_{digest}.npz")
+        if os.path.exists(cache_path):
+            with np.load(cache_path, allow_pickle=False) as npz:
+                logger.info(f"Using cached mesh zones {cache_path}")
+                mesh = {k: npz[k] for k in npz.files}
+            mesh["zones"] = [str(z) for z in mesh["zones"]]
+            mesh["node_num"] = int(mesh["node_num"])
+            return mesh
+    ele_area = element_areas(ele_table, node_x, node_y)
+
+    members = []
+    with Dataset(subregion_file, "r") as ds:
+        if zones is None:
+            zones = [
+                name
+                for name, var in ds.variables.items()
+                if var.ndim == 1 and var.shape[0] == face_num
+            ]
+        for zone in zones:
+            if zone not in ds.variables:
+                raise ValueError(f"Subregion {zone} not found in {subregion_file}")
+            val = np.ma.filled(ds.variables[zone][:], 0)
+            if val.shape[0] != face_num:
+                raise ValueError(
+                    f"Subregion {zone} has {val.shape[0]} elements, mesh has {face_num}"
+                )
+            members.append(np.flatnonzero(val))
+    zone_ptr = np.zeros(len(members) + 1, dtype=np.int64)
+    np.cumsum([len(m) for m in members], out=zone_ptr[1:])
+    zone_ele = np.concatenate(members) if members else np.zeros(0, dtype=np.int64)
+
+    mesh = {
+        "ele_table": ele_table,
+        "ele_area": ele_area,
+        "node_num": node_num,
+        "zones": list(zones),
+        "zone_ptr": zone_ptr,
+        "zone_ele": zone_ele,
+    }
+    if cache_path is not None:
+        np.savez(cache_path, **{k: np.asarray(v) for k, v in mesh.items()})
+    return mesh
+
+
+def stack_face_salinity(output_dir, stack, ele_table, node_num, chunk_steps=8):
+    """Stack-averaged depth-averaged salinity on elements.
+
+    Nodes dry at any time step of the stack, and elements flagged dry at any
+    time step, are set to :data:`BIG_SALT` so they never count as LSZ.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory.
+    stack : int
+        Output stack number.
+    ele_table : numpy.ndarray
+        One-based element table with -1 for the unused node of triangles.
+    node_num : int
+        Number of nodes.
+    chunk_steps : int, optional
+        Number of time steps read at once.
+
+    Returns
+    -------
+    face_salt : numpy.ndarray
+        Element salinity.
+    time0 : float
+        First output time of the stack in seconds.
+    """
+    def fname(prefix):
+        return os.path.join(output_dir, f"{prefix}_{stack}.nc")
+
+    with Dataset(fname("out2d"), "r") as out2d, Dataset(
+        fname("salinity"), "r"
+    ) as salt_src, Dataset(fname("zCoordinates"), "r") as z_src:
+        bottom = np.asarray(out2d.variables["bottom_index_node"][:], dtype=np.int64) - 1
+        node_dry_var = out2d.variables["dryFlagNode"]
+        elem_dry_var = out2d.variables["dryFlagElement"]
+        salt_var = salt_src.variables["salinity"]
+        z_var = z_src.variables["zCoordinates"]
+        times = np.asarray(salt_src.variables["time"][:], dtype=float)
+        nstep = len(times)
+
+        node_any_dry = np.zeros(node_num, dtype=bool)
+        elem_any_dry = np.zeros(len(ele_table), dtype=bool)
+        total = np.zeros(node_num)
+        count = np.zeros(node_num, dtype=np.int64)
+        for t0 in range(0, nstep, chunk_steps):
+            t1 = min(t0 + chunk_steps, nstep)
+            node_dry = np.ma.filled(node_dry_var[t0:t1], 1) != 0
+            node_any_dry |= node_dry.any(axis=0)
+            elem_any_dry |= (np.ma.filled(elem_dry_var[t0:t1], 1) != 0).any(axis=0)
+            salt = np.ma.filled(salt_var[t0:t1].astype(float), np.nan)
+            z = np.ma.filled(z_var[t0:t1].astype(float), np.nan)
+            da = depth_average(salt, z, bottom)
+            ok = np.isfinite(da) & ~node_dry
+            total += np.where(ok, da, 0.0).sum(axis=0)
+            count += ok.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        node_salt = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+    node_salt[node_any_dry] = BIG_SALT
+    face_salt = face_aver(node_salt, node_num, len(ele_table), ele_table)
+    face_salt[elem_any_dry] = BIG_SALT
+    return face_salt, times[0]
+
+
+def lsz_areas(face_salt, mesh, salt_low=6.0, salt_high=7.0):
+    """LSZ areas in acres for each zone and for the whole mesh.
+
+    Returns a dict with ``<zone>(<low psu)`` and ``<zone>(<high psu)`` for
+    every zone, then ``total_lsz_area1`` and ``total_lsz_area2``.
+    """
+    area = mesh["ele_area"]
+    lsz1 = np.where(face_salt < salt_low, area, 0.0)
+    lsz2 = np.where((face_salt > salt_low) & (face_salt < salt_high), area, 0.0)
+    row = {}
+    ptr = mesh["zone_ptr"]
+    for i, zone in enumerate(mesh["zones"]):
+        ele = mesh["zone_ele"][ptr[i] : ptr[i + 1]]
+        a1 = lsz1[ele].sum()
+        a2 = lsz2[ele].sum()
+        row[f"{zone}(<{salt_low:g}psu)"] = a1 * SQUARE_METER_TO_ACRE
+        row[f"{zone}(<{salt_high:g}psu)"] = (a1 + a2) * SQUARE_METER_TO_ACRE
+    a1 = lsz1.sum()
+    a2 = lsz2.sum()
+    row["total_lsz_area1"] = a1 * SQUARE_METER_TO_ACRE
+    row["total_lsz_area2"] = (a1 + a2) * SQUARE_METER_TO_ACRE
+    return row
+
+
+_MESH = None
+
+
+def _init_worker(mesh):
+    global _MESH
+    _MESH = mesh
+
+
+def _stack_row(output_dir, stack, chunk_steps, salt_low, salt_high):
+    face_salt, time0 = stack_face_salinity(
+        output_dir, stack, _MESH["ele_table"], _MESH["node_num"], chunk_steps
+    )
+    return stack, time0, lsz_areas(face_salt, _MESH, salt_low, salt_high)
+
+
+def _available_stacks(output_dir):
+    pattern = re.compile(r"salinity_(\d+)\.nc$")
+    stacks = []
+    for fname in glob.glob(os.path.join(output_dir, "salinity_*.nc")):
+        m = pattern.search(os.path.basename(fname))
+        if m:
+            stacks.append(int(m.group(1)))
+    return sorted(stacks)
+
+
+def lsz_zone_ts(
+    output_dir,
+    subregion_file,
+    start,
+    first_stack=None,
+    last_stack=None,
+    zones=None,
+    salt_low=6.0,
+    salt_high=7.0,
+    nproc=None,
+    chunk_steps=8,
+    out_file=None,
+):
+    """Compute LSZ area per subregion for a range of output stacks.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory with out2d_N.nc, salinity_N.nc and
+        zCoordinates_N.nc.
+    subregion_file : str
+        NetCDF file of element flags per subregion.
+    start : str or datetime-like
+        Model start date, used to label each stack with its date.
+    first_stack, last_stack : int, optional
+        Inclusive stack range. Defaults to all salinity stacks found.
+    zones : list of str, optional
+        Subregions to report. Defaults to all in ``subregion_file``.
+    salt_low, salt_high : float, optional
+        Salinity thresholds (psu) of the LSZ and the extended LSZ.
+    nproc : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_steps : int, optional
+        Number of time steps each worker reads at once.
+    out_file : str, optional
+        CSV file to write.
+
+    Returns
+    -------
+    pandas.DataFrame
+        LSZ areas in acres indexed by the date of each stack.
+    """
+    start = pd.Timestamp(start)
+    stacks = _available_stacks(output_dir)
+    if first_stack is not None:
+        stacks = [s for s in stacks if s >= first_stack]
+    if last_stack is not None:
+        stacks = [s for s in stacks if s <= last_stack]
+    if not stacks:
+        raise ValueError(f"No salinity_*.nc stacks in range found in {output_dir}")
+
+    mesh = load_lsz_mesh(output_dir, subregion_file, zones=zones, stack=stacks[0])
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    nproc = max(1, min(nproc, len(stacks)))
+
+    rows = {}
+    if nproc == 1:
+        _init_worker(mesh)
+        for stack in stacks:
+            _, time0, row = _stack_row(output_dir, stack, chunk_steps, salt_low, salt_high)
+            rows[stack] = (time0, row)
+            logger.info(f"Done with stack {stack}")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=nproc, initializer=_init_worker, initargs=(mesh,)
+        ) as pool:
+            futures = [
+                pool.submit(_stack_row, output_dir, s, chunk_steps, salt_low, salt_high)
+                for s in stacks
+            ]
+            for fut in as_completed(futures):
+                stack, time0, row = fut.result()
+                rows[stack] = (time0, row)
+                logger.info(f"Done with stack {stack}")
+
+    index = pd.DatetimeIndex(
+        [(start + pd.Timedelta(seconds=rows[s][0])).floor("D") for s in stacks],
+        name="time",
+    )
+    df = pd.DataFrame([rows[s][1] for s in stacks], index=index)
+    if out_file is not None:
+        df.to_csv(out_file)
+    return df
+
+
+@click.command()
+@click.option(
+    "--output-dir",
+    default="outputs",
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="SCHISM outputs directory.",
+)
+@click.option(
+    "--subregion",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="NetCDF file with subregion element flags.",
+)
+@click.option("--start", required=True, help="Model start date, e.g. 2021-04-20.")
+@click.option("--first-stack", type=int, default=None, help="First stack (inclusive).")
+@click.option("--last-stack", type=int, default=None, help="Last stack (inclusive).")
+@click.option(
+    "--zone",
+    "zones",
+    multiple=True,
+    help="Subregion to report; repeat for several. Default: all in the file.",
+)
+@click.option("--salt-low", default=6.0, show_default=True, help="LSZ upper salinity (psu).")
+@click.option(
+    "--salt-high", default=7.0, show_default=True, help="Extended LSZ upper salinity (psu)."
+)
+@click.option("-n", "--nproc", type=int, default=None, help="Number of worker processes.")
+@click.option(
+    "--chunk-steps",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Time steps read at once per worker.",
+)
+@click.option(
+    "-o", "--out", default="lsz_area.csv", show_default=True, help="Output CSV file."
+)
+@click.help_option("-h", "--help")
+def lsz_zone_ts_cli(
+    output_dir,
+    subregion,
+    start,
+    first_stack,
+    last_stack,
+    zones,
+    salt_low,
+    salt_high,
+    nproc,
+    chunk_steps,
+    out,
+):
+    """Daily low salinity zone area (acres) per subregion from SCHISM outputs."""
+    lsz_zone_ts(
+        output_dir,
+        subregion,
+        start,
+        first_stack=first_stack,
+        last_stack=last_stack,
+        zones=list(zones) or None,
+        salt_low=salt_low,
+        salt_high=salt_high,
+        nproc=nproc,
+        chunk_steps=chunk_steps,
+        out_file=out,
+    )
+
+
+if __name__ == "__main__":
+    lsz_zone_ts_cli()
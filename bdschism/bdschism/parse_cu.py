@@ -3,7 +3,8 @@
 from vtools.functions.unit_conversions import CFS2CMS, CMS2CFS
 from vtools.functions.interpolate import rhistinterp
 from vtools.data.vtime import days
-from schimpy.th_io import read_th, is_elapsed
+from schimpy.th_io import is_elapsed
+from bdschism.th_sidecar import read_th
 from schimpy.th_calcs import calc_net_source_sink
 from schimpy.yaml_util import yaml_from_file
 from bdschism.read_dss import read_dss
@@ -296,30 +297,19 @@ def calc_srcsnk_dsm2(
 
     dcd_dss_file = Path(dcd_dss_file)
 
-    df_div_dcd = read_dss(
+    # Read all three components in one pass over the file
+    df_dcd = read_dss(
         dcd_dss_file,
-        "///DIV-FLOW////",
-        start_date=start_date,
-        end_date=end_date,
-        dt=dt,
-        exclude_pathname=exclude_pathname,
-    )
-    df_seep_dcd = read_dss(
-        dcd_dss_file,
-        "///SEEP-FLOW////",
-        start_date=start_date,
-        end_date=end_date,
-        dt=dt,
-        exclude_pathname=exclude_pathname,
-    )
-    df_drain_dcd = read_dss(
-        dcd_dss_file,
-        "///DRAIN-FLOW////",
+        ["///DIV-FLOW////", "///SEEP-FLOW////", "///DRAIN-FLOW////"],
         start_date=start_date,
         end_date=end_date,
         dt=dt,
         exclude_pathname=exclude_pathname,
     )
+    c_part = df_dcd.columns.str.split("/").str[3]
+    df_div_dcd = df_dcd.loc[:, c_part == "DIV-FLOW"]
+    df_seep_dcd = df_dcd.loc[:, c_part == "SEEP-FLOW"]
+    df_drain_dcd = df_dcd.loc[:, c_part == "DRAIN-FLOW"]
 
     df_div_dcd = df_div_dcd.clip(lower=0.0)
     df_seep_dcd = df_seep_dcd.clip(lower=0.0)
@@ -20,7 +20,8 @@ from schimpy.th_calcs import (
     read_flux,
     struct_open_props,
 )
-from schimpy.th_io import read_th, is_elapsed
+from schimpy.th_io import is_elapsed
+from bdschism.th_sidecar import read_th
 import schimpy.param as parms
 from schimpy.schism_structure import SchismStructureIO as Struct
 from schimpy.prepare_schism import get_structures_from_yaml
@@ -35,6 +36,7 @@ import dms_datastore.download_noaa
 from dms_datastore.read_ts import read_noaa
 
 from bdschism.calc_ndoi import calc_indoi
+from bdschism.ts_cache import cached_call, repo_max_age
 
 bds_dir = os.path.abspath(
     os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")
@@ -179,7 +181,15 @@ def get_observed_data(
 
     print(f"\tGetting observed tidal data from NOAA...")
     if "tide" in boundary_list:
-        tide_df = get_observed_tide(period=period) * M2FT
+        tide_df = (
+            cached_call(
+                "get_observed_tide",
+                get_observed_tide,
+                period=dict(period),
+                max_age=repo_max_age(),
+            )
+            * M2FT
+        )
         tide_df.index = tide_df.index.to_period()
 
         obs_df["tide"] = rhistinterp(tide_df.mean(axis=1), out_freq, p=100)
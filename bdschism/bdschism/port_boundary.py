@@ -8,7 +8,7 @@ from vtools.functions.interpolate import rhistinterp
 from vtools.functions.filter import ts_gaussian_filter
 from vtools.data.vtime import minutes
 from schimpy.yaml_util import yaml_from_file, csv_from_file
-from schimpy.th_io import read_th
+from bdschism.th_sidecar import read_th
 from bdschism.parse_cu import orig_pert_to_schism_dcd_yaml
 from bdschism.plot_input_boundaries import (
     get_observed_data,
@@ -16,6 +16,8 @@ from bdschism.plot_input_boundaries import (
     plot_bds_boundaries,
 )
 from bdschism.read_dss import read_dss
+from bdschism.th_writer import write_th
+from bdschism.ts_cache import cached_call
 import matplotlib.pylab as plt
 import numpy as np
 import pandas as pd
@@ -35,7 +37,23 @@ def read_csv(file, var, name, dt, p=2.0, interp=True, freq="M"):
     """
     Reads in a csv file of monthly boundary conditions and interpolates
     Outputs an interpolated DataFrame of that variable
+
+    Results are cached on disk (see :mod:`bdschism.ts_cache`) until the file changes.
     """
+    return cached_call(
+        "port_boundary.read_csv",
+        _read_csv,
+        file,
+        var,
+        dt,
+        p=p,
+        interp=interp,
+        freq=freq,
+        sources=[file],
+    )
+
+
+def _read_csv(file, var, dt, p=2.0, interp=True, freq="M"):
     forecast_df = pd.read_csv(file, index_col=0, header=0, parse_dates=True)
     forecast_df.columns = forecast_df.columns.astype(str).str.strip()
     forecast_df.index = forecast_df.index.to_period(freq)
@@ -74,6 +92,23 @@ def clean_df(in_df):
     return out_df
 
 
+def _columns_by_b_part(pathnames, name):
+    """B parts of DSS pathnames, the column names used by derived formulas.
+
+    Raises a ValueError if two pathnames share a B part, since the formula
+    could not tell them apart.
+    """
+    b_parts = [pn.split("/")[2] for pn in pathnames]
+    duplicates = sorted({b for b in b_parts if b_parts.count(b) > 1})
+    if duplicates:
+        clashing = [pn for pn, b in zip(pathnames, b_parts) if b in duplicates]
+        raise ValueError(
+            f"DSS paths for {name} share the B part {', '.join(duplicates)}, "
+            f"which derived formulas use as column names: {clashing}"
+        )
+    return b_parts
+
+
 def set_gate_fraction(
     dts_in, op_var="height", ubound=10, lbound=0, increment="month_fraction"
 ):
@@ -443,15 +478,12 @@ def create_schism_bc(config_yaml, plot=False, kwargs=None):
                             f"Updating SCHISM {name} with derived timeseries\
                             expression: {formula}"
                         )
-                        dss = pd.DataFrame()
-
-                        for pn in vars_lst:
-                            b = pn.split("/")[2]
-                            dss[[b]] = read_dss(
-                                source_file,
-                                pathname=pn,
-                                p=p,
-                            )
+                        dss = read_dss(
+                            source_file,
+                            pathname=vars_lst,
+                            p=p,
+                        )
+                        dss.columns = _columns_by_b_part(dss.columns, name)
                         ## quick fix for to use last year pattern as formula
                         ## input
                         clip_1ybackward_start = start_date - pd.DateOffset(years=1)
@@ -564,7 +596,8 @@ def create_schism_bc(config_yaml, plot=False, kwargs=None):
             output_path = out_file
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             print(f"Writing {boundary_kind} boundary conditions to {output_path}")
-            dd.to_csv(
+            write_th(
+                dd,
                 output_path,
                 header=True,
                 date_format="%Y-%m-%dT%H:%M",
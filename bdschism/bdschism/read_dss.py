@@ -1,11 +1,15 @@
 from vtools.functions.interpolate import rhistinterp
 from vtools.data.vtime import days, minutes
 from pyhecdss import get_ts, DSSFile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import re
 import os
 
+from bdschism.ts_cache import cached_call
+
 
 dss_e2_freq = {"1HOUR": "h", "1DAY": "D", "1MON": "M", "15MIN": "15min"}
 
@@ -43,6 +47,7 @@ def read_dss(
     start_date=None,
     end_date=None,
     exclude_pathname=None,
+    nworkers=None,
 ):
     """
     Reads in a DSM2 dss file and interpolates
@@ -56,65 +61,144 @@ def read_dss(
         Pathname(s) within the DSS file to read.
         Needs to be in the format '/A_PART/B_PART/C_PART/D_PART/E_PART/F_PART/'
         (e.g. '//RSAN112/FLOW////')
+    nworkers: int, optional
+        Number of threads used to interpolate the series. Defaults to the
+        number of series, capped at the CPU count.
+
+    Notes
+    -----
+    All pathnames are read from the file in one pass and every matching record
+    is read only once, even if it matches several of the requested patterns.
+    Pass all paths needed from a file in a single call rather than calling
+    this once per path.
+
+    Results are stored in the on-disk time series cache
+    (:mod:`bdschism.ts_cache`) keyed on the file, its modification time and the
+    arguments, so repeated reads of an unchanged file skip DSS access and
+    interpolation.
     """
-    ts_out_list = []
-    col_names = []
+    if isinstance(pathname, str):
+        pathname = [pathname]
+    return cached_call(
+        "read_dss",
+        _read_dss,
+        filename,
+        pathname,
+        dt=dt,
+        p=p,
+        start_date=start_date,
+        end_date=end_date,
+        exclude_pathname=exclude_pathname,
+        nworkers=nworkers,
+        sources=[filename],
+        key_params=dict(
+            filename=str(filename),
+            pathname=list(pathname),
+            dt=dt,
+            p=p,
+            start_date=start_date,
+            end_date=end_date,
+            exclude_pathname=exclude_pathname,
+        ),
+    )
+
+
+def _interp_series(tt, path_e, dt, p):
+    """Convert one windowed DSS series to a regular series with rhistinterp."""
+    pidx = pd.period_range(tt.index[0], tt.index[-1], freq=dss_e2_freq[path_e])
+    ptt = pd.DataFrame(tt.values[:, 0], pidx)
+    if p > 0:
+        return rhistinterp(ptt, dt, p=p)
+    return rhistinterp(ptt, dt)
+
+
+def _assemble(columns, col_names):
+    """Align single-column frames into one preallocated 2-D DataFrame.
+
+    Equivalent to ``pd.concat(columns, axis=1)`` but fills one NumPy array, and
+    skips reindexing entirely when all series share the same index.
+    """
+    index = columns[0].index
+    for col in columns[1:]:
+        if not col.index.equals(index):
+            index = index.union(col.index)
+    values = np.full((len(index), len(columns)), np.nan)
+    for j, col in enumerate(columns):
+        if col.index.equals(index):
+            values[:, j] = col.values[:, 0]
+        else:
+            values[index.get_indexer(col.index), j] = col.values[:, 0]
+    return pd.DataFrame(values, index=index, columns=col_names)
+
+
+def _read_dss(
+    filename,
+    pathname,
+    dt=minutes(15),
+    p=2.0,
+    start_date=None,
+    end_date=None,
+    exclude_pathname=None,
+    nworkers=None,
+):
+    """Uncached implementation of :func:`read_dss`."""
     if isinstance(pathname, str):
         pathname = [pathname]
     for path in pathname:
         if len(path.split("/")[1:-1]) != 6:
             raise ValueError(f"Invalid DSS path: {path}, needs 6 parts (A-F)")
-    ts = get_ts(str(filename), *pathname)
     for path in pathname:
         print(f"\tReading path: {path}")
-        for i, tsi in enumerate(ts):
-            ts_path = tsi[0].columns.values[0]
-            if exclude_pathname is None or (
-                exclude_pathname is not None
-                and not check_exclude(ts_path, exclude_pathname)
-            ):
-                # if not an excluded path, then carry on
-                path_lst = (ts_path).split("/")
-                path_e = path_lst[5]
-                # Set default start_date and end_date to cover the full period of record if not specified
-                tt_full = tsi[0]
-                first_ts, last_ts = _get_first_last_timestamp(tt_full.index)
-                if start_date is None:
-                    start_date = first_ts
-                if end_date is None:
-                    end_date = last_ts
-                if first_ts > end_date or last_ts < start_date:
-                    raise ValueError(
-                        f"File: {filename} does not cover the dates requested. \n\tRequested dates are: {start_date} to {end_date}, \n\tand the file covers {first_ts} to {last_ts}"
-                    )
-                tt = tt_full[start_date:end_date]
-                pidx = pd.period_range(
-                    tt.index[0], tt.index[-1], freq=dss_e2_freq[path_e]
-                )
-                ptt = pd.DataFrame(tt.values[:, 0], pidx)
-
-                # Interpolate with rhistinterp
-                if p > 0:
-                    col_data = rhistinterp(ptt, dt, p=p)
-                elif p == 0:
-                    col_data = rhistinterp(ptt, dt)
-                else:
-                    col_data = tsi[0]
-                ts_out_list.append(col_data)
-                col_names.append(ts_path)
-
-    if ts_out_list:
-        ts_out = pd.concat(ts_out_list, axis=1)
-        ts_out.columns = col_names
-        ts_out = ts_out.copy()  # Defragment the DataFrame
-    else:
+
+    # Single pass over the records; wildcard patterns may match the same
+    # record more than once, so keep the first occurrence only.
+    col_names = []
+    jobs = []
+    for tsi in get_ts(str(filename), *pathname):
+        ts_path = tsi[0].columns.values[0]
+        if ts_path in col_names:
+            continue
+        if exclude_pathname is not None and check_exclude(ts_path, exclude_pathname):
+            continue
+        path_e = ts_path.split("/")[5]
+        # Set default start_date and end_date to cover the full period of record if not specified
+        tt_full = tsi[0]
+        first_ts, last_ts = _get_first_last_timestamp(tt_full.index)
+        if start_date is None:
+            start_date = first_ts
+        if end_date is None:
+            end_date = last_ts
+        if first_ts > end_date or last_ts < start_date:
+            raise ValueError(
+                f"File: {filename} does not cover the dates requested. \n\tRequested dates are: {start_date} to {end_date}, \n\tand the file covers {first_ts} to {last_ts}"
+            )
+        col_names.append(ts_path)
+        if p < 0:
+            jobs.append(tt_full)
+        else:
+            jobs.append((tt_full[start_date:end_date], path_e))
+
+    if not col_names:
         with DSSFile(filename) as dssh:
             dfcat = dssh.read_catalog()
         raise ValueError(
-            f"Warning: DSS data not found for {path}. Preview of available paths in {filename} are: {dfcat}"
+            f"Warning: DSS data not found for {pathname}. Preview of available paths in {filename} are: {dfcat}"
         )
 
-    return ts_out
+    if p < 0:
+        ts_out_list = jobs
+    else:
+        if nworkers is None:
+            nworkers = min(len(jobs), os.cpu_count() or 1)
+        if nworkers > 1:
+            with ThreadPoolExecutor(max_workers=nworkers) as pool:
+                ts_out_list = list(
+                    pool.map(lambda job: _interp_series(job[0], job[1], dt, p), jobs)
+                )
+        else:
+            ts_out_list = [_interp_series(tt, path_e, dt, p) for tt, path_e in jobs]
+
+    return _assemble(ts_out_list, col_names)
 
 
 def _get_first_last_timestamp(idx):
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Fast readers for the text output of the SCHISM extraction utilities.
+
+``read_output10_xyt`` writes one row per extracted point (cast number,
+value, z, an unused column and elapsed time in days), with ``&`` lines
+between casts and ``****`` in place of values that overflow the Fortran
+format. ``read_output*_xyz`` writes one row per time (elapsed days followed
+by one column per build point). Both are written to ``fort.18``.
+
+The readers here tokenize the whole file in a single pass and convert the
+tokens to floats in NumPy rather than splitting and converting line by
+line in Python.
+"""
+
+import re
+
+import numpy as np
+
+XYT_DTYPE = np.dtype(
+    [
+        ("cast", "i8"),
+        ("value", "f8"),
+        ("z", "f8"),
+        ("aux", "f8"),
+        ("time", "f8"),
+    ]
+)
+
+
+def _read_lines(path):
+    with open(path, "rb") as f:
+        return f.read().splitlines()
+
+
+def read_xyt(path):
+    """Read a ``read_output10_xyt`` fort.18 file.
+
+    Separator lines (``&``), blank lines and rows with an overflowed value
+    (``**`` in the second column) are skipped. Overflow in the other columns
+    is returned as NaN.
+
+    Parameters
+    ----------
+    path : str
+        Path to the fort.18 file.
+
+    Returns
+    -------
+    data : numpy.ndarray
+        Structured array with dtype :data:`XYT_DTYPE`, in file order. ``z`` is
+        the vertical coordinate as written (negative down) and ``time`` is the
+        elapsed time in days.
+    index : dict
+        Maps each cast number to the array of row indices of that cast in
+        ``data``, in file order, so profiles can be sliced without rescanning.
+    """
+    lines = []
+    for line in _read_lines(path):
+        if not line.strip() or b"&" in line:
+            continue
+        if b"**" in line:
+            # Only an overflowed value drops the row; other fields become NaN
+            fields = line.split()
+            if len(fields) > 1 and b"**" in fields[1]:
+                continue
+            line = re.sub(rb"\S*\*\*\S*", b"nan", line)
+        lines.append(line)
+    ncol = len(XYT_DTYPE.names)
+    if not lines:
+        return np.empty(0, dtype=XYT_DTYPE), {}
+    tokens = b" ".join(lines).split()
+    if len(tokens) != ncol * len(lines):
+        raise ValueError(
+            f"{path} is not a read_output10_xyt file: expected {ncol} columns on every row"
+        )
+    values = np.array(tokens, dtype=float).reshape(len(lines), ncol)
+
+    data = np.empty(len(lines), dtype=XYT_DTYPE)
+    for i, name in enumerate(XYT_DTYPE.names):
+        data[name] = values[:, i]
+    if not np.array_equal(data["cast"], values[:, 0]):
+        raise ValueError(f"Non-integer cast number in {path}")
+
+    order = np.argsort(data["cast"], kind="stable")
+    casts, starts = np.unique(data["cast"][order], return_index=True)
+    bounds = np.append(starts, len(order))
+    index = {
+        int(cast): order[bounds[i] : bounds[i + 1]] for i, cast in enumerate(casts)
+    }
+    return data, index
+
+
+def read_xyz(path):
+    """Read a ``read_output*_xyz`` fort.18 file of time series at build points.
+
+    Overflowed values (``**``) are returned as NaN.
+
+    Parameters
+    ----------
+    path : str
+        Path to the fort.18 file.
+
+    Returns
+    -------
+    time : numpy.ndarray
+        Elapsed time in days, one entry per row.
+    values : numpy.ndarray
+        Array of shape ``(ntime, npoint)``.
+    """
+    lines = [line for line in _read_lines(path) if line.strip()]
+    if not lines:
+        raise ValueError(f"No data in {path}")
+    ncol = len(lines[0].split())
+    text = b" ".join(lines)
+    if b"**" in text:
+        text = re.sub(rb"\S*\*\*\S*", b"nan", text)
+    tokens = text.split()
+    if len(tokens) != ncol * len(lines):
+        raise ValueError(f"Rows of {path} do not all have {ncol} columns")
+    values = np.array(tokens, dtype=float).reshape(len(lines), ncol)
+    return values[:, 0], values[:, 1:]
@@ -128,7 +128,7 @@ def create_link(source, symlink, config_log=False, abs=False):
     else:
         raise ValueError(f"Unsupported link style: {link_style}")
 
-def interpolate_variables(config_log=False):
+def interpolate_variables(config_log=False, cwd=None):
     """
     interpolate SCHISM variables from background grid to foreground grid for elevation, tracers, or uv3D
 
@@ -136,6 +136,10 @@ def interpolate_variables(config_log=False):
     ----------
     config_log : bool, optional
         If True, log the configuration source being used.
+    cwd : str, optional
+        Directory in which to run the utility. If None, the current working
+        directory is used. Passing this instead of calling ``os.chdir`` keeps
+        concurrent runs from interfering with each other.
 
     Raises
     ------
@@ -159,6 +163,7 @@ def interpolate_variables(config_log=False):
     result = subprocess.run(
         settings.interpolate_variables,
         shell=True,          # keeps behavior similar to os.system
+        cwd=cwd,
         capture_output=True,
         text=True,
     )
@@ -166,6 +171,7 @@ def interpolate_variables(config_log=False):
         raise RuntimeError(
             "interpolate_variables command failed:\n"
             f"  Command: {settings.interpolate_variables}\n"
+            f"  Directory: {cwd if cwd is not None else os.getcwd()}\n"
             f"  Exit code: {result.returncode}\n"
             f"  Stdout:\n{result.stdout}\n"
             f"  Stderr:\n{result.stderr}"
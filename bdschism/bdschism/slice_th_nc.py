@@ -17,15 +17,21 @@ CLI
     # for files without time:units (e.g. bare SCHISM uv3D.th.nc):
     slice_th_nc --reftime 2000-01-01 --start 2012-02-10 --end 2015-05-12 \\
                 -o uv3D_2012_2015.th.nc uv3D_2000_2025.th.nc
+
+Only the records inside the window are read, a block at a time, so slicing
+a few months out of a multi-GB ``uv3D.th.nc`` takes time and memory in
+proportion to the window rather than the file.
 """
 
 from __future__ import annotations
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple
 
 import click
+import netCDF4 as nc
 import numpy as np
 import pandas as pd
 import xarray as xr
@@ -153,6 +159,9 @@ def _detect_original_increment_seconds(time_vals) -> float:
     if len(time_vals) < 2:
         return 0.0
     vals = _to_datetime64(time_vals)
+    if np.issubdtype(vals.dtype, np.datetime64):
+        deltas = np.diff(vals).astype("timedelta64[ns]").astype(np.int64) / 1e9
+        return float(np.median(deltas))
     deltas = [_seconds_between(vals[i], vals[i - 1]) for i in range(1, len(vals))]
     return float(np.median(deltas))
 
@@ -215,6 +224,179 @@ def _parse_cf_units(units_str: str) -> Tuple[pd.Timestamp, float]:
     return pd.to_datetime(parts[2]), _mult[unit]
 
 
+# Time records copied at once are capped at about this many bytes per variable
+_BLOCK_BYTES = 64 * 1024**2
+
+
+def _time_window(infile, t_start, t_end, time_coord, reftime):
+    """
+    Locate the records of *infile* between *t_start* and *t_end*.
+
+    Only the time coordinate is read; data variables are never loaded.
+
+    Returns
+    -------
+    tname : str
+        Name of the time coordinate.
+    tdim : str
+        Name of the time dimension.
+    i0, i1 : int
+        Half-open index range ``[i0, i1)`` of the selected records.
+    times : np.ndarray
+        Absolute ``datetime64`` times of the selected records.
+    original_inc_s : float
+        Typical time step of the input in seconds.
+    time_attrs : dict
+        Attributes of the time coordinate after decoding.
+
+    Raises
+    ------
+    ValueError
+        With a message suitable for the CLI if the window cannot be located.
+    """
+    try:
+        ds = xr.open_dataset(infile, decode_times=True)
+    except Exception as e:
+        raise ValueError(f"Unable to open dataset '{infile}': {e}")
+
+    with ds:
+        tname = time_coord or _find_time_coord(ds)
+        tcoord = ds[tname]
+        if tcoord.ndim != 1:
+            raise ValueError(f"Time coordinate '{tname}' is not 1-D.")
+        tdim = tcoord.dims[0]
+        time_attrs = dict(tcoord.attrs)
+
+        # Resolve epoch for files whose time coordinate is raw float seconds
+        if np.issubdtype(tcoord.dtype, np.datetime64):
+            abs_time = tcoord.values
+        else:
+            units_str = tcoord.attrs.get("units", "")
+            if reftime is not None:
+                epoch = pd.to_datetime(reftime)
+                mult = 1.0
+                if units_str:
+                    try:
+                        _, mult = _parse_cf_units(units_str)
+                    except ValueError:
+                        pass  # fall back to seconds
+            elif units_str:
+                epoch, mult = _parse_cf_units(units_str)
+            else:
+                raise ValueError(
+                    f"time coordinate '{tname}' has no 'units' attribute; "
+                    "provide --reftime."
+                )
+            raw_s = tcoord.values.astype("float64") * mult
+            abs_time = np.datetime64(pd.Timestamp(epoch).to_datetime64()) + (
+                raw_s * 1e9
+            ).astype("int64").astype("timedelta64[ns]")
+
+    try:
+        original_inc_s = _detect_original_increment_seconds(abs_time)
+    except Exception as e:
+        raise ValueError(f"Could not detect original time increment: {e}")
+
+    vals64 = _to_datetime64(abs_time)
+    if not np.issubdtype(vals64.dtype, np.datetime64):
+        raise ValueError("Failed to slice dataset: time values are not datetimes.")
+    if vals64.size > 1 and np.any(vals64[1:] < vals64[:-1]):
+        raise ValueError("Failed to slice dataset: time coordinate is not sorted.")
+    i0 = int(np.searchsorted(vals64, np.datetime64(t_start.to_datetime64()), "left"))
+    i1 = int(np.searchsorted(vals64, np.datetime64(t_end.to_datetime64()), "right"))
+    if i1 <= i0:
+        raise ValueError("Slice produced no data (check --start/--end).")
+    return tname, tdim, i0, i1, vals64[i0:i1], original_inc_s, time_attrs
+
+
+def _copy_window(
+    infile,
+    tmpfile,
+    tname,
+    tdim,
+    i0,
+    i1,
+    new_time_vals,
+    time_attrs,
+    global_attrs,
+    complevel,
+    block_bytes,
+):
+    """Copy records ``[i0, i1)`` of *infile* to *tmpfile* block by block."""
+    with nc.Dataset(infile, "r") as src:
+        src.set_auto_maskandscale(False)
+        fmt = src.data_model
+        if complevel and not fmt.startswith("NETCDF4"):
+            fmt = "NETCDF4_CLASSIC"
+        netcdf4 = fmt.startswith("NETCDF4")
+        with nc.Dataset(tmpfile, "w", format=fmt) as dst:
+            dst.set_auto_maskandscale(False)
+            dst.setncatts(global_attrs)
+            for name, dim in src.dimensions.items():
+                if name == tdim:
+                    dst.createDimension(name, None if dim.isunlimited() else i1 - i0)
+                else:
+                    dst.createDimension(name, None if dim.isunlimited() else len(dim))
+
+            for name, var in src.variables.items():
+                timed = tdim in var.dimensions
+                kwargs = {}
+                if "_FillValue" in var.ncattrs() and name != tname:
+                    kwargs["fill_value"] = var.getncattr("_FillValue")
+                if netcdf4 and name != tname:
+                    filters = (var.filters() or {}) if src.data_model == fmt else {}
+                    if complevel is not None:
+                        filters = {"zlib": complevel > 0, "complevel": complevel, "shuffle": True}
+                    if filters.get("zlib"):
+                        kwargs.update(
+                            zlib=True,
+                            complevel=filters.get("complevel", 4),
+                            shuffle=filters.get("shuffle", False),
+                        )
+                    if timed and (complevel or filters.get("zlib")):
+                        # SCHISM reads one time record of a boundary file at a
+                        # time, so store every record as its own chunk
+                        kwargs["chunksizes"] = tuple(
+                            1 if d == tdim else len(src.dimensions[d])
+                            for d in var.dimensions
+                        )
+                    elif src.data_model == fmt:
+                        chunking = var.chunking()
+                        if chunking not in ("contiguous", None):
+                            kwargs["chunksizes"] = [
+                                min(c, i1 - i0) if d == tdim else c
+                                for c, d in zip(chunking, var.dimensions)
+                            ]
+                out = dst.createVariable(name, var.datatype, var.dimensions, **kwargs)
+
+                if name == tname:
+                    out.setncatts(time_attrs)
+                    out[:] = new_time_vals.astype(var.datatype)
+                    continue
+                out.setncatts(
+                    {a: var.getncattr(a) for a in var.ncattrs() if a != "_FillValue"}
+                )
+                if not timed:
+                    out[...] = var[...]
+                    continue
+
+                axis = var.dimensions.index(tdim)
+                record_bytes = var.dtype.itemsize * int(
+                    np.prod(
+                        [len(src.dimensions[d]) for d in var.dimensions if d != tdim],
+                        dtype=np.int64,
+                    )
+                )
+                step = max(1, block_bytes // max(record_bytes, 1))
+                for j0 in range(i0, i1, step):
+                    j1 = min(j0 + step, i1)
+                    src_idx = [slice(None)] * var.ndim
+                    src_idx[axis] = slice(j0, j1)
+                    dst_idx = [slice(None)] * var.ndim
+                    dst_idx[axis] = slice(j0 - i0, j1 - i0)
+                    out[tuple(dst_idx)] = var[tuple(src_idx)]
+
+
 # ---------- core API you can import elsewhere ----------
 def slice_nc(
     infile: str,
@@ -224,6 +406,8 @@ def slice_nc(
     *,
     time_coord: Optional[str] = None,
     reftime: Optional[str] = None,
+    complevel: Optional[int] = None,
+    block_bytes: int = _BLOCK_BYTES,
 ) -> Tuple[int, str]:
     """
     Slice a NetCDF time-history file to a date range and reindex time.
@@ -234,6 +418,11 @@ def slice_nc(
     metadata are updated accordingly; a ``history`` global attribute entry
     is appended.
 
+    The record range is located from the time coordinate alone and only
+    those records are copied, a block at a time, so run time scales with
+    the length of the window and memory use stays bounded however large
+    the input is.
+
     Parameters
     ----------
     infile : str
@@ -260,6 +449,13 @@ def slice_nc(
         ``units`` if parseable, otherwise seconds are assumed.  The
         supplied value is stored as the ``reftime`` global attribute in
         the output file.
+    complevel : int, optional
+        zlib compression level (1-9) for the output.  Time dependent
+        variables are then chunked one time record per chunk, matching the
+        way SCHISM reads boundary files.  ``0`` writes uncompressed output.
+        ``None`` (default) keeps the compression and chunking of *infile*.
+    block_bytes : int, optional
+        Approximate size of the blocks of records copied at once.
 
     Returns
     -------
@@ -272,8 +468,10 @@ def slice_nc(
     -----
     * The output time array contains ``float64`` values representing seconds
       elapsed since *start*, matching typical SCHISM ``*.th.nc`` conventions.
-    * Only a safe subset of encoding attributes is forwarded to the writer
-      to avoid backend incompatibilities.
+    * Data variables are copied as stored, with their fill values,
+      attributes and (unless *complevel* is given) compression settings.
+    * The output is written to ``<outfile>.part`` and renamed when
+      complete, so a failed slice never leaves a truncated file.
     * A datestamped entry is appended to the dataset's ``history`` global
       attribute.
     * When *reftime* is provided it is stored verbatim as the ``reftime``
@@ -285,152 +483,63 @@ def slice_nc(
     if pd.isna(t_start) or pd.isna(t_end) or (t_end < t_start):
         return 2, "ERROR: invalid --start/--end."
 
-    # Open
+    # Locate the window on the time coordinate
     try:
-        ds = xr.open_dataset(infile, decode_times=True)
-    except Exception as e:
-        return 2, f"ERROR: Unable to open dataset '{infile}': {e}"
-
-    # Time name
-    try:
-        tname = time_coord or _find_time_coord(ds)
-    except Exception as e:
-        ds.close()
-        return 2, f"ERROR: {e}"
-
-    # Resolve epoch for files whose time coordinate is raw float seconds
-    tcoord = ds[tname]
-    if not np.issubdtype(tcoord.dtype, np.datetime64):
-        units_str = tcoord.attrs.get("units", "")
-        if reftime is not None:
-            epoch = pd.to_datetime(reftime)
-            mult = 1.0
-            if units_str:
-                try:
-                    _, mult = _parse_cf_units(units_str)
-                except ValueError:
-                    pass  # fall back to seconds
-        elif units_str:
-            try:
-                epoch, mult = _parse_cf_units(units_str)
-            except ValueError as e:
-                ds.close()
-                return 2, f"ERROR: {e}"
-        else:
-            ds.close()
-            return 2, (
-                f"ERROR: time coordinate '{tname}' has no 'units' attribute; "
-                "provide --reftime."
-            )
-        raw_s = tcoord.values.astype("float64") * mult
-        abs_ns = (
-            np.datetime64(pd.Timestamp(epoch).to_datetime64())
-            + (raw_s * 1e9).astype("int64").astype("timedelta64[ns]")
+        tname, tdim, i0, i1, times, original_inc_s, time_attrs = _time_window(
+            infile, t_start, t_end, time_coord, reftime
         )
-        ds = ds.assign_coords({tname: abs_ns})
-
-    # Original increment (just for reporting)
-    try:
-        original_inc_s = _detect_original_increment_seconds(ds[tname].values)
     except Exception as e:
-        ds.close()
-        return 2, f"ERROR: Could not detect original time increment: {e}"
-
-    # Slice inclusive
-    try:
-        ds_slice = ds.sel({tname: slice(t_start, t_end)})
-    except Exception as e:
-        ds.close()
-        return 2, f"ERROR: Failed to slice dataset: {e}"
-
-    if ds_slice.sizes.get(tname, 0) == 0:
-        ds.close()
-        return 2, "ERROR: Slice produced no data (check --start/--end)."
-
-    # Work on a copy
-    ds_out = ds_slice.copy()
-
-    # Preserve time attrs
-    time_attrs = dict(ds_out[tname].attrs) if ds_out[tname].attrs is not None else {}
-    calendar = time_attrs.get("calendar", None)
+        return 2, f"ERROR: {e}"
 
     # Build new time coord as elapsed seconds since the **requested** start
-    vals64 = _to_datetime64(ds_out[tname].values)
-    t0 = pd.to_datetime(start)
-    t0_64 = np.datetime64(t0.to_datetime64())
-    delta_ns = (vals64 - t0_64).astype("timedelta64[ns]").astype(np.int64)
+    t0_64 = np.datetime64(t_start.to_datetime64())
+    delta_ns = (times - t0_64).astype("timedelta64[ns]").astype(np.int64)
     new_time_vals = delta_ns.astype("float64") / 1e9
+    new_units = f"seconds since {_iso_without_z(t_start)}"
+    time_attrs = {k: v for k, v in time_attrs.items() if k != "_FillValue"}
+    time_attrs["units"] = new_units
 
-    # Assign / attrs / encoding
-    new_units = f"seconds since {_iso_without_z(t0)}"
-    ds_out = ds_out.assign_coords({tname: (tname, new_time_vals)})
-    ds_out[tname].attrs.update(time_attrs)
-    ds_out[tname].attrs["units"] = new_units
-    if calendar is not None:
-        ds_out[tname].attrs["calendar"] = calendar
-
-    ds_out[tname].encoding = dict(ds_out[tname].encoding or {})
-    ds_out[tname].encoding["units"] = new_units
-    if calendar is not None:
-        ds_out[tname].encoding["calendar"] = calendar
-    ds_out[tname].encoding["dtype"] = ds[tname].encoding.get("dtype", "f8")
+    try:
+        with nc.Dataset(infile, "r") as src:
+            global_attrs = {a: src.getncattr(a) for a in src.ncattrs()}
+    except Exception as e:
+        return 2, f"ERROR: Unable to open dataset '{infile}': {e}"
 
     # Append to global history
     now_local = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-    prev_hist = ds_out.attrs.get("history", "")
+    prev_hist = global_attrs.get("history", "")
     if prev_hist:
         if not prev_hist.endswith((";", ".", " ")):
             prev_hist += ";"
-        ds_out.attrs["history"] = f"{prev_hist} sliced to new dates {now_local}"
+        global_attrs["history"] = f"{prev_hist} sliced to new dates {now_local}"
     else:
-        ds_out.attrs["history"] = f"sliced to new dates {now_local}"
+        global_attrs["history"] = f"sliced to new dates {now_local}"
 
     if reftime is not None:
-        ds_out.attrs["reftime"] = _iso_without_z(pd.to_datetime(reftime))
+        global_attrs["reftime"] = _iso_without_z(pd.to_datetime(reftime))
 
-    # Backend-safe encodings
+    tmpfile = f"{outfile}.part"
     try:
-        supported = {
-            "szip_coding",
-            "endian",
-            "blosc_shuffle",
-            "contiguous",
-            "_FillValue",
-            "chunksizes",
-            "szip_pixels_per_block",
-            "complevel",
-            "zlib",
-            "compression",
-            "least_significant_digit",
-            "fletcher32",
-            "shuffle",
-            "dtype",
-            "quantize_mode",
-            "significant_digits",
-        }
-        encoding: Dict[str, Dict] = {}
-        for v in ds_out.data_vars:
-            enc = dict(ds_out[v].encoding or {})
-            if enc:
-                encoding[v] = {k: enc[k] for k in enc.keys() & supported}
-
-        tenc = dict(ds_out[tname].encoding or {})
-        ds_out[tname].encoding = {k: tenc[k] for k in tenc.keys() & supported}
-        ds_out[tname].encoding["_FillValue"] = None  # prevent fill-value masking on time
-
-        ds_out.to_netcdf(outfile, encoding=encoding)
+        _copy_window(
+            infile,
+            tmpfile,
+            tname,
+            tdim,
+            i0,
+            i1,
+            new_time_vals,
+            time_attrs,
+            global_attrs,
+            complevel,
+            block_bytes,
+        )
+        os.replace(tmpfile, outfile)
     except Exception as e:
-        ds.close()
-        ds_out.close()
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
         return 2, f"ERROR: Failed to write output '{outfile}': {e}"
-    finally:
-        try:
-            ds.close()
-            ds_out.close()
-        except Exception:
-            pass
-
-    n = ds_slice.sizes[tname]
+
+    n = i1 - i0
     msg = (
         f"OK: wrote '{outfile}'. Sliced {tname} from {start} to {end} "
         f"(n={n}, increment\u2248{original_inc_s:.6g}s). Units: {new_units}"
@@ -467,6 +576,16 @@ def slice_nc(
         "Stored as the 'reftime' global attribute in the output file."
     ),
 )
+@click.option(
+    "--complevel",
+    default=None,
+    type=click.IntRange(0, 9),
+    help=(
+        "zlib compression level for the output, with one time record per "
+        "chunk as read by SCHISM. 0 writes uncompressed output. "
+        "Default keeps the compression of INFILE."
+    ),
+)
 @click.option(
     "--logdir",
     default=None,
@@ -480,7 +599,7 @@ def slice_nc(
     help="Enable debug logging.",
 )
 @click.help_option("-h", "--help")
-def slice_th_nc_cli(infile, out, start, end, reftime, logdir, debug):
+def slice_th_nc_cli(infile, out, start, end, reftime, complevel, logdir, debug):
     """Slice a NetCDF time-history file to a date range.
 
     Time is reindexed as elapsed seconds since START, and CF time
@@ -502,7 +621,9 @@ def slice_th_nc_cli(infile, out, start, end, reftime, logdir, debug):
         logdir=Path(logdir) if logdir else None,
         logfile_prefix="slice_th_nc",
     )
-    code, msg = slice_nc(infile, out, start, end, reftime=reftime)
+    code, msg = slice_nc(
+        infile, out, start, end, reftime=reftime, complevel=complevel
+    )
     if code:
         raise click.ClickException(msg.removeprefix("ERROR: "))
 
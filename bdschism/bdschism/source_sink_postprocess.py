@@ -17,6 +17,8 @@ import yaml
 
 from vtools.functions.unit_conversions import CFS2CMS, ec_psu_25c
 
+from bdschism.th_writer import write_th
+
 logger = logging.getLogger(__name__)
 
 # Canonical data file locations within BayDeltaSCHISM
@@ -277,8 +279,8 @@ def _write_dated_th(df, fname, metadata):
     header = _prepare_single_metadata_header(metadata, "dwr-dms-1.0")
     with open(fname, "w", newline="\n", encoding="utf-8") as f:
         f.write(header)
-        df.to_csv(
-            f, sep=" ", header=True,
+        write_th(
+            df, f, sep=" ", header=True,
             date_format="%Y-%m-%dT%H:%M:%S", float_format="%.4f",
             lineterminator="\n",
         )
@@ -341,8 +343,9 @@ def write_source_sink_th(
     src_elapsed = datetime_elapsed(src_window, reftime=sdate)
     with open(vsource_th_fname, "w", newline="\n", encoding="utf-8") as f:
         f.write(elapsed_header)
-        src_elapsed.to_csv(
-            f, header=False, float_format="%.4f", sep=" ", lineterminator="\n"
+        write_th(
+            src_elapsed, f, header=False, float_format="%.4f", sep=" ",
+            lineterminator="\n",
         )
     logger.info("Wrote %s", vsource_th_fname)
 
@@ -350,8 +353,9 @@ def write_source_sink_th(
     sink_elapsed = datetime_elapsed(sink_window, reftime=sdate)
     with open(vsink_th_fname, "w", newline="\n", encoding="utf-8") as f:
         f.write(elapsed_header)
-        sink_elapsed.to_csv(
-            f, header=False, float_format="%.4f", sep=" ", lineterminator="\n"
+        write_th(
+            sink_elapsed, f, header=False, float_format="%.4f", sep=" ",
+            lineterminator="\n",
         )
     logger.info("Wrote %s", vsink_th_fname)
 
@@ -426,8 +430,9 @@ def copy_paradise_up(
 
     with open(msource_adj_th_fname, "w", newline="\n", encoding="utf-8") as f:
         f.write(elapsed_header)
-        msource_elapsed.to_csv(
-            f, sep=" ", float_format="%.4f", header=False, lineterminator="\n"
+        write_th(
+            msource_elapsed, f, sep=" ", float_format="%.4f", header=False,
+            lineterminator="\n",
         )
     logger.info("Wrote %s", msource_adj_th_fname)
 
@@ -10,8 +10,14 @@ in step 7 before writing both dated QC CSVs and elapsed ``.th`` files.
 The workflow is driven by a single YAML config (``ss_workflow.yaml``) using
 schimpy ``$variable`` substitution. Changing ``version`` in that file is
 typically the only edit needed when a new channel depletion NetCDF arrives.
+
+The steps form a dependency graph (:mod:`bdschism.stage_graph`). Reruns skip
+every stage whose config, inputs and upstream outputs are unchanged, and
+independent stages run concurrently.
 """
 
+import glob
+import hashlib
 import logging
 import os
 from pathlib import Path
@@ -43,19 +49,109 @@ def _apply_scale_factor(dated_csv, scale):
     )
 
 
-def run_source_sink_workflow(config_file, set_vars=None, force=False):
-    """Run the complete source/sink postprocessing workflow.
+def _referenced_files(obj):
+    """Existing files named anywhere in a nested config, for fingerprinting."""
+    found = []
+    if isinstance(obj, dict):
+        for v in obj.values():
+            found.extend(_referenced_files(v))
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            found.extend(_referenced_files(v))
+    elif isinstance(obj, str) and os.path.isfile(obj):
+        found.append(obj)
+    return found
+
+
+def _merge_th_outputs(merge_th_cfg):
+    """Files written by ``merge_th`` for the given config."""
+    outputs = []
+    th_files = merge_th_cfg.get("merge_time_history", {}).get("th_files", {}) or {}
+    for th_file, spec in th_files.items():
+        outputs.append(str(th_file))
+        dated = (spec or {}).get("dated_output")
+        if isinstance(dated, str):
+            outputs.append(dated)
+    return outputs
+
+
+def _create_synthetic(src_out, sink_out, null_out, synthetic_cfg, syn_sdate, syn_edate):
+    """Step 5: generate the synthetic source/sink CSVs."""
+    from bdschism.source_sink_postprocess import (
+        SOURCE_MSS_YAML,
+        added_src_sink_names,
+        create_mss_minimum_srcsink,
+        create_nullzone_sink,
+    )
+
+    locs = added_src_sink_names(SOURCE_MSS_YAML)
+    nominal_cfs = float(synthetic_cfg.get("nominal_cfs", 3.0))
+    sink_fraction = float(synthetic_cfg.get("sink_fraction", 0.333))
+
+    create_nullzone_sink(null_out, syn_sdate, syn_edate)
+    create_mss_minimum_srcsink(
+        src_out, "src", nominal_cfs, locs, syn_sdate, syn_edate
+    )
+    create_mss_minimum_srcsink(
+        sink_out, "sink", nominal_cfs, locs, syn_sdate, syn_edate,
+        sink_fraction=sink_fraction,
+    )
+
+
+def _floor_and_write(
+    vsource_dated, vsink_dated, adj_dated, adj_th, adj_dated_th, sdate, edate, flow_meta
+):
+    """Step 7: floor the source/sink exchange and write CMS dated CSVs and ``.th``."""
+    from bdschism.source_sink_postprocess import (
+        floor_source_sink_exchange,
+        write_source_sink_th,
+    )
 
-    Steps
-    -----
-    1. Convert delta channel depletion NetCDF → CFS CSVs.
-    2. Convert Suisun channel depletion NetCDF → CFS CSVs.
-    3. Convert POTW CSV → flow (CFS) + salinity (PSU).
-    4. Convert inferred EC CSV → salinity (PSU).
-    5. Generate synthetic source/sink CSVs (skipped if outputs exist and not forced).
-    6. Run ``merge_th`` to assemble per-component CFS CSVs into dated merged CSVs.
-    7. Floor south-delta sources; write adjusted CFS dated CSVs and CMS ``.th``.
-    8. Propagate Paradise Cut salinity; write adjusted dated CSV and ``.th``.
+    vsource_df = pd.read_csv(
+        vsource_dated, sep=r"\s+", header=0, index_col=0, parse_dates=[0], dtype=float
+    )
+    vsink_df = pd.read_csv(
+        vsink_dated, sep=r"\s+", header=0, index_col=0, parse_dates=[0], dtype=float
+    )
+    adj_source, adj_sink = floor_source_sink_exchange(vsource_df, vsink_df)
+
+    # Convert to CMS once here — used for both dated QC CSVs and elapsed .th
+    adj_source_cms = adj_source * CFS2CMS
+    adj_sink_cms = adj_sink * CFS2CMS
+
+    write_ts_csv(adj_source_cms, adj_dated[0], metadata=flow_meta, float_format="%.4f")
+    write_ts_csv(adj_sink_cms, adj_dated[1], metadata=flow_meta, float_format="%.4f")
+
+    write_source_sink_th(
+        adj_source_cms, adj_sink_cms,
+        adj_th[0], adj_th[1],
+        sdate, edate,
+        vsource_dated_th_fname=adj_dated_th[0],
+        vsink_dated_th_fname=adj_dated_th[1],
+        metadata=flow_meta,
+    )
+
+
+def build_source_sink_graph(config_file, set_vars=None, max_workers=None):
+    """Describe the source/sink workflow as a :class:`~bdschism.stage_graph.StageGraph`.
+
+    Stages
+    ------
+    1. ``cd_delta``: convert delta channel depletion NetCDF → CFS CSVs.
+    2. ``cd_suisun``: convert Suisun channel depletion NetCDF → CFS CSVs.
+    3. ``potw``: convert POTW CSV → flow (CFS) + salinity (PSU).
+    4. ``inferred_ec``: convert inferred EC CSV → salinity (PSU).
+    5. ``synthetic``: generate synthetic source/sink CSVs.
+    6. ``merge_th``: assemble per-component CFS CSVs into dated merged CSVs.
+    7. ``floor``: floor south-delta sources; write adjusted CFS dated CSVs and
+       CMS ``.th``.
+    8. ``paradise``: propagate Paradise Cut salinity; write adjusted dated CSV
+       and ``.th``.
+
+    Stages 1–5 are independent of each other, as are 7 and 8. Each stage is
+    fingerprinted on its resolved config, the files it reads and the outputs
+    of the stages it depends on. The state is kept in
+    ``<work_dir>/.source_sink_workflow_state.json``.
 
     Parameters
     ----------
@@ -64,9 +160,15 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     set_vars : dict, optional
         Variable overrides for ``$variable`` substitution in all sub-configs,
         e.g. ``{'version': '20260101'}``.
-    force : bool, optional
-        If True, regenerate synthetic files even if outputs already exist.
-        Default False.
+    max_workers : int, optional
+        Maximum number of stages run concurrently.
+
+    Returns
+    -------
+    graph : StageGraph
+        The workflow stages.
+    final_outputs : tuple of str
+        The vsource, vsink and msource ``.th`` files for SCHISM.
     """
     from schimpy.merge_th import merge_th
     from schimpy.yaml_util import yaml_from_file
@@ -74,15 +176,11 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     from bdschism.channel_depletion import convert_channel_depletion
     from bdschism.potw import potw_to_schism
     from bdschism.source_sink_postprocess import (
-        added_src_sink_names,
         copy_paradise_up,
-        create_mss_minimum_srcsink,
-        create_nullzone_sink,
-        floor_source_sink_exchange,
-        write_source_sink_th,
         inferred_to_psu,
         SOURCE_MSS_YAML,
     )
+    from bdschism.stage_graph import Stage, StageGraph
 
     if set_vars is None:
         set_vars = {}
@@ -119,33 +217,69 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     sub_vars["suisun_mod"] = suisun_mod
     logger.info("Derived suisun_mod=%s from suisun convert config", suisun_mod)
 
+    inferred_ec_stem = Path(c["inferred_ec_file"]).stem   # e.g. deltacd_ec_inferred_20250502
+    inferred_ec_stamp = inferred_ec_stem.split("_")[-1]   # e.g. 20250502
+    sub_vars["inferred_ec_stamp"] = inferred_ec_stamp
+
+    graph = StageGraph(
+        os.path.join(work_dir, ".source_sink_workflow_state.json"),
+        max_workers=max_workers,
+    )
+
     # ------------------------------------------------------------------
     # Step 1–2: Channel depletion NetCDF conversion
     # ------------------------------------------------------------------
-    logger.info("Step 1: Converting delta channel depletion NetCDF")
-    cd_delta_cfg = cfg["channel_depletion"]["delta"]["config"]
-    convert_channel_depletion(cd_delta_cfg, sub_vars)
-
-    logger.info("Step 2: Converting Suisun channel depletion NetCDF")
-    convert_channel_depletion(cd_suisun_cfg_path, sub_vars)
+    cd_delta_cfg_path = cfg["channel_depletion"]["delta"]["config"]
+    for name, cfg_path, cd_cfg in (
+        ("cd_delta", cd_delta_cfg_path, yaml_from_file(cd_delta_cfg_path, envvar=sub_vars)),
+        ("cd_suisun", cd_suisun_cfg_path, _suisun_cfg),
+    ):
+        graph.add(
+            Stage(
+                name,
+                convert_channel_depletion,
+                args=(cfg_path, sub_vars),
+                inputs=(cfg_path, *_referenced_files(cd_cfg)),
+                outputs=(
+                    (os.path.join(cd_cfg["output_dir"], f"{cd_cfg['outfile_prefix']}_*.csv"),)
+                    if "output_dir" in cd_cfg and "outfile_prefix" in cd_cfg
+                    else ()
+                ),
+                params=cd_cfg,
+            )
+        )
 
     # ------------------------------------------------------------------
     # Step 3: POTW
     # ------------------------------------------------------------------
-    logger.info("Step 3: Converting POTW data")
-    potw_to_schism(c["potw_file"], work_dir)
+    graph.add(
+        Stage(
+            "potw",
+            potw_to_schism,
+            args=(c["potw_file"], work_dir),
+            inputs=(c["potw_file"],),
+            outputs=(
+                os.path.join(work_dir, "potw_south_delta_salinity.csv"),
+                os.path.join(work_dir, "potw_south_delta_flow.csv"),
+            ),
+        )
+    )
 
     # ------------------------------------------------------------------
     # Step 4: Inferred EC → PSU
     # ------------------------------------------------------------------
-    logger.info("Step 4: Converting inferred EC to PSU salinity")
-    inferred_ec_stem = Path(c["inferred_ec_file"]).stem   # e.g. deltacd_ec_inferred_20250502
-    inferred_ec_stamp = inferred_ec_stem.split("_")[-1]   # e.g. 20250502
-    sub_vars["inferred_ec_stamp"] = inferred_ec_stamp
     inferred_out = os.path.join(
         work_dir, f"deltacd_salinity_inferred_{inferred_ec_stamp}.csv"
     )
-    inferred_to_psu(c["inferred_ec_file"], inferred_out)
+    graph.add(
+        Stage(
+            "inferred_ec",
+            inferred_to_psu,
+            args=(c["inferred_ec_file"], inferred_out),
+            inputs=(c["inferred_ec_file"],),
+            outputs=(inferred_out,),
+        )
+    )
 
     # ------------------------------------------------------------------
     # Step 5: Synthetic source/sink generation
@@ -153,43 +287,63 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     src_out = os.path.join(work_dir, "mss_added_source.csv")
     sink_out = os.path.join(work_dir, "mss_added_sink.csv")
     null_out = os.path.join(work_dir, "nullzone_sink.csv")
-
     synthetic_cfg = cfg.get("synthetic", {})
-    skip_if_exists = synthetic_cfg.get("skip_if_exists", True)
-    existing = all(os.path.exists(p) for p in (src_out, sink_out, null_out))
-    if skip_if_exists and not force and existing:
-        logger.info(
-            "Step 5: Synthetic files exist — skipping (pass force=True to regenerate)"
-        )
-    else:
-        logger.info("Step 5: Creating synthetic source/sink files")
-        locs = added_src_sink_names(SOURCE_MSS_YAML)
-        nominal_cfs = float(synthetic_cfg.get("nominal_cfs", 3.0))
-        sink_fraction = float(synthetic_cfg.get("sink_fraction", 0.333))
-        syn_sdate = pd.Timestamp(c.get("synthetic_start", "2000-01-01"))
-        syn_edate = pd.Timestamp(c.get("synthetic_end", "2027-01-01"))
-
-        create_nullzone_sink(null_out, syn_sdate, syn_edate)
-        create_mss_minimum_srcsink(
-            src_out, "src", nominal_cfs, locs, syn_sdate, syn_edate
-        )
-        create_mss_minimum_srcsink(
-            sink_out, "sink", nominal_cfs, locs, syn_sdate, syn_edate,
-            sink_fraction=sink_fraction,
+    syn_sdate = pd.Timestamp(c.get("synthetic_start", "2000-01-01"))
+    syn_edate = pd.Timestamp(c.get("synthetic_end", "2027-01-01"))
+    graph.add(
+        Stage(
+            "synthetic",
+            _create_synthetic,
+            args=(src_out, sink_out, null_out, synthetic_cfg, syn_sdate, syn_edate),
+            inputs=(SOURCE_MSS_YAML,),
+            outputs=(src_out, sink_out, null_out),
+            params={
+                "synthetic": {
+                    k: v for k, v in synthetic_cfg.items() if k != "skip_if_exists"
+                },
+                "start": syn_sdate,
+                "end": syn_edate,
+            },
+            # Files generated before this run was tracked are kept
+            adopt_existing=synthetic_cfg.get("skip_if_exists", True),
         )
+    )
 
     # ------------------------------------------------------------------
     # Step 6: merge_th — first pass, produces CFS dated CSVs
     # ------------------------------------------------------------------
-    logger.info("Step 6: Running merge_th (CFS intermediates)")
     merge_th_cfg_path = cfg["merge_th"]["config"]
     merge_th_cfg = yaml_from_file(merge_th_cfg_path, envvar=sub_vars)
-    merge_th(merge_th_cfg)
+    merge_th_outputs = _merge_th_outputs(merge_th_cfg)
+    # Files written by this or an upstream stage are tracked through the
+    # dependencies, not as external inputs
+    produced = {os.path.abspath(p) for p in merge_th_outputs}
+    for stage in graph.stages.values():
+        for pattern in stage.outputs:
+            produced.update(os.path.abspath(p) for p in glob.glob(pattern))
+            produced.add(os.path.abspath(pattern))
+    graph.add(
+        Stage(
+            "merge_th",
+            merge_th,
+            args=(merge_th_cfg,),
+            deps=("cd_delta", "cd_suisun", "potw", "inferred_ec", "synthetic"),
+            inputs=(
+                merge_th_cfg_path,
+                *(
+                    f
+                    for f in _referenced_files(merge_th_cfg)
+                    if os.path.abspath(f) not in produced
+                ),
+            ),
+            outputs=tuple(merge_th_outputs),
+            params=merge_th_cfg,
+        )
+    )
 
     # ------------------------------------------------------------------
     # Step 7: Floor source/sink exchange (CFS → adj CSVs) + write .th
     # ------------------------------------------------------------------
-    logger.info("Step 7: Applying south-delta floor and Tom Paine handling")
     vsource_dated = os.path.join(work_dir, f"vsource_dated_{version}.csv")
     vsink_dated = os.path.join(work_dir, f"vsink_dated_{version}_{suisun_mod}.csv")
     vsource_adj_dated = os.path.join(work_dir, f"vsource_adj_{version}_dated.csv")
@@ -205,41 +359,53 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     sdate = pd.Timestamp(floor_cfg.get("sdate", start_time))
     edate = pd.Timestamp(floor_cfg.get("edate", end_time))
 
-    vsource_df = pd.read_csv(
-        vsource_dated, sep=r"\s+", header=0, index_col=0, parse_dates=[0], dtype=float
-    )
-    vsink_df = pd.read_csv(
-        vsink_dated, sep=r"\s+", header=0, index_col=0, parse_dates=[0], dtype=float
-    )
-    adj_source, adj_sink = floor_source_sink_exchange(vsource_df, vsink_df)
-
-    # Convert to CMS once here — used for both dated QC CSVs and elapsed .th
-    adj_source_cms = adj_source * CFS2CMS
-    adj_sink_cms = adj_sink * CFS2CMS
-
+    # The full config text goes into the output headers, so it is part of the
+    # fingerprint of the stages that write them.
     _config_text = Path(config_file).read_text(encoding="utf-8")
+    _config_hash = hashlib.sha256(_config_text.encode("utf-8")).hexdigest()
     _flow_meta = {
         "units": "m^3/s",
         "postprocess_config": _config_text,
         "version": version,
         "suisun_mod": suisun_mod,
     }
-    write_ts_csv(adj_source_cms, vsource_adj_dated, metadata=_flow_meta, float_format="%.4f")
-    write_ts_csv(adj_sink_cms, vsink_adj_dated, metadata=_flow_meta, float_format="%.4f")
-
-    write_source_sink_th(
-        adj_source_cms, adj_sink_cms,
-        vsource_adj_th, vsink_adj_th,
-        sdate, edate,
-        vsource_dated_th_fname=vsource_adj_dated_th,
-        vsink_dated_th_fname=vsink_adj_dated_th,
-        metadata=_flow_meta,
+    graph.add(
+        Stage(
+            "floor",
+            _floor_and_write,
+            args=(
+                vsource_dated,
+                vsink_dated,
+                (vsource_adj_dated, vsink_adj_dated),
+                (vsource_adj_th, vsink_adj_th),
+                (vsource_adj_dated_th, vsink_adj_dated_th),
+                sdate,
+                edate,
+                _flow_meta,
+            ),
+            deps=("merge_th",),
+            inputs=(vsource_dated, vsink_dated),
+            outputs=(
+                vsource_adj_dated,
+                vsink_adj_dated,
+                vsource_adj_th,
+                vsink_adj_th,
+                vsource_adj_dated_th,
+                vsink_adj_dated_th,
+            ),
+            params={
+                "sdate": sdate,
+                "edate": edate,
+                "version": version,
+                "suisun_mod": suisun_mod,
+                "config": _config_hash,
+            },
+        )
     )
 
     # ------------------------------------------------------------------
     # Step 8: Paradise Cut salinity propagation
     # ------------------------------------------------------------------
-    logger.info("Step 8: Propagating Paradise Cut salinity")
     msource_dated = os.path.join(work_dir, f"msource_dated_{version}.csv")
     msource_adj_dated = os.path.join(work_dir, f"msource_adj_{version}_dated.csv")
     msource_adj_th = os.path.join(output_dir, f"msource_adj_{version}.th")
@@ -250,23 +416,82 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
         "postprocess_config": _config_text,
         "version": version,
     }
-    copy_paradise_up(
-        msource_dated,
-        msource_adj_dated,
-        msource_adj_th,
-        metadata=_tracer_meta,
-        msource_adj_dated_th_fname=msource_adj_dated_th,
-        sdate=sdate,
-        edate=edate,
+    graph.add(
+        Stage(
+            "paradise",
+            copy_paradise_up,
+            args=(msource_dated, msource_adj_dated, msource_adj_th),
+            kwargs=dict(
+                metadata=_tracer_meta,
+                msource_adj_dated_th_fname=msource_adj_dated_th,
+                sdate=sdate,
+                edate=edate,
+            ),
+            deps=("merge_th",),
+            inputs=(msource_dated,),
+            outputs=(msource_adj_dated, msource_adj_th, msource_adj_dated_th),
+            params={
+                "sdate": sdate,
+                "edate": edate,
+                "version": version,
+                "config": _config_hash,
+            },
+        )
     )
+    return graph, (vsource_adj_th, vsink_adj_th, msource_adj_th)
 
+
+def run_source_sink_workflow(
+    config_file, set_vars=None, force=False, max_workers=None, rerun=None, dry_run=False
+):
+    """Run the complete source/sink postprocessing workflow.
+
+    The workflow is a dependency graph of stages (see
+    :func:`build_source_sink_graph`). A stage runs only if its config, its
+    input files or the outputs of a stage it depends on changed since its
+    last successful run; independent stages run concurrently. After editing
+    one value in a sub-config only the affected chain is redone.
+
+    Parameters
+    ----------
+    config_file : str or Path
+        Path to ``ss_workflow.yaml``.
+    set_vars : dict, optional
+        Variable overrides for ``$variable`` substitution in all sub-configs,
+        e.g. ``{'version': '20260101'}``.
+    force : bool, optional
+        If True, run every stage regardless of its recorded state, including
+        regenerating synthetic files that already exist. Default False.
+    max_workers : int, optional
+        Maximum number of stages run concurrently.
+    rerun : iterable of str, optional
+        Names of stages to run even if up to date. Stages downstream of them
+        run as well.
+    dry_run : bool, optional
+        Only report which stages would run.
+
+    Returns
+    -------
+    dict or list
+        Status (``"ran"`` or ``"skipped"``) of each stage, or with
+        ``dry_run`` the names of the stages that would run.
+    """
+    graph, final_outputs = build_source_sink_graph(
+        config_file, set_vars, max_workers=max_workers
+    )
+    if dry_run:
+        plan = graph.plan(force=force, rerun=rerun)
+        logger.info("Stages to run: %s", ", ".join(plan) or "none")
+        return plan
+
+    status = graph.run(force=force, rerun=rerun)
     logger.info(
-        "Workflow complete. SCHISM inputs written to %s:\n  %s\n  %s\n  %s",
-        output_dir,
-        vsource_adj_th,
-        vsink_adj_th,
-        msource_adj_th,
+        "Workflow complete (%s). SCHISM inputs written to %s:\n  %s\n  %s\n  %s",
+        ", ".join(f"{k}: {v}" for k, v in status.items()),
+        os.path.dirname(final_outputs[0]) or ".",
+        *final_outputs,
     )
+    return status
 
 
 @click.command("source_sink_workflow")
@@ -288,12 +513,34 @@ def run_source_sink_workflow(config_file, set_vars=None, force=False):
     "--force",
     is_flag=True,
     default=False,
-    help="Regenerate synthetic files even if they already exist.",
+    help="Run every stage, even if up to date, and regenerate synthetic files.",
+)
+@click.option(
+    "--rerun",
+    multiple=True,
+    metavar="STAGE",
+    help="Run this stage and everything downstream of it even if up to date "
+    "(repeatable; cd_delta, cd_suisun, potw, inferred_ec, synthetic, merge_th, "
+    "floor, paradise).",
+)
+@click.option(
+    "--max_workers",
+    type=int,
+    default=None,
+    help="Maximum number of independent stages run at the same time.",
+)
+@click.option(
+    "--dry_run",
+    is_flag=True,
+    default=False,
+    help="Only report which stages are out of date.",
 )
 @click.option("--logdir", default="logs", type=click.Path(), help="Directory for log files.")
 @click.option("--debug", is_flag=True, default=False, help="Enable debug logging.")
 @click.help_option("-h", "--help")
-def source_sink_workflow_cli(config_file, set_vars, force, logdir, debug):
+def source_sink_workflow_cli(
+    config_file, set_vars, force, rerun, max_workers, dry_run, logdir, debug
+):
     """Run the full source/sink postprocessing workflow end-to-end.
 
     Changing ``version`` in ``ss_workflow.yaml`` (or via ``--set version=...``)
@@ -312,4 +559,11 @@ def source_sink_workflow_cli(config_file, set_vars, force, logdir, debug):
         logfile_prefix="source_sink_workflow",
     )
     kv = dict(s.split("=", 1) for s in set_vars)
-    run_source_sink_workflow(config_file, set_vars=kv, force=force)
+    run_source_sink_workflow(
+        config_file,
+        set_vars=kv,
+        force=force,
+        max_workers=max_workers,
+        rerun=rerun,
+        dry_run=dry_run,
+    )
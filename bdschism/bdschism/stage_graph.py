@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental execution of file-producing workflow stages.
+
+A workflow is described as a set of :class:`Stage` objects, each naming the
+stages it depends on, the external files it reads, the files it writes and
+the slice of configuration that controls it. :class:`StageGraph` runs the
+stages in dependency order, starting independent stages concurrently, and
+skips a stage when nothing it depends on has changed since its last
+successful run.
+
+A stage is up to date when its fingerprint matches the one recorded in the
+state file and its recorded outputs are still present and unmodified. The
+fingerprint covers
+
+* the stage name and its ``params`` (serialized as JSON),
+* the size and modification time of every file in ``inputs``,
+* the outputs recorded for each dependency.
+
+Rerunning a dependency rewrites its outputs, so every stage downstream of a
+change reruns as well, while unrelated branches are skipped.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """One step of a workflow.
+
+    Attributes
+    ----------
+    name : str
+        Unique name of the stage.
+    func : callable
+        Called as ``func(*args, **kwargs)`` to run the stage.
+    args, kwargs
+        Arguments for ``func``.
+    deps : tuple of str
+        Names of stages that must complete first.
+    inputs : tuple of str
+        External files read by the stage. Glob patterns are expanded.
+    outputs : tuple of str
+        Files written by the stage. Glob patterns are expanded.
+    params : object
+        Configuration controlling the stage. Anything JSON serializable;
+        other values are converted with ``str``.
+    adopt_existing : bool
+        If the stage has never been recorded but all of its outputs exist,
+        accept them instead of running the stage.
+    """
+
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    deps: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    params: Any = None
+    adopt_existing: bool = False
+
+
+def _expand(patterns):
+    paths = []
+    for pattern in patterns:
+        pattern = str(pattern)
+        if any(c in pattern for c in "*?["):
+            paths.extend(sorted(glob.glob(pattern)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _fingerprints(patterns):
+    """Map each file to ``[size, mtime_ns]``, or None if it does not exist."""
+    out = {}
+    for path in _expand(patterns):
+        try:
+            st = os.stat(path)
+            out[os.path.abspath(path)] = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            out[os.path.abspath(path)] = None
+    return out
+
+
+class StageGraph:
+    """Dependency graph of :class:`Stage` objects with a persistent state file.
+
+    Parameters
+    ----------
+    state_file : str or Path
+        JSON file recording the fingerprint and outputs of every completed
+        stage.
+    max_workers : int, optional
+        Maximum number of stages run at the same time. Stages run in threads,
+        which suits the file and NetCDF I/O bound steps of the workflows in
+        this package.
+    """
+
+    def __init__(self, state_file, max_workers=None):
+        self.state_file = str(state_file)
+        self.max_workers = max_workers
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage):
+        """Add a stage. Dependencies must already have been added."""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        missing = [d for d in stage.deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stage(s) {missing}")
+        self.stages[stage.name] = stage
+        return stage
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def load_state(self):
+        """Return the recorded state, or an empty dict if there is none."""
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable stage state %s: %s", self.state_file, e)
+            return {}
+
+    def _save_state(self, state):
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_file)
+
+    def fingerprint(self, stage, state):
+        """Fingerprint of ``stage`` given the recorded state of its dependencies."""
+        payload = json.dumps(
+            {
+                "name": stage.name,
+                "params": json.dumps(stage.params, sort_keys=True, default=str),
+                "inputs": _fingerprints(stage.inputs),
+                "deps": {d: state.get(d, {}).get("outputs") for d in stage.deps},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _outputs_present(stage):
+        return all(
+            glob.glob(str(p)) if any(c in str(p) for c in "*?[") else os.path.exists(p)
+            for p in stage.outputs
+        )
+
+    def is_up_to_date(self, stage, state, key):
+        """True if ``stage`` can be skipped."""
+        record = state.get(stage.name)
+        if record is None:
+            return stage.adopt_existing and bool(stage.outputs) and self._outputs_present(stage)
+        if record.get("key") != key or not self._outputs_present(stage):
+            return False
+        current = _fingerprints(record.get("outputs", {}).keys())
+        return current == record.get("outputs", {})
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _order(self):
+        """Stage names in a valid execution order."""
+        # Stages can only depend on stages added earlier, so insertion order is
+        # already topological.
+        return list(self.stages)
+
+    def run(self, force=False, rerun=None):
+        """Run every stage that is not up to date.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Run all stages regardless of their recorded state.
+        rerun : iterable of str, optional
+            Force these stages (and therefore everything downstream) to run.
+
+        Returns
+        -------
+        dict
+            Maps each stage name to ``"ran"`` or ``"skipped"``.
+        """
+        rerun = set(rerun or ())
+        unknown = rerun - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+        state = self.load_state()
+        status = {}
+        pending = self._order()
+        running = {}
+
+        def _ready(name):
+            return all(d in status for d in self.stages[name].deps)
+
+        def _finish(name, key):
+            stage = self.stages[name]
+            record = {"key": key, "outputs": _fingerprints(stage.outputs)}
+            with self._lock:
+                state[name] = record
+                self._save_state(state)
+
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while (pending and error is None) or running:
+                if error is None:
+                    for name in [n for n in pending if _ready(n)]:
+                        pending.remove(name)
+                        stage = self.stages[name]
+                        key = self.fingerprint(stage, state)
+                        if not (force or name in rerun) and self.is_up_to_date(
+                            stage, state, key
+                        ):
+                            logger.info("Stage %s is up to date, skipping", name)
+                            if name not in state:
+                                _finish(name, key)
+                            status[name] = "skipped"
+                            continue
+                        logger.info("Running stage %s", name)
+                        future = pool.submit(stage.func, *stage.args, **stage.kwargs)
+                        running[future] = (name, key)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        # Let stages already running finish and record them,
+                        # but start nothing new
+                        logger.error("Stage %s failed: %s", name, exc)
+                        error = error or exc
+                        continue
+                    _finish(name, key)
+                    status[name] = "ran"
+        if error is not None:
+            raise error
+        return status
+
+    def plan(self, force=False, rerun=None):
+        """Return the stages :meth:`run` would execute, assuming none fail.
+
+        Stages downstream of a stage that would run are reported as running
+        too, since their dependency outputs will change.
+        """
+        rerun = set(rerun or ())
+        state = self.load_state()
+        will_run = []
+        for name in self._order():
+            stage = self.stages[name]
+            if force or name in rerun or any(d in will_run for d in stage.deps):
+                will_run.append(name)
+                continue
+            if not self.is_up_to_date(stage, state, self.fingerprint(stage, state)):
+                will_run.append(name)
+        return will_run
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Binary sidecar cache for ``.th`` time history files.
+
+Whitespace delimited ``.th`` files such as ``flux.th``, ``vsource.th``,
+``vsink.th``, ``msource.th`` and gate time histories are read repeatedly by
+the boundary, NDOI, consumptive use and pre-run checks. ``vsource.th`` and
+``vsink.th`` have hundreds of columns and many years of rows, so parsing the
+text dominates those reads.
+
+The readers here parse a file once and store the resulting table next to it
+as ``<file>.npz`` (for example ``vsource.th.npz``). The sidecar records the
+size and modification time of the text file and is ignored and rewritten
+whenever either changes. One sidecar can hold several parsed variants of the
+same file, e.g. with and without a ``time_basis``, each keyed on the reader
+and its arguments. Arrays are stored uncompressed, so a later read is a
+plain binary load with no text parsing.
+
+Only tables with a numeric or datetime index and a single numeric dtype are
+stored; anything else is returned uncached. When the directory of the file
+is not writable the file is simply parsed every time.
+
+Sidecars are enabled in ``bds_config.yaml``::
+
+    th_sidecar:
+      enabled: true
+
+Setting the environment variable ``BDS_TH_SIDECAR=0`` disables them for a
+run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from schimpy.th_io import read_th as _schimpy_read_th
+
+from bdschism.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_EXT = ".npz"
+_FORMAT_VERSION = 1
+_META = "__meta__"
+
+
+def sidecar_path(fname):
+    """Return the path of the sidecar for the text file ``fname``."""
+    return str(fname) + SIDECAR_EXT
+
+
+def sidecar_enabled():
+    """Return True unless sidecars are disabled by configuration or environment."""
+    if os.getenv("BDS_TH_SIDECAR", "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    cfg = get_settings().get("th_sidecar", None)
+    return bool(cfg is None or cfg.get("enabled", True))
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _variant_key(reader, kwargs):
+    """Digest identifying a reader and its arguments.
+
+    Arguments naming existing files (such as a ``head`` file supplying
+    column names) contribute their size and modification time as well.
+    """
+    params = {}
+    for k in sorted(kwargs):
+        v = kwargs[k]
+        entry = repr(v)
+        if isinstance(v, (str, os.PathLike)) and os.path.isfile(v):
+            entry = [entry] + _fingerprint(v)
+        params[k] = entry
+    name = f"{getattr(reader, '__module__', '')}.{getattr(reader, '__qualname__', repr(reader))}"
+    payload = json.dumps({"reader": name, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _to_arrays(df):
+    """Split a DataFrame into arrays for the sidecar, or None if unsupported."""
+    if not isinstance(df, pd.DataFrame) or df.columns.nlevels != 1:
+        return None
+    dtypes = set(df.dtypes)
+    if len(dtypes) != 1 or not np.issubdtype(dtypes.pop(), np.number):
+        return None
+
+    index = df.index
+    attrs = {"index_name": index.name, "freq": None}
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            return None
+        attrs["index_kind"] = "datetime"
+        attrs["freq"] = index.freqstr
+        index_values = index.values
+    elif pd.api.types.is_numeric_dtype(index.dtype):
+        attrs["index_kind"] = "numeric"
+        index_values = index.values
+    else:
+        return None
+
+    columns = df.columns
+    if pd.api.types.is_integer_dtype(columns.dtype):
+        attrs["columns_kind"] = "int"
+        column_values = columns.values.astype(np.int64)
+    elif all(isinstance(c, str) for c in columns):
+        attrs["columns_kind"] = "str"
+        column_values = np.array(list(columns), dtype=str)
+    else:
+        return None
+    attrs["columns_name"] = columns.name
+    return {
+        "index": index_values,
+        "columns": column_values,
+        "values": df.to_numpy(),
+        "attrs": np.array(json.dumps(attrs)),
+    }
+
+
+def _from_arrays(arrays):
+    attrs = json.loads(str(arrays["attrs"]))
+    if attrs["index_kind"] == "datetime":
+        index = pd.DatetimeIndex(
+            arrays["index"], freq=attrs["freq"], name=attrs["index_name"]
+        )
+    else:
+        index = pd.Index(arrays["index"], name=attrs["index_name"])
+    columns = arrays["columns"]
+    columns = pd.Index(
+        columns.tolist() if attrs["columns_kind"] == "str" else columns,
+        name=attrs["columns_name"],
+    )
+    return pd.DataFrame(arrays["values"], index=index, columns=columns)
+
+
+def _load_variant(path, fingerprint, key):
+    """Return the stored DataFrame for ``key`` or None if absent or stale."""
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz[_META]))
+            if meta.get("version") != _FORMAT_VERSION or meta.get("source") != fingerprint:
+                return None
+            names = [f"{key}.{part}" for part in ("index", "columns", "values", "attrs")]
+            if names[0] not in npz.files:
+                return None
+            return _from_arrays({n.split(".", 1)[1]: npz[n] for n in names})
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable sidecar %s: %s", path, e)
+        return None
+
+
+def _store_variant(path, fingerprint, key, arrays):
+    """Add a variant to the sidecar, dropping variants of older file versions."""
+    members = {}
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz[_META]))
+            if meta.get("version") == _FORMAT_VERSION and meta.get("source") == fingerprint:
+                members = {n: npz[n] for n in npz.files if n != _META}
+    except Exception:
+        members = {}
+    for part, arr in arrays.items():
+        members[f"{key}.{part}"] = arr
+    members[_META] = np.array(
+        json.dumps({"version": _FORMAT_VERSION, "source": fingerprint})
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **members)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_with_sidecar(fname, reader, **kwargs):
+    """Read a text file with ``reader`` through its binary sidecar.
+
+    Parameters
+    ----------
+    fname : str or Path
+        Text file to read.
+    reader : callable
+        Called as ``reader(fname, **kwargs)`` on a miss. Must return a
+        DataFrame for the result to be stored.
+    **kwargs
+        Arguments for ``reader``. They are part of the sidecar key.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The table parsed from ``fname``, freshly or from the sidecar.
+    """
+    if not sidecar_enabled():
+        return reader(fname, **kwargs)
+    try:
+        fingerprint = _fingerprint(fname)
+    except (OSError, TypeError):
+        # Missing file or not a path; let the reader handle it
+        return reader(fname, **kwargs)
+    path = sidecar_path(fname)
+    key = _variant_key(reader, kwargs)
+    df = _load_variant(path, fingerprint, key)
+    if df is not None:
+        logger.debug("Read %s from sidecar", fname)
+        return df
+
+    df = reader(fname, **kwargs)
+    arrays = _to_arrays(df)
+    if arrays is None:
+        return df
+    try:
+        _store_variant(path, fingerprint, key, arrays)
+    except OSError as e:
+        logger.debug("Could not write sidecar %s: %s", path, e)
+    return df
+
+
+def read_th(fname, **kwargs):
+    """Drop-in replacement for :func:`schimpy.th_io.read_th` using a sidecar.
+
+    Parameters
+    ----------
+    fname : str or Path
+        ``.th`` file.
+    **kwargs
+        Passed to :func:`schimpy.th_io.read_th` (``time_basis``,
+        ``elapsed_unit``, ``head``, ...).
+    """
+    return read_with_sidecar(fname, _schimpy_read_th, **kwargs)
+
+
+def read_th_table(fname, **kwargs):
+    """Read a whitespace delimited ``.th`` file with :func:`pandas.read_csv`.
+
+    Equivalent to ``pd.read_csv(fname, sep=r"\\s+", **kwargs)`` but served
+    from the sidecar when the file has not changed.
+
+    Parameters
+    ----------
+    fname : str or Path
+        ``.th`` file.
+    **kwargs
+        Passed to :func:`pandas.read_csv`, e.g. ``header=None, index_col=0``.
+    """
+    return read_with_sidecar(fname, _read_whitespace, **kwargs)
+
+
+def _read_whitespace(fname, **kwargs):
+    return pd.read_csv(fname, sep=r"\s+", **kwargs)
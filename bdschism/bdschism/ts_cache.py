@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk cache for time series read while preparing boundaries.
+
+Reading DSS, csv, repository and NOAA series and re-interpolating them with
+``rhistinterp`` dominates the run time of repeated ``port_bc``,
+``gen_elev2d`` and ``plot_bds_bc`` calls with the same inputs. This module
+stores the resulting objects under a cache directory, keyed on a hash of
+
+* the name of the reader (``namespace``),
+* the call parameters (pathnames, time window, interpolation settings, ...),
+* the absolute path, size and modification time of every source file.
+
+Changing a source file therefore invalidates its entries automatically.
+Results that come from a repository or web service, where there is no
+single file to fingerprint, can be given a maximum age instead.
+
+Entries are pickled because that round-trips pandas objects exactly,
+including ``PeriodIndex`` and index ``freq``, which downstream code relies
+on. Each entry starts with a small header recording when it was written,
+which is what a maximum age is compared against; the file modification
+time only tracks use. When the total size of the cache exceeds the
+configured limit, the least recently used entries are removed.
+
+The cache is configured in ``bds_config.yaml``::
+
+    ts_cache:
+      enabled: true
+      dir: ~/.cache/bdschism/ts_cache
+      max_size_mb: 2048
+      repo_max_age_hours: 24
+
+Setting the environment variable ``BDS_TS_CACHE=0`` disables it for a run.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+from bdschism.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_EXT = ".pkl"
+_HEADER = "bdschism.ts_cache"
+_FORMAT_VERSION = 1
+
+
+class TimeSeriesCache:
+    """Content-addressed pickle store with size-based LRU eviction.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory holding the cache entries. Created if missing.
+    max_size_mb : float
+        Upper bound on the total size of the entries in megabytes.
+    """
+
+    def __init__(self, cache_dir, max_size_mb=2048):
+        self.cache_dir = os.path.abspath(os.path.expanduser(str(cache_dir)))
+        self.max_size = int(float(max_size_mb) * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(path):
+        """Return a JSON-serializable identity of a source file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the source file.
+
+        Returns
+        -------
+        list
+            Absolute path, size and modification time in nanoseconds.
+        """
+        path = os.path.abspath(str(path))
+        st = os.stat(path)
+        return [path, st.st_size, st.st_mtime_ns]
+
+    def key(self, namespace, sources=(), **params):
+        """Build the cache key for a call.
+
+        Parameters
+        ----------
+        namespace : str
+            Name of the reader, e.g. ``"read_dss"``.
+        sources : iterable of str
+            Source files whose content determines the result. Glob patterns
+            are expanded.
+        **params
+            Remaining call parameters. Values are converted with ``repr``
+            so timestamps, timedeltas and lists can be used directly.
+
+        Returns
+        -------
+        str
+            Hex digest identifying the entry.
+        """
+        files = []
+        for src in sources:
+            src = str(src)
+            matches = sorted(glob.glob(src)) if any(c in src for c in "*?[") else [src]
+            files.extend(self.fingerprint(f) for f in matches)
+        payload = json.dumps(
+            {
+                "namespace": namespace,
+                "sources": files,
+                "params": {k: repr(params[k]) for k in sorted(params)},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + _EXT)
+
+    def get(self, key, max_age=None):
+        """Return the cached object for ``key`` or None if missing or stale.
+
+        Parameters
+        ----------
+        key : str
+            Key from :meth:`key`.
+        max_age : float, optional
+            Maximum age in seconds since the entry was written. Reading an
+            entry does not make it younger.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = pickle.load(f)
+                if not (
+                    isinstance(header, tuple)
+                    and len(header) == 3
+                    and header[:2] == (_HEADER, _FORMAT_VERSION)
+                ):
+                    # Written by an older version without the write time
+                    self._remove(path)
+                    return None
+                if max_age is not None and time.time() - header[2] > max_age:
+                    return None
+                obj = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+            self._remove(path)
+            return None
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key, obj):
+        """Store ``obj`` under ``key`` and evict old entries if needed."""
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                header = (_HEADER, _FORMAT_VERSION, time.time())
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except Exception:
+            self._remove(tmp)
+            raise
+        self.evict()
+
+    def entries(self):
+        """List ``(path, size, last_used)`` for every entry, oldest first."""
+        out = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*" + _EXT)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out.append((path, st.st_size, st.st_mtime))
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def evict(self):
+        """Remove least recently used entries until the size limit is met."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_config = None
+
+
+def get_cache():
+    """Return the configured :class:`TimeSeriesCache`, or None if disabled.
+
+    The configuration is read from the ``ts_cache`` section of the bdschism
+    settings (see :func:`bdschism.settings.get_settings`).
+    """
+    global _cache, _cache_config
+    if os.getenv("BDS_TS_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    cfg = get_settings().get("ts_cache", None)
+    if not cfg or not cfg.get("enabled", True):
+        return None
+    config = (cfg.get("dir"), cfg.get("max_size_mb", 2048))
+    if _cache is None or config != _cache_config:
+        _cache = TimeSeriesCache(config[0], config[1])
+        _cache_config = config
+    return _cache
+
+
+def repo_max_age():
+    """Maximum age in seconds for entries read from a repository or web service."""
+    cfg = get_settings().get("ts_cache", None) or {}
+    hours = cfg.get("repo_max_age_hours", 24)
+    return None if hours is None else float(hours) * 3600.0
+
+
+def cached_call(namespace, func, *args, sources=(), max_age=None, key_params=None, **kwargs):
+    """Call ``func(*args, **kwargs)`` through the time series cache.
+
+    Parameters
+    ----------
+    namespace : str
+        Name of the reader, part of the key.
+    func : callable
+        Function producing the result on a cache miss.
+    *args, **kwargs
+        Arguments for ``func``. They are part of the key unless
+        ``key_params`` is given.
+    sources : iterable of str
+        Source files whose size and modification time are part of the key.
+    max_age : float, optional
+        Maximum age of a reusable entry in seconds.
+    key_params : dict, optional
+        Explicit parameters to key on instead of ``args``/``kwargs``.
+
+    Returns
+    -------
+    object
+        The cached or freshly computed result.
+    """
+    cache = get_cache()
+    if cache is None:
+        return func(*args, **kwargs)
+    if key_params is None:
+        key_params = {"args": args, **kwargs}
+    try:
+        key = cache.key(namespace, sources=sources, **key_params)
+    except OSError:
+        # A source file is missing; let the reader raise its own error
+        return func(*args, **kwargs)
+    obj = cache.get(key, max_age=max_age)
+    if obj is not None:
+        logger.debug("Cache hit for %s (%s)", namespace, key[:12])
+        return obj
+    obj = func(*args, **kwargs)
+    try:
+        cache.put(key, obj)
+    except Exception as e:
+        logger.warning("Could not cache %s result: %s", namespace, e)
+    return obj
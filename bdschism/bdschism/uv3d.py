@@ -4,8 +4,13 @@ import bdschism.settings as config
 import os
 import shutil
 import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import xarray as xr
+
+from bdschism.combine_nc import NCTimeCombiner
+
 
 def interpolate_uv3d(
     param_nml,
@@ -204,8 +209,9 @@ def interpolate_uv3d(
         f"Running interpolate_variables utility in "
         f"{os.path.abspath(os.path.join(bg_dir, bg_output_dir))}"
     )
-    os.chdir(os.path.abspath(interp_dir))
-    config.interpolate_variables()
+    # Run in interp_dir without changing the process-wide working directory
+    # so that several interpolations can run side by side (see batch_uv3d).
+    config.interpolate_variables(cwd=interp_dir)
 
     #
     # Move the resulting file to output_dir
@@ -425,8 +431,6 @@ def single_uv3d(
     """
     Process a single uv3d output file for the specified nfile index.
     """
-    base_dir = os.path.abspath(bg_dir)
-
     # Determine outputs directory to link to tmp dir
     if bg_output_dir is None:
         if os.path.exists(os.path.join(bg_dir, "outputs.tropic")):
@@ -471,8 +475,6 @@ def single_uv3d(
         )
 
     finally:
-        os.chdir(base_dir)
-        print(f"\nCurrent dir: {os.getcwd()}")
         if cleanup and os.path.exists(tmp_bg_output_dir):
             print(f"\nDeleting temporary directory {tmp_bg_output_dir}...")
             shutil.rmtree(tmp_bg_output_dir)
@@ -606,6 +608,360 @@ def single_uv3d_cli(
         bnd_seg
     )
 
+def uv3d_output_is_valid(path):
+    """Check whether a per-stack uv3d file exists and is complete enough to reuse.
+
+    A file is considered valid if it can be opened, contains the
+    ``time_series`` variable and has at least one time step.
+
+    Parameters
+    ----------
+    path : str
+        Path to a uv3d_<N>.th.nc file.
+
+    Returns
+    -------
+    bool
+        True if the file can be reused, False if it must be (re)generated.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    try:
+        with xr.open_dataset(path, decode_times=False) as ds:
+            return "time_series" in ds.variables and ds.sizes.get("time", 0) > 0
+    except Exception:
+        return False
+
+
+def batch_uv3d(
+    start=1,
+    end=None,
+    param_nml=None,
+    bg_dir="./",
+    bg_output_dir=None,
+    fg_dir=None,
+    hgrid_bg="hgrid.gr3",
+    hgrid_fg="hgrid.gr3",
+    vgrid_bg="vgrid.in.2d",
+    vgrid_fg="vgrid.in.3d",
+    out_dir="./",
+    nproc=None,
+    overwrite=False,
+    cleanup=True,
+    bnd_seg=None,
+    combine=None,
+    reset_time=False,
+):
+    """Generate uv3d files for a range of output stacks with a process pool.
+
+    Each stack is handled by :func:`single_uv3d` in its own
+    ``tmp_outputs_<N>`` directory, so the jobs are independent and can run
+    concurrently. Stacks whose ``uv3d_<N>.th.nc`` already exists in
+    ``out_dir`` and passes :func:`uv3d_output_is_valid` are skipped unless
+    ``overwrite`` is set, which makes an interrupted batch resumable.
+
+    Parameters
+    ----------
+    start : int
+        First output stack index (inclusive).
+    end : int or None
+        Last output stack index (inclusive). If None, rnday is read from
+        ``param_nml`` (default: param.nml in bg_dir).
+    param_nml : str or None
+        Path to the background param.nml, used only to infer ``end``.
+    bg_dir, bg_output_dir, fg_dir, hgrid_bg, hgrid_fg, vgrid_bg, vgrid_fg
+        See :func:`single_uv3d`.
+    out_dir : str
+        Directory where the uv3d_<N>.th.nc files are written.
+    nproc : int or None
+        Number of concurrent jobs. Defaults to the number of CPUs.
+    overwrite : bool
+        Regenerate stacks even if a valid output already exists.
+    cleanup : bool
+        Remove each temporary directory after its job finishes.
+    bnd_seg : list of int or None
+        Boundary segments to be interpolated.
+    combine : str or None
+        If given, the per-stack files are streamed into this combined file
+        in stack order as they finish.
+    reset_time : bool
+        Passed on to :class:`bdschism.combine_nc.NCTimeCombiner`.
+
+    Returns
+    -------
+    list of str
+        Paths of the per-stack uv3d files in stack order.
+    """
+    bg_dir = os.path.abspath(bg_dir)
+    if bg_output_dir is None:
+        if os.path.exists(os.path.join(bg_dir, "outputs.tropic")):
+            bg_output_dir = os.path.join(bg_dir, "outputs.tropic")
+        elif os.path.exists(os.path.join(bg_dir, "outputs")):
+            bg_output_dir = os.path.join(bg_dir, "outputs")
+        else:
+            raise ValueError(
+                f"No output directory found in {bg_dir} (tried outputs.tropic and outputs)"
+            )
+    bg_output_dir = os.path.abspath(bg_output_dir)
+
+    if end is None:
+        if param_nml is None:
+            param_nml = os.path.join(bg_dir, "param.nml")
+        end = int(param.read_params(param_nml)["rnday"])
+        print(f"Last stack not specified. Using rnday={end} from {param_nml}.")
+    if end < start:
+        raise ValueError(f"end ({end}) must not be smaller than start ({start})")
+
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    nproc = nproc or os.cpu_count() or 1
+
+    outputs = {
+        nfile: os.path.join(out_dir, f"uv3d_{nfile}.th.nc")
+        for nfile in range(start, end + 1)
+    }
+    todo = []
+    for nfile, path in outputs.items():
+        if not overwrite and uv3d_output_is_valid(path):
+            continue
+        todo.append(nfile)
+    print(
+        f"{len(outputs) - len(todo)} of {len(outputs)} stacks already have valid "
+        f"output in {out_dir}; processing {len(todo)} with {nproc} workers."
+    )
+
+    job_args = dict(
+        param_nml=param_nml,
+        bg_dir=bg_dir,
+        bg_output_dir=bg_output_dir,
+        fg_dir=fg_dir,
+        hgrid_bg=hgrid_bg,
+        hgrid_fg=hgrid_fg,
+        vgrid_bg=vgrid_bg,
+        vgrid_fg=vgrid_fg,
+        out_dir=out_dir,
+        overwrite=True,  # invalid leftovers are replaced
+        cleanup=cleanup,
+        bnd_seg=bnd_seg,
+    )
+    # Finished stacks are appended to the combined file in stack order as soon
+    # as every earlier stack is available, so the combine overlaps with the
+    # remaining interpolation jobs.
+    combiner = NCTimeCombiner(combine, reset_time=reset_time) if combine else None
+    ready = set(outputs) - set(todo)
+    pending = iter(sorted(outputs))
+    next_nfile = next(pending, None)
+
+    def flush():
+        nonlocal next_nfile
+        while combiner is not None and next_nfile in ready:
+            combiner.append(outputs[next_nfile])
+            next_nfile = next(pending, None)
+
+    failed = {}
+    try:
+        flush()
+        if todo:
+            with ProcessPoolExecutor(max_workers=min(nproc, len(todo))) as pool:
+                futures = {
+                    pool.submit(single_uv3d, nfile, **job_args): nfile
+                    for nfile in todo
+                }
+                for ndone, future in enumerate(as_completed(futures), start=1):
+                    nfile = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed[nfile] = e
+                        print(f"[{ndone}/{len(todo)}] stack {nfile} failed: {e}")
+                        continue
+                    print(f"[{ndone}/{len(todo)}] stack {nfile} done.")
+                    ready.add(nfile)
+                    if not failed:
+                        flush()
+
+        if failed:
+            raise RuntimeError(
+                f"uv3d generation failed for stacks {sorted(failed)}. "
+                "Rerun the same command to retry only the missing stacks."
+            )
+        flush()
+    except BaseException:
+        if combiner is not None:
+            combiner.abort()
+        raise
+
+    if combiner is not None:
+        combiner.close()
+        print(f"\nOutfile written to : {combine}")
+    return [outputs[nfile] for nfile in sorted(outputs)]
+
+
+@click.command(
+    help=(
+        "Generate uv3d boundary files for a range of SCHISM output stacks in parallel.\n\n"
+        "Runs the uv3d_single workflow for every stack from START to END with a "
+        "pool of worker processes, each in its own temporary folder. Stacks that "
+        "already have a valid uv3d_<N>.th.nc in --out-dir are skipped, so an "
+        "interrupted batch can simply be rerun.\n\n"
+        "Example:\n"
+        "  bds uv3d_batch --start 1 --end 365 -n 32 --out-dir uv3d --combine uv3D.th.nc"
+    )
+)
+@click.option(
+    "--start",
+    default=1,
+    show_default=True,
+    type=int,
+    help="First output stack index to process.",
+)
+@click.option(
+    "--end",
+    default=None,
+    type=int,
+    help="Last output stack index to process. If None, rnday is parsed from param.nml.",
+)
+@click.option(
+    "--param",
+    default=None,
+    type=click.Path(exists=True),
+    help="Name of parameter file (default: param.nml in bg_dir).",
+)
+@click.option(
+    "--bg-dir",
+    default=".",
+    type=click.Path(exists=True),
+    help=(
+        "Background simulation directory (e.g., larger or barotropic) "
+        "(default: current directory)."
+    ),
+)
+@click.option(
+    "--bg-output-dir",
+    default=None,
+    type=click.Path(),
+    help="Output directory in background. If None, will try outputs.tropic then outputs.",
+)
+@click.option(
+    "--fg-dir",
+    default=None,
+    type=click.Path(),
+    help=(
+        "Foreground baroclinic run directory used for fg hgrid/vgrid links. "
+        "If None, will use bg_dir."
+    ),
+)
+@click.option(
+    "--hgrid-bg",
+    default="hgrid.gr3",
+    type=click.Path(),
+    help="Name of hgrid.gr3 file in bg_dir, which will be linked to bg.gr3.",
+)
+@click.option(
+    "--hgrid-fg",
+    default="hgrid.gr3",
+    type=click.Path(),
+    help="Name of hgrid.gr3 file in fg_dir, which will be linked to fg.gr3.",
+)
+@click.option(
+    "--vgrid-bg",
+    default="vgrid.in.2d",
+    type=click.Path(),
+    help="Name of the (2D barotropic) vgrid file in bg_dir.",
+)
+@click.option(
+    "--vgrid-fg",
+    default="vgrid.in.3d",
+    type=click.Path(),
+    help="Name of the (3D) baroclinic vgrid file in fg_dir.",
+)
+@click.option(
+    "-o",
+    "--out-dir",
+    default="./",
+    show_default=True,
+    type=click.Path(),
+    help="Directory where the generated uv3d_<N>.th.nc files will be written.",
+)
+@click.option(
+    "-n",
+    "--nproc",
+    default=None,
+    type=int,
+    help="Number of concurrent jobs (default: number of CPUs).",
+)
+@click.option(
+    "--overwrite",
+    is_flag=True,
+    help="Regenerate stacks even if a valid uv3d file already exists.",
+)
+@click.option(
+    "--cleanup/--no-cleanup",
+    default=True,
+    show_default=True,
+    help="Remove temporary linked files after interpolation.",
+)
+@click.option(
+    "--bnd-seg", "-b",
+    default=None,
+    multiple=True,
+    type=int,
+    help="Listing of boundary segments to be interpolated.\
+        Example: --b 1 -b 2 -b 4 (segments 1, 2, and 4).",
+)
+@click.option(
+    "--combine",
+    default=None,
+    type=click.Path(),
+    help="If given, stream the per-stack files into this combined output file as they finish.",
+)
+@click.option(
+    "--reset-time",
+    is_flag=True,
+    help="Reset the time coordinate of the combined file to start from zero.",
+)
+@click.help_option("-h", "--help")
+def batch_uv3d_cli(
+    start,
+    end,
+    param,
+    bg_dir,
+    bg_output_dir,
+    fg_dir,
+    hgrid_bg,
+    hgrid_fg,
+    vgrid_bg,
+    vgrid_fg,
+    out_dir,
+    nproc,
+    overwrite,
+    cleanup,
+    bnd_seg,
+    combine,
+    reset_time,
+):
+    """Generate uv3d files for output stacks START..END in parallel."""
+    batch_uv3d(
+        start,
+        end,
+        param,
+        bg_dir,
+        bg_output_dir,
+        fg_dir,
+        hgrid_bg,
+        hgrid_fg,
+        vgrid_bg,
+        vgrid_fg,
+        out_dir,
+        nproc,
+        overwrite,
+        cleanup,
+        bnd_seg,
+        combine,
+        reset_time,
+    )
+
+
 if __name__ == "__main__":
     interpolate_uv3d_cli()
     # single_uv3d_cli()
@@ -12,10 +12,20 @@ be truncated at that point.
 
 usage: --start 2004-04-18 --x2route x2route.bp
 output: x2 on surface and bottom location time series in csv format, bottom_x2.csv and surface_x2.csv
+
+For a whole run, ``bds x2_time_series`` reads salinity along the route
+directly from the ``salinity_*.nc`` output stacks (in parallel) or from
+several fort.18 files, and computes daily or tidally averaged X2 for all
+days at once with the vectorized crossing search :func:`x2_crossing`.
 """
 
 import numpy as np
 import argparse
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from netCDF4 import Dataset
 
 import datetime as dtm
 import matplotlib.pyplot as plt
@@ -28,6 +38,9 @@ from dateutil.parser import parse
 import re
 import os
 
+from bdschism.extract_xyt import PointLocator
+from bdschism.read_fort18 import read_xyz
+
 
 # plt.style.use(['seaborn-talk','seaborn-colorblind'])
 def create_arg_parser():
@@ -57,21 +70,43 @@ def create_arg_parser():
 
 
 def find_x2(transect, thresh=2.0, convert_km=0.001, distance_bias=0.0):
+    """Locate the distance at which a transect first drops below ``thresh``.
+
+    Parameters
+    ----------
+    transect : pandas.Series or pandas.DataFrame
+        Salinity indexed by distance (Series), or indexed by time with one
+        column per distance (DataFrame).
+    thresh : float or sequence of float, optional
+        Isohaline salinity, or several of them, e.g. ``(2.0, 1.0, 0.5)``.
+    convert_km : float, optional
+        Factor converting distance to the output unit.
+    distance_bias : float, optional
+        Subtracted from the converted distance.
+
+    Returns
+    -------
+    float, numpy.ndarray, pandas.Series or pandas.DataFrame
+        For a Series, the crossing distance (an array for several
+        thresholds). For a DataFrame, a Series of crossings per row (a
+        DataFrame with one column per threshold for several thresholds).
+
+    See Also
+    --------
+    x2_crossing : the kernel, which interpolates between transect points.
     """
-    Given a series transect, indexed by distance, locate a distance with value is close to thresh
-    """
-    midpoints = transect.index.to_series() + transect.index.to_series().shift(1)
-    index_new = (
-        pd.concat((transect.index.to_series(), midpoints), axis=0)
-        .sort_values()
-        .iloc[0:-1]
-    )
-    row_new = transect.reindex(index_new).interpolate().sort_values()
-    index_x2 = row_new.searchsorted(2.0)
-    index_x2 = index_x2.clip(max=len(row_new) - 1)
-    x2 = row_new.index[index_x2.clip(max=len(row_new) - 1)]
-    final_x2 = x2 * convert_km - distance_bias
-    return final_x2
+    if isinstance(transect, pd.Series):
+        distance = transect.index
+        values = transect.to_numpy()[np.newaxis, :]
+    else:
+        distance = transect.columns
+        values = transect.to_numpy()
+    x = x2_crossing(values, distance, thresh) * convert_km - distance_bias
+    if isinstance(transect, pd.Series):
+        return x[0]
+    if np.ndim(thresh) == 0:
+        return pd.Series(x, index=transect.index, name="x2")
+    return pd.DataFrame(x, index=transect.index, columns=_isohaline_names(thresh))
 
 
 def get_start_date_from_param(param_in):
@@ -107,7 +142,10 @@ def process_x2(
     print(
         f"salt_data_file: {salt_data_file} model_start_date={model_start_date} output_file={output_file} model_extract_date={model_extract_date}"
     )
-    ts_out = pd.read_csv(salt_data_file, sep=r"\s+", header=None, index_col=0)
+    elapsed, values = read_xyz(salt_data_file)
+    ts_out = pd.DataFrame(
+        values, index=elapsed, columns=range(1, values.shape[1] + 1)
+    )
     if len(ts_out) > 1:
         delta_t = round((ts_out.index[1] - ts_out.index[0]) * 24 * 60)
         freqstr = f"{int(delta_t)}min"
@@ -143,12 +181,363 @@ def process_x2(
 
     ts_out.columns = route_df.distance
     ts_out = ts_out.head(1)
-    x2_prelim = ts_out.apply(find_x2, axis=1)
+    x2_prelim = find_x2(ts_out)
     x2_prelim.index.name = "date"
-    x2_prelim.name = "x2"
     x2_prelim.to_csv(output_file, float_format="%.1f")
 
 
+# ---------------------------------------------------------------------------
+# Multi-stack X2 engine
+# ---------------------------------------------------------------------------
+
+# Tidal day (two M2 periods) in hours, the window of the "tidal" X2 average
+TIDAL_DAY_HOURS = 24.8412
+
+
+def read_x2_route(route):
+    """X2 transect points as a DataFrame with ``x``, ``y``, ``z`` and ``distance``.
+
+    Parameters
+    ----------
+    route : str or pandas.DataFrame
+        Build point file written by :func:`bdschism.x2_buildpoints.x2_route2_bp`,
+        or the DataFrame it returns.
+    """
+    if isinstance(route, pd.DataFrame):
+        route_df = route
+    elif str(route).endswith("bp"):
+        route_df = pd.read_csv(
+            route, sep=r"\s+", index_col=0, skiprows=[1], header=0, comment="!"
+        )
+    else:
+        raise ValueError("Build point file expected")
+    missing = {"x", "y", "z", "distance"} - set(route_df.columns)
+    if missing:
+        raise ValueError(f"X2 route is missing column(s) {sorted(missing)}")
+    return route_df[["x", "y", "z", "distance"]].astype(float)
+
+
+def _isohaline_names(thresh):
+    """Column names ``x2``, ``x1``, ``x0.5``... for a sequence of thresholds."""
+    return [f"x{t:g}" for t in np.atleast_1d(thresh)]
+
+
+def x2_crossing(salt, distance, thresh=2.0):
+    """Distance of the first upstream crossing of ``thresh`` on each row.
+
+    Scanning each row from the seaward end, the crossing lies between the
+    last point at or above ``thresh`` and the first point below it, and is
+    located by linear interpolation. Points further upstream are ignored, so
+    a transect that rises above ``thresh`` again upstream does not move the
+    crossing. Rows entirely below ``thresh`` return the first distance and
+    rows entirely at or above it the last distance, so X2 is truncated at
+    the ends of the transect. NaN values are treated as not below
+    ``thresh``.
+
+    Parameters
+    ----------
+    salt : array_like
+        Salinity, shape ``(ntime, npoint)``, points ordered seaward to
+        upstream.
+    distance : array_like
+        Distance of each point along the transect, increasing.
+    thresh : float or sequence of float, optional
+        Salinity of the isohaline. Several thresholds (e.g. X2, X1 and X0.5)
+        are located in the same pass.
+
+    Returns
+    -------
+    numpy.ndarray
+        Crossing distance in the units of ``distance``, shape ``(ntime,)``
+        for a scalar ``thresh`` and ``(ntime, nthresh)`` otherwise.
+    """
+    salt = np.atleast_2d(np.asarray(salt, dtype=float))
+    distance = np.asarray(distance, dtype=float)
+    scalar = np.ndim(thresh) == 0
+    thresh = np.atleast_1d(np.asarray(thresh, dtype=float))
+    # (ntime, nthresh, npoint)
+    below = salt[:, np.newaxis, :] < thresh[np.newaxis, :, np.newaxis]
+    first = np.argmax(below, axis=2)
+    upper = np.maximum(first - 1, 0)
+    s0 = np.take_along_axis(salt, upper, axis=1)
+    s1 = np.take_along_axis(salt, first, axis=1)
+    d0 = distance[upper]
+    d1 = distance[first]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = d0 + (s0 - thresh) / (s0 - s1) * (d1 - d0)
+    x = np.where(np.isfinite(x), x, d1)
+    x = np.where(first == 0, distance[0], x)
+    x = np.where(below.any(axis=2), x, distance[-1])
+    return x[:, 0] if scalar else x
+
+
+def _available_stacks(output_dir):
+    pattern = re.compile(r"salinity_(\d+)\.nc$")
+    stacks = []
+    for fname in glob.glob(os.path.join(output_dir, "salinity_*.nc")):
+        m = pattern.search(os.path.basename(fname))
+        if m:
+            stacks.append(int(m.group(1)))
+    return sorted(stacks)
+
+
+def _stack_route_salinity(output_dir, stack, nodes, weights, surface, chunk_steps):
+    """Salinity of one stack at the route points, shape ``(nstep, npoint)``.
+
+    Values are taken at the surface or bottom level of each mesh node and
+    combined with the barycentric weights of the point, ignoring dry or
+    missing nodes.
+    """
+    uniq, inv = np.unique(nodes, return_inverse=True)
+    inv = inv.reshape(nodes.shape)
+    with Dataset(os.path.join(output_dir, f"out2d_{stack}.nc"), "r") as out2d:
+        bottom = np.asarray(out2d.variables["bottom_index_node"][:], dtype=np.int64)
+        bottom = bottom[uniq] - 1
+    with Dataset(os.path.join(output_dir, f"salinity_{stack}.nc"), "r") as src:
+        times = np.asarray(src.variables["time"][:], dtype=float)
+        salt_var = src.variables["salinity"]
+        nlevel = salt_var.shape[-1]
+        level = np.where(surface[:, None], nlevel - 1, bottom[inv])
+        out = np.empty((len(times), len(nodes)))
+        for t0 in range(0, len(times), chunk_steps):
+            t1 = min(t0 + chunk_steps, len(times))
+            block = np.ma.filled(salt_var[t0:t1, uniq, :].astype(float), np.nan)
+            vals = block[:, inv, level]  # (nstep, npoint, 3)
+            ok = np.isfinite(vals)
+            w = np.where(ok, weights, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[t0:t1] = (np.where(ok, vals, 0.0) * w).sum(axis=-1) / w.sum(axis=-1)
+    return stack, times, out
+
+
+def native_route_salinity(
+    output_dir, route, start, first_stack=None, last_stack=None, nproc=None, chunk_steps=48
+):
+    """Salinity along an X2 route from SCHISM ``salinity_*.nc`` output stacks.
+
+    The route points are located on the grid once; each stack is then read
+    in blocks of time steps, only at the nodes surrounding the route, and
+    stacks are processed in parallel.
+
+    Parameters
+    ----------
+    output_dir : str
+        SCHISM outputs directory with out2d_N.nc and salinity_N.nc.
+    route : str or pandas.DataFrame
+        X2 route, see :func:`read_x2_route`. Points with ``z >= 0`` are
+        taken at the surface, others at the bottom.
+    start : str or datetime-like
+        Model start date.
+    first_stack, last_stack : int, optional
+        Inclusive stack range. Defaults to all salinity stacks found.
+    nproc : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_steps : int, optional
+        Number of time steps read at once.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Salinity indexed by time, one column per route distance.
+    """
+    route_df = read_x2_route(route)
+    stacks = _available_stacks(output_dir)
+    if first_stack is not None:
+        stacks = [s for s in stacks if s >= first_stack]
+    if last_stack is not None:
+        stacks = [s for s in stacks if s <= last_stack]
+    if not stacks:
+        raise ValueError(f"No salinity_*.nc stacks in range found in {output_dir}")
+
+    locator = PointLocator.from_out2d(os.path.join(output_dir, f"out2d_{stacks[0]}.nc"))
+    nodes, weights = locator.locate(route_df.x.values, route_df.y.values)
+    surface = route_df.z.values >= 0.0
+
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    nproc = max(1, min(nproc, len(stacks)))
+    args = (nodes, weights, surface, chunk_steps)
+    if nproc == 1:
+        results = [_stack_route_salinity(output_dir, s, *args) for s in stacks]
+    else:
+        with ProcessPoolExecutor(max_workers=nproc) as pool:
+            futures = [
+                pool.submit(_stack_route_salinity, output_dir, s, *args) for s in stacks
+            ]
+            results = [f.result() for f in futures]
+
+    times = np.concatenate([r[1] for r in results])
+    values = np.concatenate([r[2] for r in results])
+    index = (pd.Timestamp(start) + pd.to_timedelta(times, unit="s")).round("min")
+    df = pd.DataFrame(values, index=index, columns=route_df.distance.values)
+    df.index.name = "datetime"
+    return df[~df.index.duplicated(keep="first")]
+
+
+def fort18_route_salinity(salt_data_files, route, model_start_date):
+    """Salinity along an X2 route from one or more ``read_output*_xyz`` fort.18 files.
+
+    Parameters
+    ----------
+    salt_data_files : str or list of str
+        fort.18 files with one column per route point, e.g. one per
+        extraction period of a run.
+    route : str or pandas.DataFrame
+        X2 route, see :func:`read_x2_route`.
+    model_start_date : datetime-like
+        Model start date that elapsed times in the files refer to.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Salinity indexed by time, one column per route distance.
+    """
+    if isinstance(salt_data_files, str):
+        salt_data_files = [salt_data_files]
+    route_df = read_x2_route(route)
+    start = pd.Timestamp(model_start_date)
+    frames = []
+    for fname in salt_data_files:
+        elapsed, values = read_xyz(fname)
+        if values.shape[1] != len(route_df):
+            raise ValueError(
+                f"Number of columns in salt output {values.shape[1]} of {fname} must "
+                f"match number of locations in bp file {len(route_df)}"
+            )
+        index = (start + pd.to_timedelta(elapsed, unit="D")).round("min")
+        frames.append(pd.DataFrame(values, index=index, columns=route_df.distance.values))
+    df = pd.concat(frames).sort_index()
+    df.index.name = "datetime"
+    return df[~df.index.duplicated(keep="first")]
+
+
+def x2_from_salinity(
+    salt, period="daily", thresh=2.0, convert_km=0.001, distance_bias=0.0
+):
+    """X2 time series from salinity along a transect.
+
+    Parameters
+    ----------
+    salt : pandas.DataFrame
+        Salinity indexed by time with one column per transect distance, as
+        returned by :func:`native_route_salinity` or
+        :func:`fort18_route_salinity`.
+    period : {"daily", "tidal"}, optional
+        ``"daily"`` averages salinity over each calendar day. ``"tidal"``
+        averages it over a centered tidal day (:data:`TIDAL_DAY_HOURS`) at
+        every output time; times without a full window are dropped.
+    thresh : float or sequence of float, optional
+        Salinity of the isohaline, or several of them.
+    convert_km : float, optional
+        Factor converting transect distance to the output unit.
+    distance_bias : float, optional
+        Subtracted from the converted distance.
+
+    Returns
+    -------
+    pandas.Series or pandas.DataFrame
+        X2 for every day or output time, or one column per threshold
+        (``x2``, ``x1``, ``x0.5``...) for several thresholds.
+    """
+    if period == "daily":
+        avg = salt.resample("1D").mean()
+    elif period == "tidal":
+        dt = (salt.index[1] - salt.index[0]) if len(salt) > 1 else pd.Timedelta("1h")
+        window = max(1, int(round(pd.Timedelta(hours=TIDAL_DAY_HOURS) / dt)))
+        avg = salt.rolling(window, center=True, min_periods=window).mean().dropna(how="all")
+    else:
+        raise ValueError(f"Unknown period {period!r}, expected 'daily' or 'tidal'")
+    x2 = find_x2(avg, thresh, convert_km=convert_km, distance_bias=distance_bias)
+    x2.index.name = "date" if period == "daily" else "datetime"
+    return x2
+
+
+@click.command()
+@click.option(
+    "--x2route",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="X2 route build point file, e.g. from x2_buildpoints.",
+)
+@click.option("--start", required=True, help="Model start date, e.g. 2021-04-20.")
+@click.option(
+    "--output-dir",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="SCHISM outputs directory with salinity_N.nc stacks.",
+)
+@click.option(
+    "--fort18",
+    "fort18_files",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="read_output*_xyz file(s) to use instead of output stacks; repeat for several.",
+)
+@click.option("--first-stack", type=int, default=None, help="First stack (inclusive).")
+@click.option("--last-stack", type=int, default=None, help="Last stack (inclusive).")
+@click.option(
+    "--period",
+    type=click.Choice(["daily", "tidal"]),
+    default="daily",
+    show_default=True,
+    help="Average salinity over calendar days or over a running tidal day.",
+)
+@click.option(
+    "--thresh",
+    type=float,
+    multiple=True,
+    default=[2.0],
+    show_default=True,
+    help="Isohaline salinity; repeat for several, e.g. --thresh 2 --thresh 1 --thresh 0.5.",
+)
+@click.option("-n", "--nproc", type=int, default=None, help="Number of worker processes.")
+@click.option(
+    "--chunk-steps",
+    type=int,
+    default=48,
+    show_default=True,
+    help="Time steps read at once per worker.",
+)
+@click.option("-o", "--out", default=None, help="Output CSV file. Default derived from --x2route.")
+@click.help_option("-h", "--help")
+def x2_time_series_cli(
+    x2route,
+    start,
+    output_dir,
+    fort18_files,
+    first_stack,
+    last_stack,
+    period,
+    thresh,
+    nproc,
+    chunk_steps,
+    out,
+):
+    """X2 time series for a whole run from output stacks or fort.18 files.
+
+    Example:
+
+        bds x2_time_series --x2route x2_bay_sac.bp --start 2021-01-01 --output-dir outputs -n 8
+    """
+    if fort18_files:
+        salt = fort18_route_salinity(list(fort18_files), x2route, start)
+    elif output_dir is not None:
+        salt = native_route_salinity(
+            output_dir,
+            x2route,
+            start,
+            first_stack=first_stack,
+            last_stack=last_stack,
+            nproc=nproc,
+            chunk_steps=chunk_steps,
+        )
+    else:
+        raise click.UsageError("Give --output-dir or --fort18")
+    thresh = thresh[0] if len(thresh) == 1 else list(thresh)
+    x2 = x2_from_salinity(salt, period=period, thresh=thresh)
+    x2.to_csv(out or default_outname(x2route), float_format="%.1f")
+
+
 def default_outname(bpname):
     if "x2route" in bpname:
         return bpname.replace("x2route", "x2").replace("bp", "csv")
@@ -5,47 +5,149 @@ Created on Fri May  5 09:45:12 2023
 @author: qshu
 """
 
+import numba
 import numpy as np
 
 
+# ---------------------------------------------------------------------------
+# Mesh topology in CSR (compressed sparse row) form
+# ---------------------------------------------------------------------------
+
+
+def _face_table(ele_table):
+    """Return face nodes as a float array with NaN for masked entries."""
+    return np.ma.filled(np.ma.asarray(ele_table, dtype=float), np.nan)
+
+
+def face_nodes_csr(ele_table):
+    """Convert a ``SCHISM_hgrid_face_nodes`` table to CSR form.
+
+    Parameters
+    ----------
+    ele_table : array_like
+        One-based node ids, shape ``(num_ele, max_node_in_a_cell)``. Unused
+        slots may be masked, NaN or non-positive (e.g. -1 in out2d files).
+
+    Returns
+    -------
+    face_ptr : numpy.ndarray
+        Offsets into ``face_idx``, length ``num_ele + 1``.
+    face_idx : numpy.ndarray
+        Zero-based node ids of each element, concatenated.
+    """
+    table = _face_table(ele_table)
+    valid = np.isfinite(table) & (table > 0)
+    counts = valid.sum(axis=1)
+    face_ptr = np.zeros(len(table) + 1, dtype=np.int64)
+    np.cumsum(counts, out=face_ptr[1:])
+    face_idx = table[valid].astype(np.int64) - 1
+    return face_ptr, face_idx
+
+
+def node_elements_csr(face_ptr, face_idx, num_node):
+    """Invert element -> node connectivity into node -> element CSR form.
+
+    Elements around each node are listed in increasing element order.
+
+    Parameters
+    ----------
+    face_ptr, face_idx : numpy.ndarray
+        Element connectivity from :func:`face_nodes_csr`.
+    num_node : int
+        Number of nodes.
+
+    Returns
+    -------
+    node_ptr : numpy.ndarray
+        Offsets into ``node_ele``, length ``num_node + 1``.
+    node_ele : numpy.ndarray
+        Zero-based element ids around each node, concatenated.
+    """
+    ele_of_entry = np.repeat(np.arange(len(face_ptr) - 1), np.diff(face_ptr))
+    order = np.argsort(face_idx, kind="stable")
+    node_ele = ele_of_entry[order]
+    node_ptr = np.zeros(num_node + 1, dtype=np.int64)
+    np.cumsum(np.bincount(face_idx, minlength=num_node), out=node_ptr[1:])
+    return node_ptr, node_ele
+
+
+@numba.jit(nopython=True, parallel=True)
+def _node_wet_dry_kernel(ele_wet_dry, node_ptr, node_ele, out):
+    """A node is dry (1) unless one of its elements is wet (0)."""
+    num_step = ele_wet_dry.shape[0]
+    num_node = len(node_ptr) - 1
+    for t in numba.prange(num_step):
+        for i in range(num_node):
+            dry = 1
+            for k in range(node_ptr[i], node_ptr[i + 1]):
+                if ele_wet_dry[t, node_ele[k]] == 0:
+                    dry = 0
+                    break
+            out[t, i] = dry
+
+
+def node_wet_dry_csr(ele_wet_dry, node_ptr, node_ele, out=None):
+    """Node wet/dry flags from element flags using node -> element CSR.
+
+    Parameters
+    ----------
+    ele_wet_dry : array_like
+        Element dry flags, shape ``(num_step, num_ele)``, 0 for wet.
+    node_ptr, node_ele : numpy.ndarray
+        Connectivity from :func:`node_elements_csr`.
+    out : numpy.ndarray, optional
+        Output array of shape ``(num_step, num_node)``.
+
+    Returns
+    -------
+    numpy.ndarray
+        1 where all elements around a node are dry, 0 otherwise.
+    """
+    ele_wet_dry = np.ascontiguousarray(ele_wet_dry)
+    if out is None:
+        out = np.zeros((ele_wet_dry.shape[0], len(node_ptr) - 1), dtype=np.int8)
+    _node_wet_dry_kernel(ele_wet_dry, node_ptr, node_ele, out)
+    return out
+
+
+def _neibor_table_to_csr(el, num_node, max_ele_at_node):
+    """Convert the NaN padded table of gen_node_neibor_ele to CSR form."""
+    el = np.asarray(el, dtype=float)[:num_node, :max_ele_at_node]
+    valid = ~np.isnan(el)
+    node_ptr = np.zeros(num_node + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=node_ptr[1:])
+    return node_ptr, el[valid].astype(np.int64)
+
+
 def gen_node_neibor_ele(mesh_node, max_node_in_a_cell, num_ele, num_node):
-    num_ele_at_node = (np.zeros((num_node))).astype(int)
-    for i in range(num_ele):
-        for j in range(max_node_in_a_cell):
-            if mesh_node[i][j] > 0:
-                nodeid = mesh_node[i][j] - 1
-                num_ele_at_node[nodeid] = num_ele_at_node[nodeid] + 1
-
-    max_ele_at_node = int(np.max(num_ele_at_node))
-    num_ele_at_node[:] = np.zeros((num_node)).astype(int)
-    out_neibor_ele = np.empty((num_node, max_ele_at_node))
-    out_neibor_ele[:, :] = np.nan
-    for i in range(num_ele):
-        for j in range(max_node_in_a_cell):
-            if mesh_node[i][j] > 0:
-                nodeid = mesh_node[i][j] - 1
-                loc = num_ele_at_node[nodeid]
-                out_neibor_ele[nodeid, loc] = i
-                num_ele_at_node[nodeid] = loc + 1
+    """Elements around each node as a NaN padded table.
+
+    Returns the table of shape ``(num_node, max_ele_at_node)`` and
+    ``max_ele_at_node``. See :func:`node_elements_csr` for the compact form.
+    """
+    table = _face_table(mesh_node)[:num_ele, :max_node_in_a_cell]
+    face_ptr, face_idx = face_nodes_csr(table)
+    node_ptr, node_ele = node_elements_csr(face_ptr, face_idx, num_node)
+    counts = np.diff(node_ptr)
+    max_ele_at_node = int(np.max(counts))
+    out_neibor_ele = np.full((num_node, max_ele_at_node), np.nan)
+    slot = np.arange(len(node_ele)) - np.repeat(node_ptr[:-1], counts)
+    out_neibor_ele[np.repeat(np.arange(num_node), counts), slot] = node_ele
     return out_neibor_ele, max_ele_at_node
 
 
 def gen_node_wet_dry(
     node_wet_dry, ele_wet_dry, num_step, num_node, max_ele_at_node, el
 ):
-    for t in range(num_step):
-        for i in range(num_node):
-            all_dry = True
-            for j in range(max_ele_at_node):
-                if not (np.isnan(el[i, j])):
-                    dry = ele_wet_dry[t, int(el[i, j])]
-                    if dry == 0:
-                        all_dry = False
-                        break
-            if all_dry:
-                node_wet_dry[t, i] = 1
-            else:
-                node_wet_dry[t, i] = 0
+    """Fill ``node_wet_dry`` from element flags and the table of gen_node_neibor_ele."""
+    node_ptr, node_ele = _neibor_table_to_csr(el, num_node, max_ele_at_node)
+    ele_wet_dry = np.asarray(ele_wet_dry)[:num_step]
+    if node_wet_dry.shape == (num_step, num_node) and node_wet_dry.flags.c_contiguous:
+        node_wet_dry_csr(ele_wet_dry, node_ptr, node_ele, out=node_wet_dry)
+    else:
+        node_wet_dry[:num_step, :num_node] = node_wet_dry_csr(
+            ele_wet_dry, node_ptr, node_ele
+        )
 
 
 def face_aver(node_depth_average, node_num, face_num, ele_table):
@@ -98,49 +200,54 @@ def quad_area(x1, y1, x2, y2, x3, y3, x4, y4):
     return a1 + a2
 
 
+def _ele_area(table, quad, node_x, node_y):
+    """Vectorized triangle_area/quad_area over all elements."""
+    x = np.asarray(node_x, dtype=float)
+    y = np.asarray(node_y, dtype=float)
+    i1 = table[:, 0].astype(np.int64) - 1
+    i2 = table[:, 1].astype(np.int64) - 1
+    i3 = table[:, 2].astype(np.int64) - 1
+    i4 = np.where(quad, table[:, 3], 1).astype(np.int64) - 1
+    x1, y1, x2, y2, x3, y3 = x[i1], y[i1], x[i2], y[i2], x[i3], y[i3]
+    x4, y4 = x[i4], y[i4]
+    tri = triangle_area(x1, y1, x2, y2, x3, y3)
+    quad_a = quad_area(x1, y1, x2, y2, x3, y3, x4, y4)
+    return np.where(quad, quad_a, tri)
+
+
+def element_areas(ele_table, node_x, node_y):
+    """Area of every element of a mesh.
+
+    Parameters
+    ----------
+    ele_table : array_like
+        One-based face node table; a masked, NaN or non-positive fourth
+        entry marks a triangle.
+    node_x, node_y : array_like
+        Node coordinates.
+
+    Returns
+    -------
+    numpy.ndarray
+        Element areas.
+    """
+    table = _face_table(ele_table)
+    if table.shape[1] > 3:
+        quad = np.isfinite(table[:, 3]) & (table[:, 3] > 0)
+    else:
+        quad = np.zeros(len(table), dtype=bool)
+    return _ele_area(table, quad, node_x, node_y)
+
+
 def fill_ele_area(face_num, ele_table, node_x, node_y, ele_area):
-    for k in range(face_num):
-        node_id_lst = ele_table[k, :]
-
-        i = node_id_lst[0] - 1
-        x1 = node_x[i]
-        y1 = node_y[i]
-        i = node_id_lst[1] - 1
-        x2 = node_x[i]
-        y2 = node_y[i]
-        i = node_id_lst[2] - 1
-        x3 = node_x[i]
-        y3 = node_y[i]
-        i = node_id_lst[3] - 1
-        if not (np.isfinite(i)):  ## schout use garbage
-            a = triangle_area(x1, y1, x2, y2, x3, y3)
-            ele_area[k] = a
-        else:
-            x4 = node_x[i]
-            y4 = node_y[i]
-            a = quad_area(x1, y1, x2, y2, x3, y3, x4, y4)
-            ele_area[k] = a
+    """Fill ``ele_area`` for schout tables, where a non-finite fourth node marks a triangle."""
+    table = _face_table(ele_table)[:face_num]
+    quad = np.isfinite(table[:, 3])  ## schout use garbage
+    ele_area[:face_num] = _ele_area(table, quad, node_x, node_y)
 
 
 def fill_ele_area510(face_num, ele_table, node_x, node_y, ele_area):
-    for k in range(face_num):
-        node_id_lst = ele_table[k, :]
-
-        i = node_id_lst[0] - 1
-        x1 = node_x[i]
-        y1 = node_y[i]
-        i = node_id_lst[1] - 1
-        x2 = node_x[i]
-        y2 = node_y[i]
-        i = node_id_lst[2] - 1
-        x3 = node_x[i]
-        y3 = node_y[i]
-        i = node_id_lst[3] - 1
-        if i == -2:  ## out2d use -1
-            a = triangle_area(x1, y1, x2, y2, x3, y3)
-            ele_area[k] = a
-        else:
-            x4 = node_x[i]
-            y4 = node_y[i]
-            a = quad_area(x1, y1, x2, y2, x3, y3, x4, y4)
-            ele_area[k] = a
+    """Fill ``ele_area`` for out2d tables, where a fourth node of -1 marks a triangle."""
+    table = _face_table(ele_table)[:face_num]
+    quad = np.isfinite(table[:, 3]) & (table[:, 3] != -1)  ## out2d use -1
+    ele_area[:face_num] = _ele_area(table, quad, node_x, node_y)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Benchmark block writes of the gen_elev2d time history writers.
+
+Writes a synthetic elev2D boundary (15-minute steps, ``--nnode`` ocean
+nodes) with ``write_all`` and with the per-step ``write_step`` loop that
+gen_elev2D used before. Checks that both give the same values. The
+per-step loop is slow, so by default it only writes the first
+``--step-years`` and its time is scaled to the full length.
+
+Usage (from the ``bdschism`` project directory)::
+
+    python -m benchmarks.bench_gen_elev2d_writer --years 20 --nnode 150
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import netCDF4 as nc
+import numpy as np
+
+from bdschism.gen_elev2d import BinaryTHWriter, NetCDFTHWriter
+
+DT = 900.0
+
+
+def synthetic_boundary(years, nnode, seed=0):
+    ntime = int(years * 365 * 86400 / DT)
+    t = np.arange(ntime) * DT
+    phase = np.random.default_rng(seed).uniform(0.0, 0.5, nnode)
+    vals = np.sin(2 * np.pi * t[:, np.newaxis] / 44712.0 + phase) + 1.0
+    return t, vals
+
+
+def _writer(path, nnode, ntime=None):
+    if path.endswith(".nc"):
+        return NetCDFTHWriter(path, nnode, "2005-01-01", DT, 0.0, "hgrid.gr3", ntime=ntime)
+    return BinaryTHWriter(path, nnode, None, ntime=ntime)
+
+
+def time_steps(path, times, vals):
+    writer = _writer(path, vals.shape[1])
+    start = time.perf_counter()
+    # write_step of the binary writer prints every step
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, (t, row) in enumerate(zip(times, vals)):
+            writer.write_step(i, t, row)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def time_block(path, times, vals):
+    start = time.perf_counter()
+    writer = _writer(path, vals.shape[1], ntime=len(times))
+    writer.write_all(times, vals)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def _read(path, nnode):
+    if path.endswith(".nc"):
+        with nc.Dataset(path) as ds:
+            return ds["time_series"][:, :, 0, 0]
+    return np.fromfile(path, dtype=np.float32).reshape(-1, nnode + 1)[:, 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=20.0, help="Length of the boundary")
+    parser.add_argument("--nnode", type=int, default=150, help="Number of ocean nodes")
+    parser.add_argument(
+        "--step-years", type=float, default=0.5,
+        help="Length written with the per-step loop",
+    )
+    args = parser.parse_args()
+
+    times, vals = synthetic_boundary(args.years, args.nnode)
+    nstep = min(len(times), int(args.step_years * 365 * 86400 / DT))
+    scale = len(times) / nstep
+    print(f"{len(times)} steps x {args.nnode} nodes, per-step loop on {nstep} steps")
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".th.nc", ".th"):
+            step_file = os.path.join(tmp, "step" + suffix)
+            block_file = os.path.join(tmp, "block" + suffix)
+            t_step = time_steps(step_file, times[:nstep], vals[:nstep]) * scale
+            t_block = time_block(block_file, times, vals)
+            same = np.array_equal(
+                _read(step_file, args.nnode), _read(block_file, args.nnode)[:nstep]
+            )
+            print(
+                f"  {suffix:7s} write_step {t_step:8.2f} s (scaled)"
+                f"  write_all {t_block:7.2f} s  x{t_step / t_block:7.1f}  identical={same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Benchmark bdschism.th_writer.write_th against DataFrame.to_csv.
+
+Writes a synthetic source/sink time history in the dated (header, ISO
+datetime) and elapsed (no header, seconds) layouts used for ``vsource.th``
+and ``vsink.th``. It checks that the files are byte-identical and reports
+the throughput of both writers.
+
+Usage (from the ``bdschism`` project directory)::
+
+    python -m benchmarks.bench_th_writer --years 2 --ncol 400
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bdschism.th_writer import write_th
+
+
+def synthetic_frame(years, ncol, freq="15min", seed=0):
+    index = pd.date_range(
+        "2005-01-01", periods=int(years * 365 * pd.Timedelta("1D") / pd.Timedelta(freq)),
+        freq=freq, name="datetime",
+    )
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(2.0, 2.0, (len(index), ncol))
+    return pd.DataFrame(values, index=index, columns=[f"delta_src_{i}" for i in range(ncol)])
+
+
+def _timed_write(writer, df, path, **kwargs):
+    start = time.perf_counter()
+    writer(df, path, **kwargs)
+    return time.perf_counter() - start
+
+
+def _to_csv(df, path, **kwargs):
+    df.to_csv(path, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=2.0, help="Length of the history")
+    parser.add_argument("--ncol", type=int, default=400, help="Number of columns")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.years, args.ncol)
+    elapsed = df.copy()
+    elapsed.index = (df.index - df.index[0]).total_seconds()
+    layouts = {
+        "dated": (
+            df,
+            dict(sep=" ", header=True, date_format="%Y-%m-%dT%H:%M:%S", float_format="%.4f"),
+        ),
+        "elapsed": (elapsed, dict(sep=" ", header=False, float_format="%.4f")),
+    }
+    print(f"{len(df)} rows x {args.ncol} columns ({df.size / 1e6:.1f} M values)")
+    with tempfile.TemporaryDirectory() as tmp:
+        old = os.path.join(tmp, "old.th")
+        new = os.path.join(tmp, "new.th")
+        for name, (frame, kwargs) in layouts.items():
+            t_old = _timed_write(_to_csv, frame, old, **kwargs)
+            t_new = _timed_write(write_th, frame, new, **kwargs)
+            with open(old, "rb") as f_old, open(new, "rb") as f_new:
+                identical = f_old.read() == f_new.read()
+            mb = os.path.getsize(old) / 1e6
+            print(
+                f"  {name:8s} {mb:8.1f} MB  to_csv {t_old:7.2f} s ({mb / t_old:6.1f} MB/s)"
+                f"  write_th {t_new:7.2f} s ({mb / t_new:6.1f} MB/s)"
+                f"  x{t_old / t_new:5.1f}  identical={identical}"
+            )
+
+
+if __name__ == "__main__":
+    main()
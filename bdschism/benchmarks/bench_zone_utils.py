@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the zone_utils mesh kernels against the original Python loops.
+
+Builds a synthetic mixed triangle/quad mesh, checks that the new kernels
+reproduce the reference loops exactly and reports the timings. The reference
+loops are slow, so by default they are timed on a smaller mesh and only the
+new kernels are run on the large one.
+
+Usage (from the ``bdschism`` project directory)::
+
+    python -m benchmarks.bench_zone_utils --nx 1000 --ny 500 --steps 24
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bdschism.zone_utils import (
+    face_nodes_csr,
+    fill_ele_area510,
+    gen_node_neibor_ele,
+    gen_node_wet_dry,
+    node_elements_csr,
+    node_wet_dry_csr,
+)
+from tests.test_zone_utils import (
+    reference_fill_ele_area510,
+    reference_gen_node_neibor_ele,
+    reference_gen_node_wet_dry,
+    synthetic_mesh,
+)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - start
+
+
+def run_new(ele_table, node_x, node_y, num_node, ele_dry):
+    """Time the new kernels, returning results and timings."""
+    num_ele = len(ele_table)
+    num_step = ele_dry.shape[0]
+    timings = {}
+    area = np.zeros(num_ele)
+    _, timings["fill_ele_area510"] = _timed(
+        fill_ele_area510, num_ele, ele_table, node_x, node_y, area
+    )
+    (el, max_ele), timings["gen_node_neibor_ele"] = _timed(
+        gen_node_neibor_ele, ele_table, 4, num_ele, num_node
+    )
+    node_dry = np.zeros((num_step, num_node))
+    _, timings["gen_node_wet_dry"] = _timed(
+        gen_node_wet_dry, node_dry, ele_dry, num_step, num_node, max_ele, el
+    )
+    start = time.perf_counter()
+    node_ptr, node_ele = node_elements_csr(*face_nodes_csr(ele_table), num_node)
+    node_wet_dry_csr(ele_dry, node_ptr, node_ele)
+    timings["csr topology + wet/dry"] = time.perf_counter() - start
+    return (area, el, max_ele, node_dry), timings
+
+
+def run_reference(ele_table, node_x, node_y, num_node, ele_dry):
+    """Time the original loops, returning results and timings."""
+    num_ele = len(ele_table)
+    num_step = ele_dry.shape[0]
+    timings = {}
+    area = np.zeros(num_ele)
+    _, timings["fill_ele_area510"] = _timed(
+        reference_fill_ele_area510, num_ele, ele_table, node_x, node_y, area
+    )
+    (el, max_ele), timings["gen_node_neibor_ele"] = _timed(
+        reference_gen_node_neibor_ele, ele_table, 4, num_ele, num_node
+    )
+    node_dry = np.zeros((num_step, num_node))
+    _, timings["gen_node_wet_dry"] = _timed(
+        reference_gen_node_wet_dry, node_dry, ele_dry, num_step, num_node, max_ele, el
+    )
+    return (area, el, max_ele, node_dry), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nx", type=int, default=1000, help="Nodes in x, large mesh")
+    parser.add_argument("--ny", type=int, default=500, help="Nodes in y, large mesh")
+    parser.add_argument("--steps", type=int, default=24, help="Time steps")
+    parser.add_argument(
+        "--ref-nx", type=int, default=120, help="Nodes in x for the reference comparison"
+    )
+    parser.add_argument(
+        "--ref-ny", type=int, default=80, help="Nodes in y for the reference comparison"
+    )
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    # Parity and speedup on a mesh the reference loops can handle
+    ele_table, node_x, node_y, num_node = synthetic_mesh(args.ref_nx, args.ref_ny)
+    ele_dry = (rng.random((args.steps, len(ele_table))) < 0.5).astype(np.int32)
+    run_new(ele_table, node_x, node_y, num_node, ele_dry)  # JIT warm-up
+    new, t_new = run_new(ele_table, node_x, node_y, num_node, ele_dry)
+    ref, t_ref = run_reference(ele_table, node_x, node_y, num_node, ele_dry)
+    for a, b in zip(new, ref):
+        np.testing.assert_array_equal(a, b)
+    print(
+        f"Reference mesh: {len(ele_table)} elements, {num_node} nodes, "
+        f"{args.steps} steps (results identical)"
+    )
+    for name, t in t_ref.items():
+        print(f"  {name:25s} loops {t:9.3f} s  new {t_new[name]:8.4f} s  x{t / t_new[name]:8.1f}")
+
+    # Throughput on a production-sized mesh
+    ele_table, node_x, node_y, num_node = synthetic_mesh(args.nx, args.ny)
+    ele_dry = (rng.random((args.steps, len(ele_table))) < 0.5).astype(np.int32)
+    _, t_new = run_new(ele_table, node_x, node_y, num_node, ele_dry)
+    print(f"Large mesh: {len(ele_table)} elements, {num_node} nodes, {args.steps} steps")
+    for name, t in t_new.items():
+        print(f"  {name:25s} new {t:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
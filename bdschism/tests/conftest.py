@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Shared fixtures for the bdschism tests."""
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+NODE_DIM = "nSCHISM_hgrid_node"
+LEVEL_DIM = "nSCHISM_vgrid_layers"
+
+
+def write_stack(
+    directory,
+    stack,
+    times,
+    fields,
+    bottom,
+    node_x=None,
+    node_y=None,
+    faces=None,
+    dry=None,
+    dry_element=None,
+    time_units=None,
+    mask_below_bottom=True,
+):
+    """Write one synthetic SCHISM output stack.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Outputs directory.
+    stack : int
+        Stack number of the file names.
+    times : numpy.ndarray
+        Output times in seconds after the model start.
+    fields : dict
+        3-D variables by name, each ``(ntime, nnode, nlevel)``, written to
+        ``<name>_<stack>.nc``.
+    bottom : numpy.ndarray
+        One-based bottom level of each node.
+    node_x, node_y, faces : numpy.ndarray, optional
+        Grid written to ``out2d_<stack>.nc``; ``faces`` is zero-based with -1
+        for the unused fourth node of triangles.
+    dry : numpy.ndarray, optional
+        ``dryFlagNode``, ``(ntime, nnode)``.
+    dry_element : numpy.ndarray, optional
+        ``dryFlagElement``, ``(ntime, nface)``; requires ``faces``.
+    time_units : str, optional
+        Units attribute of the time variables.
+    mask_below_bottom : bool, optional
+        Write levels below the bottom as fill values; otherwise they keep
+        whatever ``fields`` holds.
+    """
+    nnode = len(bottom)
+    with Dataset(directory / f"out2d_{stack}.nc", "w") as ds:
+        ds.createDimension("time", None)
+        ds.createDimension(NODE_DIM, nnode)
+        time = ds.createVariable("time", "f8", ("time",))
+        if time_units:
+            time.units = time_units
+        time[:] = times
+        ds.createVariable("bottom_index_node", "i4", (NODE_DIM,))[:] = bottom
+        if dry is not None:
+            ds.createVariable("dryFlagNode", "i4", ("time", NODE_DIM))[:] = dry
+        if faces is not None:
+            ds.createDimension("nSCHISM_hgrid_face", len(faces))
+            ds.createDimension("nMaxSCHISM_hgrid_face_nodes", 4)
+            ds.createVariable("SCHISM_hgrid_node_x", "f8", (NODE_DIM,))[:] = node_x
+            ds.createVariable("SCHISM_hgrid_node_y", "f8", (NODE_DIM,))[:] = node_y
+            fn = ds.createVariable(
+                "SCHISM_hgrid_face_nodes",
+                "i4",
+                ("nSCHISM_hgrid_face", "nMaxSCHISM_hgrid_face_nodes"),
+                fill_value=-1,
+            )
+            fn.start_index = 1
+            fn[:] = np.ma.masked_less(faces, 0) + 1
+            if dry_element is not None:
+                ds.createVariable(
+                    "dryFlagElement", "i4", ("time", "nSCHISM_hgrid_face")
+                )[:] = dry_element
+
+    for name, values in fields.items():
+        nlevel = values.shape[-1]
+        below = np.arange(nlevel)[None, None, :] < (np.asarray(bottom) - 1)[None, :, None]
+        with Dataset(directory / f"{name}_{stack}.nc", "w") as ds:
+            ds.createDimension("time", None)
+            ds.createDimension(NODE_DIM, nnode)
+            ds.createDimension(LEVEL_DIM, nlevel)
+            time = ds.createVariable("time", "f8", ("time",))
+            if time_units:
+                time.units = time_units
+            time[:] = times
+            var = ds.createVariable(
+                name, "f4", ("time", NODE_DIM, LEVEL_DIM), fill_value=-9999.0
+            )
+            if mask_below_bottom:
+                values = np.ma.masked_array(values, mask=np.broadcast_to(below, values.shape))
+            var[:] = values
+
+
+@pytest.fixture
+def stack_writer():
+    """:func:`write_stack`, to write synthetic SCHISM output stacks."""
+    return write_stack
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Tests for the bad actor summary in bdschism.analyze_dt."""
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from bdschism.analyze_dt import summarize_elements
+
+NFACE = 40
+NTIME = 15
+
+
+def write_out2d(path, dt):
+    with Dataset(path, "w") as ds:
+        ds.createDimension("time", None)
+        ds.createDimension("nSCHISM_hgrid_face", dt.shape[1])
+        ds.createVariable("time", "f8", ("time",))[:] = 900.0 * np.arange(len(dt))
+        ds.createVariable("SCHISM_hgrid_face_x", "f8", ("nSCHISM_hgrid_face",))[:] = (
+            10.0 * np.arange(dt.shape[1])
+        )
+        ds.createVariable("SCHISM_hgrid_face_y", "f8", ("nSCHISM_hgrid_face",))[:] = (
+            -5.0 * np.arange(dt.shape[1])
+        )
+        ds.createVariable(
+            "minTransportTimeStep", "f4", ("time", "nSCHISM_hgrid_face")
+        )[:] = dt
+    return path
+
+
+def synthetic_dt(seed=0):
+    """Few distinct values, so there are ties at every rank."""
+    rng = np.random.default_rng(seed)
+    dt = rng.integers(1, 8, (NTIME, NFACE)).astype(np.float32) * 5.0
+    dt[rng.random((NTIME, NFACE)) < 0.05] = 90.0
+    dt[rng.random((NTIME, NFACE)) < 0.05] = np.nan
+    dt[9, ::4] = 90.0
+    # Elements 3 and 17 are always among the smallest
+    dt[:, 3] = 1.0
+    dt[:, 17] = 2.0
+    dt[4] = np.nan  # nothing limiting: skipped
+    return dt
+
+
+def reference(dt, face_x, face_y, top_n, min_count, ref_nth):
+    """The per-time-step loop that summarize_elements replaced.
+
+    Its argsort did not fix the order of ties; a stable sort picks the
+    lowest element index, as summarize_elements does.
+    """
+    cell_stats = {}
+    for dts in dt:
+        valid = np.where((dts != 90) & (~np.isnan(dts)))[0]
+        if valid.size == 0:
+            continue
+        order = valid[np.argsort(dts[valid], kind="stable")]
+        nth_index = order[ref_nth]
+        for idx in order[:top_n]:
+            info = cell_stats.setdefault(idx, {"count": 0, "timesteps": [], "nth_ratios": []})
+            info["count"] += 1
+            info["nth_ratios"].append(dts[idx] / dts[nth_index])
+            info["timesteps"].append(float(dts[idx]))
+    summary = []
+    for idx, info in cell_stats.items():
+        if info["count"] >= min_count:
+            paired = sorted(zip(info["timesteps"], info["nth_ratios"]), key=lambda x: x[1])
+            summary.append(
+                {
+                    "index": int(idx),
+                    "count": info["count"],
+                    "max_count": len(dt),
+                    "x": float(face_x[idx]),
+                    "y": float(face_y[idx]),
+                    "nth_ratios": [p[1] for p in paired],
+                    "timesteps": [p[0] for p in paired],
+                }
+            )
+    summary.sort(key=lambda x: (-x["count"], x["index"]))
+    return summary
+
+
+@pytest.mark.parametrize("chunk_steps", [None, 1, 7])
+@pytest.mark.parametrize("top_n, min_count, ref_nth", [(6, 3, 5), (6, 1, 2), (3, 8, 25)])
+def test_matches_per_step_loop(tmp_path, chunk_steps, top_n, min_count, ref_nth):
+    dt = synthetic_dt()
+    path = write_out2d(tmp_path / "out2d_1.nc", dt)
+    summary, face_x, face_y = summarize_elements(
+        str(path), top_n, min_count, ref_nth=ref_nth, chunk_steps=chunk_steps
+    )
+    expected = reference(dt, face_x, face_y, top_n, min_count, ref_nth)
+    assert [s["index"] for s in summary] == [s["index"] for s in expected]
+    assert summary[0]["index"] == 3 and summary[0]["count"] == NTIME - 1
+    for got, want in zip(summary, expected):
+        for key in ("count", "max_count", "x", "y", "timesteps"):
+            assert got[key] == want[key]
+        np.testing.assert_allclose(got["nth_ratios"], want["nth_ratios"], rtol=1e-6)
+    # 90 and NaN are never selected
+    assert all(v != 90.0 and np.isfinite(v) for s in summary for v in s["timesteps"])
+
+
+def test_min_count_filters_elements(tmp_path):
+    path = write_out2d(tmp_path / "out2d_1.nc", synthetic_dt())
+    summary, _, _ = summarize_elements(str(path), 2, NTIME - 1, ref_nth=5)
+    assert [s["index"] for s in summary] == [3, 17]
+    assert summary[0]["timesteps"] == [1.0] * (NTIME - 1)
+    assert summary[1]["max_count"] == NTIME
+
+
+@pytest.mark.parametrize("chunk_steps", [None, 1, 7])
+def test_too_few_limiting_elements(tmp_path, chunk_steps):
+    dt = synthetic_dt()
+    dt[11, 6:] = np.nan
+    path = write_out2d(tmp_path / "out2d_1.nc", dt)
+    with pytest.raises(ValueError, match="Time index 11"):
+        summarize_elements(str(path), 3, 1, ref_nth=6, chunk_steps=chunk_steps)
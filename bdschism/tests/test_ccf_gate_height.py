@@ -17,6 +17,7 @@ from bdschism.ccf_gate_height import (
     flow_to_max_gate,
     create_priority_series,
     gen_gate_height,
+    gen_gate_height_batch,
     ccf_A,
     ccf_reference_level,
 )
@@ -295,6 +296,103 @@ class TestGenGateHeightSynthetic:
         assert zin_df["ccfb_interior_surface"].max() < 6.0
 
 
+# ---------------------------------------------------------------------------
+# gen_gate_height_batch
+# ---------------------------------------------------------------------------
+
+class TestGenGateHeightBatch:
+    def test_single_scenario_matches_gen_gate_height(
+        self, synthetic_tidal_oh4, synthetic_priority, synthetic_max_height,
+        synthetic_export, synthetic_cvp
+    ):
+        s1 = pd.Timestamp("2022-03-01")
+        s2 = pd.Timestamp("2022-03-01 12:00")
+        dt = pd.Timedelta(minutes=2)
+
+        single = gen_gate_height(
+            synthetic_export, synthetic_priority, synthetic_max_height,
+            synthetic_tidal_oh4, synthetic_cvp, 2.12, s1, s2, dt
+        )
+        (batch,) = gen_gate_height_batch(
+            [synthetic_export], synthetic_priority, synthetic_max_height,
+            synthetic_tidal_oh4, synthetic_cvp, 2.12, s1, s2, dt
+        )
+        for a, b in zip(single, batch):
+            pd.testing.assert_frame_equal(a, b)
+
+    def test_export_scenarios_are_independent(
+        self, synthetic_tidal_oh4, synthetic_priority, synthetic_max_height,
+        synthetic_export, synthetic_cvp
+    ):
+        """Each scenario in a batch matches its own single run."""
+        s1 = pd.Timestamp("2022-03-01")
+        s2 = pd.Timestamp("2022-03-01 12:00")
+        dt = pd.Timedelta(minutes=2)
+        exports = [synthetic_export * f for f in (0.5, 1.0, 2.0)]
+
+        results = gen_gate_height_batch(
+            exports, synthetic_priority, synthetic_max_height,
+            synthetic_tidal_oh4, synthetic_cvp, 2.12, s1, s2, dt
+        )
+        assert len(results) == 3
+        for export, (height_df, zin_df, diag_df) in zip(exports, results):
+            ref_height, ref_zin, ref_diag = gen_gate_height(
+                export, synthetic_priority, synthetic_max_height,
+                synthetic_tidal_oh4, synthetic_cvp, 2.12, s1, s2, dt
+            )
+            pd.testing.assert_frame_equal(height_df, ref_height)
+            pd.testing.assert_frame_equal(zin_df, ref_zin)
+        # More export draws the forebay down further
+        assert (
+            results[2][1]["ccfb_interior_surface"].iloc[-1]
+            < results[0][1]["ccfb_interior_surface"].iloc[-1]
+        )
+
+    @pytest.mark.parametrize("batch_size", [1, 2])
+    def test_batches_match_one_batch(
+        self, synthetic_tidal_oh4, synthetic_priority, synthetic_max_height,
+        synthetic_export, synthetic_cvp, batch_size
+    ):
+        s1 = pd.Timestamp("2022-03-01")
+        s2 = pd.Timestamp("2022-03-01 12:00")
+        dt = pd.Timedelta(minutes=2)
+        exports = [synthetic_export * f for f in (0.5, 1.0, 2.0)]
+        args = (
+            exports, synthetic_priority, synthetic_max_height,
+            synthetic_tidal_oh4, synthetic_cvp, 2.12, s1, s2, dt
+        )
+        whole = gen_gate_height_batch(*args, batch_size=3)
+        batched = gen_gate_height_batch(*args, batch_size=batch_size)
+        assert len(batched) == 3
+        for a, b in zip(whole, batched):
+            for df_a, df_b in zip(a, b):
+                pd.testing.assert_frame_equal(df_a, df_b)
+
+    def test_inconsistent_scenario_lengths(
+        self, synthetic_tidal_oh4, synthetic_priority, synthetic_max_height,
+        synthetic_export, synthetic_cvp
+    ):
+        with pytest.raises(ValueError):
+            gen_gate_height_batch(
+                [synthetic_export] * 2, synthetic_priority, synthetic_max_height,
+                [synthetic_tidal_oh4] * 3, synthetic_cvp, 2.12,
+                pd.Timestamp("2022-03-01"), pd.Timestamp("2022-03-01 06:00"),
+                pd.Timedelta(minutes=2),
+            )
+
+    def test_start_off_grid_raises(
+        self, synthetic_tidal_oh4, synthetic_priority, synthetic_max_height,
+        synthetic_export, synthetic_cvp
+    ):
+        with pytest.raises(ValueError):
+            gen_gate_height_batch(
+                synthetic_export, synthetic_priority, synthetic_max_height,
+                synthetic_tidal_oh4, synthetic_cvp, 2.12,
+                pd.Timestamp("2022-03-01 00:01"), pd.Timestamp("2022-03-01 06:00"),
+                pd.Timedelta(minutes=2),
+            )
+
+
 # ---------------------------------------------------------------------------
 # Integration tests (require network / external data)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Tests for nudging file validation in bdschism.check_nudging_data."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from bdschism.check_nudging_data import (
+    bad_cells_table,
+    validate_nudging_files,
+    write_validation_summary,
+)
+
+BOUNDS = dict(min_salt=0.0, max_salt=50.0, min_temp=0.0, max_temp=40.0)
+
+
+def write_day(directory, day, edit=None, seed=0):
+    """Write one synthetic daily nudging file and return its path."""
+    rng = np.random.default_rng(seed)
+    date = pd.Timestamp("2020-01-01") + pd.Timedelta(days=day)
+    shape = (24, 3, 4, 5)
+    temp = rng.uniform(5.0, 20.0, shape)
+    salt = rng.uniform(0.5, 33.0, shape)
+    if edit is not None:
+        edit(temp, salt)
+    dims = ("time", "depth", "lat", "lon")
+    ds = xr.Dataset(
+        {"temperature": (dims, temp), "salinity": (dims, salt)},
+        coords={
+            "time": pd.date_range(date, periods=24, freq="h"),
+            "depth": np.arange(3.0),
+            "lat": np.linspace(37.0, 38.0, 4),
+            "lon": np.linspace(-123.0, -122.0, 5),
+        },
+    )
+    path = os.path.join(directory, f"hycom_interpolated_hourly_pst{date:%Y%m%d}.nc")
+    ds.to_netcdf(path)
+    return path
+
+
+def bad_temperature(temp, salt):
+    temp[2, 1, 2, 3] = np.nan
+    temp[20, 0, 0, 0] = 45.0
+    salt[23, 2, 3, 4] = -1.0
+
+
+@pytest.fixture
+def archive(tmp_path):
+    for day in (0, 1, 3):
+        write_day(tmp_path, day, seed=day)
+    write_day(tmp_path, 4, edit=bad_temperature, seed=4)
+    return tmp_path
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 5, 24])
+def test_detects_bad_points_and_missing_days(archive, chunk_steps):
+    success, results = validate_nudging_files(str(archive), chunk_steps=chunk_steps, **BOUNDS)
+    assert not success
+    assert results["missing_files"] == ["2020-01-03T00:00:00"]
+    assert results["files_checked"] == 4
+    (item,) = results["files_with_invalid_data"]
+    bad = item["bad_data_by_var_type"]
+    assert list(bad) == [
+        ("temperature", "nan"),
+        ("temperature", "out_of_bounds"),
+        ("salinity", "out_of_bounds"),
+    ]
+    (detail,) = bad[("temperature", "out_of_bounds")]["details"]
+    assert detail["value"] == 45.0
+    assert detail["time"] == np.datetime64("2020-01-05T20:00")
+    (detail,) = bad[("salinity", "out_of_bounds")]["details"]
+    assert (detail["depth"], detail["lat"], detail["lon"]) == (2.0, 38.0, -122.0)
+    assert len(bad_cells_table(results)) == 3
+
+
+def test_quick_mode_and_manual_values(tmp_path):
+    def rounded_salt(temp, salt):
+        temp[0, 0, 0, 0] = np.inf
+        salt[:] = np.round(salt)
+
+    write_day(tmp_path, 0, edit=rounded_salt)
+    success, results = validate_nudging_files(str(tmp_path), quick=True, **BOUNDS)
+    assert not success
+    bad = results["files_with_invalid_data"][0]["bad_data_by_var_type"]
+    assert list(bad) == [("temperature", "inf"), ("salinity", "manual_spec")]
+    assert all(v["count"] == 1 and v["details"] == [] for v in bad.values())
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 24])
+def test_quick_mode_nan_after_inf(tmp_path, chunk_steps):
+    def inf_then_nan(temp, salt):
+        temp[0, 0, 0, 0] = np.inf
+        temp[20, 1, 1, 1] = np.nan
+
+    write_day(tmp_path, 0, edit=inf_then_nan)
+    _, results = validate_nudging_files(
+        str(tmp_path), quick=True, chunk_steps=chunk_steps, **BOUNDS
+    )
+    (item,) = results["files_with_invalid_data"]
+    assert item["issues"] == ["temperature has NaN values"]
+
+
+def test_parallel_matches_serial(archive):
+    _, serial = validate_nudging_files(str(archive), **BOUNDS)
+    _, parallel = validate_nudging_files(str(archive), nproc=2, **BOUNDS)
+    assert [i["issues"] for i in parallel["files_with_invalid_data"]] == [
+        i["issues"] for i in serial["files_with_invalid_data"]
+    ]
+    pd.testing.assert_frame_equal(bad_cells_table(parallel), bad_cells_table(serial))
+
+
+def test_resume_skips_unchanged_files(archive, tmp_path_factory):
+    summary = str(tmp_path_factory.mktemp("report") / "summary.json")
+    _, first = validate_nudging_files(str(archive), **BOUNDS)
+    write_validation_summary(first, summary)
+
+    _, resumed = validate_nudging_files(str(archive), resume=summary, **BOUNDS)
+    assert resumed["files_resumed"] == 4
+    assert [i["issues"] for i in resumed["files_with_invalid_data"]] == [
+        i["issues"] for i in first["files_with_invalid_data"]
+    ]
+
+    # A rewritten file is checked again
+    write_day(archive, 4, seed=4)
+    _, repaired = validate_nudging_files(str(archive), resume=summary, **BOUNDS)
+    assert repaired["files_resumed"] == 3
+    assert repaired["files_with_invalid_data"] == []
+
+    # Different bounds invalidate the previous summary
+    _, other = validate_nudging_files(
+        str(archive), resume=summary, **dict(BOUNDS, max_temp=30.0)
+    )
+    assert other["files_resumed"] == 0
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Tests for the streaming combine in bdschism.combine_nc."""
+
+import os
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import xarray as xr
+
+from bdschism.combine_nc import NCTimeCombiner, combine_nc
+
+NFILE = 4
+NT = 9  # per file, the first one repeats the last of the previous file
+
+
+def write_uv3d_stacks(directory, fmt="NETCDF4", dt=900.0):
+    """uv3d_N.th.nc files that share their boundary time steps."""
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(NFILE):
+        path = directory / f"uv3d_{i + 1}.th.nc"
+        with nc.Dataset(path, "w", format=fmt) as ds:
+            ds.title = "uv3d"
+            ds.createDimension("time", None)
+            ds.createDimension("nOpenBndNodes", 5)
+            ds.createDimension("nLevels", 3)
+            ds.createDimension("nComponents", 2)
+            ds.createDimension("one", 1)
+            time = ds.createVariable("time", "f8", ("time",))
+            time[:] = 43200.0 + dt * (i * (NT - 1) + np.arange(NT))
+            ts = ds.createVariable(
+                "time_series",
+                "f4",
+                ("time", "nOpenBndNodes", "nLevels", "nComponents"),
+                fill_value=-9999.0,
+            )
+            ts.long_name = "velocity"
+            ts[:] = rng.random((NT, 5, 3, 2))
+            ds.createVariable("time_step", "f4", ("one",))[:] = dt
+        files.append(str(path))
+    return files
+
+
+def xarray_concat(input_files, reset_time=False):
+    """The xarray concat that the streaming combine replaced.
+
+    Its default ``data_vars="all"`` also stacked the time-invariant
+    variables along time; the streaming combine copies them once.
+    """
+    datasets = [xr.open_dataset(f, decode_times=False) for f in input_files]
+    combined = xr.concat(
+        [ds if i == 0 else ds.isel(time=slice(1, None)) for i, ds in enumerate(datasets)],
+        dim="time",
+        data_vars="minimal",
+    ).load()
+    if reset_time:
+        times = np.asarray(combined["time"].values, dtype=float)
+        dt = np.diff(times)[1]
+        combined["time"] = np.arange(0, len(times) * dt, dt)
+    for ds in datasets:
+        ds.close()
+    return combined
+
+
+@pytest.mark.parametrize("fmt", ["NETCDF4", "NETCDF3_64BIT_OFFSET"])
+@pytest.mark.parametrize("reset_time", [False, True])
+def test_matches_xarray_concat(tmp_path, fmt, reset_time):
+    files = write_uv3d_stacks(tmp_path, fmt=fmt)
+    out = tmp_path / "uv3D.th.nc"
+    combine_nc(files, str(out), reset_time=reset_time)
+
+    ref = xarray_concat(files, reset_time=reset_time)
+    with xr.open_dataset(out, decode_times=False) as ds:
+        assert ds.sizes["time"] == NFILE * (NT - 1) + 1
+        xr.testing.assert_identical(ds, ref)
+    with nc.Dataset(out) as ds:
+        assert ds.data_model == fmt
+        assert ds.ncattrs() == ["title"]
+    assert not os.path.exists(f"{out}.part")
+
+
+@pytest.mark.parametrize("reset_time", [False, True])
+def test_resume_partial_output(tmp_path, reset_time):
+    files = write_uv3d_stacks(tmp_path)
+    out = tmp_path / "uv3D.th.nc"
+    combine_nc(files, str(tmp_path / "whole.th.nc"), reset_time=reset_time)
+
+    # A combine killed after two files leaves its partial output behind
+    combiner = NCTimeCombiner(str(out), reset_time=reset_time)
+    for f in files[:2]:
+        combiner.append(f)
+    combiner._dst.close()
+    assert os.path.exists(f"{out}.part")
+
+    # The inputs already in the partial output are not read again
+    os.remove(files[0])
+    combine_nc(files, str(out), reset_time=reset_time, resume=True)
+    with xr.open_dataset(out, decode_times=False) as ds, xr.open_dataset(
+        tmp_path / "whole.th.nc", decode_times=False
+    ) as whole:
+        xr.testing.assert_identical(ds, whole)
+
+
+def test_inconsistent_time_step(tmp_path):
+    files = write_uv3d_stacks(tmp_path)
+    with nc.Dataset(files[2], "a") as ds:
+        ds["time"][4] += 60.0
+    out = tmp_path / "uv3D.th.nc"
+    with pytest.raises(ValueError, match="Found 2 inconsistent timestep") as err:
+        combine_nc(files, str(out))
+    assert "idx 19->20" in str(err.value) and "idx 20->21" in str(err.value)
+    assert not os.path.exists(out)
+    assert not os.path.exists(f"{out}.part")
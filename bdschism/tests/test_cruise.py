@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Tests for yearly USGS cruise CSV ingestion in bdschism.cruise."""
+
+import datetime as dtm
+import os
+
+import numpy as np
+import pandas as pd
+
+from bdschism.cruise import (
+    _extract_native,
+    process_cruise_yearly_csv,
+    read_cruise_yearly_table,
+)
+
+STATIONS = ["2", "3", "7"]
+
+
+def write_year(path):
+    """Two cruise days; the second lacks station 3 after filtering."""
+    rows = [
+        # day 1: complete, station 2 written as a float, unsorted depths
+        ("2011-04-05", "9:10", "2.0", 3.0, "10.5"),
+        ("2011-04-05", "9:12", "2", 1.0, "10.0"),
+        ("2011-04-05", "9:12", " 2 ", 2.0, "10.2"),
+        ("2011-04-05", "10:00", "3", 1.0, "8.0"),
+        ("2011-04-05", "10:00", "3", 2.0, "bad"),  # dropped row
+        ("2011-04-05", "11:30", "7", 12.0, "5.5"),
+        ("2011-04-05", "11:30", "7", 1.0, "5.0"),
+        ("2011-04-05", "11:30", "99", 1.0, "1.0"),  # not a target station
+        # day 2: station 7 too shallow, station 3 missing
+        ("2011-05-02", "08:00", "2", 1.0, "12.0"),
+        ("2011-05-02", "08:30", "7", 4.0, "6.0"),
+        ("2011-05-02", "xx", "3", 1.0, "9.0"),  # unparseable time
+    ]
+    pd.DataFrame(rows, columns=["Date", "Time", "Station", "Depth (m)", "Salinity"]).to_csv(
+        path, index=False
+    )
+
+
+def test_records_and_filters(tmp_path, capsys):
+    path = tmp_path / "usgs_cruise_2011.csv"
+    write_year(path)
+    records = process_cruise_yearly_csv(
+        str(path), target_stations=STATIONS, depth_threshold_stations={"7": 9}
+    )
+    assert "Removing 2011-05-02: missing stations ['3', '7']" in capsys.readouterr().out
+    assert list(records) == ["2011-04-05"]
+    day = records["2011-04-05"]
+    assert list(day) == ["2", "3", "7"]
+    depth, salinity, time = day["2"]
+    np.testing.assert_array_equal(depth, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(salinity, [10.0, 10.2, 10.5])
+    assert time == dtm.datetime(2011, 4, 5, 9, 10) and type(time) is dtm.datetime
+    np.testing.assert_array_equal(day["3"][1], [8.0])
+    np.testing.assert_array_equal(day["7"][0], [1.0, 12.0])
+
+
+def test_model_start_filter(tmp_path):
+    path = tmp_path / "usgs_cruise_2011.csv"
+    write_year(path)
+    records = process_cruise_yearly_csv(
+        str(path),
+        target_stations=["2"],
+        model_start_time=dtm.datetime(2011, 3, 10),
+    )
+    assert list(records) == ["2011-05-02"]
+
+
+def test_cache_reused_and_invalidated(tmp_path):
+    path = tmp_path / "usgs_cruise_2011.csv"
+    write_year(path)
+    table = read_cruise_yearly_table(str(path))
+    cache_file = str(path) + ".npz"
+    assert os.path.exists(cache_file)
+    assert len(table) == 9
+    pd.testing.assert_frame_equal(read_cruise_yearly_table(str(path)), table)
+    pd.testing.assert_frame_equal(read_cruise_yearly_table(str(path), cache=False), table)
+
+    with open(path, "a") as f:
+        f.write("2011-06-01,07:00,2,1.0,3.0\n")
+    assert len(read_cruise_yearly_table(str(path))) == 10
+
+
+def test_native_extraction_skips_dates_after_the_run(tmp_path, stack_writer, capsys):
+    node_x = np.array([0.0, 100.0, 100.0, 0.0])
+    node_y = np.array([0.0, 0.0, 100.0, 100.0])
+    faces = np.array([[0, 1, 2, -1], [0, 2, 3, -1]])
+    for stack in (1, 2):
+        t = 86400.0 * (stack - 1) + np.array([43200.0, 86400.0])
+        z = np.broadcast_to(-10.0 + 5.0 * np.arange(3), (2, 4, 3)).copy()
+        salt = np.broadcast_to(stack + np.arange(3.0), (2, 4, 3)).copy()
+        stack_writer(
+            tmp_path,
+            stack,
+            t,
+            {"salinity": salt, "zCoordinates": z},
+            np.ones(4, dtype=int),
+            node_x=node_x,
+            node_y=node_y,
+            faces=faces,
+        )
+    inside = {"time": dtm.datetime(2011, 3, 30)}
+    after = {"time": dtm.datetime(2011, 4, 5)}
+    pending = [
+        (inside, {1: (50.0, 20.0, 129600.0, "a", "2"), 2: (20.0, 50.0, 150000.0, "b", "3")}),
+        (after, {1: (50.0, 20.0, 100000.0, "a", "2"), 2: (20.0, 50.0, 600000.0, "b", "3")}),
+    ]
+    _extract_native(str(tmp_path), pending)
+    assert "model_file" not in after
+    assert "Error processing date 2011-04-05" in capsys.readouterr().out
+    data, index = inside["model_file"]
+    assert sorted(index) == [1, 2]
+    # Cast 1 is at the first output of stack 2
+    np.testing.assert_allclose(data["value"][index[1]], [2.0, 3.0, 4.0], rtol=1e-6)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Tests for the native depth averages in bdschism.depth_average."""
+
+import numpy as np
+import pytest
+import xarray as xr
+from netCDF4 import Dataset
+
+import bdschism.depth_average as depth_average_module
+from bdschism.depth_average import depth_average, depth_average_stacks, stack_depth_average
+
+NNODE = 6
+NLEVEL = 4
+STEPS = 4  # six-hourly outputs per daily stack
+BOTTOM = np.array([1, 2, 3, 1, 2, 4])  # one-based; the last node is dry
+
+
+def write_stacks(stack_writer, directory, nstack=2, seed=0, step=21600.0):
+    rng = np.random.default_rng(seed)
+    for stack in range(1, nstack + 1):
+        t = step * ((stack - 1) * STEPS + np.arange(1, STEPS + 1))
+        depth = rng.uniform(5.0, 15.0, NNODE)
+        frac = np.sort(rng.uniform(0, 1, (STEPS, NNODE, NLEVEL)), axis=-1)
+        frac[..., 0], frac[..., -1] = 0.0, 1.0
+        z = -depth[None, :, None] * (1.0 - frac)
+        salt = rng.uniform(0.0, 30.0, (STEPS, NNODE, NLEVEL))
+        dry = np.zeros((STEPS, NNODE), dtype=np.int32)
+        dry[:, -1] = 1
+        dry[0, 0] = 1
+        stack_writer(
+            directory,
+            stack,
+            t,
+            {"zCoordinates": z, "salinity": salt},
+            BOTTOM,
+            dry=dry,
+            time_units="seconds since 2021-04-20 00:00:00",
+        )
+
+
+def open_stacks(files):
+    return xr.concat([xr.load_dataset(f) for f in files], dim="time")
+
+
+def suxarray_reference(directory, nstack):
+    """Depth average with the formula of suxarray, in xarray."""
+    ds = xr.merge(
+        [open_stacks([directory / f"{name}_{s}.nc" for s in range(1, nstack + 1)])
+         for name in ("salinity", "zCoordinates")]
+    )
+    dz = ds.zCoordinates.diff("nSCHISM_vgrid_layers")
+    mid = ds.salinity.rolling(nSCHISM_vgrid_layers=2).mean().isel(
+        nSCHISM_vgrid_layers=slice(1, None)
+    )
+    da = (mid * dz).sum("nSCHISM_vgrid_layers") / dz.sum("nSCHISM_vgrid_layers")
+    dry = np.concatenate(
+        [Dataset(directory / f"out2d_{s}.nc").variables["dryFlagNode"][:] for s in range(1, nstack + 1)]
+    )
+    return da.where(dry == 0)
+
+
+def test_kernel_linear_profile_is_exact():
+    z = np.array([[[-10.0, -10.0, -6.0, -1.0, 0.0]]])
+    values = 2.0 - 0.5 * z  # linear in z: the average is the mid-depth value
+    values[..., 0] = 99.0  # below the bottom
+    da = depth_average(values, z, np.array([1]))
+    np.testing.assert_allclose(da, 2.0 + 0.5 * 5.0)
+
+
+@pytest.mark.parametrize("nproc", [1, 2])
+def test_matches_suxarray_formula(tmp_path, stack_writer, nproc):
+    write_stacks(stack_writer, tmp_path)
+    files = depth_average_stacks(
+        str(tmp_path),
+        "2021-04-20",
+        instantaneous=True,
+        nproc=nproc,
+        chunk_steps=3,
+        chunk_nodes=4,
+    )
+    assert [f.split("/")[-1] for f in files] == [
+        "depth_averaged_salinity_1.nc",
+        "depth_averaged_salinity_2.nc",
+        "depth_averaged_salinity_daily.nc",
+    ]
+    ref = suxarray_reference(tmp_path, 2)
+
+    inst = open_stacks(files[:2]).depth_averaged_salinity
+    np.testing.assert_allclose(inst.values, ref.values, rtol=1e-5)
+    assert np.isnan(inst.values[:, -1]).all()
+
+    # xarray pads the period with empty days
+    ref_daily = ref.resample(time="1D", closed="right").mean().dropna("time", how="all")
+    with xr.open_dataset(files[2]) as daily:
+        assert list(daily.time.values) == list(ref_daily.time.values)
+        np.testing.assert_allclose(
+            daily.depth_averaged_salinity.values, ref_daily.values, rtol=1e-5
+        )
+
+
+def test_default_node_blocks_follow_byte_budget(tmp_path, stack_writer, monkeypatch):
+    write_stacks(stack_writer, tmp_path, nstack=1)
+    whole = stack_depth_average(str(tmp_path), 1, "2021-04-20", chunk_nodes=NNODE)
+
+    # Two time steps of four levels of two nodes
+    monkeypatch.setattr(depth_average_module, "_BLOCK_BYTES", 2 * 2 * NLEVEL * 8)
+    assert depth_average_module._node_block(None, 2, NLEVEL, NNODE) == 2
+    assert depth_average_module._node_block(None, 2, NLEVEL, 1) == 1
+    assert depth_average_module._node_block(5, 2, NLEVEL, NNODE) == 5
+    blocks = stack_depth_average(str(tmp_path), 1, "2021-04-20", chunk_steps=2)
+    assert blocks.keys() == whole.keys()
+    for day, (total, count) in whole.items():
+        np.testing.assert_allclose(blocks[day][0], total)
+        np.testing.assert_array_equal(blocks[day][1], count)
+
+
+@pytest.mark.parametrize("nproc", [1, 3])
+def test_days_shared_by_stacks(tmp_path, stack_writer, nproc):
+    # 16-hour stacks: most days take outputs from two stacks
+    write_stacks(stack_writer, tmp_path, nstack=5, step=14400.0)
+    files = depth_average_stacks(
+        str(tmp_path), "2021-04-20", instantaneous=True, nproc=nproc
+    )
+    inst = open_stacks(files[:-1]).depth_averaged_salinity
+    ref = inst.resample(time="1D", closed="right").mean().dropna("time", how="all")
+    with xr.open_dataset(files[-1]) as daily:
+        assert list(daily.time.values) == list(ref.time.values)
+        np.testing.assert_allclose(daily.depth_averaged_salinity.values, ref.values, rtol=1e-5)
+    assert not (tmp_path / "depth_averaged_salinity_daily.nc.part").exists()
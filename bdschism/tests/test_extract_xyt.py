@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Tests for profile extraction in bdschism.extract_xyt."""
+
+import numpy as np
+
+from bdschism.extract_xyt import extract_profiles
+
+NODE_X = np.array([0.0, 100.0, 100.0, 0.0])
+NODE_Y = np.array([0.0, 0.0, 100.0, 100.0])
+FACES = np.array([[0, 1, 2, -1], [0, 2, 3, -1]])
+BOTTOM = np.array([1, 2, 1, 1])  # one-based; level 0 is below the bed at node 1
+
+
+def field(t):
+    """Linear in x, level and time, so interpolation is exact."""
+    level = np.arange(3)
+    values = 1.0 + NODE_X[None, :, None] / 100.0 + level + t[:, None, None] / 3600.0
+    values[:, 1, 0] = 99.0  # garbage below the bed, not a fill value
+    return values
+
+
+def test_profiles_skip_levels_below_bed(tmp_path, stack_writer):
+    for stack in (1, 2):
+        t = 3600.0 * (stack - 1) * 2 + np.array([1800.0, 3600.0])
+        z = np.broadcast_to(-10.0 + 5.0 * np.arange(3), (2, 4, 3)).copy()
+        stack_writer(
+            tmp_path,
+            stack,
+            t,
+            {"salinity": field(t), "zCoordinates": z},
+            BOTTOM,
+            node_x=NODE_X,
+            node_y=NODE_Y,
+            faces=FACES,
+            mask_below_bottom=False,
+        )
+    # (60, 30) uses node 1; (10, 80) does not
+    profiles = extract_profiles(str(tmp_path), [60.0, 10.0], [30.0, 80.0], [4500.0, 1800.0])
+    values, z = profiles[0]
+    np.testing.assert_allclose(values, 1.0 + 0.6 + np.array([1.0, 2.0]) + 1.25)
+    np.testing.assert_allclose(z, [-5.0, 0.0])
+    values, z = profiles[1]
+    np.testing.assert_allclose(values, 1.0 + 0.1 + np.arange(3.0) + 0.5)
+    np.testing.assert_allclose(z, [-10.0, -5.0, 0.0])
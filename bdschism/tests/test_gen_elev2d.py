@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Tests for the scenario path of bdschism.gen_elev2d."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from netCDF4 import Dataset
+
+pytest.importorskip("schimpy")
+# vtools may be installed but fail to import against a newer scipy
+pytest.importorskip("vtools", exc_type=ImportError)
+pytest.importorskip("dms_datastore")
+
+import bdschism.gen_elev2d as gen_elev2d
+from bdschism.gen_elev2d import gen_elev2D, gen_elev2D_scenarios
+
+# Periods with tide data; the years in between are missing
+AVAILABLE = [("2009-11-01", "2010-03-01"), ("2019-11-01", "2020-03-01")]
+DATA_END = "2020-03-01"
+
+
+def write_hgrid(path):
+    """Two triangles between Point Reyes and Monterey, one open boundary."""
+    nodes = [(520000.0, 4150000.0), (540000.0, 4130000.0), (545000.0, 4160000.0),
+             (525000.0, 4175000.0)]
+    lines = ["hgrid", "2 4"]
+    lines += [f"{i + 1} {x} {y} 50.0" for i, (x, y) in enumerate(nodes)]
+    lines += ["1 3 1 2 3", "2 3 1 3 4"]
+    lines += ["1 = Number of open boundaries", "2 = Total number of open boundary nodes",
+              "2 = Number of nodes for open boundary 1", "1", "2"]
+    lines += ["0 = number of land boundaries", "0 = Total number of land boundary nodes"]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def synthetic_tide(src, start, end=None):
+    """15-minute station elevations, NaN outside :data:`AVAILABLE`."""
+    index = pd.date_range(start, end or DATA_END, freq="15min")
+    t = (index - pd.Timestamp("2000-01-01")) / pd.Timedelta(1, "h")
+    lag = 0.5 if src == "monterey" else 0.0
+    eta = (
+        0.6 * np.cos(2 * np.pi * (t - lag) / 12.42)
+        + 0.35 * np.cos(2 * np.pi * (t - lag) / 23.93)
+        + 0.1 * np.sin(2 * np.pi * t / (24 * 14.77))
+        + 1.0
+    )
+    have = np.zeros(len(index), dtype=bool)
+    for a, b in AVAILABLE:
+        have |= (index >= a) & (index <= b)
+    return pd.DataFrame({"value": np.where(have, eta, np.nan)}, index=index)
+
+
+@pytest.fixture
+def tides(monkeypatch):
+    calls = []
+
+    def get_data(src, start, end=None):
+        calls.append((src, pd.Timestamp(start), end))
+        return synthetic_tide(src, start, end)
+
+    monkeypatch.setattr(gen_elev2d, "_get_data", get_data)
+    return calls
+
+
+def read_th(path):
+    if str(path).endswith("nc"):
+        with Dataset(path) as ds:
+            return ds["time"][:], ds["time_series"][:]
+    return path.read_bytes()
+
+
+def run_scenarios(directory, hgrid, scenarios):
+    gen_elev2D_scenarios(
+        str(hgrid),
+        "pt_reyes",
+        "monterey",
+        [(str(directory / name), start, end, slr) for name, start, end, slr in scenarios],
+    )
+
+
+def assert_match_single_runs(directory, hgrid, scenarios):
+    """Each scenario output is bit-identical to its own gen_elev2D run."""
+    for name, start, end, slr in scenarios:
+        single = directory / f"single_{name}"
+        gen_elev2D(str(hgrid), str(single), "pt_reyes", "monterey", start, end, slr)
+        if name.endswith("nc"):
+            for a, b in zip(read_th(directory / name), read_th(single)):
+                np.testing.assert_array_equal(a, b)
+        else:
+            assert read_th(directory / name) == read_th(single)
+
+
+def test_slr_scenarios_match_single_runs(tmp_path, tides):
+    hgrid = tmp_path / "hgrid.gr3"
+    write_hgrid(hgrid)
+    scenarios = [
+        (f"elev2D_slr{slr}.th{ext}", "2010-01-01", "2010-01-20", slr)
+        for slr, ext in ((0.0, ".nc"), (0.5, ".nc"), (1.0, ""))
+    ]
+    run_scenarios(tmp_path, hgrid, scenarios)
+    # One read of each station for the shared window
+    assert len(tides) == 2
+    assert_match_single_runs(tmp_path, hgrid, scenarios)
+
+    _, base = read_th(tmp_path / "elev2D_slr0.0.th.nc")
+    _, raised = read_th(tmp_path / "elev2D_slr0.5.th.nc")
+    np.testing.assert_allclose(raised - base, 0.5, atol=1e-5)
+
+
+def test_disjoint_windows_are_read_separately(tmp_path, tides):
+    hgrid = tmp_path / "hgrid.gr3"
+    write_hgrid(hgrid)
+    scenarios = [
+        ("elev2D_2020.th.nc", "2020-01-01", "2020-01-20", 0.0),
+        ("elev2D_2010.th", "2010-01-01", "2010-01-20", 0.0),
+    ]
+    # The union of the windows spans the years without data
+    run_scenarios(tmp_path, hgrid, scenarios)
+    assert sorted({start for _, start, _ in tides}) == [
+        pd.Timestamp("2009-12-16"),
+        pd.Timestamp("2019-12-16"),
+    ]
+    assert_match_single_runs(tmp_path, hgrid, scenarios)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Tests for coarse to fine grid mapping in bdschism.grid_mapping."""
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from bdschism.grid_mapping import GridMapping, grid_mapping, read_grid, read_map_text
+
+
+def write_gr3(path, x, y, elems):
+    """Write a gr3 file; ``elems`` are zero-based node lists of 3 or 4 nodes."""
+    with open(path, "w") as f:
+        f.write("test grid\n")
+        f.write(f"{len(elems)} {len(x)}\n")
+        for i, (xi, yi) in enumerate(zip(x, y)):
+            f.write(f"{i + 1} {xi:.6f} {yi:.6f} 1.0\n")
+        for i, e in enumerate(elems):
+            f.write(f"{i + 1} {len(e)} " + " ".join(str(n + 1) for n in e) + "\n")
+
+
+def coarse_grid(path, n=5, spacing=100.0):
+    """Structured grid of triangles with a quadrilateral in the first cell."""
+    x, y = np.meshgrid(np.arange(n) * spacing, np.arange(n) * spacing)
+    elems = []
+    for j in range(n - 1):
+        for i in range(n - 1):
+            a, b, c, d = j * n + i, j * n + i + 1, (j + 1) * n + i + 1, (j + 1) * n + i
+            elems += [[a, b, c, d]] if i == j == 0 else [[a, b, c], [a, c, d]]
+    write_gr3(path, x.ravel(), y.ravel(), elems)
+
+
+def fine_grid(path, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.r_[rng.uniform(0, 400, 60), 0.0, 200.0, 450.0]  # two on nodes, one outside
+    y = np.r_[rng.uniform(0, 400, 60), 0.0, 300.0, 420.0]
+    write_gr3(path, x, y, [[0, 1, 2]])
+
+
+def linear(x, y):
+    return 1.0 + 2.0 * x - 3.0 * y
+
+
+def test_barycentric_exact_for_linear_field(tmp_path):
+    coarse_grid(tmp_path / "coarse.gr3")
+    fine_grid(tmp_path / "hgrid.gr3")
+    fx, fy, _ = read_grid(tmp_path / "hgrid.gr3")
+    cx, cy, faces = read_grid(tmp_path / "coarse.gr3")
+    assert faces.shape == (31, 4) and (faces[1:, 3] == -1).all()
+
+    mapping = grid_mapping(str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid.gr3"))
+    assert mapping.matrix.shape == (63, 25)
+    np.testing.assert_allclose(mapping.matrix.sum(axis=1), 1.0)
+    out = mapping.remap(linear(cx, cy))
+    np.testing.assert_allclose(out[:-1], linear(fx, fy)[:-1], atol=1e-8)
+    # outside the coarse grid: nearest coarse node (400, 400)
+    assert out[-1] == pytest.approx(linear(400.0, 400.0))
+
+    series = np.vstack([linear(cx, cy) * k for k in range(1, 4)])
+    np.testing.assert_allclose(mapping.remap(series)[2], 3.0 * out)
+
+
+def test_idw_weights(tmp_path):
+    coarse_grid(tmp_path / "coarse.gr3")
+    fine_grid(tmp_path / "hgrid.gr3")
+    fx, fy, _ = read_grid(tmp_path / "hgrid.gr3")
+    cx, cy, _ = read_grid(tmp_path / "coarse.gr3")
+    mapping = grid_mapping(
+        str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid.gr3"), method="idw", cache_dir=""
+    )
+    i = 5
+    nodes = mapping.nodes[i]
+    inv = 1.0 / np.hypot(cx[nodes] - fx[i], cy[nodes] - fy[i])
+    np.testing.assert_allclose(mapping.weights[i], inv / inv.sum())
+    values = np.arange(25.0)
+    out = mapping.remap(values)
+    assert out[60] == values[0] and out[61] == values[17]
+
+
+def test_cache_keyed_on_grid_content(tmp_path):
+    coarse_grid(tmp_path / "coarse.gr3")
+    fine_grid(tmp_path / "hgrid.gr3")
+    first = grid_mapping(str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid.gr3"))
+    cached = [f for f in os.listdir(tmp_path) if f.startswith("grid_mapping_")]
+    assert len(cached) == 1
+
+    # Same content under another name reuses the cache
+    os.rename(tmp_path / "hgrid.gr3", tmp_path / "hgrid_copy.gr3")
+    again = grid_mapping(str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid_copy.gr3"))
+    np.testing.assert_array_equal(again.weights, first.weights)
+    assert len([f for f in os.listdir(tmp_path) if f.startswith("grid_mapping_")]) == 1
+
+    fine_grid(tmp_path / "hgrid_copy.gr3", seed=1)
+    grid_mapping(str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid_copy.gr3"))
+    assert len([f for f in os.listdir(tmp_path) if f.startswith("grid_mapping_")]) == 2
+
+
+def test_map_file_matches_script_formula(tmp_path):
+    coarse_grid(tmp_path / "coarse.gr3")
+    fine_grid(tmp_path / "hgrid.gr3")
+    mapping = grid_mapping(str(tmp_path / "coarse.gr3"), str(tmp_path / "hgrid.gr3"))
+    mapping.write_map_file(tmp_path / "map.nc")
+    values = xr.DataArray(np.random.default_rng(3).uniform(0, 10, 25), dims="nMesh2_node")
+    with xr.open_dataset(tmp_path / "map.nc", mask_and_scale=False) as ds:
+        # as in calculate_hsi: unused slots point at node -1 with zero weight
+        remapped = (values.isel(nMesh2_node=ds.map_to_coarse_nodes) * ds.weight).sum(
+            dim="three"
+        ) / ds.weight.sum(dim="three")
+    np.testing.assert_allclose(remapped.values, mapping.remap(values.values))
+
+    loaded = GridMapping.load(
+        [os.path.join(tmp_path, f) for f in os.listdir(tmp_path) if f.endswith(".npz")][0]
+    )
+    assert (loaded.matrix != mapping.matrix).nnz == 0
+
+
+def test_map_text_matches_per_node_average(tmp_path):
+    rng = np.random.default_rng(4)
+    ids, weights = [], []
+    with open(tmp_path / "mapped.txt", "w") as f:
+        for j in range(40):
+            n = 1 + j % 4
+            ids.append(rng.choice(25, n, replace=False))
+            weights.append(rng.uniform(0.1, 2.0, n))
+            f.write(
+                f"{j + 1} {n} " + " ".join(str(i + 1) for i in ids[-1]) + " "
+                + " ".join(f"{w:.6f}" for w in weights[-1]) + "\n"
+            )
+    mapping = read_map_text(tmp_path / "mapped.txt", nsource=25)
+    assert mapping.matrix.shape == (40, 25)
+
+    # as in scripts/HSI_Bever_updated.py, node by node
+    quantiles = rng.uniform(0, 10, (4, 6, 25))
+    weights = [np.round(w, 6) for w in weights]  # as written to the file
+    expected = np.stack(
+        [np.average(quantiles[:, :, i], axis=2, weights=w) for i, w in zip(ids, weights)],
+        axis=-1,
+    )
+    np.testing.assert_allclose(mapping.remap(quantiles), expected)
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""Tests for the day-block HSI pipeline in bdschism.hsi."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from netCDF4 import Dataset
+
+from bdschism.grid_mapping import grid_mapping
+from bdschism.hsi import hsi_stacks
+
+# 3 x 3 nodes, 100 m apart: one quadrilateral and six triangles
+NODE_X = np.tile([0.0, 100.0, 200.0], 3)
+NODE_Y = np.repeat([0.0, 100.0, 200.0], 3)
+FACES = np.array(
+    [[0, 1, 4, 3], [1, 2, 5, -1], [1, 5, 4, -1], [3, 4, 7, -1], [3, 7, 6, -1],
+     [4, 5, 8, -1], [4, 8, 7, -1]]
+)
+NNODE, NLEVEL, STEPS = 9, 3, 4
+BOTTOM = np.array([1, 2, 1, 1, 1, 2, 1, 1, 1])
+START = "2021-07-01"
+
+
+def write_stacks(stack_writer, directory, nstack=2, seed=0, step=21600.0):
+    """Stacks of STEPS outputs from 00:30, as the half-hourly outputs of a run."""
+    rng = np.random.default_rng(seed)
+    for stack in range(1, nstack + 1):
+        t = 1800.0 + step * ((stack - 1) * STEPS + np.arange(STEPS))
+        depth = rng.uniform(5.0, 15.0, NNODE)
+        frac = np.sort(rng.uniform(0, 1, (STEPS, NNODE, NLEVEL)), axis=-1)
+        frac[..., 0], frac[..., -1] = 0.0, 1.0
+        fields = {
+            "zCoordinates": -depth[None, :, None] * (1.0 - frac),
+            "salinity": rng.uniform(2.0, 10.0, (STEPS, NNODE, NLEVEL)),
+            "horizontalVelX": rng.uniform(-1.2, 1.2, (STEPS, NNODE, NLEVEL)),
+            "horizontalVelY": rng.uniform(-0.6, 0.6, (STEPS, NNODE, NLEVEL)),
+        }
+        stack_writer(
+            directory,
+            stack,
+            t,
+            fields,
+            BOTTOM,
+            node_x=NODE_X,
+            node_y=NODE_Y,
+            faces=FACES,
+            time_units=f"seconds since {START} 00:00:00",
+        )
+
+
+def write_inputs(directory, nday=3, seed=1):
+    """Coarse grid, quantile files and subregions."""
+    rng = np.random.default_rng(seed)
+    with open(directory / "coarse.gr3", "w") as f:
+        f.write("coarse\n2 4\n")
+        for i, (x, y) in enumerate([(-10, -10), (210, -10), (210, 210), (-10, 210)]):
+            f.write(f"{i + 1} {x} {y} 1.0\n")
+        f.write("1 3 1 2 3\n2 3 1 3 4\n")
+    for q in (10, 25, 75, 90):
+        offset = (q - 50) / 20.0
+        pd.DataFrame(rng.uniform(21.0, 25.0, (nday, 4)) + offset).to_csv(
+            directory / f"temperature_{q}.csv", header=False, index=False
+        )
+        pd.DataFrame(np.log(rng.uniform(8.0, 14.0, (nday, 4)) + 2 * offset)).to_csv(
+            directory / f"ln_turbidity_{q}.csv", header=False, index=False
+        )
+    with Dataset(directory / "subregion_hsi.nc", "w") as ds:
+        ds.createDimension("nSCHISM_hgrid_face", len(FACES))
+        ds.createVariable("west", "i4", ("nSCHISM_hgrid_face",))[:] = [1, 0, 0, 1, 1, 0, 0]
+        ds.createVariable("east", "i4", ("nSCHISM_hgrid_face",))[:] = [0, 1, 1, 0, 0, 1, 1]
+
+
+def run(tmp_path, **kwargs):
+    kwargs.setdefault("quantile_start", START)
+    return hsi_stacks(
+        str(tmp_path / "outputs"),
+        START,
+        str(tmp_path / "input" / "temperature_*.csv"),
+        str(tmp_path / "input" / "ln_turbidity_*.csv"),
+        str(tmp_path / "input" / "coarse.gr3"),
+        str(tmp_path / "input" / "subregion_hsi.nc"),
+        out_dir=str(tmp_path / "hsi"),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def study(tmp_path, stack_writer):
+    (tmp_path / "outputs").mkdir()
+    (tmp_path / "input").mkdir()
+    write_stacks(stack_writer, tmp_path / "outputs")
+    write_inputs(tmp_path / "input")
+    return tmp_path
+
+
+# Reference: the xarray formulas of scripts/suxarray_dep_scripts/calculate_hsi*.py
+def bin_and_apply(val, bins, fns):
+    digitized = np.digitize(val, bins)
+    result = np.empty_like(val)
+    for i in range(len(fns)):
+        mask = np.where(digitized == i)
+        result[mask] = fns[i](val[mask])
+    np.clip(result, 0.0, 1.0, out=result)
+    return result
+
+
+def interpolate_turbidity_cutoff_probability(turb, levels):
+    probability_all = np.zeros_like(turb)
+    funclist = [
+        lambda v1, v2: (12.0 - v1) / (v2 - v1) * 0.20 + 0.05,
+        lambda v1, v2: (12.0 - v1) / (v2 - v1) * 0.25 + 0.25,
+        lambda v1, v2: (12.0 - v1) / (v2 - v1) * 0.25 + 0.5,
+        lambda v1, v2: (12.0 - v2) / (v2 - v1) * 0.25 + 0.75,
+    ]
+    n_quantiles = turb.shape[-1]
+    for l in range(n_quantiles):
+        l_ = l if l != n_quantiles - 1 else l - 1
+        probability_all[..., l] = funclist[l](turb[..., l_], turb[..., l_ + 1])
+    result = np.select(
+        [levels == i for i in range(n_quantiles)],
+        [probability_all[..., i] for i in range(n_quantiles)],
+        default=0.0,
+    )
+    np.clip(result, 0.0, 1.0, out=result)
+    return result
+
+
+def face_average(da):
+    idx = xr.DataArray(np.where(FACES < 0, 0, FACES), dims=("nMesh2_face", "four"))
+    used = xr.DataArray(FACES >= 0, dims=("nMesh2_face", "four"))
+    return da.isel(nMesh2_node=idx).where(used).mean("four")
+
+
+def reference(tmp_path, nstack=2, formula="hsi"):
+    out = tmp_path / "outputs"
+
+    def open_var(name):
+        ds = xr.concat(
+            [xr.load_dataset(out / f"{name}_{s}.nc") for s in range(1, nstack + 1)], "time"
+        )
+        return ds[name].rename(nSCHISM_hgrid_node="nMesh2_node")
+
+    z = open_var("zCoordinates")
+    dz = z.diff("nSCHISM_vgrid_layers")
+
+    def depth_average(name):
+        mid = open_var(name).rolling(nSCHISM_vgrid_layers=2).mean()
+        mid = mid.isel(nSCHISM_vgrid_layers=slice(1, None))
+        return (mid * dz).sum("nSCHISM_vgrid_layers") / dz.sum("nSCHISM_vgrid_layers")
+
+    def shift_30min_up(da):
+        return da.assign_coords(time=da.coords["time"] - pd.to_timedelta("30min"))
+
+    hvel = np.hypot(depth_average("horizontalVelX"), depth_average("horizontalVelY"))
+    # "1D" with origin="start" in the scripts; recent pandas needs a fixed frequency
+    hvel_max = shift_30min_up(hvel.resample(time="24h", origin="start").max())
+    frac = xr.where(depth_average("salinity") < 6.0, 1, 0)
+    frac = shift_30min_up(frac.resample(time="24h", origin="start").mean())
+
+    frac_face = face_average(frac)
+    hvel_face = face_average(hvel_max)
+    si_hvel = xr.apply_ufunc(
+        lambda v: bin_and_apply(
+            v,
+            [0.5, 0.71, 0.82, 0.89, 1.02, 1.1],
+            [
+                lambda v: 1.0,
+                lambda v: -0.4655 * v + 1.233,
+                lambda v: -1.8608 * v + 2.228,
+                lambda v: -3.0193 * v + 3.179,
+                lambda v: -1.5059 * v + 1.836,
+                lambda v: -2.4432 * v + 2.792,
+                lambda v: -0.0859 * v + 0.194,
+            ],
+        ),
+        hvel_face,
+    )
+    si_salinity = xr.apply_ufunc(
+        lambda v: bin_and_apply(
+            v,
+            [0.195, 0.448, 0.723, 0.802, 0.839, 0.949],
+            [
+                lambda v: 0.1537 * v + 0.069,
+                lambda v: 0.7937 * v - 0.055,
+                lambda v: 0.7273 * v - 0.025,
+                lambda v: 2.5386 * v - 1.334,
+                lambda v: 5.3637 * v - 3.600,
+                lambda v: 0.8902 * v + 0.155,
+                lambda v: 1.0,
+            ],
+        ),
+        frac_face,
+    )
+
+    mapping = grid_mapping(
+        str(tmp_path / "input" / "coarse.gr3"), str(out / "out2d_1.nc"), method="idw",
+        cache_dir="",
+    )
+
+    def quantiles(prefix, transform=lambda v: v):
+        values = np.stack(
+            [pd.read_csv(tmp_path / "input" / f"{prefix}_{q}.csv", header=None).values
+             for q in (10, 25, 75, 90)]
+        )
+        da = xr.DataArray(
+            mapping.remap(transform(values)),
+            dims=["quantile", "time", "nMesh2_node"],
+            coords={"time": pd.date_range(START, periods=values.shape[1])},
+        )
+        return face_average(da)
+
+    temp = quantiles("temperature")
+    si_temperature = xr.apply_ufunc(
+        lambda v: np.array([0, 0.25, 0.5, 0.75, 1.0])[v],
+        xr.where(temp < 24.0, 1, 0).sum(dim="quantile"),
+    )
+    turb = quantiles("ln_turbidity", np.exp)
+    levels = xr.where(turb > 12.0, 1, 0).sum(dim="quantile")
+    prob = xr.apply_ufunc(
+        interpolate_turbidity_cutoff_probability,
+        turb,
+        levels,
+        input_core_dims=[["quantile"], []],
+    )
+    if formula == "hsi2":
+        hsi = (1.0 - 0.6 * prob) * (0.67 * si_salinity + 0.33 * si_hvel) * si_temperature
+    else:
+        hsi = (1.0 - 0.6 * prob) * (0.67 * frac_face + 0.33 * hvel_face) * si_temperature
+    return si_hvel, si_salinity, hsi
+
+
+@pytest.mark.parametrize("formula", ["hsi", "hsi2"])
+def test_matches_script_formulas(study, formula):
+    # calculate_hsi2.py starts the quantiles on July 1 of the model year
+    kwargs = {"quantile_start": None} if formula == "hsi2" else {}
+    files = run(study, nproc=1, chunk_steps=3, chunk_nodes=4, formula=formula, **kwargs)
+    assert [os.path.basename(f) for f in files] == [
+        "si_hvel.nc", "si_salinity.nc", "hsi.nc", "hsi_area.nc"
+    ]
+    si_hvel, si_salinity, hsi = reference(study, formula=formula)
+    assert hsi.sizes["time"] == 2
+    assert list(hsi.time.values) == list(pd.date_range(START, periods=2))
+    assert 0.0 < float(hsi.min())
+    for path, var, ref in zip(files, ["SI_hvel", "SI_salinity", "hsi"], [si_hvel, si_salinity, hsi]):
+        with xr.open_dataset(path) as ds:
+            assert list(ds.time.values) == list(ref.time.values)
+            np.testing.assert_allclose(ds[var].values, ref.values, rtol=1e-5)
+
+    with xr.open_dataset(files[-1]) as ds:
+        assert list(ds.region.values) == ["west", "east"]
+        np.testing.assert_allclose(ds.subarea.values, [20000.0, 20000.0])
+        area = np.array([10000.0, 5000.0, 5000.0, 5000.0, 5000.0, 5000.0, 5000.0])
+        west = np.array([1, 0, 0, 1, 1, 0, 0], dtype=bool)
+        np.testing.assert_allclose(
+            ds.hsi_area.values,
+            [(area[west] * hsi.values[:, west]).sum(axis=1),
+             (area[~west] * hsi.values[:, ~west]).sum(axis=1)],
+            rtol=1e-5,
+        )
+
+
+def test_resume_skips_checkpointed_days(study):
+    first = run(study, nproc=2)
+    checkpoints = study / "hsi" / "hsi_checkpoints"
+    assert sorted(os.listdir(checkpoints)) == ["hsi_day_1.npz", "hsi_day_2.npz"]
+    with xr.open_dataset(first[2]) as ds:
+        expected = ds.hsi.values
+
+    # A crash after the first day leaves its checkpoint only
+    os.remove(checkpoints / "hsi_day_2.npz")
+    mtime = os.stat(checkpoints / "hsi_day_1.npz").st_mtime_ns
+    files = run(study, nproc=1)
+    assert os.stat(checkpoints / "hsi_day_1.npz").st_mtime_ns == mtime
+    with xr.open_dataset(files[2]) as ds:
+        np.testing.assert_array_equal(ds.hsi.values, expected)
+
+    # Changed inputs invalidate the checkpoints
+    write_inputs(study / "input", seed=2)
+    files = run(study, nproc=1)
+    assert os.stat(checkpoints / "hsi_day_1.npz").st_mtime_ns != mtime
+    with xr.open_dataset(files[2]) as ds:
+        assert not np.allclose(ds.hsi.values, expected)
+
+
+def test_runs_without_the_first_stack(study):
+    files = run(study, nproc=1)
+    with xr.open_dataset(files[2]) as ds:
+        expected = ds.hsi.values[1:]
+
+    # e.g. --first-stack 2 on outputs where stack 1 was cleaned up
+    for fname in os.listdir(study / "outputs"):
+        if fname.endswith("_1.nc"):
+            os.remove(study / "outputs" / fname)
+    files = run(study, nproc=2, first_stack=2, checkpoint_dir=str(study / "fresh"))
+    with xr.open_dataset(files[2]) as ds:
+        assert ds.sizes["time"] == 1
+        np.testing.assert_array_equal(ds.hsi.values, expected)
+
+
+def test_default_quantile_start(study):
+    # The quantile files of calculate_hsi.py start on 2017-07-01
+    with pytest.raises(ValueError, match="quantile record"):
+        run(study, nproc=1, quantile_start=None)
+
+
+@pytest.mark.parametrize("step, match", [(43200.0, "more than one day"), (10800.0, "same day")])
+def test_stacks_must_hold_one_day(tmp_path, stack_writer, step, match):
+    (tmp_path / "outputs").mkdir()
+    (tmp_path / "input").mkdir()
+    write_stacks(stack_writer, tmp_path / "outputs", step=step)
+    write_inputs(tmp_path / "input")
+    with pytest.raises(ValueError, match=match):
+        run(tmp_path, nproc=1)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Tests for the LSZ area time series in bdschism.lsz_zone_ts."""
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from bdschism.lsz_zone_ts import SQUARE_METER_TO_ACRE, load_lsz_mesh, lsz_zone_ts
+
+# 3 x 3 nodes, 100 m apart, two triangles per cell: every element is 5000 m2
+NODE_X = np.tile([0.0, 100.0, 200.0], 3)
+NODE_Y = np.repeat([0.0, 100.0, 200.0], 3)
+FACES = np.array(
+    [[a, a + 1, a + 4, -1] for a in (0, 1, 3, 4)] + [[a, a + 4, a + 3, -1] for a in (0, 1, 3, 4)]
+)
+NODE_SALT = np.array([5.0, 5.5, 6.5, 5.8, 6.2, 6.9, 8.0, 6.4, 9.0])
+BOTTOM = np.array([1, 2, 1, 1, 1, 1, 2, 1, 1])
+STEPS = 4
+ZONES = {"west": [0, 2, 4, 6], "east": [1, 3, 5, 7]}
+
+
+def write_study(stack_writer, directory, node_x=NODE_X):
+    for stack in (1, 2):
+        t = (stack - 1) * 86400.0 + 21600.0 * np.arange(1, STEPS + 1)
+        # Vertically uniform, so the depth average is the node value
+        salt = np.broadcast_to(NODE_SALT[None, :, None], (STEPS, 9, 3)).copy()
+        z = np.broadcast_to(np.array([-10.0, -5.0, 0.0]), (STEPS, 9, 3)).copy()
+        dry = np.zeros((STEPS, 9), dtype=np.int32)
+        dry_element = np.zeros((STEPS, len(FACES)), dtype=np.int32)
+        if stack == 2:
+            dry[1, 8] = 1  # node 8 dry once: its elements are excluded
+            dry_element[2, 0] = 1
+        stack_writer(
+            directory,
+            stack,
+            t,
+            {"salinity": salt, "zCoordinates": z},
+            BOTTOM,
+            node_x=node_x,
+            node_y=NODE_Y,
+            faces=FACES,
+            dry=dry,
+            dry_element=dry_element,
+        )
+    if (directory / "subregions.nc").exists():
+        return
+    with Dataset(directory / "subregions.nc", "w") as ds:
+        ds.createDimension("nSCHISM_hgrid_face", len(FACES))
+        for zone, members in ZONES.items():
+            flag = np.zeros(len(FACES), dtype=np.int32)
+            flag[members] = 1
+            ds.createVariable(zone, "i4", ("nSCHISM_hgrid_face",))[:] = flag
+
+
+def expected_row(excluded=()):
+    face_salt = np.array([NODE_SALT[f[:3]].mean() for f in FACES])
+    face_salt[list(excluded)] = 9999.0
+    row = {}
+    for zone, members in ZONES.items():
+        s = face_salt[members]
+        row[f"{zone}(<6psu)"] = 5000.0 * (s < 6.0).sum() * SQUARE_METER_TO_ACRE
+        row[f"{zone}(<7psu)"] = 5000.0 * (s < 7.0).sum() * SQUARE_METER_TO_ACRE
+    row["total_lsz_area1"] = 5000.0 * (face_salt < 6.0).sum() * SQUARE_METER_TO_ACRE
+    row["total_lsz_area2"] = 5000.0 * (face_salt < 7.0).sum() * SQUARE_METER_TO_ACRE
+    return row
+
+
+def test_lsz_areas_by_zone(tmp_path, stack_writer):
+    write_study(stack_writer, tmp_path)
+    df = lsz_zone_ts(str(tmp_path), str(tmp_path / "subregions.nc"), "2021-04-20", nproc=1)
+    assert [str(d.date()) for d in df.index] == ["2021-04-20", "2021-04-21"]
+    first = expected_row()
+    assert first["total_lsz_area2"] > first["total_lsz_area1"] > 0
+    assert df.iloc[0].to_dict() == pytest.approx(first)
+    # elements 0 (flagged dry) and 3, 7 (node 8 dry) drop out on day two
+    assert df.iloc[1].to_dict() == pytest.approx(expected_row(excluded=[0, 3, 7]))
+    assert list(df.columns) == list(first)
+
+
+def test_mesh_cache_tracks_node_coordinates(tmp_path, stack_writer):
+    write_study(stack_writer, tmp_path)
+    mesh = load_lsz_mesh(str(tmp_path), str(tmp_path / "subregions.nc"))
+    np.testing.assert_allclose(mesh["ele_area"], 5000.0)
+    cached = load_lsz_mesh(str(tmp_path), str(tmp_path / "subregions.nc"))
+    np.testing.assert_array_equal(cached["zone_ele"], mesh["zone_ele"])
+
+    # Same node and element counts, stretched in x
+    write_study(stack_writer, tmp_path, node_x=2.0 * NODE_X)
+    moved = load_lsz_mesh(str(tmp_path), str(tmp_path / "subregions.nc"))
+    np.testing.assert_allclose(moved["ele_area"], 10000.0)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Tests for the derived DSS columns of bdschism.port_boundary."""
+
+import pytest
+
+pytest.importorskip("schimpy")
+# vtools may be installed but fail to import against a newer scipy
+pytest.importorskip("vtools", exc_type=ImportError)
+pytest.importorskip("pyhecdss")
+
+from bdschism.port_boundary import _columns_by_b_part
+
+
+def test_columns_are_b_parts():
+    paths = ["/CALSIM/C_SAC041/CHANNEL//1MON/L2020A/", "/CALSIM/D_OMR027/DIVERSION//1MON/L2020A/"]
+    assert _columns_by_b_part(paths, "flux") == ["C_SAC041", "D_OMR027"]
+
+
+def test_shared_b_part_raises():
+    paths = [
+        "/CALSIM/C_SAC041/CHANNEL//1MON/L2020A/",
+        "/CALSIM/C_SAC041/FLOW-DELIVERY//1MON/L2020A/",
+        "/CALSIM/D_OMR027/DIVERSION//1MON/L2020A/",
+    ]
+    with pytest.raises(ValueError, match="share the B part C_SAC041") as err:
+        _columns_by_b_part(paths, "flux")
+    assert "FLOW-DELIVERY" in str(err.value) and "D_OMR027" not in str(err.value)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Tests for the fort.18 readers in bdschism.read_fort18."""
+
+import numpy as np
+
+from bdschism.read_fort18 import read_xyt, read_xyz
+
+
+def test_xyt_overflow_only_drops_value_rows(tmp_path):
+    path = tmp_path / "fort.18"
+    path.write_text(
+        "1 10.5 -1.0 0.0 0.25\n"
+        "1 ****** -2.0 0.0 0.25\n"  # overflowed value: dropped
+        "1 11.0 ***** 0.0 0.25\n"  # overflowed depth: kept as NaN
+        "&\n"
+        "\n"
+        "2 3.5 -1.0 ****** 0.5\n"
+        "2 4.0 -3.0 0.0 0.5\n"
+    )
+    data, index = read_xyt(str(path))
+    np.testing.assert_array_equal(data["value"], [10.5, 11.0, 3.5, 4.0])
+    assert np.isnan(data["z"][1]) and np.isnan(data["aux"][2])
+    np.testing.assert_array_equal(index[1], [0, 1])
+    np.testing.assert_array_equal(index[2], [2, 3])
+
+
+def test_xyz_overflow_is_nan(tmp_path):
+    path = tmp_path / "fort.18"
+    path.write_text("0.5 1.0 2.0\n1.0 ***** 3.0\n")
+    time, values = read_xyz(str(path))
+    np.testing.assert_array_equal(time, [0.5, 1.0])
+    np.testing.assert_array_equal(values, [[1.0, 2.0], [np.nan, 3.0]])
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Tests for windowed slicing of time history NetCDF files in bdschism.slice_th_nc."""
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import xarray as xr
+
+from bdschism.slice_th_nc import slice_nc
+
+NT = 400
+
+
+def write_uv3d(path, with_units=False, fill_value=-9999.0):
+    """Bare SCHISM style uv3D.th.nc with time in seconds since 2000-01-01."""
+    rng = np.random.default_rng(0)
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("time", None)
+        ds.createDimension("nOpenBndNodes", 7)
+        ds.createDimension("nLevels", 3)
+        ds.createDimension("nComponents", 2)
+        ds.createDimension("one", 1)
+        time = ds.createVariable("time", "f8", ("time",))
+        if with_units:
+            time.units = "seconds since 2000-01-01"
+        time[:] = np.arange(NT) * 900.0
+        ts = ds.createVariable(
+            "time_series",
+            "f4",
+            ("time", "nOpenBndNodes", "nLevels", "nComponents"),
+            fill_value=fill_value,
+        )
+        values = rng.random((NT, 7, 3, 2))
+        values[100:110, 2] = np.nan
+        ts[:] = values
+        ds.createVariable("time_step", "f4", ("one",))[:] = 900.0
+    return path
+
+
+@pytest.mark.parametrize("fill_value", [-9999.0, np.nan])
+@pytest.mark.parametrize("block_bytes", [1, 1000, 2**26])
+def test_window_and_elapsed_time(tmp_path, block_bytes, fill_value):
+    src = write_uv3d(tmp_path / "uv3D.th.nc", fill_value=fill_value)
+    out = tmp_path / "out.th.nc"
+    code, msg = slice_nc(
+        str(src), str(out), "2000-01-02", "2000-01-03T06:00",
+        reftime="2000-01-01", block_bytes=block_bytes,
+    )
+    assert code == 0, msg
+
+    with xr.open_dataset(src, decode_times=False) as a, xr.open_dataset(
+        out, decode_times=False
+    ) as b:
+        i0, i1 = 96, 96 + 30 * 4 + 1
+        np.testing.assert_array_equal(b.time.values, np.arange(i1 - i0) * 900.0)
+        np.testing.assert_array_equal(b.time_series.values, a.time_series.values[i0:i1])
+        np.testing.assert_array_equal(b.time_step.values, a.time_step.values)
+        assert np.isnan(b.time_series.values).any()
+        assert b.time.attrs["units"] == "seconds since 2000-01-02 00:00:00.000000"
+        assert b.attrs["reftime"] == "2000-01-01 00:00:00.000000"
+        assert "sliced to new dates" in b.attrs["history"]
+
+
+def test_cf_units_and_compression(tmp_path):
+    src = write_uv3d(tmp_path / "uv3D.th.nc", with_units=True)
+    out = tmp_path / "out.th.nc"
+    code, msg = slice_nc(str(src), str(out), "2000-01-01T12:00", "2000-01-01T18:00", complevel=4)
+    assert code == 0, msg
+    with nc.Dataset(out) as ds:
+        assert ds.dimensions["time"].isunlimited()
+        assert len(ds.dimensions["time"]) == 25
+        var = ds.variables["time_series"]
+        assert var.filters()["zlib"]
+        assert var.chunking() == [1, 7, 3, 2]
+        assert var.getncattr("_FillValue") == np.float32(-9999.0)
+
+
+def test_errors(tmp_path):
+    src = write_uv3d(tmp_path / "uv3D.th.nc")
+    out = tmp_path / "out.th.nc"
+    code, msg = slice_nc(str(src), str(out), "2000-01-02", "2000-01-03")
+    assert code == 2 and "provide --reftime" in msg
+    code, msg = slice_nc(
+        str(src), str(out), "2001-01-01", "2001-02-01", reftime="2000-01-01"
+    )
+    assert code == 2 and "no data" in msg
+    assert not out.exists()
+    assert not (tmp_path / "out.th.nc.part").exists()
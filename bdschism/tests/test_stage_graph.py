@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Tests for incremental stage execution in bdschism.stage_graph."""
+
+import os
+import threading
+
+import pytest
+
+from bdschism.stage_graph import Stage, StageGraph
+
+
+def copy_upper(src, dst, calls, name):
+    calls.append(name)
+    with open(src) as f:
+        text = f.read()
+    with open(dst, "w") as f:
+        f.write(text.upper())
+
+
+def concat(srcs, dst, calls, name):
+    calls.append(name)
+    with open(dst, "w") as f:
+        for src in srcs:
+            with open(src) as g:
+                f.write(g.read())
+
+
+def build_graph(tmp_path, calls, params=None, max_workers=2):
+    """Two independent branches a and b merged by c."""
+    for name in ("a", "b"):
+        if not (tmp_path / f"{name}.txt").exists():
+            (tmp_path / f"{name}.txt").write_text(name)
+    graph = StageGraph(tmp_path / "state.json", max_workers=max_workers)
+    for name in ("a", "b"):
+        graph.add(
+            Stage(
+                name,
+                copy_upper,
+                args=(tmp_path / f"{name}.txt", tmp_path / f"{name}.out", calls, name),
+                inputs=(str(tmp_path / f"{name}.txt"),),
+                outputs=(str(tmp_path / f"{name}.out"),),
+                params=(params or {}).get(name),
+            )
+        )
+    graph.add(
+        Stage(
+            "c",
+            concat,
+            args=([tmp_path / "a.out", tmp_path / "b.out"], tmp_path / "c.out", calls, "c"),
+            deps=("a", "b"),
+            outputs=(str(tmp_path / "c.out"),),
+        )
+    )
+    return graph
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_second_run_skips_everything(tmp_path):
+    calls = []
+    status = build_graph(tmp_path, calls).run()
+    assert status == {"a": "ran", "b": "ran", "c": "ran"}
+    assert (tmp_path / "c.out").read_text() == "AB"
+
+    calls.clear()
+    status = build_graph(tmp_path, calls).run()
+    assert calls == []
+    assert set(status.values()) == {"skipped"}
+
+
+def test_changed_input_reruns_branch_and_downstream(tmp_path):
+    calls = []
+    build_graph(tmp_path, calls).run()
+    graph = build_graph(tmp_path, calls)
+    (tmp_path / "a.txt").write_text("x")
+    bump_mtime(tmp_path / "a.txt")
+    calls.clear()
+    assert graph.plan() == ["a", "c"]
+    graph.run()
+    assert sorted(calls) == ["a", "c"]
+    assert (tmp_path / "c.out").read_text() == "XB"
+
+
+def test_changed_params_rerun(tmp_path):
+    calls = []
+    build_graph(tmp_path, calls, params={"b": {"scale": 1}}).run()
+    calls.clear()
+    build_graph(tmp_path, calls, params={"b": {"scale": 2}}).run()
+    assert sorted(calls) == ["b", "c"]
+
+
+def test_modified_or_missing_output_reruns(tmp_path):
+    calls = []
+    build_graph(tmp_path, calls).run()
+    os.remove(tmp_path / "c.out")
+    calls.clear()
+    build_graph(tmp_path, calls).run()
+    assert calls == ["c"]
+
+    bump_mtime(tmp_path / "b.out")
+    calls.clear()
+    build_graph(tmp_path, calls).run()
+    assert sorted(calls) == ["b", "c"]
+
+
+def test_force_and_rerun(tmp_path):
+    calls = []
+    build_graph(tmp_path, calls).run()
+    calls.clear()
+    build_graph(tmp_path, calls).run(force=True)
+    assert sorted(calls) == ["a", "b", "c"]
+    calls.clear()
+    build_graph(tmp_path, calls).run(rerun=["b"])
+    assert sorted(calls) == ["b", "c"]
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    barrier = threading.Barrier(2, timeout=10)
+    graph = StageGraph(tmp_path / "state.json", max_workers=2)
+    graph.add(Stage("x", barrier.wait))
+    graph.add(Stage("y", barrier.wait))
+    # Raises BrokenBarrierError if the stages were run one after the other
+    assert graph.run() == {"x": "ran", "y": "ran"}
+
+
+def test_failure_records_completed_stages(tmp_path):
+    calls = []
+    graph = build_graph(tmp_path, calls, max_workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    graph.add(Stage("d", fail, deps=("c",)))
+    with pytest.raises(RuntimeError, match="boom"):
+        graph.run()
+    assert set(graph.load_state()) == {"a", "b", "c"}
+
+
+def test_adopt_existing_outputs(tmp_path):
+    (tmp_path / "synthetic.csv").write_text("1")
+    calls = []
+    graph = StageGraph(tmp_path / "state.json")
+    graph.add(
+        Stage(
+            "synthetic",
+            calls.append,
+            args=("synthetic",),
+            outputs=(str(tmp_path / "synthetic.csv"),),
+            adopt_existing=True,
+        )
+    )
+    assert graph.run() == {"synthetic": "skipped"}
+    assert calls == []
+    assert "synthetic" in graph.load_state()
+
+
+def test_unknown_dependency_rejected(tmp_path):
+    graph = StageGraph(tmp_path / "state.json")
+    with pytest.raises(ValueError, match="unknown stage"):
+        graph.add(Stage("late", print, deps=("early",)))
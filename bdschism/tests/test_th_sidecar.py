@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Tests for the binary .th sidecar cache in bdschism.th_sidecar."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bdschism.th_sidecar import read_th_table, read_with_sidecar, sidecar_path
+
+
+def write_elapsed_th(path, nrow=50, ncol=7, seed=0):
+    rng = np.random.default_rng(seed)
+    data = np.column_stack([np.arange(nrow) * 900.0, rng.random((nrow, ncol)) * 100])
+    np.savetxt(path, data, fmt="%.4f")
+
+
+def write_dated_th(path, nrow=30):
+    index = pd.date_range("2020-01-01", periods=nrow, freq="15min", name="datetime")
+    df = pd.DataFrame(
+        {"sac": np.arange(nrow) * 1.5, "sjr": np.arange(nrow) * -0.5}, index=index
+    )
+    df.to_csv(path, sep=" ", date_format="%Y-%m-%dT%H:%M")
+    return df
+
+
+@pytest.fixture(autouse=True)
+def enable_sidecar(monkeypatch):
+    monkeypatch.setenv("BDS_TH_SIDECAR", "1")
+
+
+class CountingReader:
+    """Wrap pandas.read_csv and count the text parses."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, fname, **kwargs):
+        self.calls += 1
+        return pd.read_csv(fname, sep=r"\s+", **kwargs)
+
+
+def test_elapsed_round_trip(tmp_path):
+    fname = tmp_path / "vsource.th"
+    write_elapsed_th(fname)
+    expected = pd.read_csv(fname, sep=r"\s+", index_col=0, header=None)
+
+    first = read_th_table(fname, index_col=0, header=None)
+    assert os.path.exists(sidecar_path(fname))
+    second = read_th_table(fname, index_col=0, header=None)
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+
+
+def test_dated_round_trip(tmp_path):
+    fname = tmp_path / "flux.th"
+    write_dated_th(fname)
+    kwargs = dict(header=0, index_col=0, parse_dates=[0], dtype=float)
+    expected = pd.read_csv(fname, sep=r"\s+", **kwargs)
+    read_th_table(fname, **kwargs)
+    pd.testing.assert_frame_equal(read_th_table(fname, **kwargs), expected)
+
+
+def test_hit_skips_parse_and_change_invalidates(tmp_path):
+    fname = tmp_path / "vsink.th"
+    write_elapsed_th(fname)
+    reader = CountingReader()
+    read_with_sidecar(fname, reader, index_col=0, header=None)
+    read_with_sidecar(fname, reader, index_col=0, header=None)
+    assert reader.calls == 1
+
+    write_elapsed_th(fname, nrow=60, seed=1)
+    df = read_with_sidecar(fname, reader, index_col=0, header=None)
+    assert reader.calls == 2
+    assert len(df) == 60
+
+
+def test_variants_share_one_sidecar(tmp_path):
+    fname = tmp_path / "msource.th"
+    write_elapsed_th(fname)
+    reader = CountingReader()
+    a = read_with_sidecar(fname, reader, index_col=0, header=None)
+    b = read_with_sidecar(fname, reader, header=None)
+    assert reader.calls == 2
+    pd.testing.assert_frame_equal(read_with_sidecar(fname, reader, index_col=0, header=None), a)
+    pd.testing.assert_frame_equal(read_with_sidecar(fname, reader, header=None), b)
+    assert reader.calls == 2
+
+
+def test_disabled_by_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("BDS_TH_SIDECAR", "0")
+    fname = tmp_path / "flux.th"
+    write_elapsed_th(fname)
+    read_th_table(fname, index_col=0, header=None)
+    assert not os.path.exists(sidecar_path(fname))
+
+
+def test_mixed_dtypes_not_stored(tmp_path):
+    fname = tmp_path / "gate.th"
+    fname.write_text("datetime install name\n2020-01-01 1 a\n2020-01-02 0 b\n")
+    df = read_th_table(fname, header=0)
+    assert list(df.columns) == ["datetime", "install", "name"]
+    assert not os.path.exists(sidecar_path(fname))
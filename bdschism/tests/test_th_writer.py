@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Byte-identity tests for bdschism.th_writer.write_th against DataFrame.to_csv."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bdschism.th_writer import write_th
+
+
+def synthetic_th(nrow=500, ncol=12, seed=0, elapsed=False):
+    """Wide time history with values spanning several orders of magnitude."""
+    rng = np.random.default_rng(seed)
+    values = rng.standard_normal((nrow, ncol)) * 10.0 ** rng.integers(-5, 4, ncol)
+    if elapsed:
+        index = pd.Index(np.arange(nrow) * 900.0)
+    else:
+        index = pd.date_range("2005-01-01", periods=nrow, freq="15min", name="datetime")
+    columns = [f"delta_src_{i}" for i in range(ncol)]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def to_csv_text(df, **kwargs):
+    buf = io.StringIO()
+    df.to_csv(buf, **kwargs)
+    return buf.getvalue()
+
+
+def write_th_text(df, **kwargs):
+    buf = io.StringIO()
+    write_th(df, buf, **kwargs)
+    return buf.getvalue()
+
+
+DATED = dict(
+    sep=" ",
+    header=True,
+    date_format="%Y-%m-%dT%H:%M:%S",
+    float_format="%.4f",
+    lineterminator="\n",
+)
+ELAPSED = dict(sep=" ", header=False, float_format="%.4f", lineterminator="\n")
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 100, 20000])
+def test_dated_identical(chunk_rows):
+    df = synthetic_th()
+    assert write_th_text(df, chunk_rows=chunk_rows, **DATED) == to_csv_text(df, **DATED)
+
+
+def test_elapsed_identical():
+    df = synthetic_th(elapsed=True)
+    assert write_th_text(df, chunk_rows=64, **ELAPSED) == to_csv_text(df, **ELAPSED)
+
+
+def test_nan_rounding_and_negative_zero():
+    df = synthetic_th(nrow=40, ncol=4)
+    df.iloc[3, 1] = np.nan
+    df.iloc[25, 2] = -0.00004
+    df.iloc[30, 0] = -0.0
+    df.iloc[31, 3] = 0.00005
+    assert write_th_text(df, chunk_rows=10, **DATED) == to_csv_text(df, **DATED)
+
+
+def test_mixed_int_float_columns():
+    df = synthetic_th(nrow=30, ncol=3)
+    df.insert(0, "install", np.arange(30) % 2)
+    df["ndup"] = np.int32(2)
+    kwargs = dict(sep=" ", float_format="%.2f", date_format="%Y-%m-%dT%H:%M")
+    assert write_th_text(df, **kwargs) == to_csv_text(df, **kwargs)
+
+
+def test_fallback_for_object_and_multiindex_columns():
+    df = synthetic_th(nrow=20, ncol=2)
+    df["elev"] = "-4.0244"
+    assert write_th_text(df, **DATED) == to_csv_text(df, **DATED)
+
+    df = synthetic_th(nrow=20, ncol=4)
+    df.columns = pd.MultiIndex.from_product([["salinity", "temperature"], ["a", "b"]])
+    assert write_th_text(df, **DATED) == to_csv_text(df, **DATED)
+
+
+def test_path_output_matches(tmp_path):
+    df = synthetic_th(nrow=50)
+    kwargs = dict(sep=" ", header=True, date_format="%Y-%m-%dT%H:%M", float_format="%.4f")
+    write_th(df, tmp_path / "new.th", **kwargs)
+    df.to_csv(tmp_path / "old.th", **kwargs)
+    assert (tmp_path / "new.th").read_bytes() == (tmp_path / "old.th").read_bytes()
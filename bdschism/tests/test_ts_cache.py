@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Tests for the on-disk time series cache in bdschism.ts_cache."""
+
+import os
+import pickle
+import time
+
+import pandas as pd
+
+import bdschism.ts_cache as ts_cache
+from bdschism.ts_cache import TimeSeriesCache
+
+
+def test_round_trip_and_source_invalidation(tmp_path):
+    cache = TimeSeriesCache(tmp_path / "cache")
+    src = tmp_path / "data.csv"
+    src.write_text("a\n1\n")
+    series = pd.Series([1.0, 2.0], index=pd.period_range("2020-01", periods=2, freq="M"))
+    key = cache.key("read", sources=[src], window=(1, 2))
+    cache.put(key, series)
+    pd.testing.assert_series_equal(cache.get(key), series)
+
+    src.write_text("a\n1\n2\n")
+    assert cache.key("read", sources=[src], window=(1, 2)) != key
+
+
+def test_max_age_counts_from_write_not_use(tmp_path, monkeypatch):
+    cache = TimeSeriesCache(tmp_path)
+    key = cache.key("repo", station="9414290")
+    now = time.time()
+    monkeypatch.setattr(ts_cache.time, "time", lambda: now - 7200.0)
+    cache.put(key, "old")
+    monkeypatch.setattr(ts_cache.time, "time", lambda: now)
+
+    # Reading refreshes the modification time for LRU only
+    os.utime(cache._path(key))
+    assert cache.get(key, max_age=10800.0) == "old"
+    assert cache.get(key, max_age=3600.0) is None
+    assert cache.get(key) == "old"
+
+
+def test_entry_without_header_is_a_miss(tmp_path):
+    cache = TimeSeriesCache(tmp_path)
+    key = cache.key("repo", station="9414290")
+    with open(cache._path(key), "wb") as f:
+        pickle.dump("legacy", f)
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
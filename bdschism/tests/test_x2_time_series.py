@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Tests for the multi-stack X2 engine in bdschism.x2_time_series."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bdschism.x2_time_series import (
+    find_x2,
+    fort18_route_salinity,
+    native_route_salinity,
+    x2_crossing,
+    x2_from_salinity,
+)
+
+NX = 21  # nodes along the strip, 1 km apart
+STEPS = 24  # hourly outputs per daily stack
+
+
+def bottom_salt(x, t):
+    """Bottom salinity decreasing upstream; 2 psu at 18 km plus a tide."""
+    return 20.0 - x / 1000.0 + 0.5 * np.sin(2 * np.pi * t / 44712.0)
+
+
+def write_stacks(stack_writer, directory, nstack=2):
+    """Two rows of nodes along x with triangles, three vertical levels."""
+    x = np.tile(np.arange(NX) * 1000.0, 2)
+    y = np.repeat([0.0, 1000.0], NX)
+    faces = []
+    for i in range(NX - 1):
+        a, b, c, d = i, i + 1, NX + i + 1, NX + i
+        faces += [[a, b, c, -1], [a, c, d, -1]]
+    bottom = np.where(np.arange(2 * NX) % 3 == 0, 2, 1)  # one-based bottom level
+
+    for stack in range(1, nstack + 1):
+        t = (stack - 1) * 86400.0 + 3600.0 * np.arange(1, STEPS + 1)
+        salt = np.empty((STEPS, 2 * NX, 3))
+        for level in range(3):
+            # levels below the bottom are garbage, the surface is fresher
+            salt[:, :, level] = bottom_salt(x[None, :], t[:, None]) - (level == 2) * 3.0
+        salt[:, bottom == 2, 0] = 99.0
+        stack_writer(
+            directory,
+            stack,
+            t,
+            {"salinity": salt},
+            bottom,
+            node_x=x,
+            node_y=y,
+            faces=np.array(faces),
+            mask_below_bottom=False,
+        )
+
+
+def route(z=-10000.0):
+    dist = np.arange(500.0, 20000.0, 500.0)
+    return pd.DataFrame({"x": dist, "y": 500.0, "z": z, "distance": dist})
+
+
+def test_x2_crossing_interpolates_and_truncates():
+    distance = np.array([0.0, 10.0, 20.0, 30.0])
+    salt = np.array(
+        [
+            [5.0, 3.0, 1.0, 0.5],  # crossing between 10 and 20
+            [1.0, 0.5, 0.2, 0.1],  # fresh everywhere: first point
+            [9.0, 8.0, 7.0, 6.0],  # salty everywhere: last point
+            [5.0, 3.0, 2.5, 1.0],  # crossing between 20 and 30
+        ]
+    )
+    np.testing.assert_allclose(x2_crossing(salt, distance), [15.0, 0.0, 30.0, 20.0 + 10.0 / 3.0])
+    np.testing.assert_allclose(x2_crossing(salt, distance, thresh=4.0), [5.0, 0.0, 30.0, 5.0])
+
+
+def test_x2_crossing_several_thresholds_and_non_monotonic():
+    distance = np.array([0.0, 10.0, 20.0, 30.0, 40.0])
+    salt = np.array(
+        [
+            [3.0, 1.5, 4.0, 0.8, 0.2],  # dips below 2 then rises again upstream
+            [6.0, 4.0, 2.0, 1.0, 0.4],
+        ]
+    )
+    x = x2_crossing(salt, distance, thresh=[2.0, 1.0, 0.5])
+    assert x.shape == (2, 3)
+    np.testing.assert_allclose(x[0], [10.0 * 1.0 / 1.5, 30.0 - 10.0 * 0.2 / 3.2, 35.0])
+    np.testing.assert_allclose(x[1], [20.0, 30.0, 30.0 + 10.0 * 0.5 / 0.6])
+    for j, thresh in enumerate([2.0, 1.0, 0.5]):
+        np.testing.assert_allclose(x[:, j], x2_crossing(salt, distance, thresh))
+
+
+def test_find_x2_series_and_frame():
+    distance = np.array([0.0, 1000.0, 2000.0])
+    frame = pd.DataFrame(
+        [[4.0, 3.0, 1.0], [3.0, 1.0, 0.4]],
+        index=pd.date_range("2020-01-01", periods=2, freq="D"),
+        columns=distance,
+    )
+    assert find_x2(frame.iloc[0]) == pytest.approx(1.5)
+    x2 = find_x2(frame)
+    assert x2.name == "x2"
+    np.testing.assert_allclose(x2.values, [1.5, 0.5])
+    several = find_x2(frame, thresh=[2.0, 1.0, 0.5], distance_bias=0.5)
+    assert list(several.columns) == ["x2", "x1", "x0.5"]
+    np.testing.assert_allclose(several.values, [[1.0, 1.5, 1.5], [0.0, 0.5, 0.5 + 5.0 / 6.0]])
+
+
+@pytest.mark.parametrize("nproc", [1, 2])
+def test_native_stacks_daily_and_tidal(tmp_path, stack_writer, nproc):
+    write_stacks(stack_writer, tmp_path)
+    salt = native_route_salinity(str(tmp_path), route(), "2020-01-01", nproc=nproc, chunk_steps=5)
+    assert len(salt) == 2 * STEPS
+    assert salt.index[0] == pd.Timestamp("2020-01-01 01:00")
+    expected = bottom_salt(route().x.values[None, :], 3600.0 * np.arange(1, 2 * STEPS + 1)[:, None])
+    np.testing.assert_allclose(salt.to_numpy(), expected, atol=1e-5)
+
+    daily = x2_from_salinity(salt)
+    assert list(daily.index) == list(pd.date_range("2020-01-01", periods=3, freq="D"))[:len(daily)]
+    tidal = x2_from_salinity(salt, period="tidal")
+    np.testing.assert_allclose(tidal.values, 18.0, atol=0.05)
+
+
+def test_surface_points(tmp_path, stack_writer):
+    write_stacks(stack_writer, tmp_path, nstack=1)
+    salt = native_route_salinity(str(tmp_path), route(z=0.0), "2020-01-01", nproc=1)
+    expected = bottom_salt(route().x.values[None, :], 3600.0 * np.arange(1, STEPS + 1)[:, None]) - 3.0
+    np.testing.assert_allclose(salt.to_numpy(), expected, atol=1e-5)
+
+
+def test_fort18_files(tmp_path):
+    rt = route()
+    files = []
+    for day in range(2):
+        elapsed = day + np.arange(STEPS) / 24.0
+        values = bottom_salt(rt.x.values[None, :], elapsed[:, None] * 86400.0)
+        fname = tmp_path / f"fort.18_{day}"
+        np.savetxt(fname, np.column_stack([elapsed, values]), fmt="%.6f")
+        files.append(str(fname))
+    salt = fort18_route_salinity(files, rt, "2020-01-01")
+    assert len(salt) == 2 * STEPS
+    daily = x2_from_salinity(salt)
+    assert len(daily) == 2
+    np.testing.assert_allclose(daily.values, 18.0, atol=0.05)
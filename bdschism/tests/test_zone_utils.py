@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Parity tests for the mesh topology and area kernels in bdschism.zone_utils.
+
+The ``reference_*`` functions are the original pure-Python loops and serve as
+the oracle for the vectorized/numba versions. They are also used by
+``benchmarks/bench_zone_utils.py``.
+"""
+
+import numpy as np
+import pytest
+
+from bdschism.zone_utils import (
+    element_areas,
+    face_nodes_csr,
+    fill_ele_area,
+    fill_ele_area510,
+    gen_node_neibor_ele,
+    gen_node_wet_dry,
+    node_elements_csr,
+    node_wet_dry_csr,
+    quad_area,
+    triangle_area,
+)
+
+
+# ---------------------------------------------------------------------------
+# Reference implementations
+# ---------------------------------------------------------------------------
+
+
+def reference_gen_node_neibor_ele(mesh_node, max_node_in_a_cell, num_ele, num_node):
+    num_ele_at_node = (np.zeros((num_node))).astype(int)
+    for i in range(num_ele):
+        for j in range(max_node_in_a_cell):
+            if mesh_node[i][j] > 0:
+                nodeid = mesh_node[i][j] - 1
+                num_ele_at_node[nodeid] = num_ele_at_node[nodeid] + 1
+
+    max_ele_at_node = int(np.max(num_ele_at_node))
+    num_ele_at_node[:] = np.zeros((num_node)).astype(int)
+    out_neibor_ele = np.empty((num_node, max_ele_at_node))
+    out_neibor_ele[:, :] = np.nan
+    for i in range(num_ele):
+        for j in range(max_node_in_a_cell):
+            if mesh_node[i][j] > 0:
+                nodeid = mesh_node[i][j] - 1
+                loc = num_ele_at_node[nodeid]
+                out_neibor_ele[nodeid, loc] = i
+                num_ele_at_node[nodeid] = loc + 1
+    return out_neibor_ele, max_ele_at_node
+
+
+def reference_gen_node_wet_dry(
+    node_wet_dry, ele_wet_dry, num_step, num_node, max_ele_at_node, el
+):
+    for t in range(num_step):
+        for i in range(num_node):
+            all_dry = True
+            for j in range(max_ele_at_node):
+                if not (np.isnan(el[i, j])):
+                    dry = ele_wet_dry[t, int(el[i, j])]
+                    if dry == 0:
+                        all_dry = False
+                        break
+            if all_dry:
+                node_wet_dry[t, i] = 1
+            else:
+                node_wet_dry[t, i] = 0
+
+
+def reference_fill_ele_area510(face_num, ele_table, node_x, node_y, ele_area):
+    for k in range(face_num):
+        node_id_lst = ele_table[k, :]
+        i = node_id_lst[0] - 1
+        x1, y1 = node_x[i], node_y[i]
+        i = node_id_lst[1] - 1
+        x2, y2 = node_x[i], node_y[i]
+        i = node_id_lst[2] - 1
+        x3, y3 = node_x[i], node_y[i]
+        i = node_id_lst[3] - 1
+        if i == -2:
+            ele_area[k] = triangle_area(x1, y1, x2, y2, x3, y3)
+        else:
+            ele_area[k] = quad_area(x1, y1, x2, y2, x3, y3, node_x[i], node_y[i])
+
+
+def synthetic_mesh(nx, ny, seed=0):
+    """Structured mesh of mixed quads and split triangles in out2d layout.
+
+    Returns one-based ``ele_table`` with -1 in the fourth column of
+    triangles, jittered node coordinates and the node count.
+    """
+    rng = np.random.default_rng(seed)
+    X, Y = np.meshgrid(np.arange(nx, dtype=float), np.arange(ny, dtype=float))
+    node_x = (X + 0.3 * rng.random(X.shape)).ravel() * 50.0
+    node_y = (Y + 0.3 * rng.random(Y.shape)).ravel() * 50.0
+    j, i = np.meshgrid(np.arange(ny - 1), np.arange(nx - 1), indexing="ij")
+    a = (j * nx + i).ravel() + 1
+    b, c, d = a + 1, a + nx + 1, a + nx
+    is_quad = rng.random(a.size) < 0.5
+    quads = np.column_stack([a, b, c, d])[is_quad]
+    t1 = np.column_stack([a, b, c, -np.ones_like(a)])[~is_quad]
+    t2 = np.column_stack([a, c, d, -np.ones_like(a)])[~is_quad]
+    ele_table = np.vstack([quads, t1, t2])
+    ele_table = ele_table[rng.permutation(len(ele_table))]
+    return ele_table, node_x, node_y, nx * ny
+
+
+@pytest.fixture
+def mesh():
+    return synthetic_mesh(13, 9)
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+class TestTopology:
+    def test_face_nodes_csr(self, mesh):
+        ele_table, _, _, _ = mesh
+        face_ptr, face_idx = face_nodes_csr(ele_table)
+        for k in (0, 5, len(ele_table) - 1):
+            expected = [n - 1 for n in ele_table[k] if n > 0]
+            assert list(face_idx[face_ptr[k] : face_ptr[k + 1]]) == expected
+
+    def test_masked_table_matches_fill_value_table(self, mesh):
+        ele_table, _, _, _ = mesh
+        masked = np.ma.masked_less(ele_table, 0)
+        for a, b in zip(face_nodes_csr(ele_table), face_nodes_csr(masked)):
+            np.testing.assert_array_equal(a, b)
+
+    def test_gen_node_neibor_ele_parity(self, mesh):
+        ele_table, _, _, num_node = mesh
+        expected, max_expected = reference_gen_node_neibor_ele(
+            ele_table, 4, len(ele_table), num_node
+        )
+        out, max_ele = gen_node_neibor_ele(ele_table, 4, len(ele_table), num_node)
+        assert max_ele == max_expected
+        np.testing.assert_array_equal(out, expected)
+
+    def test_node_elements_csr_lists_every_incidence(self, mesh):
+        ele_table, _, _, num_node = mesh
+        face_ptr, face_idx = face_nodes_csr(ele_table)
+        node_ptr, node_ele = node_elements_csr(face_ptr, face_idx, num_node)
+        assert node_ptr[-1] == len(face_idx)
+        node = 3 * 13 + 4
+        around = node_ele[node_ptr[node] : node_ptr[node + 1]]
+        assert all((ele_table[e] == node + 1).any() for e in around)
+        assert list(around) == sorted(around)
+
+
+class TestWetDry:
+    def test_gen_node_wet_dry_parity(self, mesh):
+        ele_table, _, _, num_node = mesh
+        el, max_ele = gen_node_neibor_ele(ele_table, 4, len(ele_table), num_node)
+        rng = np.random.default_rng(1)
+        num_step = 6
+        ele_dry = (rng.random((num_step, len(ele_table))) < 0.7).astype(np.int32)
+        expected = np.zeros((num_step, num_node))
+        reference_gen_node_wet_dry(expected, ele_dry, num_step, num_node, max_ele, el)
+        out = np.zeros((num_step, num_node))
+        gen_node_wet_dry(out, ele_dry, num_step, num_node, max_ele, el)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_node_wet_dry_csr_all_wet(self, mesh):
+        ele_table, _, _, num_node = mesh
+        node_ptr, node_ele = node_elements_csr(*face_nodes_csr(ele_table), num_node)
+        out = node_wet_dry_csr(np.zeros((2, len(ele_table))), node_ptr, node_ele)
+        assert out.shape == (2, num_node)
+        assert not out.any()
+
+
+class TestArea:
+    def test_fill_ele_area510_parity(self, mesh):
+        ele_table, node_x, node_y, _ = mesh
+        expected = np.zeros(len(ele_table))
+        reference_fill_ele_area510(len(ele_table), ele_table, node_x, node_y, expected)
+        out = np.zeros(len(ele_table))
+        fill_ele_area510(len(ele_table), ele_table, node_x, node_y, out)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_fill_ele_area_schout_layout(self, mesh):
+        ele_table, node_x, node_y, _ = mesh
+        masked = np.ma.masked_less(ele_table, 0)
+        expected = np.zeros(len(ele_table))
+        fill_ele_area510(len(ele_table), ele_table, node_x, node_y, expected)
+        out = np.zeros(len(ele_table))
+        fill_ele_area(len(masked), masked, node_x, node_y, out)
+        np.testing.assert_array_equal(out, expected)
+        np.testing.assert_array_equal(element_areas(masked, node_x, node_y), expected)
+
+    def test_total_area(self):
+        ele_table, _, _, _ = synthetic_mesh(5, 4)
+        X, Y = np.meshgrid(np.arange(5.0), np.arange(4.0))
+        area = element_areas(ele_table, X.ravel(), Y.ravel())
+        assert area.sum() == pytest.approx(4.0 * 3.0)
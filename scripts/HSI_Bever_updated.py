@@ -9,11 +9,12 @@ import os
 
 import netCDF4
 import datetime as dtm
-from math import exp
 from osgeo import ogr
 import json
 import pandas as pd
 from zone_utils import *
+from bdschism.grid_mapping import read_map_text
+from bdschism.hsi import read_quantile_files
 
 ele_table=0
 ele_area=0
@@ -50,91 +51,34 @@ quantiles = ['05','25','50','75']
 quantile_factors = [0.0,0.25,0.5,0.75,1.0]  #first zero is for if none of the temps fall below the threshold
 
 
-##########-----READ TURBIDITY QUANTILE DATA ON COARSE GRID-----#############
-turbidity_time_quantiles = []
-turbidity_data_quantiles = []
-
-for q in quantiles:
-    turbidity_file="{0}/ln_turbidity_quantile_{1}_fit.csv".format(path_to_quantile_files,q)
-    #read turbidity data
-    t_file = open(turbidity_file)
-    turb_file_data = t_file.readlines()
-    t_file.close()
-    
-    turbidity_date=st
-    turbidity_time=[]
-    turbidity_data=[]
-    for ii in range(len(turb_file_data)):
-       turbidity_time.append(turbidity_date)
-       turbidity_date=turbidity_date+dt  
-       turbidity_data.append([exp(float(i)) for i in turb_file_data[ii].split(",")])
-    
-    turbidity_time_quantiles.append(turbidity_time)
-    turbidity_data_quantiles.append(turbidity_data)
-
-
-##########-----READ TEMPERATURE QUANTILE DATA ON COARSE GRID-----#############
-temperature_time_quantiles = []
-temperature_data_quantiles = []
-
-for qq in quantiles:
-    temp_file="{0}/temperature_quantile_{1}_fit.csv".format(path_to_quantile_files,qq)
-    #read turbidity data
-    t_file = open(temp_file)
-    temp_file_data = t_file.readlines()
-    t_file.close()
-    
-    temperature_date=st
-    temperature_time=[]
-    temperature_data=[]
-    for ii in range(len(temp_file_data)):
-       temperature_time.append(temperature_date)
-       temperature_date=temperature_date+dt  
-       temperature_data.append([float(i) for i in temp_file_data[ii].split(",")])
-    
-    temperature_time_quantiles.append(temperature_time)
-    temperature_data_quantiles.append(temperature_data)
-
+##########-----READ TURBIDITY AND TEMPERATURE QUANTILE DATA ON COARSE GRID-----#############
+# Arrays of shape (quantile, day, coarse node), one row per day from st
+turbdq = np.exp(
+    read_quantile_files(
+        [
+            "{0}/ln_turbidity_quantile_{1}_fit.csv".format(path_to_quantile_files, q)
+            for q in quantiles
+        ]
+    )
+)
+tempdq = read_quantile_files(
+    [
+        "{0}/temperature_quantile_{1}_fit.csv".format(path_to_quantile_files, qq)
+        for qq in quantiles
+    ]
+)
+quantile_time = [st + dt * ii for ii in range(turbdq.shape[1])]
 
 
 ##########-----READ GRID MAPPING DATA-----#############
-map_f = open(map_file_path)
-map_data = map_f.readlines()
-map_f.close()
-
-numNdElNds = []
-ndElIDs = []
-ndElWghts = []
-
-for i in range(len(map_data)):  #number of nodes in hgrid
-    temp_data = map_data[i].split()
-    n_nodes = int(temp_data[1])
-    numNdElNds.append(n_nodes)  
-    elNodes = []
-    elWeights = []
-    for j in range(n_nodes):
-        elNodes.append(int(temp_data[2+j])-1)
-        elWeights.append(float(temp_data[2+n_nodes+j]))
-        
-    ndElIDs.append(elNodes)
-    ndElWghts.append(elWeights)
-
-#########################################################
+# Sparse (fine node, coarse node) matrix of the normalized weights
+grid_map = read_map_text(map_file_path, nsource=turbdq.shape[2])
 
 ##########-----MAP DATA-----#############
 print("Mapping grids")
-turbdq = np.array(turbidity_data_quantiles)
-tempdq = np.array(temperature_data_quantiles)
-
-mappedTurbidity = []
-mappedTemperature = []
-
-for j in range(len(map_data)):
-    mappedvalues = np.average(turbdq[:,:,ndElIDs[j]],axis=2,weights=ndElWghts[j])
-    mappedTurbidity.append(mappedvalues)
-    
-    mappedvalues = np.average(tempdq[:,:,ndElIDs[j]],axis=2,weights=ndElWghts[j])
-    mappedTemperature.append(mappedvalues)
+# One sparse product for all quantiles and days: (quantile, day, fine node)
+mappedTurbidity = grid_map.remap(turbdq)
+mappedTemperature = grid_map.remap(tempdq)
 print("Done Mapping")
         
 ##############STORING DATETIME FOR PERIOD################
@@ -510,16 +454,10 @@ for k in range(len(average_period)-1):
     date = dtm.datetime(start_date.year,start_date.month,start_date.day)
     
         
-    ii = turbidity_time_quantiles[0].index(date) 
+    ii = quantile_time.index(date)
     for qq in range(len(quantiles)):
-        nodeTurbData=[]
-        nodeTempData=[]
-        for j in range(node_num):
-            nodeTurbData.append(mappedTurbidity[j][qq][ii])
-            nodeTempData.append(mappedTemperature[j][qq][ii])
-            
-        dst.variables["turbidity_q{0}".format(quantiles[qq])][k,:]=nodeTurbData
-        dst.variables["temperature_q{0}".format(quantiles[qq])][k,:]=nodeTempData
+        dst.variables["turbidity_q{0}".format(quantiles[qq])][k,:]=mappedTurbidity[qq, ii, :]
+        dst.variables["temperature_q{0}".format(quantiles[qq])][k,:]=mappedTemperature[qq, ii, :]
         
              
 
@@ -2,6 +2,12 @@
 
 It is based on the previous script `hsi_Bever_updated.py`.
 
+`bdschism hsi` (bdschism.hsi) writes the same files one day at a time
+without suxarray, with bounded memory and resumable day checkpoints. It
+follows the formula, the daily bins and the quantile start of this script;
+``--formula hsi2`` gives the suitability index combination of
+calculate_hsi2.py instead. Each output stack must hold one daily bin.
+
 NOTE: Use the master branch of suxarray as of 2023-06-30
 and uxarray v2023.06.
 """
@@ -16,6 +22,8 @@ import xarray as xr
 import suxarray as sx
 import suxarray.helper
 
+from bdschism.grid_mapping import grid_mapping
+
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)s %(message)s",
@@ -420,78 +428,10 @@ def read_quantile_data(path_csv_pattern):
 
 
 def map_grids(coarse_path, fine_path, map_path):
-    # Read coarse grid
-    coarse_grid = sx.read_hgrid_gr3(coarse_path)
-
-    # Read fine grid
-    fine_grid = sx.read_hgrid_gr3(fine_path)
-
-    fine_nodes = fine_grid.node_points
-
-    coarse_face_id_from_fine_node = coarse_grid.elem_strtree.query(
-        fine_nodes, predicate="intersects"
-    )
-    coarse_face_nodes = coarse_grid.Mesh2_face_nodes.values
-    # Create an empty array to store the node mapping. `-1` is the fill value.
-    map_to_coarse_nodes = np.full((fine_grid.nMesh2_node, 3), -1, dtype=int)
-
-    map_to_coarse_nodes[coarse_face_id_from_fine_node[0], :] = coarse_face_nodes[
-        coarse_face_id_from_fine_node[1]
-    ][:, :3]
-    fine_nodes_not_found = list(
-        set(range(fine_grid.nMesh2_node)) - set(coarse_face_id_from_fine_node[0])
-    )
-
-    if len(fine_nodes_not_found) > 0:
-        fine_nodes_not_found.sort()
-        coarse_nodes_nearest = xr.apply_ufunc(
-            lambda p: coarse_grid.node_strtree.nearest(p),
-            fine_nodes.isel(nMesh2_node=fine_nodes_not_found),
-            vectorize=True,
-            dask="parallelized",
-        )
-        map_to_coarse_nodes[fine_nodes_not_found, 0] = coarse_nodes_nearest
-
-    da_map_to_coarse_nodes = xr.DataArray(
-        map_to_coarse_nodes,
-        dims=("nMesh2_node", "three"),
-        attrs={"_FillValue": -1, "start_index": 0},
-        name="map_to_coarse_nodes",
-    )
-
-    def _calculate_weight(conn, points):
-        """Calculate distance between a point and a set of points."""
-        x = coarse_grid.Mesh2_node_x.values[conn]
-        y = coarse_grid.Mesh2_node_y.values[conn]
-        xy = np.array([p.xy for p in points])
-        dist = np.apply_along_axis(np.linalg.norm, 1, np.stack((x, y), axis=1) - xy)
-        weight = np.reciprocal(dist)
-        # Find where we see the infinite values
-        mask = np.where(np.isinf(weight))
-        # Adjust the weights for the node
-        weight[mask[0], :] = 0.0
-        weight[mask] = 1.0
-        # weight /= weight.sum(axis=1).reshape(-1, 1)
-        return weight
-
-    chunk_size = None
-    da_weight = xr.apply_ufunc(
-        _calculate_weight,
-        da_map_to_coarse_nodes.chunk({"nMesh2_node": chunk_size}),
-        fine_nodes.chunk({"nMesh2_node": chunk_size}),
-        input_core_dims=[["three"], []],
-        output_core_dims=[["three"]],
-        dask="parallelized",
-        output_dtypes=float,
-    ).persist()
-
-    # Create a dataset and save it
-    ds_map_and_weight = da_map_to_coarse_nodes.to_dataset(
-        name=da_map_to_coarse_nodes.name
-    )
-    ds_map_and_weight["weight"] = da_weight
-    path_map_and_weight = map_path
-    ds_map_and_weight.to_netcdf(path_map_and_weight)
+    # Inverse-distance weights of the enclosing coarse element, computed once
+    # per pair of grids and cached next to the fine grid
+    mapping = grid_mapping(str(coarse_path), str(fine_path), method="idw")
+    mapping.write_map_file(map_path)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,9 @@ Script to map nodes from a fine grid to a coarse grid.
 
 """
 
-import numpy as np
-import xarray as xr
 import click
-from suxarray import *
+
+from bdschism.grid_mapping import grid_mapping
 
 
 @click.command()
@@ -49,75 +48,8 @@ def main(coarse_path, fine_path, map_path):
     -------
     None
     """
-    # Read coarse grid
-    coarse_mesh = read_hgrid_gr3(coarse_path)
-
-    # Read fine grid
-    fine_mesh = read_hgrid_gr3(fine_path)
-
-    fine_nodes = fine_mesh.node_points
-
-    coarse_face_id_from_fine_node = coarse_mesh.elem_strtree.query(fine_nodes)
-    coarse_face_nodes = coarse_mesh.Mesh2_face_nodes.values
-    # Create an empty array to store the node mapping. `-1` is the fill value.
-    map_to_coarse_nodes = np.full((fine_mesh.nMesh2_node, 3), -1, dtype=int)
-
-    map_to_coarse_nodes[coarse_face_id_from_fine_node[0], :] = (
-        coarse_face_nodes[coarse_face_id_from_fine_node[1]][:, :3] - 1
-    )
-    fine_nodes_not_found = list(
-        set(range(fine_mesh.nMesh2_node)) - set(coarse_face_id_from_fine_node[0])
-    )
-
-    if len(fine_nodes_not_found) > 0:
-        fine_nodes_not_found.sort()
-        coarse_nodes_nearest = xr.apply_ufunc(
-            lambda p: coarse_mesh.node_strtree.nearest(p),
-            fine_nodes.isel(nMesh2_node=fine_nodes_not_found),
-            vectorize=True,
-            dask="parallelized",
-        )
-        map_to_coarse_nodes[fine_nodes_not_found, 0] = coarse_nodes_nearest
-
-    da_map_to_coarse_nodes = xr.DataArray(
-        map_to_coarse_nodes,
-        dims=("nMesh2_node", "three"),
-        attrs={"_FillValue": -1, "start_index": 0},
-        name="map_to_coarse_nodes",
-    )
-
-    def _calculate_weight(conn, points):
-        """Calculate distance between a point and a set of points."""
-        x = coarse_mesh.Mesh2_node_x.values[conn]
-        y = coarse_mesh.Mesh2_node_y.values[conn]
-        xy = np.array([p.xy for p in points])
-        dist = np.apply_along_axis(np.linalg.norm, 1, np.stack((x, y), axis=1) - xy)
-        weight = np.reciprocal(dist)
-        # Find where we see the infinite values
-        mask = np.where(np.isinf(weight))
-        # Adjust the weights for the node
-        weight[mask[0], :] = 0.0
-        weight[mask] = 1.0
-        return weight
-
-    chunk_size = None
-    da_weight = xr.apply_ufunc(
-        _calculate_weight,
-        da_map_to_coarse_nodes.chunk({"nMesh2_node": chunk_size}),
-        fine_nodes.chunk({"nMesh2_node": chunk_size}),
-        input_core_dims=[["three"], []],
-        output_core_dims=[["three"]],
-        dask="parallelized",
-        output_dtypes=float,
-    ).persist()
-
-    # Create a dataset and save it
-    ds_map_and_weight = da_map_to_coarse_nodes.to_dataset(
-        name=da_map_to_coarse_nodes.name
-    )
-    ds_map_and_weight["weight"] = da_weight
-    path_map_and_weight = map_path
-    ds_map_and_weight.to_netcdf(path_map_and_weight)
+    mapping = grid_mapping(coarse_path, fine_path, method="idw")
+    mapping.write_map_file(map_path)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import os
 import pandas as pd
 from schimpy.schism_source import read_sources
 from vtools import elapsed_datetime, days
+from bdschism.th_sidecar import read_th_table
 
 
 
@@ -15,9 +16,9 @@ from vtools import elapsed_datetime, days
 def source_dfs(sim_dir, params):
     """Reads vsource, vsink and msource.th files and returns as list of DataFrames"""
     start = params.run_start
-    vsource = pd.read_csv(os.path.join(sim_dir, "vsource.th"), index_col=0, sep=r"\s+", header=None)
-    vsink = pd.read_csv(os.path.join(sim_dir, "vsink.th"), index_col=0, sep=r"\s+", header=None)
-    msource = pd.read_csv(os.path.join(sim_dir, "msource.th"), index_col=0, sep=r"\s+", header=None)
+    vsource = read_th_table(os.path.join(sim_dir, "vsource.th"), index_col=0, header=None)
+    vsink = read_th_table(os.path.join(sim_dir, "vsink.th"), index_col=0, header=None)
+    msource = read_th_table(os.path.join(sim_dir, "msource.th"), index_col=0, header=None)
     return [elapsed_datetime(x, reftime=start) for x in (vsource, vsink, msource)]
 
 